@@ -0,0 +1,105 @@
+import os
+import logging
+from typing import Callable, Dict, List, Optional
+
+from services.executor import run_blocking
+from services.extractive_summary import ExtractiveAnalysis, condense
+from services.metrics import track
+
+logger = logging.getLogger(__name__)
+
+class LocalSummarizationAgent:
+    """
+    Agent that summarizes transcripts and extracts action items on the CPU,
+    without calling a model: TF-IDF/TextRank sentence ranking and rule-based
+    action item detection. Same process_transcript contract as SummarizationAgent.
+    """
+
+    # Bump whenever the ranking or the action item rules change
+    ENGINE_VERSION = "1"
+
+    def __init__(self):
+        self.summary_words = int(os.getenv("LOCAL_SUMMARY_WORDS", "150"))
+
+    async def process_transcript(
+        self,
+        transcript: str,
+        on_partial: Optional[Callable[[Dict[str, any]], None]] = None
+    ) -> Optional[Dict[str, any]]:
+        """
+        Summarize a transcript and extract its action items locally
+
+        Args:
+            transcript: Raw transcript text
+            on_partial: Optional callback, given each action item as it is found
+                (the whole result is ready at once, so this only mirrors the
+                streaming contract of SummarizationAgent)
+
+        Returns:
+            Dict containing summary, action_items, action_item_details (owner,
+            verb and deadline of each item) and engine "local", or None if failed
+        """
+        try:
+            with track("summarization", "local"):
+                result = await run_blocking(self.analyze, transcript)
+            if on_partial:
+                for index, item in enumerate(result["action_items"]):
+                    on_partial({"action_item": item, "index": index})
+                on_partial({"summary": result["summary"]})
+            logger.info(f"Local summary ready. Found {len(result['action_items'])} action items")
+            return result
+
+        except Exception as e:
+            logger.error(f"Error summarizing transcript locally: {str(e)}")
+            return None
+
+    async def update_rolling_summary(
+        self,
+        previous_summary: str,
+        action_items: List[str],
+        new_text: str
+    ) -> Optional[Dict[str, any]]:
+        """
+        Extend a live meeting's summary with the most central sentence of the new
+        text and return the action items found in it
+
+        Args:
+            previous_summary: Rolling summary so far (may be empty)
+            action_items: Action items already extracted
+            new_text: Transcript text received since the last update
+
+        Returns:
+            Dict with the updated "summary" and the "action_items" found in the new
+            text, or None if failed
+        """
+        try:
+            result = await run_blocking(self.analyze, new_text, 40)
+            known = set(action_items)
+            new_items = [item for item in result["action_items"] if item not in known]
+            summary = f"{previous_summary} {result['summary']}".strip() if result["summary"] else previous_summary
+            return {"summary": summary.replace("\n\n", " "), "action_items": new_items}
+
+        except Exception as e:
+            logger.error(f"Error updating rolling summary locally: {str(e)}")
+            return None
+
+    async def condense(self, transcript: str, max_chars: int) -> str:
+        """
+        Shorten a transcript to about max_chars, keeping likely action items and
+        the most central sentences (see services.extractive_summary.condense)
+        """
+        with track("summarization", "condense"):
+            return await run_blocking(condense, transcript, max_chars)
+
+    def analyze(self, transcript: str, max_words: Optional[int] = None) -> Dict[str, any]:
+        """
+        Blocking part of process_transcript, for use from worker threads
+        """
+        analysis = ExtractiveAnalysis(transcript)
+        details = analysis.action_items()
+        return {
+            "summary": analysis.summary(max_words or self.summary_words),
+            "action_items": [item["text"] for item in details],
+            "action_item_details": details,
+            "engine": "local",
+        }
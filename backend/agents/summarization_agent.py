@@ -1,8 +1,19 @@
+import asyncio
 import os
+import random
+import threading
 import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
 import logging
-from typing import Dict, List, Optional
-import json
+from typing import Callable, Dict, List, Optional
+import time
+
+from agents.local_summarization_agent import LocalSummarizationAgent
+from services.executor import run_provider_call
+from services.json_stream import SummaryStreamParser
+from services.metrics import LOCAL_SUMMARIES, STAGE_LATENCY, track, record_external
+from services.resilience import CircuitOpenError, DeadlineExceeded, get_provider, sleep_within_deadline
+from services.transcript_chunker import split_transcript, dedupe_action_items
 
 logger = logging.getLogger(__name__)
 
@@ -11,6 +22,9 @@ class SummarizationAgent:
     Agent responsible for generating meeting summaries and extracting action items using Google Gemini
     """
     
+    # Bump whenever the prompt changes so cached summaries are not reused
+    PROMPT_VERSION = "3"
+    
     def __init__(self):
         self.api_key = os.getenv("GEMINI_API_KEY")
         if not self.api_key:
@@ -18,98 +32,476 @@ class SummarizationAgent:
             self.demo_mode = True
         else:
             self.demo_mode = False
-            # Configure Gemini
-            genai.configure(api_key=self.api_key)
+            # Configure Gemini; GEMINI_API_ENDPOINT points the REST transport at another host (e.g. a local stand-in)
+            api_endpoint = os.getenv("GEMINI_API_ENDPOINT")
+            if api_endpoint:
+                genai.configure(api_key=self.api_key, transport="rest", client_options={"api_endpoint": api_endpoint})
+            else:
+                genai.configure(api_key=self.api_key)
             self.model = genai.GenerativeModel('gemini-1.5-flash')
+        
+        # Map-reduce settings for transcripts too long for a single prompt
+        self.chunk_chars = int(os.getenv("SUMMARY_CHUNK_CHARS", "12000"))
+        self.chunk_overlap = int(os.getenv("SUMMARY_CHUNK_OVERLAP", "600"))
+        self.fanout = max(1, int(os.getenv("SUMMARY_FANOUT", "4")))
+        
+        # Bounds that keep live-meeting update prompts a constant size
+        self.live_summary_words = int(os.getenv("LIVE_SUMMARY_WORDS", "250"))
+        self.live_known_items = int(os.getenv("LIVE_KNOWN_ITEMS", "30"))
+        
+        # Gemini calls share one circuit breaker and retry budget; failed requests are
+        # retried up to GEMINI_MAX_RETRIES times while the budget and deadline allow
+        self.provider = get_provider("gemini")
+        self.max_retries = max(0, int(os.getenv("GEMINI_MAX_RETRIES", "1")))
+        self.retry_delay = float(os.getenv("GEMINI_RETRY_DELAY", "1.0"))
+        
+        # Stream responses so the summary and action items are parsed while the model is still generating
+        self.streaming = os.getenv("SUMMARY_STREAMING", "true").lower() == "true"
+        
+        # Local extractive engine: the whole summary without an API key, an instant
+        # preview while Gemini works, the result when Gemini fails, and optionally a
+        # pre-filter that condenses long transcripts into a single prompt
+        self.local = LocalSummarizationAgent()
+        self.preview = os.getenv("SUMMARY_PREVIEW", "true").lower() == "true"
+        self.local_fallback = os.getenv("SUMMARY_LOCAL_FALLBACK", "true").lower() == "true"
+        self.prefilter = os.getenv("SUMMARY_PREFILTER", "false").lower() == "true"
+        self.prefilter_chars = int(os.getenv("SUMMARY_PREFILTER_CHARS", str(self.chunk_chars)))
+        if self.prefilter:
+            # Condensed transcripts give different answers, so their summaries are cached separately
+            self.PROMPT_VERSION = f"{self.PROMPT_VERSION}-prefilter{self.prefilter_chars}-local{self.local.ENGINE_VERSION}"
     
-    async def process_transcript(self, transcript: str) -> Optional[Dict[str, any]]:
+    async def process_transcript(
+        self,
+        transcript: str,
+        on_partial: Optional[Callable[[Dict[str, any]], None]] = None
+    ) -> Optional[Dict[str, any]]:
         """
         Process transcript to generate summary and extract action items
         
         Args:
             transcript: Raw transcript text
+            on_partial: Optional callback receiving partial results: the local
+                engine's {"preview": result} first, then each chunk's result when a
+                long transcript is summarized in chunks, otherwise the summary and
+                each action item as soon as they are streamed
             
         Returns:
-            Dict containing summary and action_items or None if failed
+            Dict containing summary and action_items or None if failed. Results of
+            the local engine (demo mode, or Gemini failed) also have engine "local".
         """
         try:
             logger.info("Starting transcript processing")
             
             if self.demo_mode:
-                # Return demo summary and action items
-                demo_result = {
-                    "summary": "This was a productive weekly team meeting focused on product launch preparation and budget planning. The team discussed upcoming deadlines, resource allocation, and coordination between departments. Key decisions were made regarding marketing materials, product demos, and budget review processes.",
-                    "action_items": [
-                        "Sarah will finalize the marketing materials by Friday",
-                        "John will prepare a product demo for the sales team", 
-                        "Finance team will review Q2 budget allocation",
-                        "Marketing team will submit campaign proposal by next week"
-                    ]
-                }
-                logger.info("Demo mode: Returning sample summary and action items")
-                return demo_result
-            
-            # Create prompt for Gemini
+                logger.info("Demo mode: summarizing with the local engine")
+                LOCAL_SUMMARIES.inc(use="demo")
+                return await self.local.process_transcript(transcript, on_partial)
+            
+            remote = asyncio.ensure_future(self._summarize_remote(transcript, on_partial))
+            preview = None
+            try:
+                if self.preview and on_partial:
+                    # Runs while the Gemini request is in flight
+                    preview = await self.local.process_transcript(transcript)
+                    if preview:
+                        LOCAL_SUMMARIES.inc(use="preview")
+                        on_partial({"preview": preview})
+                result = await remote
+            except asyncio.CancelledError:
+                remote.cancel()
+                raise
+            except Exception as e:
+                logger.error(f"Error processing transcript: {str(e)}")
+                result = None
+            
+            if result is None and self.local_fallback:
+                logger.warning("Gemini summarization failed; returning the local summary instead")
+                LOCAL_SUMMARIES.inc(use="fallback")
+                return preview or await self.local.process_transcript(transcript)
+            return result
+                
+        except Exception as e:
+            logger.error(f"Error processing transcript: {str(e)}")
+            return None
+    
+    async def _summarize_remote(
+        self,
+        transcript: str,
+        on_partial: Optional[Callable[[Dict[str, any]], None]] = None
+    ) -> Optional[Dict[str, any]]:
+        """
+        Summarize with Gemini: in one prompt, condensed into one prompt by the
+        local engine (SUMMARY_PREFILTER), or map-reduce over chunks
+        """
+        if self.prefilter and len(transcript) > self.prefilter_chars:
+            condensed = await self.local.condense(transcript, self.prefilter_chars)
+            LOCAL_SUMMARIES.inc(use="prefilter")
+            logger.info(f"Long transcript ({len(transcript)} chars) condensed to {len(condensed)} chars for a single prompt")
+            return await self._summarize_single(condensed, on_partial)
+        
+        chunks = split_transcript(transcript, self.chunk_chars, self.chunk_overlap)
+        if len(chunks) <= 1:
+            return await self._summarize_single(transcript, on_partial)
+        
+        logger.info(f"Long transcript ({len(transcript)} chars): summarizing {len(chunks)} chunks with fan-out {self.fanout}")
+        return await self._summarize_chunked(chunks, on_partial)
+    
+    async def update_rolling_summary(
+        self,
+        previous_summary: str,
+        action_items: List[str],
+        new_text: str
+    ) -> Optional[Dict[str, any]]:
+        """
+        Incrementally update a live meeting's summary from newly transcribed text
+        
+        Only the previous summary, the known action items and the new text are sent,
+        so the cost of an update does not grow with the length of the meeting.
+        
+        Args:
+            previous_summary: Rolling summary so far (may be empty)
+            action_items: Action items already extracted
+            new_text: Transcript text received since the last update
+            
+        Returns:
+            Dict with the updated "summary" and the "action_items" found in the new
+            text, or None if failed
+        """
+        if self.demo_mode:
+            # Demo mode: the local engine keeps live sessions working without an API key
+            return await self.local.update_rolling_summary(previous_summary, action_items, new_text)
+        
+        try:
+            known_items = "\n".join(f"- {item}" for item in action_items[-self.live_known_items:]) or "(none)"
             prompt = f"""
-            Please analyze the following meeting transcript and provide:
+            You are keeping live notes for a meeting that is still in progress.
             
-            1. A concise summary of the meeting (2-3 paragraphs)
-            2. A clear list of action items with responsible parties and deadlines where mentioned
+            Current summary of the meeting so far:
+            {previous_summary or "(nothing yet)"}
             
-            Meeting Transcript:
-            {transcript}
+            Action items already recorded:
+            {known_items}
+            
+            New transcript text since the last update:
+            {new_text}
+            
+            Update the summary to include the new information in at most {self.live_summary_words} words,
+            and list only NEW concrete action items from the new text (not ones already recorded).
+            
+            Please format your response as JSON with the following structure:
+            {{
+                "summary": "Updated meeting summary...",
+                "action_items": ["New action item 1"]
+            }}
+            """
+            
+            result = await self._generate_json(prompt)
+            
+        except Exception as e:
+            logger.error(f"Error updating rolling summary: {str(e)}")
+            result = None
+        
+        if result is None and self.local_fallback:
+            LOCAL_SUMMARIES.inc(use="fallback")
+            return await self.local.update_rolling_summary(previous_summary, action_items, new_text)
+        return result
+    
+    async def _summarize_single(
+        self,
+        transcript: str,
+        on_partial: Optional[Callable[[Dict[str, any]], None]] = None
+    ) -> Optional[Dict[str, any]]:
+        """
+        Summarize a transcript that fits in one prompt
+        """
+        # Create prompt for Gemini
+        prompt = f"""
+        Please analyze the following meeting transcript and provide:
+        
+        1. A concise summary of the meeting (2-3 paragraphs)
+        2. A clear list of action items with responsible parties and deadlines where mentioned
+        
+        Meeting Transcript:
+        {transcript}
+        
+        Please format your response as JSON with the following structure, with the
+        action items first:
+        {{
+            "action_items": [
+                "Action item 1",
+                "Action item 2",
+                "Action item 3"
+            ],
+            "summary": "Meeting summary here..."
+        }}
+        
+        For action items, extract only concrete, actionable tasks that were discussed. 
+        If no specific action items were mentioned, return an empty array.
+        """
+        
+        result = await self._generate_json(prompt, on_partial)
+        if result:
+            logger.info(f"Successfully processed transcript. Found {len(result['action_items'])} action items")
+        return result
+    
+    async def _summarize_chunked(
+        self,
+        chunks: List[str],
+        on_partial: Optional[Callable[[Dict[str, any]], None]] = None
+    ) -> Optional[Dict[str, any]]:
+        """
+        Map-reduce summarization: summarize the chunks concurrently, then merge the
+        partial summaries and de-duplicate the action items
+        """
+        slots = asyncio.Semaphore(self.fanout)
+        
+        async def summarize_chunk(index: int, chunk: str) -> Optional[Dict[str, any]]:
+            prompt = f"""
+            The following is part {index + 1} of {len(chunks)} of a long meeting transcript.
+            
+            Please provide:
+            1. A short summary of this part (one paragraph)
+            2. The concrete action items discussed in this part, with responsible parties and deadlines where mentioned
+            
+            Transcript part:
+            {chunk}
             
             Please format your response as JSON with the following structure:
             {{
-                "summary": "Meeting summary here...",
-                "action_items": [
-                    "Action item 1",
-                    "Action item 2",
-                    "Action item 3"
-                ]
+                "summary": "Summary of this part...",
+                "action_items": ["Action item 1", "Action item 2"]
             }}
             
-            For action items, extract only concrete, actionable tasks that were discussed. 
             If no specific action items were mentioned, return an empty array.
             """
+            async with slots:
+                partial = await self._generate_json(prompt)
+            if partial and on_partial:
+                on_partial({"chunk": index + 1, "chunks": len(chunks), **partial})
+            return partial
+        
+        partials = await asyncio.gather(*(summarize_chunk(i, chunk) for i, chunk in enumerate(chunks)))
+        partials = [partial for partial in partials if partial]
+        if not partials:
+            logger.error("All chunk summaries failed")
+            return None
+        
+        action_items = dedupe_action_items(
+            [item for partial in partials for item in partial.get("action_items", [])]
+        )
+        summary = await self._merge_summaries([partial.get("summary", "") for partial in partials])
+        
+        logger.info(f"Merged {len(partials)} chunk summaries. Found {len(action_items)} action items")
+        return {"summary": summary, "action_items": action_items}
+    
+    async def _merge_summaries(self, summaries: List[str]) -> str:
+        """
+        Combine partial summaries into one. The reduce prompt only contains the
+        partial summaries, so its size is independent of the transcript length.
+        """
+        combined = "\n\n".join(summary for summary in summaries if summary)
+        prompt = f"""
+        The following are summaries of consecutive parts of one meeting, in order.
+        Write a single concise summary of the whole meeting (2-3 paragraphs).
+        Respond with plain text only.
+        
+        Part summaries:
+        {combined}
+        """
+        merged = await self._generate(prompt)
+        return merged.strip() if merged else combined
+    
+    @staticmethod
+    def _is_client_error(error: BaseException) -> bool:
+        """
+        Whether Gemini rejected the request itself (bad prompt, key or quota is
+        fine): retrying cannot help and the API is not unhealthy
+        """
+        return isinstance(error, google_exceptions.ClientError) and not isinstance(
+            error, google_exceptions.TooManyRequests
+        )
+    
+    async def _retry(self, attempt: int, error: Exception) -> None:
+        """
+        Wait before retrying a failed Gemini request, or re-raise the error when
+        it should not be retried
+        """
+        if attempt > self.max_retries or self._is_client_error(error) or not self.provider.retry_allowed():
+            raise error
+        logger.warning(f"Gemini request failed, retrying ({attempt}/{self.max_retries}): {str(error) or type(error).__name__}")
+        await sleep_within_deadline(random.uniform(0.5, 1.0) * self.retry_delay * 2 ** (attempt - 1))
+    
+    def _generate_blocking(self, prompt: str, timeout: Optional[float], stream: bool = False):
+        """
+        GenerativeModel.generate_content with a client-side timeout, so a call
+        the caller gave up on also stops in its thread
+        """
+        options = {} if timeout is None else {"timeout": timeout}
+        return self.model.generate_content(prompt, stream=stream, request_options=options)
+    
+    async def _generate(self, prompt: str) -> Optional[str]:
+        """
+        Send a prompt to Gemini and return the response text
+        """
+        logger.info("Sending request to Gemini API...")
+        attempt = 0
+        while True:
+            try:
+                with track("summarization", "generate"):
+                    # Not hedged: a call running in a thread cannot be cancelled, so the
+                    # slower copy would hold a thread until its timeout anyway
+                    response = await self.provider.call(
+                        lambda timeout: run_provider_call("gemini", self._generate_blocking, prompt, timeout),
+                        client_error=self._is_client_error,
+                    )
+                break
+            except (CircuitOpenError, DeadlineExceeded):
+                raise
+            except Exception as e:
+                record_external("summarization", False)
+                attempt += 1
+                await self._retry(attempt, e)
+        record_external("summarization", True)
+        
+        if not response.text:
+            logger.error("Empty response from Gemini")
+            return None
+        return response.text
+    
+    async def _generate_stream(self, prompt: str, on_text: Callable[[str], None]) -> Optional[str]:
+        """
+        Send a prompt to Gemini with a streamed response, passing each piece of
+        text to on_text as it arrives, and return the full response text
+        """
+        logger.info("Sending streaming request to Gemini API...")
+        loop = asyncio.get_running_loop()
+        text_parts = []
+        
+        async def consume(timeout) -> None:
+            pieces: asyncio.Queue = asyncio.Queue()
+            stop = threading.Event()
             
-            # Generate response using Gemini
-            logger.info("Sending request to Gemini API...")
-            response = self.model.generate_content(prompt)
-            
-            if not response.text:
-                logger.error("Empty response from Gemini")
-                return None
+            def produce() -> None:
+                # Iterating the response blocks on the network, so it runs on Gemini's executor;
+                # the client timeout bounds each read, and after a timeout the thread
+                # gives up at the next chunk
+                try:
+                    for chunk in self._generate_blocking(prompt, timeout, stream=True):
+                        if stop.is_set():
+                            break
+                        loop.call_soon_threadsafe(pieces.put_nowait, chunk.text)
+                finally:
+                    loop.call_soon_threadsafe(pieces.put_nowait, None)
             
-            # Parse JSON response
+            producer = asyncio.ensure_future(run_provider_call("gemini", produce))
             try:
-                # Clean the response text (remove markdown formatting if present)
-                response_text = response.text.strip()
-                if response_text.startswith('```json'):
-                    response_text = response_text[7:]
-                if response_text.endswith('```'):
-                    response_text = response_text[:-3]
-                
-                result = json.loads(response_text)
-                
-                # Validate response structure
-                if "summary" not in result or "action_items" not in result:
-                    logger.error("Invalid response structure from Gemini")
-                    return None
-                
-                logger.info(f"Successfully processed transcript. Found {len(result['action_items'])} action items")
-                return result
-                
-            except json.JSONDecodeError as e:
-                logger.error(f"Failed to parse Gemini response as JSON: {str(e)}")
-                logger.error(f"Raw response: {response.text}")
-                
-                # Fallback: try to extract information manually
-                return self._fallback_extraction(response.text)
-                
-        except Exception as e:
-            logger.error(f"Error processing transcript: {str(e)}")
+                while True:
+                    piece = await pieces.get()
+                    if piece is None:
+                        break
+                    text_parts.append(piece)
+                    on_text(piece)
+                await producer
+            finally:
+                stop.set()
+        
+        attempt = 0
+        while True:
+            try:
+                with track("summarization", "generate"):
+                    # Not hedged: two streams would deliver the text twice
+                    await self.provider.call(consume, client_error=self._is_client_error)
+                break
+            except (CircuitOpenError, DeadlineExceeded):
+                raise
+            except Exception as e:
+                record_external("summarization", False)
+                if text_parts:
+                    # Text already passed on cannot be taken back, so only a stream
+                    # that failed before its first piece is retried
+                    raise
+                attempt += 1
+                await self._retry(attempt, e)
+        record_external("summarization", True)
+        
+        if not text_parts:
+            logger.error("Empty response from Gemini")
+            return None
+        return "".join(text_parts)
+    
+    async def _generate_json(
+        self,
+        prompt: str,
+        on_partial: Optional[Callable[[Dict[str, any]], None]] = None
+    ) -> Optional[Dict[str, any]]:
+        """
+        Generate a JSON summary response and parse it. When streaming, the
+        response is parsed as it arrives and on_partial receives the summary
+        and each action item as soon as they are complete.
+        """
+        if not self.streaming:
+            response_text = await self._generate(prompt)
+            return self._parse_response(response_text) if response_text else None
+        
+        parser = SummaryStreamParser()
+        start = time.perf_counter()
+        action_items_seen = 0
+        
+        def dispatch(events) -> None:
+            nonlocal action_items_seen
+            for kind, value in events:
+                if kind == "action_item":
+                    if action_items_seen == 0:
+                        STAGE_LATENCY.observe(time.perf_counter() - start, agent="summarization", stage="first_action_item")
+                    if on_partial:
+                        on_partial({"action_item": value, "index": action_items_seen})
+                    action_items_seen += 1
+                elif on_partial:
+                    on_partial({"summary": value})
+        
+        def on_text(piece: str) -> None:
+            with track("summarization", "json_parse"):
+                events = parser.feed(piece)
+            dispatch(events)
+        
+        response_text = await self._generate_stream(prompt, on_text)
+        if not response_text:
             return None
+        
+        result = parser.close()
+        dispatch(parser.events())
+        return self._validate_result(result, response_text)
+    
+    def _parse_response(self, response_text: str) -> Optional[Dict[str, any]]:
+        """
+        Parse a JSON summary response, falling back to line-based extraction
+        """
+        # The tolerant parser skips markdown fences and repairs truncated or sloppy JSON
+        with track("summarization", "json_parse"):
+            parser = SummaryStreamParser()
+            parser.feed(response_text)
+            result = parser.close()
+        return self._validate_result(result, response_text)
+    
+    def _validate_result(self, result: Optional[Dict[str, any]], response_text: str) -> Optional[Dict[str, any]]:
+        """
+        Check the parsed response has the expected structure, falling back to
+        line-based extraction when no summary object was found
+        """
+        if result is None or ("summary" not in result and "action_items" not in result):
+            logger.error("Failed to parse Gemini response as JSON")
+            logger.error(f"Raw response: {response_text}")
+            
+            # Fallback: try to extract information manually
+            with track("summarization", "fallback_extraction"):
+                return self._fallback_extraction(response_text)
+        
+        # A response cut off before one of the fields still yields the other
+        summary = result.get("summary", "")
+        action_items = result.get("action_items", [])
+        result["summary"] = summary if isinstance(summary, str) else str(summary)
+        result["action_items"] = action_items if isinstance(action_items, list) else [action_items]
+        return result
     
     def _fallback_extraction(self, response_text: str) -> Dict[str, any]:
         """
@@ -1,11 +1,35 @@
+import asyncio
 import os
+import shutil
 import assemblyai as aai
 import tempfile
 import logging
-from typing import Optional
+from typing import Any, Dict, Optional
+
+from services.executor import run_blocking, run_provider_call
+from services.metrics import track, record_external
+from services.resilience import get_provider
+from services.shared_state import get_shared_state
+from services.upload_spool import spool_upload
+from services.transcription_tracker import TranscriptionTracker
+from services.audio_segmenter import AudioSegmenter, stitch_transcripts
 
 logger = logging.getLogger(__name__)
 
+DEMO_TRANSCRIPT = """
+Welcome to our weekly team meeting. Today we discussed several important topics including the upcoming product launch, budget planning for Q2, and the new marketing campaign. 
+
+Sarah mentioned that the product launch is scheduled for next month and we need to finalize the marketing materials. John suggested we should also prepare a demo for the sales team.
+
+We also talked about the budget allocation. The marketing department needs additional funds for the campaign, and we need to review the current spending patterns.
+
+Action items from this meeting include:
+1. Sarah will finalize the marketing materials by Friday
+2. John will prepare a product demo for the sales team
+3. Finance team will review Q2 budget allocation
+4. Marketing team will submit campaign proposal by next week
+""".strip()
+
 class TranscriptionAgent:
     """
     Agent responsible for converting audio files to text using AssemblyAI
@@ -20,6 +44,37 @@ class TranscriptionAgent:
             self.demo_mode = False
             # Configure AssemblyAI
             aai.settings.api_key = self.api_key
+            base_url = os.getenv("ASSEMBLYAI_BASE_URL")
+            if base_url:
+                aai.settings.base_url = base_url
+        
+        # Completion tracking: webhook mode when a public callback URL is configured, polling otherwise
+        self.webhook_url = os.getenv("TRANSCRIPTION_WEBHOOK_URL")
+        self.webhook_secret = os.getenv("TRANSCRIPTION_WEBHOOK_SECRET")
+        self.tracker = TranscriptionTracker(
+            api_key=self.api_key or "",
+            base_url=aai.settings.base_url,
+            webhook_url=self.webhook_url,
+            initial_interval=float(os.getenv("TRANSCRIPTION_POLL_INITIAL", "1.0")),
+            max_interval=float(os.getenv("TRANSCRIPTION_POLL_MAX", "30.0")),
+            timeout=float(os.getenv("TRANSCRIPTION_TIMEOUT", "3600")),
+            # The webhook may be answered by another worker process
+            shared_state=get_shared_state(),
+            callback_interval=float(os.getenv("TRANSCRIPTION_CALLBACK_INTERVAL", "1.0")),
+        )
+        
+        # Uploads go through the shared AssemblyAI circuit breaker; they take longer
+        # than status requests, so they get their own timeout
+        self.provider = get_provider("assemblyai")
+        self.upload_timeout = float(os.getenv("ASSEMBLYAI_UPLOAD_TIMEOUT", "600"))
+        
+        # Same limit as the upload endpoints
+        self.max_upload_bytes = int(os.getenv("MAX_UPLOAD_MB", "500")) * 1024 * 1024
+        
+        # Long recordings are split at silence and the chunks transcribed in parallel
+        self.chunking_enabled = os.getenv("AUDIO_CHUNKING", "true").lower() == "true"
+        self.chunk_concurrency = max(1, int(os.getenv("AUDIO_CHUNK_CONCURRENCY", "8")))
+        self.segmenter = AudioSegmenter(max_chunk_seconds=float(os.getenv("AUDIO_CHUNK_SECONDS", "600")))
     
     async def transcribe_audio(self, audio_file) -> Optional[str]:
         """
@@ -35,53 +90,122 @@ class TranscriptionAgent:
             logger.info(f"Starting transcription for file: {audio_file.filename}")
             
             if self.demo_mode:
-                # Return demo transcript
-                demo_transcript = """
-                Welcome to our weekly team meeting. Today we discussed several important topics including the upcoming product launch, budget planning for Q2, and the new marketing campaign. 
-
-                Sarah mentioned that the product launch is scheduled for next month and we need to finalize the marketing materials. John suggested we should also prepare a demo for the sales team.
-
-                We also talked about the budget allocation. The marketing department needs additional funds for the campaign, and we need to review the current spending patterns.
-
-                Action items from this meeting include:
-                1. Sarah will finalize the marketing materials by Friday
-                2. John will prepare a product demo for the sales team
-                3. Finance team will review Q2 budget allocation
-                4. Marketing team will submit campaign proposal by next week
-                """
                 logger.info("Demo mode: Returning sample transcript")
-                return demo_transcript.strip()
+                return DEMO_TRANSCRIPT
             
-            # Save uploaded file to temporary location
-            with tempfile.NamedTemporaryFile(delete=False, suffix=f"_{audio_file.filename}") as temp_file:
-                content = await audio_file.read()
-                temp_file.write(content)
-                temp_file_path = temp_file.name
+            # Stream uploaded file to a temporary location in fixed-size chunks
+            spooled = await spool_upload(audio_file, tempfile.gettempdir(), max_bytes=self.max_upload_bytes)
             
             try:
-                # Create AssemblyAI transcriber
-                transcriber = aai.Transcriber()
-                
-                # Transcribe the audio file
-                logger.info("Uploading file to AssemblyAI...")
-                transcript = transcriber.transcribe(temp_file_path)
-                
-                # Wait for transcription to complete
-                logger.info("Waiting for transcription to complete...")
-                while transcript.status not in [aai.TranscriptStatus.completed, aai.TranscriptStatus.error]:
-                    transcript = transcriber.get_transcript(transcript.id)
-                
-                if transcript.status == aai.TranscriptStatus.error:
-                    logger.error(f"Transcription failed: {transcript.error}")
-                    return None
-                
-                logger.info("Transcription completed successfully")
-                return transcript.text
-                
+                return await self.transcribe_file(spooled.path, audio_file.filename)
             finally:
                 # Clean up temporary file
-                os.unlink(temp_file_path)
+                await run_blocking(spooled.remove)
                 
         except Exception as e:
             logger.error(f"Error during transcription: {str(e)}")
             return None
+    
+    async def transcribe_file(self, file_path: str, filename: Optional[str] = None) -> Optional[str]:
+        """
+        Transcribe an audio file that is already stored on local disk
+        
+        Args:
+            file_path: Path of the audio file
+            filename: Original name of the upload, used for logging
+            
+        Returns:
+            str: Transcribed text or None if failed
+        """
+        try:
+            if self.demo_mode:
+                logger.info(f"Demo mode: Returning sample transcript for {filename or file_path}")
+                return DEMO_TRANSCRIPT
+            
+            if self.chunking_enabled:
+                chunk_dir = tempfile.mkdtemp(prefix="chunks-", dir=os.path.dirname(os.path.abspath(file_path)))
+                try:
+                    chunks = await self.segmenter.split(file_path, chunk_dir)
+                    if chunks:
+                        return await self._transcribe_chunks(chunks, filename or file_path)
+                finally:
+                    await run_blocking(shutil.rmtree, chunk_dir, True)
+            
+            transcript = await self._transcribe_single(file_path)
+            return transcript.get("text") if transcript else None
+            
+        except Exception as e:
+            logger.error(f"Error during transcription: {str(e)}")
+            return None
+    
+    async def _transcribe_chunks(self, chunks, name: str) -> Optional[str]:
+        """
+        Transcribe chunks of one recording concurrently and stitch them back together
+        """
+        logger.info(f"Transcribing {len(chunks)} chunks of {name} concurrently")
+        semaphore = asyncio.Semaphore(self.chunk_concurrency)
+        
+        async def transcribe_chunk(chunk):
+            async with semaphore:
+                return await self._transcribe_single(chunk.path)
+        
+        transcripts = await asyncio.gather(*(transcribe_chunk(chunk) for chunk in chunks))
+        failed = [chunk.index for chunk, transcript in zip(chunks, transcripts) if transcript is None]
+        if failed:
+            logger.error(f"Transcription failed for chunks {failed} of {name}")
+            return None
+        
+        stitched = stitch_transcripts(chunks, transcripts)
+        logger.info("Transcription completed successfully")
+        return stitched["text"]
+    
+    async def _transcribe_single(self, file_path: str) -> Optional[Dict[str, Any]]:
+        """
+        Upload one file and wait for its transcript
+
+        Returns:
+            The transcript JSON (text, words with millisecond timestamps) or None if failed
+        """
+        try:
+            # The AssemblyAI SDK upload is synchronous, so run it on AssemblyAI's executor
+            logger.info("Uploading file to AssemblyAI...")
+            with track("transcription", "upload"):
+                submitted = await self.provider.call(
+                    lambda timeout: run_provider_call("assemblyai", self._submit_blocking, file_path, timeout),
+                    timeout=self.upload_timeout,
+                )
+            
+            record_external("transcription", submitted.status != aai.TranscriptStatus.error)
+            if submitted.status == aai.TranscriptStatus.error:
+                logger.error(f"Transcription failed: {submitted.error}")
+                return None
+            
+            # Wait for transcription to complete without holding a thread
+            logger.info(f"Waiting for transcript {submitted.id} ({self.tracker.mode} mode)...")
+            with track("transcription", "wait"):
+                transcript = await self.tracker.wait(submitted.id)
+            
+            if transcript.get("status") == "error":
+                logger.error(f"Transcription failed: {transcript.get('error')}")
+                return None
+            
+            logger.info("Transcription completed successfully")
+            return transcript
+            
+        except Exception as e:
+            logger.error(f"Error during transcription: {str(e)}")
+            return None
+    
+    def _submit_blocking(self, file_path: str, timeout: Optional[float] = None):
+        config = aai.TranscriptionConfig()
+        if self.webhook_url:
+            config.set_webhook(self.webhook_url, "X-Webhook-Secret", self.webhook_secret)
+        
+        # A client of its own carries the call's timeout into every connect, read and write,
+        # so an upload the caller gave up on also stops in its thread
+        client = aai.Client(settings=aai.settings.copy(update={"http_timeout": timeout}))
+        try:
+            # Upload the file and create the transcript without waiting for it
+            return aai.Transcriber(client=client).submit(file_path, config=config)
+        finally:
+            client.http_client.close()
@@ -1,8 +1,16 @@
+import asyncio
 import os
-import requests
+import random
+import httpx
 import logging
 from typing import List, Dict, Optional
 
+from services.action_item_index import ActionItemIndex, fingerprint, normalize
+from services.executor import run_blocking
+from services.shared_state import token_bucket
+from services.resilience import CircuitOpenError, DeadlineExceeded, get_provider, sleep_within_deadline
+from services.metrics import track, record_external, RETRIES, DUPLICATE_ACTION_ITEMS
+
 logger = logging.getLogger(__name__)
 
 class TrelloAgent:
@@ -21,7 +29,52 @@ class TrelloAgent:
         else:
             self.demo_mode = False
         
-        self.base_url = "https://api.trello.com/1"
+        self.base_url = os.getenv("TRELLO_BASE_URL", "https://api.trello.com/1")
+        
+        # Bulk creation settings. Trello allows 100 requests per 10 seconds per token.
+        self.concurrency = max(1, int(os.getenv("TRELLO_CONCURRENCY", "8")))
+        self.max_retries = int(os.getenv("TRELLO_MAX_RETRIES", "3"))
+        self.retry_base_delay = float(os.getenv("TRELLO_RETRY_DELAY", "0.5"))
+        # Trello's limit is per token, so all worker processes share one bucket
+        self.rate_limiter = token_bucket(
+            "trello",
+            rate=float(os.getenv("TRELLO_RATE_LIMIT", "9")),
+            capacity=float(os.getenv("TRELLO_RATE_BURST", "10"))
+        )
+        self._client: Optional[httpx.AsyncClient] = None
+        # Timeouts, circuit breaker and retry budget shared by every Trello call (TRELLO_TIMEOUT)
+        self.provider = get_provider("trello")
+        
+        # Index of the cards already created, so resubmitted action items are skipped
+        # (or, with TRELLO_DEDUP_UPDATE, renamed to the new wording) instead of posted again
+        self.dedup_update = os.getenv("TRELLO_DEDUP_UPDATE", "false").lower() == "true"
+        self.index: Optional[ActionItemIndex] = None
+        if not self.demo_mode and os.getenv("TRELLO_DEDUP", "true").lower() == "true":
+            self.index = ActionItemIndex(
+                os.getenv("TRELLO_INDEX_PATH", "trello_index.db"),
+                threshold=float(os.getenv("TRELLO_DEDUP_THRESHOLD", "0.7"))
+            )
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        # One pooled client for the agent's lifetime, so cards reuse keep-alive connections.
+        # Each request passes its own timeout, bounded by the request deadline.
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self.provider.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.concurrency,
+                    max_keepalive_connections=self.concurrency
+                )
+            )
+        return self._client
+    
+    async def close(self):
+        """
+        Close the pooled HTTP client
+        """
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
     
     async def create_tasks(self, action_items: List[str]) -> List[Dict[str, any]]:
         """
@@ -33,62 +86,245 @@ class TrelloAgent:
         Returns:
             List of created card information
         """
-        created_cards = []
+        results = await self.create_tasks_detailed(action_items)
+        return [result['card'] for result in results if result['status'] == 'created']
+    
+    async def create_tasks_detailed(self, action_items: List[str]) -> List[Dict[str, any]]:
+        """
+        Create Trello cards concurrently and report the outcome of every item
         
+        Requests share a pooled connection, run at most TRELLO_CONCURRENCY at a
+        time and are throttled by a token bucket sized to Trello's per-token rate
+        limit. Failed items are retried with backoff; 429 responses pause all
+        requests for the Retry-After period. Items matching a card already in the
+        action item index (exactly, or as a near duplicate) are not posted again.
+        
+        Args:
+            action_items: List of action item strings
+            
+        Returns:
+            One result per action item, in input order, with keys index, name,
+            status ("created", "duplicate", "updated" or "failed"), card, error,
+            attempts and duplicate_of (the match for duplicates, else None)
+        """
         try:
             logger.info(f"Creating {len(action_items)} Trello cards")
             
             if self.demo_mode:
                 # Return demo card creation results
+                results = []
                 for i, action_item in enumerate(action_items, 1):
-                    created_cards.append({
-                        'id': f'demo_card_{i}',
+                    results.append({
+                        'index': i,
                         'name': action_item,
-                        'url': f'https://trello.com/c/demo_card_{i}'
+                        'status': 'created',
+                        'card': {
+                            'id': f'demo_card_{i}',
+                            'name': action_item,
+                            'url': f'https://trello.com/c/demo_card_{i}'
+                        },
+                        'error': None,
+                        'attempts': 1,
+                        'duplicate_of': None
                     })
-                logger.info(f"Demo mode: Created {len(created_cards)} demo cards")
-                return created_cards
+                logger.info(f"Demo mode: Created {len(results)} demo cards")
+                return results
             
-            for i, action_item in enumerate(action_items, 1):
-                try:
-                    # Create card data
-                    card_data = {
-                        'name': action_item,
-                        'desc': f"Action item #{i} from meeting analysis",
-                        'idList': self.list_id,
-                        'key': self.api_key,
-                        'token': self.token
-                    }
-                    
-                    # Make API request to create card
-                    response = requests.post(
-                        f"{self.base_url}/cards",
-                        data=card_data,
-                        timeout=10
-                    )
-                    
-                    if response.status_code == 200:
-                        card_info = response.json()
-                        created_cards.append({
-                            'id': card_info['id'],
-                            'name': card_info['name'],
-                            'url': card_info['url']
-                        })
-                        logger.info(f"Created Trello card: {action_item}")
-                    else:
-                        logger.error(f"Failed to create card for '{action_item}': {response.status_code} - {response.text}")
-                        
-                except Exception as e:
-                    logger.error(f"Error creating card for '{action_item}': {str(e)}")
-                    continue
+            matches = [None] * len(action_items)
+            if self.index is not None:
+                with track('trello', 'index_lookup'):
+                    matches = await run_blocking(self.index.lookup, self.list_id, action_items)
+            
+            slots = asyncio.Semaphore(self.concurrency)
+            
+            async def create_one(i: int, action_item: str, match: Optional[Dict[str, any]]) -> Dict[str, any]:
+                if match is not None and (match['match'] == 'exact' or not self.dedup_update or not match['card']):
+                    return self._duplicate(i, action_item, match)
+                async with slots:
+                    if match is not None:
+                        return await self._update_card(i, action_item, match)
+                    return await self._create_card(i, action_item)
+            
+            try:
+                results = list(await asyncio.gather(
+                    *(create_one(i, action_item, match)
+                      for i, (action_item, match) in enumerate(zip(action_items, matches), 1))
+                ))
+            except BaseException:
+                if self.index is not None:
+                    self.index.release(self.list_id, [item for item, match in zip(action_items, matches) if not match])
+                raise
+            
+            if self.index is not None:
+                await self._update_index(results)
             
-            logger.info(f"Successfully created {len(created_cards)} out of {len(action_items)} cards")
-            return created_cards
+            created = sum(1 for result in results if result['status'] == 'created')
+            duplicates = sum(1 for result in results if result['status'] in ('duplicate', 'updated'))
+            logger.info(f"Successfully created {created} out of {len(action_items)} cards ({duplicates} duplicates)")
+            return results
             
         except Exception as e:
             logger.error(f"Error in create_tasks: {str(e)}")
             raise
     
+    async def _create_card(self, i: int, action_item: str) -> Dict[str, any]:
+        """
+        Create one card, retrying transient failures with exponential backoff
+        """
+        # Create card data
+        card_data = {
+            'name': action_item,
+            'desc': f"Action item #{i} from meeting analysis",
+            'idList': self.list_id,
+            'key': self.api_key,
+            'token': self.token
+        }
+        result = {'index': i, 'name': action_item, 'status': 'failed', 'card': None, 'error': None, 'attempts': 0,
+                  'duplicate_of': None}
+        
+        response = await self._request(result, 'POST', f"{self.base_url}/cards", card_data, 'create_card')
+        if response is not None and response.status_code == 200:
+            result.update(status='created', card=self._card(response.json()))
+            logger.info(f"Created Trello card: {action_item}")
+        else:
+            logger.error(f"Failed to create card for '{action_item}': {result['error']}")
+        return result
+    
+    async def _update_card(self, i: int, action_item: str, match: Dict[str, any]) -> Dict[str, any]:
+        """
+        Rename the card of a near-duplicate item to the new wording; recreate it
+        when it no longer exists in Trello
+        """
+        card_id = match['card']['id']
+        card_data = {'name': action_item, 'key': self.api_key, 'token': self.token}
+        result = {'index': i, 'name': action_item, 'status': 'failed', 'card': None, 'error': None, 'attempts': 0,
+                  'duplicate_of': self._duplicate_of(match)}
+        
+        response = await self._request(result, 'PUT', f"{self.base_url}/cards/{card_id}", card_data, 'update_card')
+        if response is not None and response.status_code == 200:
+            DUPLICATE_ACTION_ITEMS.inc(match=match['match'], action='updated')
+            result.update(status='updated', card=self._card(response.json()))
+            logger.info(f"Updated Trello card {card_id}: {action_item}")
+        elif response is not None and response.status_code == 404:
+            logger.info(f"Trello card {card_id} no longer exists; creating a new one")
+            await run_blocking(self.index.forget, self.list_id, card_id)
+            result = await self._create_card(i, action_item)
+        else:
+            logger.error(f"Failed to update card {card_id} for '{action_item}': {result['error']}")
+        return result
+    
+    def _duplicate(self, i: int, action_item: str, match: Dict[str, any]) -> Dict[str, any]:
+        DUPLICATE_ACTION_ITEMS.inc(match=match['match'], action='skipped')
+        logger.info(f"Skipping '{action_item}': {match['match']} match of the card for '{match['name']}'")
+        return {'index': i, 'name': action_item, 'status': 'duplicate', 'card': match['card'], 'error': None,
+                'attempts': 0, 'duplicate_of': self._duplicate_of(match)}
+    
+    @staticmethod
+    def _duplicate_of(match: Dict[str, any]) -> Dict[str, any]:
+        return {'match': match['match'], 'similarity': match['similarity'], 'name': match['name']}
+    
+    @staticmethod
+    def _card(card_info: Dict[str, any]) -> Dict[str, any]:
+        return {'id': card_info['id'], 'name': card_info['name'], 'url': card_info['url']}
+    
+    async def _update_index(self, results: List[Dict[str, any]]) -> None:
+        """
+        Store the new cards in the index, release the reservations of items that
+        failed, and fill in cards for duplicates of items created in this call
+        """
+        created = [(result['name'], result['card']) for result in results if result['status'] == 'created']
+        failed = [result['name'] for result in results if result['status'] == 'failed' and not result['duplicate_of']]
+        if created:
+            await run_blocking(self.index.record, self.list_id, created)
+        if failed:
+            await run_blocking(self.index.release, self.list_id, failed)
+        
+        cards = {fingerprint(normalize(name)): card for name, card in created}
+        failed_items = {fingerprint(normalize(name)) for name in failed}
+        for result in results:
+            if result['status'] == 'duplicate' and result['card'] is None:
+                original = fingerprint(normalize(result['duplicate_of']['name']))
+                if original in failed_items:
+                    result.update(status='failed', error=f"The card for '{result['duplicate_of']['name']}' failed")
+                else:
+                    result['card'] = cards.get(original)
+    
+    async def _request(
+        self, result: Dict[str, any], method: str, url: str, data: Dict[str, str], stage: str
+    ) -> Optional[httpx.Response]:
+        """
+        Send one Trello API request, retrying transient failures with exponential
+        backoff while the retry budget and the request deadline allow. Renames
+        (PUT) are idempotent and may be hedged. Returns the last response (None
+        if none arrived); result keeps the attempt count and the last error.
+        """
+        response = None
+        try:
+            for attempt in range(1, self.max_retries + 2):
+                if attempt > 1:
+                    if not self.provider.retry_allowed():
+                        break
+                    RETRIES.inc(agent='trello')
+                result['attempts'] = attempt
+                response = await self._attempt(result, method, url, data, stage, attempt)
+                if response is None:
+                    await self._backoff(attempt)
+                    continue
+                
+                record_external('trello', response.status_code == 200)
+                if response.status_code == 200:
+                    result['error'] = None
+                    return response
+                
+                result['error'] = f"{response.status_code} - {response.text}"
+                if response.status_code == 429:
+                    retry_after = self._retry_after(response)
+                    logger.warning(f"Trello rate limit hit, pausing requests for {retry_after:.1f}s")
+                    self.rate_limiter.pause(retry_after)
+                elif response.status_code >= 500:
+                    await self._backoff(attempt)
+                else:
+                    # Other client errors (bad list id, invalid token) will not succeed on retry
+                    break
+        except (CircuitOpenError, DeadlineExceeded) as e:
+            # Fail fast: Trello is known to be down, or the caller has no time left
+            result['error'] = str(e)
+            logger.warning(f"Not sending '{result['name']}' to Trello: {str(e)}")
+        
+        return response
+    
+    async def _attempt(
+        self, result: Dict[str, any], method: str, url: str, data: Dict[str, str], stage: str, attempt: int
+    ) -> Optional[httpx.Response]:
+        """
+        One attempt of _request; returns None after a network error or timeout
+        """
+        await self.rate_limiter.acquire()
+        try:
+            with track('trello', stage):
+                return await self.provider.call(
+                    lambda timeout: self._get_client().request(method, url, data=data, timeout=timeout),
+                    idempotent=method == 'PUT',
+                    failed=lambda response: response.status_code >= 500,
+                )
+        except (CircuitOpenError, DeadlineExceeded):
+            raise
+        except (httpx.HTTPError, TimeoutError) as e:
+            record_external('trello', False)
+            result['error'] = str(e) or type(e).__name__
+            logger.warning(f"Error sending '{result['name']}' to Trello (attempt {attempt}): {result['error']}")
+            return None
+    
+    async def _backoff(self, attempt: int):
+        await sleep_within_deadline(min(self.retry_base_delay * (2 ** (attempt - 1)), 30) * random.uniform(0.5, 1.0))
+    
+    @staticmethod
+    def _retry_after(response: httpx.Response) -> float:
+        try:
+            return max(0.0, float(response.headers.get('Retry-After', '1')))
+        except ValueError:
+            return 1.0
+    
     async def test_connection(self) -> bool:
         """
         Test Trello API connection and list access
@@ -107,7 +343,11 @@ class TrelloAgent:
                 'token': self.token
             }
             
-            response = requests.get(url, params=params, timeout=10)
+            response = await self.provider.call(
+                lambda timeout: self._get_client().get(url, params=params, timeout=timeout),
+                idempotent=True,
+                failed=lambda response: response.status_code >= 500,
+            )
             
             if response.status_code == 200:
                 list_info = response.json()
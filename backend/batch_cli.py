@@ -0,0 +1,132 @@
+"""
+Process a backlog of recordings from the command line with the same agents,
+cache and pipeline as the API server.
+
+Progress is checkpointed to a JSON file after every finished stage; running the
+same command again (or with --resume) continues where it stopped. The final
+throughput report is printed and stored in the checkpoint.
+
+Usage (from the backend directory):
+    python batch_cli.py recordings/ extra_meeting.wav --checkpoint backlog.json
+    python batch_cli.py --resume --checkpoint backlog.json --trello
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+import main as server
+from main import agents, pipeline
+from services.batch import BatchCheckpoint, BatchRunner, ItemStatus, batch_summary, collect_audio_files, new_batch
+from services.executor import shutdown_executor
+
+
+def print_progress(item, stage) -> None:
+    status = "failed" if item["status"] == ItemStatus.FAILED else "done"
+    seconds = item["stage_seconds"].get(stage, 0)
+    print(f"[{stage:>13}] {status:6} {seconds:7.2f}s  {item['filename']}", flush=True)
+
+
+def print_report(report) -> None:
+    print(f"\n{report['completed']}/{report['files']} files completed, {report['failed']} failed "
+          f"({report['already_done']} were already done)")
+    print(f"wall time {report['wall_seconds']:.1f}s, {report['files_per_minute']} files/min"
+          + (f", {report['audio_hours_per_hour']} audio hours/hour" if report.get("audio_hours_per_hour") else ""))
+    for stage, stats in report["stages"].items():
+        p50 = "n/a" if stats["p50_seconds"] is None else f"{stats['p50_seconds']:.2f}s"
+        p95 = "n/a" if stats["p95_seconds"] is None else f"{stats['p95_seconds']:.2f}s"
+        print(f"  {stage:13} concurrency={stats['concurrency']:<3} done={stats['completed']:<5} "
+              f"failed={stats['failed']:<4} p50={p50:>8} p95={p95:>8} utilization={stats['utilization']}")
+
+
+async def run(args) -> int:
+    checkpoint = BatchCheckpoint(args.checkpoint)
+    batch = await checkpoint.aload()
+    if batch is not None:
+        done = sum(1 for item in batch["items"] if item["status"] in ItemStatus.TERMINAL)
+        print(f"Resuming batch {batch['id']} from {args.checkpoint}: {done}/{len(batch['items'])} files done")
+        if args.paths:
+            print("Ignoring the given paths; the checkpoint already lists the batch's files")
+        if args.retry_failed:
+            for item in batch["items"]:
+                if item["status"] == ItemStatus.FAILED:
+                    item["status"] = ItemStatus.PENDING
+                    item["error"] = None
+    elif args.resume:
+        print(f"No checkpoint at {args.checkpoint}", file=sys.stderr)
+        return 2
+    else:
+        files = collect_audio_files(args.paths)
+        if not files:
+            print("No audio files found", file=sys.stderr)
+            return 2
+        batch = new_batch([{"path": path, "filename": os.path.basename(path)} for path in files], trello=args.trello)
+        print(f"Starting batch {batch['id']} with {len(files)} files; checkpoint at {args.checkpoint}")
+    if args.trello:
+        batch["trello"] = True
+
+    if not await agents.aget("transcription") or not await agents.aget("summarization"):
+        print("Processing agents not available. Please check API keys.", file=sys.stderr)
+        return 1
+
+    server.open_stores()
+    runner = BatchRunner(
+        pipeline,
+        agents,
+        transcription_concurrency=args.transcription_concurrency,
+        summarization_concurrency=args.summarization_concurrency,
+        trello_concurrency=args.trello_concurrency,
+        stage_timeout=float(os.getenv("JOB_TIMEOUT", "7200")),
+        meetings=server.meeting_store,
+    )
+    try:
+        report = await runner.run(batch, checkpoint, on_progress=None if args.quiet else print_progress)
+    finally:
+        transcription_agent = agents.loaded("transcription")
+        if transcription_agent:
+            await transcription_agent.tracker.close()
+        trello_agent = agents.loaded("trello")
+        if trello_agent:
+            await trello_agent.close()
+        if server.meeting_store is not None:
+            server.meeting_store.close()
+
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump(batch_summary(batch), handle, indent=2)
+        print(f"Results written to {args.output}")
+    return 0 if report["failed"] == 0 else 1
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="*", help="Audio files or directories (searched recursively)")
+    parser.add_argument("--checkpoint", default="batch_checkpoint.json", help="Progress file, reused to resume")
+    parser.add_argument("--resume", action="store_true", help="Require an existing checkpoint")
+    parser.add_argument("--retry-failed", action="store_true", help="Process failed files again when resuming")
+    parser.add_argument("--trello", action="store_true", help="Create Trello cards for the action items")
+    parser.add_argument("--transcription-concurrency", type=int,
+                        default=int(os.getenv("BATCH_TRANSCRIPTION_CONCURRENCY", "4")))
+    parser.add_argument("--summarization-concurrency", type=int,
+                        default=int(os.getenv("BATCH_SUMMARIZATION_CONCURRENCY", "4")))
+    parser.add_argument("--trello-concurrency", type=int, default=int(os.getenv("BATCH_TRELLO_CONCURRENCY", "2")))
+    parser.add_argument("--output", help="Write every file's summary and action items to this JSON file")
+    parser.add_argument("--quiet", action="store_true", help="Only print the final report")
+    args = parser.parse_args()
+    if not args.paths and not args.resume and not os.path.exists(args.checkpoint):
+        parser.error("give audio files or directories, or --resume with an existing checkpoint")
+
+    try:
+        exit_code = asyncio.run(run(args))
+    except KeyboardInterrupt:
+        print(f"\nInterrupted; progress is saved in {args.checkpoint}. Run again to resume.", file=sys.stderr)
+        exit_code = 130
+    finally:
+        shutdown_executor(wait=False)
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
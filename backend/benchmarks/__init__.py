@@ -0,0 +1 @@
+# Benchmarks for Meeting Intelligence Agent
@@ -0,0 +1,167 @@
+"""
+Action item index: lookup latency as the index grows, match quality, and the
+Trello calls saved when a meeting's action items are sent again.
+
+Items are generated from templates ("<person> will <verb> the <object>
+<deadline>"), so many share most of their words; that is the hard case for the
+locality-sensitive hashing, since near-identical templates land in the same
+buckets. Lookups are measured for:
+- exact resubmissions (different case, punctuation or list markers)
+- near duplicates (a spelling variant, a dropped or added word)
+- new items that are not in the index
+
+Usage (from the backend directory):
+    python -m benchmarks.action_item_index_bench --items 100000 --checkpoints 1000 10000 100000
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+import httpx
+
+from agents.trello_agent import TrelloAgent
+from benchmarks import fake_trello
+from services.action_item_index import ActionItemIndex, normalize
+from services.rate_limit import TokenBucket
+
+PEOPLE = ["Sarah", "John", "Priya", "Marco", "Aisha", "Tom", "Elena", "Wei", "Fatima", "Lucas", "Nina", "Omar",
+          "Grace", "Diego", "Hana", "Ivan", "Zoe", "Kofi", "Mei", "Paul", "The finance team", "Marketing", "QA", "Legal"]
+VERBS = ["finalize", "review", "send", "prepare", "update", "draft", "schedule", "share", "book", "test", "approve",
+         "summarize", "publish", "collect", "organize", "fix", "present", "document", "check", "submit"]
+OBJECTS = ["marketing materials", "product demo", "budget allocation", "campaign proposal", "release notes",
+           "onboarding guide", "vendor contract", "quarterly report", "hiring plan", "design mockups",
+           "customer survey", "pricing page", "security review", "launch checklist", "training slides",
+           "sales forecast", "support playbook", "roadmap", "board deck", "API documentation", "travel budget",
+           "office move plan", "team offsite agenda", "partner agreement", "incident report", "data migration plan",
+           "accessibility audit", "newsletter", "job description", "retention analysis"]
+DEADLINES = ["by Friday", "by Monday", "before the launch", "next week", "by end of month", "for the board meeting",
+             "by Q2", "by Q3", "before the offsite", "by tomorrow", "this sprint", "by March 15", "by April 1",
+             "after the audit", "before the release", "by the next standup", "", "in two weeks"]
+SPELLINGS = [("finalize", "finalise"), ("organize", "organise"), ("summarize", "summarise"), ("materials", "material")]
+
+
+def generate_items(count: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    items, seen = [], set()
+    while len(items) < count:
+        item = f"{rng.choice(PEOPLE)} will {rng.choice(VERBS)} the {rng.choice(OBJECTS)} {rng.choice(DEADLINES)}"
+        item = item.strip()
+        if item not in seen:
+            seen.add(item)
+            items.append(item)
+    return items
+
+
+def exact_variant(item: str, rng: random.Random) -> str:
+    return rng.choice([f"- {item}.", item.upper(), f"1. {item}!", f"  {item.lower()}  "])
+
+
+def near_variant(item: str, rng: random.Random) -> str:
+    for american, british in SPELLINGS:
+        if f" {american} " in item:
+            return item.replace(f" {american} ", f" {british} ")
+    return rng.choice([item.replace(" the ", " "), item + " please", item.replace(" will ", " should ")])
+
+
+def percentiles(samples: list) -> str:
+    samples = sorted(samples)
+    pick = lambda q: samples[min(len(samples) - 1, int(q * len(samples)))] * 1e6
+    return f"p50={pick(0.5):6.0f}us p95={pick(0.95):6.0f}us p99={pick(0.99):6.0f}us"
+
+
+def measure(index: ActionItemIndex, list_id: str, indexed: list, fresh: list, samples: int, rng) -> None:
+    indexed_by_key = {normalize(item): item for item in indexed}
+    cases = {
+        "exact": [(exact_variant(item, rng), item) for item in rng.sample(indexed, samples)],
+        "near": [(near_variant(item, rng), item) for item in rng.sample(indexed, samples)],
+        "new": [(item, None) for item in rng.sample(fresh, samples)],
+    }
+    for kind, queries in cases.items():
+        latencies, found, correct = [], 0, 0
+        for query, original in queries:
+            start = time.perf_counter()
+            match = index.lookup(list_id, [query], reserve=False)[0]
+            latencies.append(time.perf_counter() - start)
+            if match is not None:
+                found += 1
+                # A near variant may legitimately be closer to another indexed item than to its source
+                correct += original is not None and (
+                    normalize(match["name"]) == normalize(original) or normalize(query) in indexed_by_key)
+        quality = f"matched {found / len(queries):6.1%}"
+        if kind != "new":
+            quality += f", to its source {correct / len(queries):6.1%}"
+        print(f"  {kind:5} lookups: {percentiles(latencies)}  {quality}")
+
+
+def build_index(args) -> None:
+    rng = random.Random(3)
+    items = generate_items(args.items + args.samples)
+    indexed, fresh = items[:args.items], items[args.items:]
+    path = os.path.join(tempfile.mkdtemp(prefix="action-index-"), "trello_index.db")
+    index = ActionItemIndex(path)
+    list_id = "bench-list"
+
+    done = 0
+    for checkpoint in sorted(args.checkpoints):
+        start = time.perf_counter()
+        batch = indexed[done:checkpoint]
+        for offset in range(0, len(batch), 1000):
+            chunk = batch[offset:offset + 1000]
+            index.record(list_id, [(item, {"id": f"card{done + offset + i}", "name": item, "url": ""})
+                                   for i, item in enumerate(chunk)])
+        elapsed = time.perf_counter() - start
+        done = checkpoint
+        print(f"{index.size():>7} items indexed (+{len(batch)} in {elapsed:.1f}s, "
+              f"{len(batch) / max(elapsed, 1e-9):.0f}/s), database {os.path.getsize(path) / 1e6:.1f} MB")
+        measure(index, list_id, indexed[:done], fresh, args.samples, rng)
+    index.close()
+
+
+async def resubmission(args) -> None:
+    fake = fake_trello.create_app(latency=args.latency, rate_limit=100000)
+    agent = TrelloAgent()
+    agent.demo_mode = False
+    agent.api_key, agent.token, agent.list_id = "bench-key", "bench-token", "bench-list"
+    agent.base_url = "http://fake-trello/1"
+    agent.rate_limiter = TokenBucket(rate=1000, capacity=1000)
+    agent._client = httpx.AsyncClient(transport=httpx.ASGITransport(app=fake), timeout=10)
+    agent.index = ActionItemIndex(os.path.join(tempfile.mkdtemp(prefix="action-index-"), "trello_index.db"))
+
+    rng = random.Random(11)
+    meeting = generate_items(args.meeting_items, seed=5)
+    rounds = [
+        ("first submission", meeting),
+        ("same items again", meeting),
+        ("reworded", [near_variant(item, rng) for item in meeting]),
+        ("reworded, updating cards", [item.replace(" will ", " needs to ") for item in meeting]),
+    ]
+    print(f"\nresubmitting a meeting's {len(meeting)} action items (stand-in Trello latency {args.latency}s):")
+    for title, items in rounds:
+        agent.dedup_update = title.endswith("updating cards")
+        before = dict(fake.state.stats)
+        start = time.perf_counter()
+        results = await agent.create_tasks_detailed(items)
+        elapsed = time.perf_counter() - start
+        statuses = {}
+        for result in results:
+            statuses[result["status"]] = statuses.get(result["status"], 0) + 1
+        print(f"  {title:26} {elapsed:5.2f}s  API requests={fake.state.stats['requests'] - before['requests']:<3} "
+              f"{statuses}")
+    await agent.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=100000)
+    parser.add_argument("--checkpoints", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="Index sizes at which lookups are measured")
+    parser.add_argument("--samples", type=int, default=500, help="Lookups per case at each checkpoint")
+    parser.add_argument("--meeting-items", type=int, default=12)
+    parser.add_argument("--latency", type=float, default=0.1, help="Stand-in Trello latency per request")
+    args = parser.parse_args()
+    args.checkpoints = [c for c in args.checkpoints if c <= args.items] or [args.items]
+    build_index(args)
+    asyncio.run(resubmission(args))
@@ -0,0 +1,112 @@
+"""
+Admission control under a burst: one team uploads a large batch of recordings
+at once while another keeps sending a recording every few seconds. Processing
+is simulated by a provider with a fixed number of concurrent slots (the API
+quota), so every request admitted beyond it just waits inside the server,
+holding its upload in memory.
+
+Without admission control the steady team's requests queue behind the whole
+burst. With it, the bursting team is held to its own concurrency and queue
+share and the excess is shed at once with 429 and a Retry-After hint, so the
+steady team's latency stays close to the processing time.
+
+Usage (from the backend directory):
+    python -m benchmarks.admission_bench --burst 60 --steady 10 --service-time 1.0
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from collections import Counter
+
+from services.admission import AdmissionController, AdmissionRejected
+
+
+class Server:
+    """
+    Simulated server: requests hold `service_time` seconds of one of the
+    provider's `capacity` slots; peak counts every request inside the server
+    """
+
+    def __init__(self, capacity: int, service_time: float, admission=None):
+        self.provider = asyncio.Semaphore(capacity)
+        self.service_time = service_time
+        self.admission = admission
+        self.inside = 0
+        self.peak = 0
+
+    async def handle(self, client: str, priority: str = "normal"):
+        if self.admission is not None:
+            try:
+                await self.admission.acquire(client, priority)
+            except AdmissionRejected as e:
+                return e.status_code, e.retry_after
+        self.inside += 1
+        self.peak = max(self.peak, self.inside)
+        start = time.monotonic()
+        try:
+            async with self.provider:
+                await asyncio.sleep(self.service_time)
+        finally:
+            self.inside -= 1
+            if self.admission is not None:
+                self.admission.release(client, time.monotonic() - start)
+        return 200, None
+
+
+async def run_once(args, admission) -> None:
+    server = Server(args.capacity, args.service_time, admission)
+    outcomes = {"burst": [], "steady": []}
+
+    async def request(team: str):
+        start = time.monotonic()
+        status, retry_after = await server.handle(team, "low" if team == "burst" else "normal")
+        outcomes[team].append((status, time.monotonic() - start, retry_after))
+
+    async def steady():
+        tasks = []
+        for _ in range(args.steady):
+            tasks.append(asyncio.create_task(request("steady")))
+            await asyncio.sleep(args.steady_interval)
+        await asyncio.gather(*tasks)
+
+    start = time.monotonic()
+    await asyncio.gather(*(request("burst") for _ in range(args.burst)), steady())
+    elapsed = time.monotonic() - start
+
+    label = "admission on " if admission else "admission off"
+    print(f"{label}: wall={elapsed:5.1f}s peak requests inside the server={server.peak}")
+    for team, results in outcomes.items():
+        statuses = Counter(status for status, _, _ in results)
+        served = sorted(latency for status, latency, _ in results if status == 200)
+        hints = [retry_after for status, _, retry_after in results if status != 200]
+        p95 = served[int(0.95 * (len(served) - 1))] if served else 0.0
+        print(f"  {team:6} {dict(sorted(statuses.items()))} served p50={statistics.median(served) if served else 0:5.2f}s "
+              f"p95={p95:5.2f}s" + (f" Retry-After {min(hints):.1f}-{max(hints):.1f}s" if hints else ""))
+
+
+async def run(args) -> None:
+    await run_once(args, None)
+    await run_once(args, AdmissionController(
+        max_concurrent=args.max_concurrent,
+        queue_size=args.queue_size,
+        max_wait=args.max_wait,
+        client_concurrency=args.client_concurrency,
+        client_queue=args.client_queue,
+        client_rate=0,
+    ))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--burst", type=int, default=60, help="Requests sent at once by the bursting team")
+    parser.add_argument("--steady", type=int, default=10, help="Requests sent by the steady team")
+    parser.add_argument("--steady-interval", type=float, default=2.0)
+    parser.add_argument("--service-time", type=float, default=1.0, help="Processing time per request")
+    parser.add_argument("--capacity", type=int, default=4, help="Concurrent requests the provider quota allows")
+    parser.add_argument("--max-concurrent", type=int, default=4)
+    parser.add_argument("--queue-size", type=int, default=16)
+    parser.add_argument("--max-wait", type=float, default=30.0)
+    parser.add_argument("--client-concurrency", type=int, default=2)
+    parser.add_argument("--client-queue", type=int, default=4)
+    asyncio.run(run(parser.parse_args()))
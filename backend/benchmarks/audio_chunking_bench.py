@@ -0,0 +1,141 @@
+"""
+Silence-aware chunking with parallel transcription, using a synthetic recording
+(bursts of "speech" separated by pauses) and a stand-in transcriber whose
+latency is proportional to the audio duration, like AssemblyAI's.
+
+Reports the wall time for one whole-file job versus chunked parallel jobs, and
+checks that the stitched word timestamps match the known burst onsets, so no
+burst was cut in half and every chunk offset is right.
+
+Usage (from the backend directory):
+    python -m benchmarks.audio_chunking_bench --minutes 120 --chunk-seconds 600
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import wave
+
+import numpy as np
+
+from agents.transcription_agent import TranscriptionAgent
+from services.audio_segmenter import AudioSegmenter, block_energies, probe_duration, stitch_transcripts
+from services.executor import run_blocking, shutdown_executor
+
+FRAME_SECONDS = 0.02
+
+
+def synthetic_recording(path: str, minutes: float, rate: int, seed: int = 7) -> list:
+    """
+    Write a mono WAV of speech-like noise bursts (0.3-3s) separated by pauses
+    (0.25-1.5s) and return the burst onset times in seconds
+    """
+    rng = np.random.default_rng(seed)
+    total = int(minutes * 60 * rate)
+    onsets = []
+    position = 0
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        while position < total:
+            pause = int(rng.uniform(0.25, 1.5) * rate)
+            burst = int(rng.uniform(0.3, 3.0) * rate)
+            silence = rng.normal(0, 30, pause)
+            speech = rng.normal(0, 6000, burst) * np.sin(np.linspace(0, np.pi, burst))
+            onsets.append((position + pause) / rate)
+            block = np.concatenate([silence, speech])[: total - position]
+            wav.writeframes(np.clip(block, -32768, 32767).astype("<i2").tobytes())
+            position += len(block)
+    return [onset for onset in onsets if onset < minutes * 60]
+
+
+def detect_onsets(path: str) -> list:
+    duration = probe_duration(path)
+    energies = block_energies(path, 0.0, duration, FRAME_SECONDS)
+    loud = energies > -40
+    starts = np.flatnonzero(loud[1:] & ~loud[:-1]) + 1
+    return [round(float(i) * FRAME_SECONDS * 1000) for i in starts]
+
+
+class StandInTranscriber:
+    """
+    Replaces TranscriptionAgent._transcribe_single: one "word" per burst with
+    millisecond timestamps relative to the file, after a delay proportional to its duration
+    """
+
+    def __init__(self, seconds_per_audio_second: float):
+        self.seconds_per_audio_second = seconds_per_audio_second
+        self.jobs = 0
+
+    async def __call__(self, file_path: str):
+        self.jobs += 1
+        duration = await run_blocking(probe_duration, file_path)
+        onsets = await run_blocking(detect_onsets, file_path)
+        await asyncio.sleep(duration * self.seconds_per_audio_second)
+        words = [{"text": f"w{i}", "start": start, "end": start + 200} for i, start in enumerate(onsets)]
+        return {"status": "completed", "text": " ".join(word["text"] for word in words), "words": words}
+
+
+async def run(args) -> None:
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, "meeting.wav")
+        start = time.perf_counter()
+        onsets = synthetic_recording(path, args.minutes, args.sample_rate)
+        print(f"generated {args.minutes:.0f} min recording ({os.path.getsize(path) / 1e6:.0f} MB, "
+              f"{len(onsets)} bursts) in {time.perf_counter() - start:.1f}s")
+
+        agent = TranscriptionAgent()
+        agent.demo_mode = False
+        agent.segmenter = AudioSegmenter(max_chunk_seconds=args.chunk_seconds)
+        agent.chunk_concurrency = args.concurrency
+        transcriber = StandInTranscriber(args.seconds_per_audio_second)
+        agent._transcribe_single = transcriber
+
+        agent.chunking_enabled = False
+        start = time.perf_counter()
+        await agent.transcribe_file(path)
+        single = time.perf_counter() - start
+        print(f"single job:      wall={single:6.2f}s")
+
+        agent.chunking_enabled = True
+        transcriber.jobs = 0
+        start = time.perf_counter()
+        await agent.transcribe_file(path)
+        chunked = time.perf_counter() - start
+        longest = args.chunk_seconds * args.seconds_per_audio_second
+        print(f"chunked jobs:    wall={chunked:6.2f}s jobs={transcriber.jobs} "
+              f"(longest chunk alone ~{longest:.2f}s) speedup={single / chunked:.1f}x")
+
+        # Stitching accuracy: stitched word starts should match the true burst onsets
+        chunk_dir = tempfile.mkdtemp(dir=workdir)
+        start = time.perf_counter()
+        chunks = await agent.segmenter.split(path, chunk_dir)
+        split_time = time.perf_counter() - start
+        transcripts = await asyncio.gather(*(StandInTranscriber(0)(chunk.path) for chunk in chunks))
+        stitched = stitch_transcripts(chunks, transcripts)
+        found = np.array([word["start"] for word in stitched["words"]]) / 1000
+        expected = np.array(onsets)
+        print(f"split:           {len(chunks)} chunks in {split_time:.2f}s, "
+              f"lengths {min(c.duration for c in chunks):.0f}-{max(c.duration for c in chunks):.0f}s")
+        ordered = bool(np.all(np.diff(found) > 0))
+        if len(found) == len(expected):
+            error_ms = np.abs(found - expected).max() * 1000
+            print(f"stitching:       {len(found)}/{len(expected)} bursts, ordered={ordered}, "
+                  f"max onset error={error_ms:.0f}ms")
+        else:
+            print(f"stitching:       MISMATCH found {len(found)} bursts, expected {len(expected)}, ordered={ordered}")
+    shutdown_executor()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=float, default=120)
+    parser.add_argument("--sample-rate", type=int, default=8000)
+    parser.add_argument("--chunk-seconds", type=float, default=600)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--seconds-per-audio-second", type=float, default=0.002,
+                        help="Stand-in transcription latency per second of audio")
+    args = parser.parse_args()
+    asyncio.run(run(args))
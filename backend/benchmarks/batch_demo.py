@@ -0,0 +1,137 @@
+"""
+Batch processing demo against the local AssemblyAI, Gemini and Trello stand-ins.
+
+Generates a directory of synthetic recordings, then runs batch_cli.py on it:
+1. with every stage limited to one file at a time (no pipelining)
+2. with the default per-stage concurrency, interrupted part-way with Ctrl-C
+   and resumed from its checkpoint
+
+and prints both throughput reports. The result cache is disabled and every
+stand-in transcript is distinct, so each file really goes through every stage.
+With --trello action items also become cards; the Trello agent's client-side
+rate limit (TRELLO_RATE_LIMIT, 9 requests/s) then bounds the whole batch.
+
+Usage (from the backend directory):
+    python -m benchmarks.batch_demo --files 24 --interrupt-after 4
+"""
+import argparse
+import asyncio
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks import fake_servers
+from benchmarks.load_test import BACKEND_DIR, backend_env, synthetic_wav, wait_until_ready
+
+
+def write_recordings(directory: str, files: int, size_kb: int) -> None:
+    for i in range(files):
+        with open(os.path.join(directory, f"meeting_{i:03d}.wav"), "wb") as handle:
+            handle.write(synthetic_wav(size_kb, seed=i))
+
+
+def batch_cli(args, checkpoint: str, extra: list) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "batch_cli.py", "--checkpoint", checkpoint, "--quiet"] + extra,
+        cwd=BACKEND_DIR, env=backend_env(args),
+        stdout=subprocess.PIPE, stderr=None if args.verbose else subprocess.DEVNULL, text=True,
+    )
+
+
+def finished(process: subprocess.Popen) -> str:
+    output, _ = process.communicate()
+    return output
+
+
+def show_report(title: str, checkpoint: str) -> dict:
+    with open(checkpoint) as handle:
+        batch = json.load(handle)
+    report = batch["report"]
+    print(f"\n== {title}")
+    print(f"   {report['completed']}/{report['files']} completed, {report['failed']} failed, "
+          f"{report['processed_this_run']} processed in this run ({report['already_done']} resumed as done)")
+    print(f"   wall {report['wall_seconds']:.1f}s, {report['files_per_minute']} files/min, "
+          f"{report['trello_cards']} Trello cards in total")
+    for stage, stats in report["stages"].items():
+        p50 = "n/a" if stats["p50_seconds"] is None else f"{stats['p50_seconds']:.2f}s"
+        print(f"   {stage:13} concurrency={stats['concurrency']:<2} done={stats['completed']:<3} p50={p50:>6} "
+              f"utilization={stats['utilization']}")
+    return report
+
+
+async def run(args) -> None:
+    args.cache = False
+    args.assemblyai_unique_transcripts = 1
+    fakes = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.fake_servers"] + fake_servers.forward_arguments(args), cwd=BACKEND_DIR
+    )
+    workdir = tempfile.mkdtemp(prefix="batch-demo-")
+    recordings = os.path.join(workdir, "recordings")
+    os.makedirs(recordings)
+    write_recordings(recordings, args.files, args.audio_kb)
+    print(f"{args.files} recordings in {recordings}")
+    try:
+        for port in (args.assemblyai_port, args.gemini_port, args.trello_port):
+            await wait_until_ready(f"http://{args.host}:{port}/", fakes)
+
+        sequential = os.path.join(workdir, "sequential.json")
+        start = time.perf_counter()
+        trello = ["--trello"] if args.trello else []
+        finished(batch_cli(args, sequential, [recordings, "--transcription-concurrency", "1",
+                                              "--summarization-concurrency", "1", "--trello-concurrency", "1"] + trello))
+        print(f"sequential run took {time.perf_counter() - start:.1f}s (including start-up)")
+        sequential_report = show_report("one file per stage at a time", sequential)
+
+        pipelined = os.path.join(workdir, "pipelined.json")
+        start = time.perf_counter()
+        process = batch_cli(args, pipelined, [recordings] + trello)
+        # Interrupt once a few files are through, as an operator pressing Ctrl-C would
+        while process.poll() is None:
+            await asyncio.sleep(0.2)
+            if os.path.exists(pipelined):
+                with open(pipelined) as handle:
+                    try:
+                        batch = json.load(handle)
+                    except ValueError:
+                        continue
+                if sum(1 for item in batch["items"] if item["status"] == "completed") >= args.interrupt_after:
+                    process.send_signal(signal.SIGINT)
+                    break
+        finished(process)
+        with open(pipelined) as handle:
+            batch = json.load(handle)
+        statuses = {}
+        for item in batch["items"]:
+            statuses[item["status"]] = statuses.get(item["status"], 0) + 1
+        print(f"\ninterrupted after {time.perf_counter() - start:.1f}s; checkpoint holds {statuses}")
+
+        finished(batch_cli(args, pipelined, ["--resume"]))
+        print(f"interrupted + resumed run took {time.perf_counter() - start:.1f}s (including two start-ups)")
+        pipelined_report = show_report("pipelined stages, resumed run", pipelined)
+
+        print(f"\nfiles/min: sequential {sequential_report['files_per_minute']}, "
+              f"pipelined (resumed part) {pipelined_report['files_per_minute']}")
+    finally:
+        fakes.terminate()
+        try:
+            fakes.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            fakes.kill()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=24)
+    parser.add_argument("--audio-kb", type=int, default=64)
+    parser.add_argument("--interrupt-after", type=int, default=4, help="Completed files before the Ctrl-C")
+    parser.add_argument("--poll-interval", type=float, default=0.25, help="Initial transcription poll interval")
+    parser.add_argument("--trello", action="store_true", help="Create Trello cards too")
+    parser.add_argument("--verbose", action="store_true", help="Show the batch's log output")
+    fake_servers.add_arguments(parser)
+    parser.set_defaults(assemblyai_processing_time=0.5, gemini_latency=0.3, trello_latency=0.05)
+    args = parser.parse_args()
+    asyncio.run(run(args))
@@ -0,0 +1,166 @@
+"""
+Single-flight coalescing of identical uploads. Runs the app in-process with a
+stand-in transcriber (fixed latency, counts its calls) and the stand-in Gemini
+model, with the result cache disabled so only coalescing can save calls.
+
+Scenarios:
+- N identical uploads at once to /process-audio (a double-clicked upload or
+  several attendees sending the same recording), plus the same audio on /jobs
+- an upstream error, which every waiting caller must receive
+- the caller that started the work being cancelled while others wait (and its
+  upload removed), then every caller being cancelled
+
+Usage (from the backend directory):
+    python -m benchmarks.coalescing_bench --callers 8 --latency 0.5
+"""
+import argparse
+import asyncio
+import io
+import os
+import tempfile
+import time
+import wave
+
+import httpx
+
+import main
+from benchmarks.stand_ins import StandInGeminiModel
+
+
+class StandInTranscriber:
+    """
+    Replaces TranscriptionAgent.transcribe_file; reads the file after the delay
+    to prove it still exists when the work finishes
+    """
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+        self.cancelled = 0
+        self.error = None
+
+    async def __call__(self, file_path: str, filename=None):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.latency)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.error:
+            raise RuntimeError(self.error)
+        with open(file_path, "rb") as handle:
+            size = len(handle.read())
+        return f"Recording of {size} bytes. Sarah will send the notes by Friday. John should book the room."
+
+
+def wav_bytes(seconds: float = 1.0, rate: int = 16000) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(b"\x01\x00" * int(seconds * rate))
+    return buffer.getvalue()
+
+
+async def upload(client: httpx.AsyncClient, path: str, audio: bytes) -> httpx.Response:
+    return await client.post(path, files={"file": ("meeting.wav", audio, "audio/wav")})
+
+
+async def wait_for_job(client: httpx.AsyncClient, job_id: str) -> dict:
+    while True:
+        job = (await client.get(f"/jobs/{job_id}")).json()
+        if job["status"] in ("completed", "failed"):
+            return job
+        await asyncio.sleep(0.05)
+
+
+async def identical_uploads(client, transcriber, model, callers: int) -> None:
+    audio = wav_bytes()
+    transcriber.calls = model.calls = 0
+    start = time.perf_counter()
+    job_ids = [(await upload(client, "/jobs", audio)).json()["job_id"] for _ in range(2)]
+    responses = await asyncio.gather(*(upload(client, "/process-audio", audio) for _ in range(callers)))
+    jobs = await asyncio.gather(*(wait_for_job(client, job_id) for job_id in job_ids))
+    wall = time.perf_counter() - start
+
+    bodies = [response.json() for response in responses]
+    same = all(body == bodies[0] for body in bodies) and all(
+        job["action_items"] == bodies[0]["action_items"] for job in jobs)
+    print(f"identical uploads: {callers} x /process-audio + 2 x /jobs in {wall:.2f}s, "
+          f"statuses={sorted({r.status_code for r in responses})}, jobs={[job['status'] for job in jobs]}")
+    print(f"  transcriptions={transcriber.calls} gemini calls={model.calls} identical results={same}")
+
+
+async def error_fan_out(client, transcriber, callers: int) -> None:
+    audio = wav_bytes(1.5)
+    transcriber.calls = 0
+    transcriber.error = "stand-in upstream failure"
+    responses = await asyncio.gather(*(upload(client, "/process-audio", audio) for _ in range(callers)))
+    transcriber.error = None
+    details = {response.json().get("detail") for response in responses}
+    print(f"error fan-out:     transcriptions={transcriber.calls} "
+          f"statuses={sorted({r.status_code for r in responses})} details={details}")
+
+
+async def cancellation(transcriber, latency: float) -> None:
+    pipeline = main.pipeline
+    workdir = tempfile.mkdtemp()
+    audio = wav_bytes(2.0)
+    paths = []
+    for i in range(3):
+        paths.append(os.path.join(workdir, f"upload_{i}.wav"))
+        with open(paths[-1], "wb") as handle:
+            handle.write(audio)
+
+    # The first caller starts the work, is cancelled and its upload deleted; the others still finish
+    transcriber.calls = transcriber.cancelled = 0
+    tasks = [asyncio.create_task(pipeline.transcribe(path, "meeting.wav", "cancel-test")) for path in paths]
+    await asyncio.sleep(latency / 4)
+    tasks[0].cancel()
+    os.unlink(paths[0])
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    outcome = ["cancelled" if isinstance(r, asyncio.CancelledError) else "ok" if r else "failed" for r in results]
+    print(f"leader cancelled:  transcriptions={transcriber.calls} cancelled={transcriber.cancelled} "
+          f"callers={outcome} leftover files={sorted(os.listdir(workdir))}")
+
+    # Every caller cancelled: the shared work is cancelled too
+    transcriber.calls = transcriber.cancelled = 0
+    tasks = [asyncio.create_task(pipeline.transcribe(path, "meeting.wav", "cancel-all")) for path in paths[1:]]
+    await asyncio.sleep(latency / 4)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await asyncio.sleep(0.05)
+    print(f"all cancelled:     transcriptions={transcriber.calls} cancelled={transcriber.cancelled} "
+          f"in flight={len(pipeline.transcriptions)} leftover files={sorted(os.listdir(workdir))}")
+
+
+async def run(args) -> None:
+    transcription_agent = main.agents.get("transcription")
+    summarization_agent = main.agents.get("summarization")
+    transcriber = StandInTranscriber(args.latency)
+    transcription_agent.transcribe_file = transcriber
+    summarization_agent.demo_mode = False
+    model = StandInGeminiModel(base_latency=args.latency)
+    summarization_agent.model = model
+    main.pipeline.cache = None
+    # Every upload comes from the same client, which admission control would hold to its share
+    main.ADMISSION_CONTROL = False
+    main.open_stores()
+    await main.job_queue.start()
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        await identical_uploads(client, transcriber, model, args.callers)
+        await error_fan_out(client, transcriber, args.callers)
+    await cancellation(transcriber, args.latency)
+    await main.job_queue.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--callers", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.5, help="Stand-in transcription and Gemini latency")
+    args = parser.parse_args()
+    asyncio.run(run(args))
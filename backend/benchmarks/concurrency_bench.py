@@ -0,0 +1,93 @@
+"""
+Concurrency benchmark for the non-blocking agent execution layer.
+
+Replaces the Gemini model with a stand-in whose generate_content blocks the
+calling thread (like the real SDK does) and fires N simultaneous
+/process-audio requests. With blocking calls offloaded to the executor, the
+batch finishes in about the time of a single request and the / health check
+stays responsive while the batch is running.
+
+Every request uploads different bytes and gets its own transcript, and the
+result cache is off, so no request is answered from the cache or joins
+another's summarization (single flight): each one makes its own blocking call.
+
+Usage (from the backend directory):
+    python -m benchmarks.concurrency_bench --requests 8 --latency 0.5
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+import main
+from agents.transcription_agent import DEMO_TRANSCRIPT
+
+
+class BlockingModel:
+    """
+    Stand-in for genai.GenerativeModel with a synchronous, slow generate_content
+    """
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+
+    def generate_content(self, prompt, stream=False, request_options=None):
+        self.calls += 1
+        time.sleep(self.latency)
+        text = json.dumps({"summary": "Stand-in summary", "action_items": ["Stand-in action item"]})
+        response = type("Response", (), {"text": text})()
+        return [response] if stream else response
+
+
+async def stand_in_transcribe(file_path: str, filename: str = None) -> str:
+    # Distinct per upload, so no two requests share a summary
+    return f"{DEMO_TRANSCRIPT}\nThis meeting was recorded as {filename}."
+
+
+async def timed_request(client: httpx.AsyncClient, index: int) -> float:
+    start = time.perf_counter()
+    audio = b"RIFF" + index.to_bytes(4, "little") + b"WAVE"
+    response = await client.post("/process-audio", files={"file": (f"meeting-{index}.wav", audio, "audio/wav")})
+    response.raise_for_status()
+    return time.perf_counter() - start
+
+
+async def run(requests: int, latency: float) -> None:
+    # Every request comes from the same client, which admission control would hold to its share
+    main.ADMISSION_CONTROL = False
+    # Measure the blocking calls, not cache hits
+    main.pipeline.cache = None
+    transcription_agent = main.agents.get("transcription")
+    transcription_agent.transcribe_file = stand_in_transcribe
+    summarization_agent = main.agents.get("summarization")
+    summarization_agent.demo_mode = False
+    model = summarization_agent.model = BlockingModel(latency)
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        single = await timed_request(client, 0)
+
+        start = time.perf_counter()
+        batch = asyncio.gather(*(timed_request(client, index) for index in range(1, requests + 1)))
+        await asyncio.sleep(latency / 4)
+        health_start = time.perf_counter()
+        await client.get("/")
+        health_latency = time.perf_counter() - health_start
+        await batch
+        total = time.perf_counter() - start
+
+    print(f"single request:          {single:.3f}s")
+    print(f"{requests} concurrent requests: {total:.3f}s ({total / single:.2f}x single)")
+    print(f"health check under load: {health_latency * 1000:.1f}ms")
+    print(f"Gemini calls:            {model.calls} (one per request)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.5, help="Simulated Gemini latency in seconds")
+    args = parser.parse_args()
+    asyncio.run(run(args.requests, args.latency))
@@ -0,0 +1,128 @@
+"""
+Local stand-in for the AssemblyAI REST API (upload, create transcript, poll).
+
+Transcripts complete after a configurable processing time. When a transcript
+is created with a webhook_url, the fake calls it on completion the way
+AssemblyAI does, using the given httpx client. Every request can be delayed by
+a fixed latency and is subject to a sliding-window rate limit (429). With
+unique_transcripts each transcript ends with its own sentence, so identical
+stand-in text does not let caching or coalescing skip summaries.
+
+Fault injection: slow_rate of the requests take slow_latency longer (a latency
+tail), and setting app.state.outage answers every request with 503 until it is
+cleared.
+"""
+import asyncio
+import random
+import time
+import uuid
+from collections import deque
+from typing import Optional
+
+import httpx
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse
+
+
+def create_app(
+    processing_time: float = 2.0,
+    error_rate: float = 0.0,
+    transcript_text: str = "This is a stand-in transcript.",
+    webhook_client: Optional[httpx.AsyncClient] = None,
+    request_latency: float = 0.0,
+    rate_limit: int = 100000,
+    rate_window: float = 60.0,
+    unique_transcripts: bool = False,
+    slow_rate: float = 0.0,
+    slow_latency: float = 0.0,
+) -> FastAPI:
+    app = FastAPI(title="Fake AssemblyAI")
+    app.state.transcripts = {}
+    app.state.stats = {"uploads": 0, "creates": 0, "polls": 0, "webhooks": 0, "rate_limited": 0, "outage": 0,
+                       "requests": 0}
+    app.state.webhook_client = webhook_client
+    app.state.outage = False
+    window = deque()
+
+    @app.middleware("http")
+    async def latency_and_rate_limit(request: Request, call_next):
+        app.state.stats["requests"] += 1
+        now = time.monotonic()
+        while window and window[0] <= now - rate_window:
+            window.popleft()
+        if len(window) >= rate_limit:
+            app.state.stats["rate_limited"] += 1
+            return JSONResponse(status_code=429, content={"error": "Too many requests"},
+                                headers={"Retry-After": f"{window[0] + rate_window - now:.2f}"})
+        window.append(now)
+        if app.state.outage:
+            app.state.stats["outage"] += 1
+            return JSONResponse(status_code=503, content={"error": "Service unavailable"})
+        latency = request_latency + (slow_latency if random.random() < slow_rate else 0.0)
+        if latency:
+            await asyncio.sleep(latency)
+        return await call_next(request)
+
+    def _response(transcript_id: str) -> dict:
+        record = app.state.transcripts[transcript_id]
+        status = record["status"]
+        if status not in ("completed", "error") and time.monotonic() >= record["ready_at"]:
+            status = "error" if record["fail"] else "completed"
+            record["status"] = status
+        return {
+            "id": transcript_id,
+            "audio_url": record["audio_url"],
+            "status": status,
+            "text": record["text"] if status == "completed" else None,
+            "error": "Stand-in transcription error" if status == "error" else None,
+            "webhook_url": record["webhook_url"],
+        }
+
+    async def _deliver_webhook(transcript_id: str) -> None:
+        record = app.state.transcripts[transcript_id]
+        await asyncio.sleep(max(0.0, record["ready_at"] - time.monotonic()))
+        payload = {"transcript_id": transcript_id, "status": _response(transcript_id)["status"]}
+        headers = {}
+        if record["webhook_auth_header_name"]:
+            headers[record["webhook_auth_header_name"]] = record["webhook_auth_header_value"]
+        client = app.state.webhook_client or httpx.AsyncClient()
+        await client.post(record["webhook_url"], json=payload, headers=headers)
+        app.state.stats["webhooks"] += 1
+
+    @app.post("/v2/upload")
+    async def upload(request: Request):
+        async for _ in request.stream():
+            pass
+        app.state.stats["uploads"] += 1
+        return {"upload_url": f"https://cdn.fake-assemblyai.local/{uuid.uuid4().hex}"}
+
+    @app.post("/v2/transcript")
+    async def create_transcript(request: Request):
+        body = await request.json()
+        transcript_id = uuid.uuid4().hex
+        text = transcript_text
+        if unique_transcripts:
+            text += f" Recording {len(app.state.transcripts) + 1}: Priya will file the notes for this recording."
+        app.state.transcripts[transcript_id] = {
+            "text": text,
+            "audio_url": body.get("audio_url"),
+            "status": "queued",
+            "ready_at": time.monotonic() + processing_time,
+            "fail": random.random() < error_rate,
+            "webhook_url": body.get("webhook_url"),
+            "webhook_auth_header_name": body.get("webhook_auth_header_name"),
+            "webhook_auth_header_value": body.get("webhook_auth_header_value"),
+        }
+        app.state.stats["creates"] += 1
+        if body.get("webhook_url"):
+            asyncio.create_task(_deliver_webhook(transcript_id))
+        return _response(transcript_id)
+
+    @app.get("/v2/transcript/{transcript_id}")
+    async def get_transcript(transcript_id: str):
+        if transcript_id not in app.state.transcripts:
+            raise HTTPException(status_code=404, detail="Transcript not found")
+        app.state.stats["polls"] += 1
+        return _response(transcript_id)
+
+    return app
@@ -0,0 +1,107 @@
+"""
+Local stand-in for the Gemini REST API (POST /v1beta/models/{model}:generateContent
+and :streamGenerateContent).
+
+Latency grows with the prompt length like real generation, and with
+output_chars_per_second set the answer takes time to generate too; streamed
+requests receive it piece by piece, as a JSON array of responses or, with
+?alt=sse, as server-sent events, like the real API. Supports a random server-error rate and a sliding-window rate limit
+answered with 429 RESOURCE_EXHAUSTED. Point the backend at it with
+GEMINI_API_ENDPOINT.
+"""
+import asyncio
+import json
+import random
+import time
+from collections import deque
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from benchmarks.stand_ins import stand_in_answer
+
+
+def create_app(
+    base_latency: float = 0.5,
+    seconds_per_kchar: float = 0.01,
+    error_rate: float = 0.0,
+    rate_limit: int = 1000,
+    rate_window: float = 60.0,
+    output_chars_per_second: float = 0.0,
+    stream_chunk_chars: int = 40,
+    answer=stand_in_answer,
+) -> FastAPI:
+    """
+    Args:
+        output_chars_per_second: Generation speed of the answer (0 = instant)
+        stream_chunk_chars: Characters per streamed response piece
+        answer: Function returning the model's answer text for a prompt
+    """
+    app = FastAPI(title="Fake Gemini")
+    app.state.stats = {"requests": 0, "completed": 0, "rate_limited": 0, "errors": 0, "prompt_chars": 0}
+    window = deque()
+
+    def _error(status: int, code: str, message: str) -> JSONResponse:
+        return JSONResponse(status_code=status, content={"error": {"code": status, "status": code, "message": message}})
+
+    @app.post("/v1beta/models/{model_action}")
+    async def generate_content(model_action: str, request: Request):
+        body = await request.json()
+        app.state.stats["requests"] += 1
+
+        now = time.monotonic()
+        while window and window[0] <= now - rate_window:
+            window.popleft()
+        if len(window) >= rate_limit:
+            app.state.stats["rate_limited"] += 1
+            return _error(429, "RESOURCE_EXHAUSTED", "Stand-in quota exceeded")
+        window.append(now)
+
+        prompt = "".join(
+            part.get("text", "") for content in body.get("contents", []) for part in content.get("parts", [])
+        )
+        app.state.stats["prompt_chars"] += len(prompt)
+        await asyncio.sleep(base_latency + len(prompt) / 1000 * seconds_per_kchar)
+
+        if random.random() < error_rate:
+            app.state.stats["errors"] += 1
+            return _error(503, "UNAVAILABLE", "Stand-in server error")
+
+        app.state.stats["completed"] += 1
+        text = answer(prompt)
+        if model_action.endswith(":streamGenerateContent"):
+            if request.query_params.get("alt") == "sse":
+                return StreamingResponse(_stream(text, sse=True), media_type="text/event-stream")
+            return StreamingResponse(_stream(text), media_type="application/json")
+        if output_chars_per_second:
+            await asyncio.sleep(len(text) / output_chars_per_second)
+        return _response(text)
+
+    def _response(text: str, finish_reason: str = "STOP") -> dict:
+        return {
+            "candidates": [{
+                "content": {"parts": [{"text": text}], "role": "model"},
+                "finishReason": finish_reason,
+                "index": 0,
+                "safetyRatings": [],
+            }],
+            "promptFeedback": {"safetyRatings": []},
+        }
+
+    async def _stream(text: str, sse: bool = False):
+        pieces = [text[i:i + stream_chunk_chars] for i in range(0, len(text), stream_chunk_chars)] or [""]
+        if not sse:
+            yield "["
+        for i, piece in enumerate(pieces):
+            if output_chars_per_second:
+                await asyncio.sleep(len(piece) / output_chars_per_second)
+            last = i == len(pieces) - 1
+            body = json.dumps(_response(piece, "STOP" if last else "FINISH_REASON_UNSPECIFIED"))
+            if sse:
+                yield f"data: {body}\r\n\r\n"
+            else:
+                yield ("" if i == 0 else ",\r\n") + body
+        if not sse:
+            yield "]"
+
+    return app
@@ -0,0 +1,112 @@
+"""
+Run the AssemblyAI, Gemini and Trello stand-ins as real HTTP servers so the
+backend can be pointed at them through its *_BASE_URL / *_API_ENDPOINT settings.
+
+Usage (from the backend directory):
+    python -m benchmarks.fake_servers --gemini-latency 0.5 --trello-rate-limit 100
+"""
+import argparse
+import asyncio
+import signal
+
+import uvicorn
+
+from benchmarks import fake_assemblyai, fake_gemini, fake_trello
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--assemblyai-port", type=int, default=9101)
+    parser.add_argument("--gemini-port", type=int, default=9102)
+    parser.add_argument("--trello-port", type=int, default=9103)
+    parser.add_argument("--assemblyai-processing-time", type=float, default=1.0)
+    parser.add_argument("--assemblyai-latency", type=float, default=0.02, help="Per-request latency")
+    parser.add_argument("--assemblyai-error-rate", type=float, default=0.0)
+    parser.add_argument("--assemblyai-rate-limit", type=int, default=100000, help="Requests per minute")
+    parser.add_argument("--assemblyai-unique-transcripts", type=int, default=0,
+                        help="1 = give every transcript a distinct final sentence")
+    parser.add_argument("--assemblyai-slow-rate", type=float, default=0.0,
+                        help="Fraction of requests delayed by --assemblyai-slow-latency")
+    parser.add_argument("--assemblyai-slow-latency", type=float, default=0.0)
+    parser.add_argument("--gemini-latency", type=float, default=0.5, help="Base generation latency")
+    parser.add_argument("--gemini-seconds-per-kchar", type=float, default=0.01)
+    parser.add_argument("--gemini-error-rate", type=float, default=0.0)
+    parser.add_argument("--gemini-rate-limit", type=int, default=100000, help="Requests per minute")
+    parser.add_argument("--gemini-output-cps", type=float, default=0.0,
+                        help="Answer generation speed in characters per second (0 = instant)")
+    parser.add_argument("--trello-latency", type=float, default=0.1)
+    parser.add_argument("--trello-error-rate", type=float, default=0.0)
+    parser.add_argument("--trello-rate-limit", type=int, default=100, help="Requests per 10 seconds per key")
+
+
+def forward_arguments(args: argparse.Namespace) -> list:
+    """
+    Turn parsed fake-server options back into command-line arguments for a subprocess
+    """
+    parser = argparse.ArgumentParser()
+    add_arguments(parser)
+    forwarded = []
+    for action in parser._actions:
+        if action.dest == "help" or not hasattr(args, action.dest):
+            continue
+        forwarded += [action.option_strings[0], str(getattr(args, action.dest))]
+    return forwarded
+
+
+def transcript_text() -> str:
+    sentences = [
+        "We reviewed the launch plan and the budget for next quarter.",
+        "Sarah will finalize the marketing materials by Friday.",
+        "John will prepare a product demo for the sales team.",
+        "The finance team should review the vendor contract before signing.",
+    ]
+    return " ".join(sentences * 10)
+
+
+async def serve(args: argparse.Namespace) -> None:
+    apps = [
+        (fake_assemblyai.create_app(
+            processing_time=args.assemblyai_processing_time,
+            error_rate=args.assemblyai_error_rate,
+            transcript_text=transcript_text(),
+            request_latency=args.assemblyai_latency,
+            rate_limit=args.assemblyai_rate_limit,
+            unique_transcripts=bool(args.assemblyai_unique_transcripts),
+            slow_rate=args.assemblyai_slow_rate,
+            slow_latency=args.assemblyai_slow_latency,
+        ), args.assemblyai_port),
+        (fake_gemini.create_app(
+            base_latency=args.gemini_latency,
+            seconds_per_kchar=args.gemini_seconds_per_kchar,
+            error_rate=args.gemini_error_rate,
+            rate_limit=args.gemini_rate_limit,
+            output_chars_per_second=args.gemini_output_cps,
+        ), args.gemini_port),
+        (fake_trello.create_app(
+            latency=args.trello_latency,
+            error_rate=args.trello_error_rate,
+            rate_limit=args.trello_rate_limit,
+        ), args.trello_port),
+    ]
+    servers = [
+        uvicorn.Server(uvicorn.Config(app, host=args.host, port=port, log_level="warning"))
+        for app, port in apps
+    ]
+
+    # Each uvicorn server would install its own signal handlers; stop them all together instead
+    def stop():
+        for server in servers:
+            server.should_exit = True
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop)
+    for server in servers:
+        server.install_signal_handlers = lambda: None
+    await asyncio.gather(*(server.serve() for server in servers))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    asyncio.run(serve(parser.parse_args()))
@@ -0,0 +1,91 @@
+"""
+Local stand-in for the Trello REST API (POST /1/cards, PUT /1/cards/{id},
+GET /1/lists/{id}).
+
+Supports a fixed response latency, a random server-error rate and a per-key
+sliding-window rate limit that answers 429 with a Retry-After header. Setting
+app.state.outage answers card requests with 503 until it is cleared.
+"""
+import asyncio
+import random
+import time
+import uuid
+from collections import defaultdict, deque
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+
+def create_app(
+    latency: float = 0.1,
+    error_rate: float = 0.0,
+    rate_limit: int = 100,
+    rate_window: float = 10.0,
+) -> FastAPI:
+    app = FastAPI(title="Fake Trello")
+    app.state.stats = {"requests": 0, "created": 0, "updated": 0, "rate_limited": 0, "errors": 0, "max_in_flight": 0}
+    app.state.cards = {}
+    app.state.outage = False
+    in_flight = {"count": 0}
+    windows = defaultdict(deque)
+
+    def _rate_limited(key: str):
+        now = time.monotonic()
+        window = windows[key]
+        while window and window[0] <= now - rate_window:
+            window.popleft()
+        if len(window) >= rate_limit:
+            return window[0] + rate_window - now
+        window.append(now)
+        return None
+
+    @app.post("/1/cards")
+    async def create_card(request: Request):
+        form = await request.form()
+        app.state.stats["requests"] += 1
+        wait = _rate_limited(form.get("key", ""))
+        if wait is not None:
+            app.state.stats["rate_limited"] += 1
+            return JSONResponse(status_code=429, content={"message": "API_TOKEN_LIMIT_EXCEEDED"},
+                                headers={"Retry-After": f"{wait:.2f}"})
+
+        in_flight["count"] += 1
+        app.state.stats["max_in_flight"] = max(app.state.stats["max_in_flight"], in_flight["count"])
+        try:
+            await asyncio.sleep(latency)
+        finally:
+            in_flight["count"] -= 1
+
+        if app.state.outage or random.random() < error_rate:
+            app.state.stats["errors"] += 1
+            return JSONResponse(status_code=503, content={"message": "Stand-in server error"})
+
+        card_id = uuid.uuid4().hex[:24]
+        card = {"id": card_id, "name": form.get("name"), "idList": form.get("idList"),
+                "url": f"https://trello.com/c/{card_id}"}
+        app.state.cards[card_id] = card
+        app.state.stats["created"] += 1
+        return card
+
+    @app.put("/1/cards/{card_id}")
+    async def update_card(card_id: str, request: Request):
+        form = await request.form()
+        app.state.stats["requests"] += 1
+        wait = _rate_limited(form.get("key", ""))
+        if wait is not None:
+            app.state.stats["rate_limited"] += 1
+            return JSONResponse(status_code=429, content={"message": "API_TOKEN_LIMIT_EXCEEDED"},
+                                headers={"Retry-After": f"{wait:.2f}"})
+        await asyncio.sleep(latency)
+        card = app.state.cards.get(card_id)
+        if card is None:
+            return JSONResponse(status_code=404, content={"message": "The requested resource was not found."})
+        card["name"] = form.get("name", card["name"])
+        app.state.stats["updated"] += 1
+        return card
+
+    @app.get("/1/lists/{list_id}")
+    async def get_list(list_id: str):
+        return {"id": list_id, "name": "Fake list"}
+
+    return app
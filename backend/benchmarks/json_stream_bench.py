@@ -0,0 +1,222 @@
+"""
+Streaming summarization and the incremental JSON parser.
+
+1. Parser throughput on a large response fed in small pieces, against one
+   json.loads of the whole text and against re-parsing the accumulated text
+   after every piece.
+2. Recovery on malformed responses (truncated, fenced, missing commas, single
+   quotes, prose around the object): action items recovered by the tolerant
+   parser versus json.loads with the line-based fallback.
+3. End to end against the Gemini stand-in generating at a fixed speed: time to
+   the first action item and to the full result, streamed versus not.
+
+The REST transport of the installed google-generativeai SDK reads a streamed
+response completely before returning it (only the default gRPC transport
+streams progressively), so the end-to-end run talks to the stand-in through
+SSEModel, a minimal streaming client with the same generate_content interface.
+
+Usage (from the backend directory):
+    python -m benchmarks.json_stream_bench --items 5000 --output-cps 2000
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import httpx
+import uvicorn
+
+from services.json_stream import SummaryStreamParser
+
+PIECE_CHARS = 40
+
+
+class SSEModel:
+    """
+    generate_content(prompt, stream=...) against the stand-in's server-sent event stream
+    """
+
+    class Chunk:
+        def __init__(self, text: str):
+            self.text = text
+
+    def __init__(self, base_url: str):
+        self.url = f"{base_url}/v1beta/models/gemini-1.5-flash:streamGenerateContent"
+
+    def _pieces(self, prompt: str, timeout: float):
+        body = {"contents": [{"parts": [{"text": prompt}], "role": "user"}]}
+        with httpx.stream("POST", self.url, params={"alt": "sse"}, json=body, timeout=timeout) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if line.startswith("data: "):
+                    data = json.loads(line[6:])
+                    yield self.Chunk(data["candidates"][0]["content"]["parts"][0]["text"])
+
+    def generate_content(self, prompt: str, stream: bool = False, request_options=None):
+        pieces = self._pieces(prompt, (request_options or {}).get("timeout", 60))
+        if stream:
+            return pieces
+        return self.Chunk("".join(chunk.text for chunk in pieces))
+
+
+def make_answer(items: int, summary_chars: int = 1500, items_first: bool = False) -> str:
+    summary = ("The team reviewed the launch plan, the budget and open hiring questions. " * 40)[:summary_chars]
+    action_items = [f"Owner {i % 7} will deliver follow-up {i} by Friday" for i in range(items)]
+    answer = {"action_items": action_items, "summary": summary} if items_first else {
+        "summary": summary, "action_items": action_items}
+    return "```json\n" + json.dumps(answer, indent=2) + "\n```"
+
+
+def pieces(text: str, size: int = PIECE_CHARS):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def parse_incremental(text: str):
+    parser = SummaryStreamParser()
+    for piece in pieces(text):
+        parser.feed(piece)
+    return parser.close()
+
+
+def parse_strict(text: str):
+    cleaned = text.strip()
+    if cleaned.startswith("```json"):
+        cleaned = cleaned[7:]
+    if cleaned.endswith("```"):
+        cleaned = cleaned[:-3]
+    return json.loads(cleaned)
+
+
+def parse_reparse(text: str, limit: int):
+    # What streaming without an incremental parser costs: re-parse the prefix after every piece
+    received = ""
+    for piece in pieces(text)[:limit]:
+        received += piece
+        try:
+            parse_strict(received)
+        except ValueError:
+            pass
+
+
+def bench_throughput(items: int) -> None:
+    text = make_answer(items)
+    start = time.perf_counter()
+    result = parse_incremental(text)
+    incremental = time.perf_counter() - start
+    assert len(result["action_items"]) == items
+
+    start = time.perf_counter()
+    parse_strict(text)
+    strict = time.perf_counter() - start
+
+    # Re-parsing is quadratic; time a prefix and extrapolate
+    limit = min(len(pieces(text)), 2000)
+    start = time.perf_counter()
+    parse_reparse(text, limit)
+    reparse = (time.perf_counter() - start) * (len(pieces(text)) / limit) ** 2
+
+    print(f"throughput: {len(text) / 1e6:.2f} MB, {items} items, {len(pieces(text))} pieces of {PIECE_CHARS} chars")
+    print(f"  incremental parser:   {incremental * 1000:8.1f} ms ({len(text) / incremental / 1e6:.1f} MB/s)")
+    print(f"  json.loads once:      {strict * 1000:8.1f} ms")
+    print(f"  re-parse every piece: {reparse * 1000:8.0f} ms (extrapolated)")
+
+
+def malformed_variants(answer: str, rng: random.Random):
+    yield "valid", answer
+    yield "prose around", "Sure! Here is the JSON you asked for:\n" + answer + "\nLet me know if you need more."
+    yield "missing commas", answer.replace('",\n', '"\n')
+    yield "trailing commas", answer.replace('"\n  ]', '",\n  ]')
+    yield "single quotes", answer.replace('"', "'")
+    yield "raw newlines", answer.replace(". ", ".\n")
+    for fraction in (0.9, 0.6, 0.3):
+        yield f"truncated {fraction:.0%}", answer[: int(len(answer) * fraction)]
+    cut = rng.randrange(len(answer) // 2, len(answer))
+    yield "truncated random", answer[:cut]
+
+
+def bench_recovery(items: int, seed: int) -> None:
+    from agents.summarization_agent import SummarizationAgent
+
+    agent = SummarizationAgent()
+    answer = make_answer(items)
+    print(f"recovery ({items} action items per response):")
+    print(f"  {'variant':18} {'tolerant':>10} {'summary':>8} {'json.loads+fallback':>20} {'parse ms':>9}")
+    for name, text in malformed_variants(answer, random.Random(seed)):
+        start = time.perf_counter()
+        tolerant = parse_incremental(text) or {}
+        elapsed = (time.perf_counter() - start) * 1000
+        try:
+            strict = parse_strict(text)
+        except ValueError:
+            strict = agent._fallback_extraction(text)
+        summary = "yes" if tolerant.get("summary") else "no"
+        print(f"  {name:18} {len(tolerant.get('action_items', [])):>10} {summary:>8} "
+              f"{len(strict.get('action_items', [])):>20} {elapsed:>9.2f}")
+
+
+async def bench_end_to_end(args) -> None:
+    print(f"end to end ({args.output_cps:.0f} chars/s, {args.base_latency:.2f}s before the first token):")
+    for items_first in (False, True):
+        await run_end_to_end(args, make_answer(args.e2e_items, items_first=items_first), items_first)
+
+
+async def run_end_to_end(args, answer: str, items_first: bool) -> None:
+    from benchmarks import fake_gemini
+
+    app = fake_gemini.create_app(
+        base_latency=args.base_latency,
+        seconds_per_kchar=0.0,
+        output_chars_per_second=args.output_cps,
+        answer=lambda prompt: answer,
+    )
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=args.port, log_level="warning"))
+    server.install_signal_handlers = lambda: None
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    from agents.summarization_agent import SummarizationAgent
+    agent = SummarizationAgent()
+    agent.demo_mode = False
+    agent.model = SSEModel(f"http://127.0.0.1:{args.port}")
+
+    for streaming in (False, True):
+        agent.streaming = streaming
+        first = None
+        start = time.perf_counter()
+
+        def on_partial(partial):
+            nonlocal first
+            if first is None and "action_item" in partial:
+                first = time.perf_counter() - start
+
+        result = await agent._summarize_single("Sarah will send the notes.", on_partial)
+        total = time.perf_counter() - start
+        first = first if first is not None else total
+        order = "items first  " if items_first else "summary first"
+        print(f"  {order} streaming={str(streaming):5}  first action item {first:6.2f}s  "
+              f"full result {total:6.2f}s  items={len(result['action_items'])}")
+
+    server.should_exit = True
+    await serving
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=5000, help="Action items in the throughput response")
+    parser.add_argument("--recovery-items", type=int, default=20)
+    parser.add_argument("--e2e-items", type=int, default=20)
+    parser.add_argument("--output-cps", type=float, default=2000, help="Stand-in generation speed")
+    parser.add_argument("--base-latency", type=float, default=0.3)
+    parser.add_argument("--port", type=int, default=9111)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    bench_throughput(args.items)
+    bench_recovery(args.recovery_items, args.seed)
+    asyncio.run(bench_end_to_end(args))
+
+
+if __name__ == "__main__":
+    main()
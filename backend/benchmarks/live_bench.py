@@ -0,0 +1,49 @@
+"""
+Live-meeting summarization with a scripted segment feed and the stand-in
+Gemini model. Reports update latency early and late in the meeting; with
+incremental updates it should stay flat as the transcript grows.
+
+Usage (from the backend directory):
+    python -m benchmarks.live_bench --minutes 180 --segment-interval 0.002
+"""
+import argparse
+import asyncio
+import statistics
+
+from agents.summarization_agent import SummarizationAgent
+from benchmarks.stand_ins import StandInGeminiModel, synthetic_transcript
+from services.live_session import LiveMeetingSession
+
+
+async def run(minutes: int, segment_interval: float) -> None:
+    agent = SummarizationAgent()
+    agent.demo_mode = False
+    agent.model = StandInGeminiModel()
+
+    updates = []
+
+    async def on_update(update):
+        updates.append(update)
+
+    session = LiveMeetingSession(agent, on_update=on_update)
+    segments = synthetic_transcript(minutes).split("\n")
+    for line in segments:
+        speaker, _, text = line.partition(": ")
+        session.add_segment(text, speaker)
+        await asyncio.sleep(segment_interval)
+    final = await session.finish()
+
+    latencies = [update["latency_ms"] for update in updates]
+    quarter = max(1, len(latencies) // 4)
+    print(f"segments={final['segments']} transcript_chars={final['transcript_chars']} updates={final['updates']}")
+    print(f"action_items={len(final['action_items'])} summary_chars={len(final['summary'])}")
+    print(f"first quarter mean update latency: {statistics.mean(latencies[:quarter]):.1f}ms")
+    print(f"last quarter mean update latency:  {statistics.mean(latencies[-quarter:]):.1f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=int, default=180)
+    parser.add_argument("--segment-interval", type=float, default=0.002, help="Seconds between scripted segments")
+    args = parser.parse_args()
+    asyncio.run(run(args.minutes, args.segment_interval))
@@ -0,0 +1,271 @@
+"""
+End-to-end load test. Starts the AssemblyAI, Gemini and Trello stand-ins and
+the backend as separate processes, drives /process-audio and /send-to-trello
+at each concurrency level, and reports p50/p95/p99 latency, throughput and the
+backend's peak RSS. Results are saved as JSON (tagged with the git commit) so
+runs on different commits can be compared with --compare.
+
+Usage (from the backend directory):
+    python -m benchmarks.load_test --concurrency 1 4 16 --requests 32
+    python -m benchmarks.load_test --compare benchmarks/results/load_<commit>_<time>.json
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import subprocess
+import sys
+import time
+import wave
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from benchmarks import fake_servers
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(values: List[float], pct: float) -> float:
+    # Nearest-rank percentile
+    ordered = sorted(values)
+    rank = max(1, int(round(pct / 100 * len(ordered) + 0.5)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def synthetic_wav(size_kb: int, seed: int) -> bytes:
+    """
+    A mono 16 kHz WAV of roughly size_kb; the seed makes every upload unique
+    """
+    frames = os.urandom(8) + seed.to_bytes(8, "little")
+    frames = (frames * (size_kb * 1024 // len(frames) + 1))[: size_kb * 1024]
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(16000)
+        wav.writeframes(frames)
+    return buffer.getvalue()
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def rss_mb(pid: int) -> Optional[float]:
+    # Linux only; other platforms report no memory figures
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+    return None
+
+
+class RssSampler:
+    """
+    Samples a process's RSS in the background and keeps the peak
+    """
+
+    def __init__(self, pid: int, interval: float = 0.05):
+        self.pid = pid
+        self.interval = interval
+        self.peak: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def _sample(self) -> None:
+        while True:
+            current = rss_mb(self.pid)
+            if current is not None:
+                self.peak = max(self.peak or 0.0, current)
+            await asyncio.sleep(self.interval)
+
+    def __enter__(self):
+        self._task = asyncio.create_task(self._sample())
+        return self
+
+    def __exit__(self, *exc):
+        self._task.cancel()
+        return False
+
+
+async def wait_until_ready(url: str, process: subprocess.Popen, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f"Process serving {url} exited with code {process.returncode}")
+            try:
+                await client.get(url)
+                return
+            except httpx.HTTPError:
+                await asyncio.sleep(0.2)
+    raise RuntimeError(f"{url} did not become ready in {timeout:.0f}s")
+
+
+def backend_env(args) -> Dict[str, str]:
+    env = dict(os.environ)
+    env.update({
+        "ASSEMBLYAI_API_KEY": "bench-key",
+        "ASSEMBLYAI_BASE_URL": f"http://{args.host}:{args.assemblyai_port}",
+        "TRANSCRIPTION_POLL_INITIAL": str(args.poll_interval),
+        "TRANSCRIPTION_POLL_MAX": str(args.poll_interval * 4),
+        "GEMINI_API_KEY": "bench-key",
+        "GEMINI_API_ENDPOINT": f"http://{args.host}:{args.gemini_port}",
+        "TRELLO_API_KEY": "bench-key",
+        "TRELLO_TOKEN": "bench-token",
+        "TRELLO_LIST_ID": "bench-list",
+        "TRELLO_BASE_URL": f"http://{args.host}:{args.trello_port}/1",
+        "RESULT_CACHE": "memory" if args.cache else "none",
+        # Every request sends the same items; measure card creation, not the duplicate index
+        "TRELLO_DEDUP": "false",
+        # Report Gemini errors as errors rather than local summaries
+        "SUMMARY_LOCAL_FALLBACK": "false",
+        # All load comes from one client; measure the pipeline, not the per-client limits
+        "ADMISSION_CONTROL": "false",
+    })
+    return env
+
+
+async def drive(client: httpx.AsyncClient, endpoint: str, total: int, concurrency: int, args) -> Dict[str, Any]:
+    """
+    Closed-loop load: `concurrency` workers issue requests back to back until `total` are done
+    """
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(total))
+    items = [f"Load test action item {i}" for i in range(args.items)]
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            start = time.perf_counter()
+            try:
+                if endpoint == "process-audio":
+                    audio = synthetic_wav(args.audio_kb, seed=i + concurrency * 1000003)
+                    response = await client.post("/process-audio", files={"file": (f"load_{i}.wav", audio, "audio/wav")})
+                else:
+                    response = await client.post("/send-to-trello", json=items)
+                ok = response.status_code == 200 and response.json().get("status") == "success"
+            except httpx.HTTPError:
+                ok = False
+            latencies.append(time.perf_counter() - start)
+            errors += 0 if ok else 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - start
+    return {
+        "endpoint": endpoint,
+        "concurrency": concurrency,
+        "requests": total,
+        "errors": errors,
+        "wall_s": round(wall, 3),
+        "throughput_rps": round((total - errors) / wall, 3),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+    }
+
+
+def print_result(result: Dict[str, Any]) -> None:
+    rss = result.get("peak_rss_mb")
+    print(
+        f"{result['endpoint']:<15} c={result['concurrency']:>3} n={result['requests']:>4} errors={result['errors']:>3} "
+        f"rps={result['throughput_rps']:7.2f} p50={result['p50_ms']:8.1f}ms p95={result['p95_ms']:8.1f}ms "
+        f"p99={result['p99_ms']:8.1f}ms peak_rss={'n/a' if rss is None else f'{rss:.1f}MB'}"
+    )
+
+
+def compare(report: Dict[str, Any], baseline_path: str) -> None:
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    previous = {(r["endpoint"], r["concurrency"]): r for r in baseline["results"]}
+    print(f"\nCompared with {baseline['commit']} ({baseline_path}):")
+    for result in report["results"]:
+        before = previous.get((result["endpoint"], result["concurrency"]))
+        if before is None:
+            continue
+        deltas = []
+        for key in ("p50_ms", "p95_ms", "p99_ms", "throughput_rps", "peak_rss_mb"):
+            if before.get(key) and result.get(key) is not None:
+                deltas.append(f"{key}={(result[key] - before[key]) / before[key] * 100:+.1f}%")
+        print(f"{result['endpoint']:<15} c={result['concurrency']:>3} " + " ".join(deltas))
+
+
+async def run(args) -> None:
+    fakes = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.fake_servers"] + fake_servers.forward_arguments(args), cwd=BACKEND_DIR
+    )
+    backend = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", args.host, "--port", str(args.port),
+         "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=backend_env(args),
+        stdout=None if args.verbose else subprocess.DEVNULL,
+        stderr=None if args.verbose else subprocess.DEVNULL,
+    )
+    try:
+        for port in (args.assemblyai_port, args.gemini_port, args.trello_port):
+            await wait_until_ready(f"http://{args.host}:{port}/", fakes)
+        await wait_until_ready(f"http://{args.host}:{args.port}/", backend)
+
+        results = []
+        limits = httpx.Limits(max_connections=max(args.concurrency) * 2)
+        async with httpx.AsyncClient(base_url=f"http://{args.host}:{args.port}", timeout=300, limits=limits) as client:
+            for endpoint in args.endpoints:
+                for concurrency in args.concurrency:
+                    with RssSampler(backend.pid) as sampler:
+                        result = await drive(client, endpoint, args.requests, concurrency, args)
+                    result["peak_rss_mb"] = None if sampler.peak is None else round(sampler.peak, 1)
+                    print_result(result)
+                    results.append(result)
+    finally:
+        for process in (backend, fakes):
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    commit = git_commit()
+    report = {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": {key: value for key, value in vars(args).items() if key not in ("compare", "output_dir", "verbose")},
+        "results": results,
+    }
+    os.makedirs(args.output_dir, exist_ok=True)
+    path = os.path.join(args.output_dir, f"load_{commit}_{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nSaved results to {path}")
+
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--endpoints", nargs="+", default=["process-audio", "send-to-trello"],
+                        choices=["process-audio", "send-to-trello"])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--requests", type=int, default=32, help="Requests per endpoint and concurrency level")
+    parser.add_argument("--audio-kb", type=int, default=256, help="Size of each synthetic upload")
+    parser.add_argument("--items", type=int, default=5, help="Action items per /send-to-trello request")
+    parser.add_argument("--port", type=int, default=9100, help="Backend port")
+    parser.add_argument("--poll-interval", type=float, default=0.25, help="Initial transcription poll interval")
+    parser.add_argument("--cache", action="store_true", help="Keep the result cache enabled")
+    parser.add_argument("--output-dir", default=os.path.join(BACKEND_DIR, "benchmarks", "results"))
+    parser.add_argument("--compare", help="Earlier results JSON to compare against")
+    parser.add_argument("--verbose", action="store_true", help="Show the backend's log output")
+    fake_servers.add_arguments(parser)
+    args = parser.parse_args()
+    asyncio.run(run(args))
@@ -0,0 +1,163 @@
+"""
+Local extractive engine: time to summarize synthetic meetings of growing length,
+action item recall and precision against the items planted in them, and how far
+the pre-filter shrinks the prompt sent to Gemini.
+
+The meetings mix discussion, planted action items phrased in several ways
+("I'll ...", "<name> is going to ...", "<name>, can you ...", "Action item: ...")
+and distractors that must not become items (questions, negations, "it will be").
+
+Usage (from the backend directory):
+    python -m benchmarks.local_summary_bench --minutes 30 90 180 --repeat 5
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from agents.summarization_agent import SummarizationAgent
+from benchmarks.stand_ins import StandInGeminiModel
+from services.extractive_summary import ExtractiveAnalysis, condense
+
+SPEAKERS = ["Sarah", "John", "Priya", "Marcus", "Elena", "Wei"]
+OBJECTS = ["release notes", "vendor contract", "budget forecast", "onboarding guide", "pricing page", "launch checklist",
+           "design mockups", "customer survey", "security review", "hiring plan", "board deck", "support playbook",
+           "migration plan", "training slides", "partner agreement", "incident report"]
+VERBS = ["send", "review", "draft", "update", "finalize", "schedule", "prepare", "share", "fix", "publish"]
+DEADLINES = ["by Friday", "next week", "by March 15", "before the launch", "by end of month", "tomorrow", ""]
+DISCUSSION = [
+    "The {object} came up again because the numbers moved since last time.",
+    "Customer feedback on the {object} has been mostly positive so far.",
+    "There are a few open questions about the {object} that legal raised.",
+    "I looked at the {object} yesterday and the structure seems solid.",
+    "Timing for the {object} depends on what engineering can deliver this quarter.",
+    "Marketing asked how the {object} fits with the campaign schedule.",
+    "Most of the {object} is done, only the appendix is still missing.",
+    "We compared two options for the {object} and the cheaper one looks fine.",
+    "Okay, sounds good.",
+    "Yeah, I agree with that.",
+]
+DISTRACTORS = [
+    "It will be great to see the {object} finished.",
+    "Will {name} {verb} the {object}?",
+    "We won't {verb} the {object} this sprint.",
+    "I think the {object} will be fine.",
+]
+ACTIONS = [
+    ("I'll {verb} the {object} {deadline}.", "speaker"),
+    ("{name} is going to {verb} the {object} {deadline}.", "name"),
+    ("{name}, can you {verb} the {object} {deadline}?", "name"),
+    ("{name} will {verb} the {object} {deadline}.", "name"),
+    ("Action item: {name} needs to {verb} the {object} {deadline}.", "name"),
+]
+
+
+def synthetic_meeting(minutes: int, seed: int = 1, words_per_minute: int = 150):
+    """
+    Build a speaker-labelled transcript and the action items planted in it, as
+    (owner, verb, object, deadline) tuples
+    """
+    rng = random.Random(seed)
+    lines, planted, words, turn = [], [], 0, 0
+    used = set()
+    while words < minutes * words_per_minute:
+        speaker = SPEAKERS[turn % len(SPEAKERS)]
+        sentences = [rng.choice(DISCUSSION).format(object=rng.choice(OBJECTS)) for _ in range(rng.randint(2, 4))]
+        roll = rng.random()
+        if roll < 0.12:
+            template, owner_from = rng.choice(ACTIONS)
+            name = rng.choice([s for s in SPEAKERS if s != speaker])
+            verb, obj, deadline = rng.choice(VERBS), rng.choice(OBJECTS), rng.choice(DEADLINES)
+            owner = speaker if owner_from == "speaker" else name
+            if (owner, verb, obj) not in used:
+                used.add((owner, verb, obj))
+                planted.append((owner, verb, obj, deadline))
+                sentence = template.format(name=name, verb=verb, object=obj, deadline=deadline)
+                sentences.insert(rng.randint(0, len(sentences)), sentence.replace(" .", ".").replace(" ?", "?"))
+        elif roll < 0.2:
+            sentences.append(rng.choice(DISTRACTORS).format(
+                name=rng.choice(SPEAKERS), verb=rng.choice(VERBS), object=rng.choice(OBJECTS)))
+        text = " ".join(sentences)
+        lines.append(f"{speaker}: {text}")
+        words += len(text.split())
+        turn += 1
+    return "\n".join(lines), planted
+
+
+def score_items(items, planted):
+    found = 0
+    matched = set()
+    for owner, verb, obj, deadline in planted:
+        for index, item in enumerate(items):
+            if index in matched:
+                continue
+            if item["owner"] == owner and item["verb"] == verb and obj in item["task"] and (
+                    (item["deadline"] or "") == deadline):
+                matched.add(index)
+                found += 1
+                break
+    recall = found / len(planted) if planted else 1.0
+    precision = len(matched) / len(items) if items else 1.0
+    return recall, precision
+
+
+def timed_analysis(transcript: str, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        analysis = ExtractiveAnalysis(transcript)
+        ranked = time.perf_counter()
+        summary = analysis.summary(150)
+        items = analysis.action_items()
+        timings.append((ranked - start, time.perf_counter() - start))
+    rank_time = statistics.median(t[0] for t in timings)
+    total_time = statistics.median(t[1] for t in timings)
+    return rank_time, total_time, summary, items
+
+
+async def prefilter_comparison(transcript: str, chunk_chars: int) -> None:
+    for prefilter in (False, True):
+        agent = SummarizationAgent()
+        agent.demo_mode = False
+        agent.model = StandInGeminiModel()
+        agent.chunk_chars = chunk_chars
+        agent.prefilter = prefilter
+        agent.prefilter_chars = chunk_chars
+        start = time.perf_counter()
+        result = await agent.process_transcript(transcript)
+        elapsed = time.perf_counter() - start
+        label = "pre-filtered, one prompt" if prefilter else "map-reduce over chunks"
+        print(f"  {label:26} {elapsed:6.2f}s  Gemini calls={agent.model.calls:<3} "
+              f"action items={len(result['action_items']) if result else 0}")
+
+
+def run(args) -> None:
+    print(f"{'minutes':>7} {'words':>7} {'sentences':>9} {'rank':>8} {'total':>8} {'items':>6} "
+          f"{'recall':>7} {'precision':>9} {'condensed':>16}")
+    longest = None
+    for minutes in args.minutes:
+        transcript, planted = synthetic_meeting(minutes)
+        rank_time, total_time, summary, items = timed_analysis(transcript, args.repeat)
+        recall, precision = score_items(items, planted)
+        start = time.perf_counter()
+        condensed = condense(transcript, args.chunk_chars)
+        condense_time = time.perf_counter() - start
+        sentences = len(ExtractiveAnalysis(transcript).sentences)
+        print(f"{minutes:>7} {len(transcript.split()):>7} {sentences:>9} {rank_time * 1000:>6.0f}ms "
+              f"{total_time * 1000:>6.0f}ms {len(items):>6} {recall:>7.1%} {precision:>9.1%} "
+              f"{len(transcript) // 1000:>4}k->{len(condensed) // 1000}k {condense_time * 1000:>4.0f}ms")
+        longest = (minutes, transcript, summary)
+
+    minutes, transcript, summary = longest
+    print(f"\nsummary of the {minutes}-minute meeting:\n{summary}\n")
+    print(f"summarizing the {minutes}-minute meeting with the stand-in Gemini model:")
+    asyncio.run(prefilter_comparison(transcript, args.chunk_chars))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=int, nargs="+", default=[30, 90, 180])
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per meeting; the median is reported")
+    parser.add_argument("--chunk-chars", type=int, default=12000, help="Chunk size and pre-filter target")
+    run(parser.parse_args())
@@ -0,0 +1,182 @@
+"""
+Meeting store at scale: fills a store with tens of thousands of synthetic
+meetings, then times the API's queries against it.
+
+  writes   Meetings per second when every meeting commits on its own versus
+           group commit (everything queued since the last commit goes into one
+           transaction), measured on a fresh database each.
+  queries  p50/p95 latency of ranked search (common words, a rare project
+           name, a phrase, filtered by owner and by date), the first and a deep
+           page of the meeting list, and a transcript page; plus a LIKE scan
+           over the transcripts as the baseline without the full-text index.
+
+Memory: the peak Python allocation while the queries run (tracemalloc) only
+covers the rows and segments returned, however large the store is; the RSS
+also counts SQLite's page cache and the memory-mapped database file.
+
+Usage (from the backend directory):
+    python -m benchmarks.meeting_store_bench --meetings 20000 --minutes 10
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.local_summary_bench import SPEAKERS, synthetic_meeting
+from services.meeting_store import MeetingStore
+
+PROJECTS = ["Aurora", "Basalt", "Cinder", "Dahlia", "Ember", "Fjord", "Garnet", "Harbor", "Iris", "Juniper",
+            "Kestrel", "Lumen", "Mistral", "Nimbus", "Onyx", "Pollux", "Quartz", "Raven", "Sable", "Tundra"]
+DAY = 86400
+
+
+def rss_mb() -> float:
+    with open("/proc/self/status") as handle:
+        for line in handle:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def meeting_pool(size: int, minutes: int):
+    """
+    Distinct synthetic meetings (transcript, summary, action items) to store
+    repeatedly under new ids, so loading the store is not bound by generating text
+    """
+    pool = []
+    for seed in range(size):
+        transcript, planted = synthetic_meeting(minutes, seed=seed)
+        items = [f"{owner} will {verb} the {obj} {deadline}".strip() for owner, verb, obj, deadline in planted]
+        summary = " ".join(line.split(": ", 1)[1] for line in transcript.split("\n")[:3])
+        pool.append((transcript, summary, items))
+    return pool
+
+
+def fill(store: MeetingStore, pool, count: int, start: float, rng: random.Random) -> float:
+    began = time.perf_counter()
+    for index in range(count):
+        transcript, summary, items = pool[index % len(pool)]
+        project = rng.choice(PROJECTS)
+        # One project name per meeting makes selective queries possible
+        transcript = f"{transcript}\n{rng.choice(SPEAKERS)}: The {project} rollout needs another review."
+        store.save(
+            transcript, summary, items,
+            title=f"{project} sync {index}",
+            source="bench",
+            created_at=start + index * (365 * DAY / count),
+        )
+    store.flush()
+    return time.perf_counter() - began
+
+
+def write_throughput(args, pool) -> None:
+    print(f"writes: {args.write_sample} meetings of ~{args.minutes} min into a fresh store")
+    for batch_size in (1, args.batch_size):
+        with tempfile.TemporaryDirectory() as directory:
+            store = MeetingStore(os.path.join(directory, "meetings.db"), batch_size=batch_size)
+            elapsed = fill(store, pool, args.write_sample, time.time(), random.Random(1))
+            store.close()
+        label = "commit per meeting" if batch_size == 1 else f"group commit (<= {batch_size})"
+        print(f"  {label:24} {args.write_sample / elapsed:8.1f} meetings/s ({elapsed:5.1f}s)")
+
+
+def timed(function, repeat: int):
+    latencies = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return latencies, result
+
+
+def report(label: str, latencies, detail: str = "") -> None:
+    p95 = latencies[int(0.95 * (len(latencies) - 1))]
+    print(f"  {label:34} p50={statistics.median(latencies) * 1000:8.2f}ms p95={p95 * 1000:8.2f}ms {detail}")
+
+
+def queries(args, store: MeetingStore, start: float) -> None:
+    mid_year = time.strftime("%Y-%m-%d", time.localtime(start + 180 * DAY))
+    month_later = time.strftime("%Y-%m-%d", time.localtime(start + 210 * DAY))
+    date_from = time.mktime(time.strptime(mid_year, "%Y-%m-%d"))
+    date_to = time.mktime(time.strptime(month_later, "%Y-%m-%d")) + DAY
+    cases = [
+        ("search common words", lambda: store.search("budget forecast", limit=20)),
+        ("search rare project name", lambda: store.search("Kestrel rollout", limit=20)),
+        ("search phrase", lambda: store.search('"vendor contract" legal', limit=20)),
+        ("search prefix", lambda: store.search("onboard*", limit=20)),
+        ("search action items for owner", lambda: store.search("review", scopes=["action_items"], owner="Priya")),
+        ("search within one month", lambda: store.search("pricing page", date_from=date_from, date_to=date_to)),
+        ("search page 5", lambda: store.search("security review", limit=20, offset=80)),
+    ]
+    print(f"queries ({args.repeat} runs each):")
+    for label, function in cases:
+        latencies, result = timed(function, args.repeat)
+        report(label, latencies, f"hits={len(result['hits'])}")
+
+    latencies, first = timed(lambda: store.list(limit=20), args.repeat)
+    report("list first page", latencies)
+    cursor = first["next_cursor"]
+    for _ in range(args.deep_pages):
+        cursor = store.list(limit=20, cursor=cursor)["next_cursor"]
+    latencies, _ = timed(lambda: store.list(limit=20, cursor=cursor), args.repeat)
+    report(f"list page {args.deep_pages + 2} (cursor)", latencies)
+    latencies, result = timed(lambda: store.list(owner="Marcus", limit=20), args.repeat)
+    report("list meetings for owner", latencies, f"rows={len(result['meetings'])}")
+
+    meeting_id = first["meetings"][0]["meeting_id"]
+    latencies, page = timed(lambda: store.transcript_page(meeting_id, 2, 2), args.repeat)
+    report("transcript page", latencies, f"of {page['total_segments']} segments")
+
+    # Ranking needs every match, so the scan cannot stop at the first 20
+    with store._lock:
+        latencies, rows = timed(lambda: store._conn.execute(
+            "SELECT DISTINCT meeting_id FROM transcript_segments WHERE text LIKE '%Kestrel rollout%'"
+        ).fetchall(), max(1, args.repeat // 10))
+    report("LIKE scan, rare project name", latencies, f"matches={len(rows)}")
+
+
+def run(args) -> None:
+    pool = meeting_pool(args.pool, args.minutes)
+    chars = statistics.mean(len(transcript) for transcript, _, _ in pool)
+    print(f"{args.pool} distinct synthetic meetings, ~{chars / 1000:.0f}k transcript chars each\n")
+    write_throughput(args, pool)
+
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "meetings.db")
+    store = MeetingStore(path, batch_size=args.batch_size)
+    start = time.time() - 365 * DAY
+    elapsed = fill(store, pool, args.meetings, start, random.Random(2))
+    size = sum(os.path.getsize(path + suffix) for suffix in ("", "-wal") if os.path.exists(path + suffix))
+    print(f"\nloaded {store.size()} meetings in {elapsed:.1f}s ({args.meetings / elapsed:.0f}/s), "
+          f"database {size / 2 ** 20:.0f} MB, RSS {rss_mb():.0f} MB\n")
+    tracemalloc.start()
+    queries(args, store, start)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"\npeak Python allocation during queries {peak / 2 ** 20:.1f} MB, RSS {rss_mb():.0f} MB")
+    store.close()
+    if not args.keep:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.unlink(path + suffix)
+        os.rmdir(directory)
+    else:
+        print(f"database kept at {path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--meetings", type=int, default=20000)
+    parser.add_argument("--minutes", type=int, default=10, help="Length of each synthetic meeting")
+    parser.add_argument("--pool", type=int, default=200, help="Distinct meetings generated")
+    parser.add_argument("--write-sample", type=int, default=1000, help="Meetings stored for the write comparison")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--deep-pages", type=int, default=200, help="Pages to skip before the deep list page")
+    parser.add_argument("--keep", action="store_true", help="Keep the database for inspection")
+    run(parser.parse_args())
@@ -0,0 +1,77 @@
+"""
+Audio pre-processing before upload: converts a synthetic 48 kHz stereo WAV
+recording to 16 kHz mono (Opus with ffmpeg, PCM WAV without) and reports the
+bytes saved, the transcode time and the net latency change at several upload
+bandwidths. Also checks that an already compact file is skipped.
+
+Usage (from the backend directory):
+    python -m benchmarks.preprocess_bench --minutes 30 --mbps 10 20 100
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import wave
+
+import numpy as np
+
+from services.audio_preprocessor import AudioPreprocessor, remove_preprocessed
+from services.audio_segmenter import ffmpeg_available
+from services.executor import shutdown_executor
+
+
+def synthetic_wav(path: str, minutes: float, rate: int, channels: int) -> None:
+    rng = np.random.default_rng(3)
+    block_seconds = 60
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        remaining = int(minutes * 60 * rate)
+        t0 = 0
+        while remaining > 0:
+            frames = min(remaining, block_seconds * rate)
+            t = (np.arange(frames) + t0) / rate
+            voice = 4000 * np.sin(2 * np.pi * 220 * t) * (np.sin(2 * np.pi * 0.5 * t) > 0)
+            mono = voice + rng.normal(0, 200, frames)
+            samples = np.repeat(mono[:, None], channels, axis=1)
+            wav.writeframes(np.clip(samples, -32768, 32767).astype("<i2").tobytes())
+            remaining -= frames
+            t0 += frames
+
+
+async def run(args) -> None:
+    print(f"encoder: {'ffmpeg (Opus)' if ffmpeg_available() else 'numpy resample (16-bit PCM WAV)'}")
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, "meeting.wav")
+        synthetic_wav(path, args.minutes, 48000, 2)
+
+        for mbps in args.mbps:
+            preprocessor = AudioPreprocessor(upload_mbps=mbps)
+            result = await preprocessor.process(path)
+            stats = result.as_dict()
+            upload_before = stats["original_bytes"] * 8 / (mbps * 1e6)
+            print(
+                f"{mbps:6.0f} Mbps: {stats['original_bytes'] / 1e6:7.1f}MB -> {stats['output_bytes'] / 1e6:6.1f}MB "
+                f"({stats['original_bytes'] / max(1, stats['output_bytes']):.1f}x smaller) "
+                f"transcode={stats['transcode_seconds']:.2f}s upload {upload_before:.1f}s -> "
+                f"{upload_before - stats['estimated_upload_seconds_saved']:.1f}s "
+                f"net={stats['estimated_net_latency_seconds']:+.2f}s"
+            )
+            remove_preprocessed(result)
+
+        compact = os.path.join(workdir, "compact.wav")
+        synthetic_wav(compact, 1, 16000, 1)
+        start = time.perf_counter()
+        result = await AudioPreprocessor().process(compact)
+        print(f"16 kHz mono input: skipped={result.skipped!r} in {(time.perf_counter() - start) * 1000:.1f}ms")
+    shutdown_executor()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=float, default=30)
+    parser.add_argument("--mbps", type=float, nargs="+", default=[10, 20, 100], help="Upload bandwidths to compare")
+    args = parser.parse_args()
+    asyncio.run(run(args))
@@ -0,0 +1,196 @@
+"""
+Failure handling against the local stand-ins:
+
+  breaker   Trello goes down while cards are being created. Without a circuit
+            breaker every card waits out its retries; with one, cards fail
+            fast once the breaker opens, and after the outage a half-open
+            probe closes it again.
+  budget    Trello answers every request with 503. Per-call retries multiply
+            the load on the failing API; a retry budget caps the extra
+            requests at a fraction of the real ones.
+  hedging   A few AssemblyAI status requests are very slow. Hedging sends a
+            second copy after the recent p95 latency and cuts the p99.
+  deadline  Gemini hangs. The request deadline stops waiting for it and the
+            local summary is returned when the deadline is reached.
+
+Usage (from the backend directory):
+    python -m benchmarks.resilience_bench --scenarios breaker budget hedging deadline
+"""
+import argparse
+import asyncio
+import statistics
+import threading
+import time
+
+import httpx
+
+from agents.summarization_agent import SummarizationAgent
+from agents.trello_agent import TrelloAgent
+from benchmarks import fake_assemblyai, fake_trello
+from benchmarks.stand_ins import StandInGeminiModel, synthetic_transcript
+from services.rate_limit import TokenBucket
+from services.resilience import CircuitBreaker, Provider, RetryBudget, deadline
+from services.transcription_tracker import TranscriptionTracker
+
+# Settings that make the breaker or budget never trigger, to measure without them
+NEVER = 10 ** 9
+
+
+def trello_agent(fake, provider: Provider, max_retries: int = 3) -> TrelloAgent:
+    agent = TrelloAgent()
+    agent.demo_mode = False
+    agent.api_key, agent.token, agent.list_id = "bench-key", "bench-token", "bench-list"
+    agent.base_url = "http://fake-trello/1"
+    agent.max_retries = max_retries
+    agent.retry_base_delay = 0.05
+    agent.rate_limiter = TokenBucket(rate=1000, capacity=1000)
+    agent._client = httpx.AsyncClient(transport=httpx.ASGITransport(app=fake), timeout=10)
+    agent.index = None
+    agent.provider = provider
+    return agent
+
+
+async def create_cards(agent: TrelloAgent, count: int, label: str):
+    start = time.perf_counter()
+    results = await agent.create_tasks_detailed([f"{label} item {i}" for i in range(count)])
+    created = sum(1 for result in results if result["status"] == "created")
+    return created, time.perf_counter() - start
+
+
+async def breaker_scenario(args) -> None:
+    print(f"breaker: {args.items} cards while Trello is down, then {args.items} after it recovers")
+    for enabled in (False, True):
+        fake = fake_trello.create_app(latency=args.trello_latency, rate_limit=NEVER)
+        breaker = CircuitBreaker("trello", min_calls=args.min_calls if enabled else NEVER,
+                                 window=30, open_seconds=args.open_seconds)
+        agent = trello_agent(fake, Provider("trello", 10, breaker, RetryBudget(ratio=NEVER)))
+
+        fake.state.outage = True
+        created, outage_time = await create_cards(agent, args.items, "outage")
+        outage_requests = fake.state.stats["requests"]
+        state_after_outage = breaker.state
+
+        fake.state.outage = False
+        if enabled:
+            await asyncio.sleep(args.open_seconds)
+        # While half-open the breaker admits a single probe and rejects other calls,
+        # so one card goes first and closes it
+        probed, _ = await create_cards(agent, 1, "probe")
+        state_after_probe = breaker.state
+        created_after, recovery_time = await create_cards(agent, args.items, "recovered")
+        await agent.close()
+        print(f"  breaker {'on ' if enabled else 'off'} outage: {outage_time:5.2f}s "
+              f"requests={outage_requests:<4} created={created}/{args.items} state={state_after_outage:<7}"
+              f"| probe created={probed} state={state_after_probe:<7}"
+              f"| recovered: {recovery_time:5.2f}s created={created_after}/{args.items}")
+
+
+async def budget_scenario(args) -> None:
+    print(f"retry budget: {args.items} cards, Trello answers 503 to everything, up to 3 retries each")
+    for ratio in (NEVER, args.budget_ratio):
+        fake = fake_trello.create_app(latency=args.trello_latency, error_rate=1.0, rate_limit=NEVER)
+        budget = RetryBudget(ratio=ratio, window=60, min_per_second=0.05)
+        agent = trello_agent(fake, Provider("trello", 10, CircuitBreaker("trello", min_calls=NEVER), budget))
+        _, elapsed = await create_cards(agent, args.items, "failing")
+        await agent.close()
+        requests = fake.state.stats["requests"]
+        label = "unlimited" if ratio == NEVER else f"{ratio:.0%}"
+        print(f"  budget {label:>9}: {requests:>4} requests for {args.items} cards "
+              f"(amplification x{requests / args.items:.2f}) in {elapsed:5.2f}s")
+
+
+async def hedging_scenario(args) -> None:
+    print(f"hedging: {args.fetches} AssemblyAI status requests, {args.slow_rate:.0%} of them "
+          f"{args.slow_latency:.1f}s slower")
+    for hedging in (False, True):
+        fake = fake_assemblyai.create_app(processing_time=0, request_latency=args.assemblyai_latency,
+                                          slow_rate=args.slow_rate, slow_latency=args.slow_latency)
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=fake), base_url="http://fake-assemblyai")
+        tracker = TranscriptionTracker(api_key="bench", http_client=client)
+        tracker.provider = Provider("assemblyai", 30, CircuitBreaker("assemblyai", min_calls=NEVER),
+                                    RetryBudget(ratio=0.2), hedging=hedging, hedge_delay=args.slow_latency)
+        transcript_id = (await client.post("/v2/transcript", json={"audio_url": "https://example.invalid/a.wav"})).json()["id"]
+        requests_before = fake.state.stats["requests"]
+
+        latencies = []
+        slots = asyncio.Semaphore(args.concurrency)
+
+        async def fetch():
+            async with slots:
+                start = time.perf_counter()
+                await tracker.fetch(transcript_id)
+                latencies.append(time.perf_counter() - start)
+
+        await asyncio.gather(*(fetch() for _ in range(args.fetches)))
+        await tracker.close()
+        latencies.sort()
+        p99 = latencies[int(0.99 * (len(latencies) - 1))]
+        sent = fake.state.stats["requests"] - requests_before
+        print(f"  hedging {'on ' if hedging else 'off'} p50={statistics.median(latencies) * 1000:6.1f}ms "
+              f"p99={p99 * 1000:7.1f}ms max={latencies[-1] * 1000:7.1f}ms "
+              f"requests sent={sent} (+{sent - args.fetches}) hedge delay={tracker.provider.hedge_delay() * 1000:.0f}ms")
+
+
+class HangingGeminiModel(StandInGeminiModel):
+    """
+    Stand-in model whose requests hang until released
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+
+    def generate_content(self, prompt, **kwargs):
+        self.calls += 1
+        self.release.wait(600)
+        raise ConnectionError("Stand-in connection reset")
+
+
+async def deadline_scenario(args) -> None:
+    print(f"deadline: summarizing while Gemini hangs, request deadline {args.deadline:.1f}s")
+    agent = SummarizationAgent()
+    agent.demo_mode = False
+    agent.model = HangingGeminiModel()
+    agent.provider = Provider("gemini", 120, CircuitBreaker("gemini"), RetryBudget())
+    transcript = synthetic_transcript(30)
+    start = time.perf_counter()
+    try:
+        async with deadline(args.deadline):
+            result = await agent.process_transcript(transcript)
+    finally:
+        agent.model.release.set()
+    elapsed = time.perf_counter() - start
+    engine = result.get("engine", "gemini") if result else None
+    print(f"  answered after {elapsed:5.2f}s with engine={engine} "
+          f"({len(result['action_items']) if result else 0} action items, Gemini calls={agent.model.calls})")
+
+
+SCENARIOS = {
+    "breaker": breaker_scenario,
+    "budget": budget_scenario,
+    "hedging": hedging_scenario,
+    "deadline": deadline_scenario,
+}
+
+
+async def run(args) -> None:
+    for name in args.scenarios:
+        await SCENARIOS[name](args)
+        print()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--items", type=int, default=40, help="Trello cards per phase")
+    parser.add_argument("--trello-latency", type=float, default=0.02)
+    parser.add_argument("--min-calls", type=int, default=10, help="Calls before the breaker may open")
+    parser.add_argument("--open-seconds", type=float, default=1.0, help="Time the breaker stays open")
+    parser.add_argument("--budget-ratio", type=float, default=0.2)
+    parser.add_argument("--fetches", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--assemblyai-latency", type=float, default=0.01)
+    parser.add_argument("--slow-rate", type=float, default=0.03)
+    parser.add_argument("--slow-latency", type=float, default=0.5)
+    parser.add_argument("--deadline", type=float, default=2.0)
+    asyncio.run(run(parser.parse_args()))
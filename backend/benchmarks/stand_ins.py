@@ -0,0 +1,72 @@
+"""
+Deterministic in-process stand-ins for the Gemini model used by the benchmarks.
+"""
+import json
+import re
+import time
+
+ACTION_PATTERN = re.compile(r"[^.!?]*\b(?:will|needs? to|should)\b[^.!?]*[.!?]")
+
+
+class StandInResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class StandInGeminiModel:
+    """
+    Replacement for genai.GenerativeModel whose generate_content blocks for a time
+    proportional to the prompt length (like real generation latency) and returns
+    a deterministic JSON answer derived from the prompt
+    """
+
+    def __init__(self, seconds_per_kchar: float = 0.01, base_latency: float = 0.05):
+        self.seconds_per_kchar = seconds_per_kchar
+        self.base_latency = base_latency
+        self.calls = 0
+
+    def generate_content(self, prompt, **kwargs):
+        self.calls += 1
+        time.sleep(self.base_latency + len(prompt) / 1000 * self.seconds_per_kchar)
+        response = StandInResponse(stand_in_answer(prompt))
+        # A streamed answer arrives as a single piece
+        return [response] if kwargs.get("stream") else response
+
+
+def stand_in_answer(prompt: str) -> str:
+    """
+    Deterministic model answer for a prompt: plain text for merge prompts,
+    otherwise JSON with the prompt's "will/should/needs to" sentences as action items
+    """
+    if "Respond with plain text only" in prompt:
+        return "Stand-in merged summary of the whole meeting."
+    action_items = [match.strip() for match in ACTION_PATTERN.findall(prompt)][:20]
+    return json.dumps({
+        "summary": f"Stand-in summary of {len(prompt)} prompt characters.",
+        "action_items": action_items,
+    })
+
+
+def synthetic_transcript(minutes: int, words_per_minute: int = 150) -> str:
+    """
+    Build a speaker-labelled meeting transcript of roughly the given duration
+    """
+    speakers = ["Sarah", "John", "Priya", "Marcus"]
+    sentences = [
+        "We went through the latest numbers for the quarter.",
+        "The launch timeline still looks realistic if design signs off this week.",
+        "There are a few open questions about the vendor contract.",
+        "Customer feedback on the beta has been mostly positive.",
+    ]
+    lines = []
+    words = 0
+    turn = 0
+    while words < minutes * words_per_minute:
+        speaker = speakers[turn % len(speakers)]
+        text = " ".join(sentences[(turn + i) % len(sentences)] for i in range(3))
+        if turn % 7 == 0:
+            text += f" {speaker} will follow up on item {turn} by Friday."
+        lines.append(f"{speaker}: {text}")
+        words += len(text.split())
+        turn += 1
+    return "\n".join(lines)
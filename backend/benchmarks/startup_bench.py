@@ -0,0 +1,94 @@
+"""
+Cold-start timing for the backend. Measures, each in a fresh interpreter:
+
+- the time to `import main`
+- the time from launching uvicorn to the first 200 from the `/` liveness check
+- the time from launching uvicorn to the first 200 from `/ready`
+
+Runs each measurement several times and reports the median, so it can be
+compared across commits.
+
+Usage (from the backend directory):
+    python -m benchmarks.startup_bench --runs 5
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_seconds(env) -> float:
+    code = "import time; start = time.perf_counter(); import main; print(time.perf_counter() - start)"
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def wait_for_200(client: httpx.Client, url: str, process: subprocess.Popen, start: float, timeout: float) -> float:
+    while time.perf_counter() - start < timeout:
+        if process.poll() is not None:
+            raise RuntimeError(f"Backend exited with code {process.returncode}")
+        try:
+            if client.get(url).status_code == 200:
+                return time.perf_counter() - start
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.01)
+    raise RuntimeError(f"{url} did not return 200 within {timeout:.0f}s")
+
+
+def serve_seconds(env, port: int, timeout: float):
+    """
+    Launch uvicorn and return the seconds until / and /ready first answer 200
+    """
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=1.0) as client:
+            live = wait_for_200(client, "/", process, start, timeout)
+            ready = wait_for_200(client, "/ready", process, start, timeout)
+        return live, ready
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=9110)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--no-prewarm", action="store_true", help="Start with AGENT_PREWARM=false")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env["AGENT_PREWARM"] = "false" if args.no_prewarm else "true"
+
+    imports, lives, readies = [], [], []
+    for _ in range(args.runs):
+        imports.append(import_seconds(env))
+        live, ready = serve_seconds(env, args.port, args.timeout)
+        lives.append(live)
+        readies.append(ready)
+
+    print(f"runs={args.runs} prewarm={env['AGENT_PREWARM']} (medians)")
+    print(f"import main:         {statistics.median(imports):6.3f}s")
+    print(f"first 200 on /:      {statistics.median(lives):6.3f}s")
+    print(f"first 200 on /ready: {statistics.median(readies):6.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Single-prompt versus map-reduce summarization of long transcripts, using a
+deterministic stand-in model whose latency grows with the prompt length.
+With chunking, time to result should track the longest chunk rather than
+the whole transcript.
+
+Usage (from the backend directory):
+    python -m benchmarks.summarization_bench --minutes 30 90 180 --fanout 8
+"""
+import argparse
+import asyncio
+import time
+
+from agents.summarization_agent import SummarizationAgent
+from benchmarks.stand_ins import StandInGeminiModel, synthetic_transcript
+
+
+def make_agent(chunk_chars: int, fanout: int) -> SummarizationAgent:
+    agent = SummarizationAgent()
+    agent.demo_mode = False
+    agent.model = StandInGeminiModel()
+    agent.chunk_chars = chunk_chars
+    agent.fanout = fanout
+    return agent
+
+
+async def timed(agent: SummarizationAgent, transcript: str):
+    start = time.perf_counter()
+    result = await agent.process_transcript(transcript)
+    return time.perf_counter() - start, result
+
+
+async def run(minutes_list, fanout: int, chunk_chars: int) -> None:
+    print(f"{'minutes':>7} {'chars':>9} {'single':>8} {'chunked':>8} {'calls':>6} {'items':>6}")
+    for minutes in minutes_list:
+        transcript = synthetic_transcript(minutes)
+        single_time, _ = await timed(make_agent(len(transcript) + 1, fanout), transcript)
+        chunked_agent = make_agent(chunk_chars, fanout)
+        chunked_time, result = await timed(chunked_agent, transcript)
+        print(
+            f"{minutes:>7} {len(transcript):>9} {single_time:>7.2f}s {chunked_time:>7.2f}s "
+            f"{chunked_agent.model.calls:>6} {len(result['action_items']):>6}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=int, nargs="+", default=[30, 90, 180])
+    parser.add_argument("--fanout", type=int, default=8)
+    parser.add_argument("--chunk-chars", type=int, default=12000)
+    args = parser.parse_args()
+    asyncio.run(run(args.minutes, args.fanout, args.chunk_chars))
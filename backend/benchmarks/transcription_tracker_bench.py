@@ -0,0 +1,73 @@
+"""
+Tracks many in-flight transcripts against the local AssemblyAI stand-in in
+polling (backoff + jitter) and webhook mode, and reports wall time and the
+number of status requests sent.
+
+Usage (from the backend directory):
+    python -m benchmarks.transcription_tracker_bench --transcripts 1000 --processing-time 3
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+from fastapi import FastAPI, Request
+
+from benchmarks import fake_assemblyai
+from services.transcription_tracker import TranscriptionTracker
+
+
+async def run_mode(mode: str, transcripts: int, processing_time: float) -> None:
+    webhook_app = FastAPI()
+    webhook_client = httpx.AsyncClient(transport=httpx.ASGITransport(app=webhook_app), base_url="http://webhook")
+    fake = fake_assemblyai.create_app(processing_time=processing_time, webhook_client=webhook_client)
+    api_client = httpx.AsyncClient(transport=httpx.ASGITransport(app=fake), base_url="http://fake-assemblyai")
+
+    tracker = TranscriptionTracker(
+        api_key="bench",
+        webhook_url="http://webhook/webhooks/transcription" if mode == "webhook" else None,
+        initial_interval=0.25,
+        max_interval=2.0,
+        timeout=processing_time * 10,
+        http_client=api_client,
+    )
+
+    @webhook_app.post("/webhooks/transcription")
+    async def webhook(request: Request):
+        payload = await request.json()
+        await tracker.notify(payload["transcript_id"], payload["status"])
+        return {"status": "received"}
+
+    body = {"audio_url": "https://example.invalid/audio.wav"}
+    if mode == "webhook":
+        body["webhook_url"] = tracker.webhook_url
+    ids = []
+    for _ in range(transcripts):
+        response = await api_client.post("/v2/transcript", json=body)
+        ids.append(response.json()["id"])
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(tracker.wait(transcript_id) for transcript_id in ids))
+    elapsed = time.perf_counter() - start
+
+    completed = sum(1 for result in results if result["status"] == "completed")
+    polls = fake.state.stats["polls"]
+    print(
+        f"{mode:8s} transcripts={transcripts} completed={completed} wall={elapsed:.2f}s "
+        f"status_requests={polls} ({polls / transcripts:.1f} per transcript)"
+    )
+    await api_client.aclose()
+    await webhook_client.aclose()
+
+
+async def run(transcripts: int, processing_time: float) -> None:
+    for mode in ("polling", "webhook"):
+        await run_mode(mode, transcripts, processing_time)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--transcripts", type=int, default=1000)
+    parser.add_argument("--processing-time", type=float, default=3.0)
+    args = parser.parse_args()
+    asyncio.run(run(args.transcripts, args.processing_time))
@@ -0,0 +1,61 @@
+"""
+Bulk Trello card creation against the local Trello stand-in. Wall time should
+scale with items / concurrency rather than with the item count alone.
+
+Usage (from the backend directory):
+    python -m benchmarks.trello_bench --items 40 --concurrency 1 2 4 8 16 --latency 0.1
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from agents.trello_agent import TrelloAgent
+from benchmarks import fake_trello
+from services.rate_limit import TokenBucket
+
+
+async def run_once(items: int, concurrency: int, args) -> None:
+    fake = fake_trello.create_app(latency=args.latency, error_rate=args.error_rate,
+                                  rate_limit=args.rate_limit, rate_window=args.rate_window)
+    agent = TrelloAgent()
+    agent.demo_mode = False
+    agent.api_key, agent.token, agent.list_id = "bench-key", "bench-token", "bench-list"
+    agent.base_url = "http://fake-trello/1"
+    agent.concurrency = concurrency
+    agent.retry_base_delay = 0.05
+    agent.rate_limiter = TokenBucket(rate=args.client_rate, capacity=args.client_rate)
+    agent._client = httpx.AsyncClient(transport=httpx.ASGITransport(app=fake), timeout=10)
+    agent.index = None
+
+    start = time.perf_counter()
+    results = await agent.create_tasks_detailed([f"Action item {i}" for i in range(items)])
+    elapsed = time.perf_counter() - start
+    await agent.close()
+
+    created = sum(1 for result in results if result["status"] == "created")
+    retries = sum(result["attempts"] - 1 for result in results)
+    stats = fake.state.stats
+    print(
+        f"concurrency={concurrency:>3} wall={elapsed:6.2f}s created={created}/{items} retries={retries} "
+        f"429s={stats['rate_limited']} 5xx={stats['errors']} max_in_flight={stats['max_in_flight']}"
+    )
+
+
+async def run(args) -> None:
+    for concurrency in args.concurrency:
+        await run_once(args.items, concurrency, args)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--latency", type=float, default=0.1, help="Fake server latency per card")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument("--rate-limit", type=int, default=1000, help="Fake server requests per window per key")
+    parser.add_argument("--rate-window", type=float, default=10.0)
+    parser.add_argument("--client-rate", type=float, default=1000.0, help="Client token bucket rate per second")
+    args = parser.parse_args()
+    asyncio.run(run(args))
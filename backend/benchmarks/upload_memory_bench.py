@@ -0,0 +1,185 @@
+"""
+Peak memory of ingesting an upload: the old read-everything approach versus
+the chunked spool_upload path. Peak Python heap usage is measured with
+tracemalloc for several file sizes; the spooled path should stay flat at
+about one chunk.
+
+The second table measures the real request path: the backend runs under
+uvicorn (demo mode, no API keys) with MAX_UPLOAD_MB set to --max-upload-mb,
+each file is streamed to POST /process-audio from another process, and the
+server's peak resident memory is read from /proc (Linux only). Files over
+the limit are sent chunked, without a Content-Length, so they are refused by
+counting the streamed bytes rather than by the declared size. The server
+answers 413 and closes the connection while the client is still sending,
+which the table shows as "closed".
+
+Usage (from the backend directory):
+    python -m benchmarks.upload_memory_bench --sizes-mb 16 64 256 --max-upload-mb 128
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Optional
+
+import httpx
+from starlette.datastructures import UploadFile
+
+from benchmarks.load_test import BACKEND_DIR, wait_until_ready
+from services.upload_spool import spool_upload
+
+
+def make_source(size_mb: int, directory: str) -> str:
+    path = os.path.join(directory, f"source_{size_mb}mb.wav")
+    block = os.urandom(1024 * 1024)
+    with open(path, "wb") as out:
+        for _ in range(size_mb):
+            out.write(block)
+    return path
+
+
+async def read_all(upload: UploadFile, directory: str) -> None:
+    # The pre-streaming implementation: whole upload in memory, then one write
+    content = await upload.read()
+    with tempfile.NamedTemporaryFile(dir=directory, delete=False) as out:
+        out.write(content)
+    os.unlink(out.name)
+
+
+async def spooled(upload: UploadFile, directory: str) -> None:
+    result = await spool_upload(upload, directory)
+    result.remove()
+
+
+async def measure(func, source: str, directory: str):
+    with open(source, "rb") as handle:
+        upload = UploadFile(file=handle, filename=os.path.basename(source))
+        tracemalloc.start()
+        start = time.perf_counter()
+        await func(upload, directory)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return peak, elapsed
+
+
+def peak_rss_mb(pid: int) -> Optional[float]:
+    try:
+        with open(f"/proc/{pid}/status") as handle:
+            for line in handle:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def reset_peak_rss(pid: int) -> None:
+    try:
+        with open(f"/proc/{pid}/clear_refs", "w") as handle:
+            handle.write("5")
+    except OSError:
+        pass
+
+
+async def chunked(path: str):
+    """
+    A multipart body for the file, streamed without a Content-Length
+    """
+    yield (
+        b'--bench\r\nContent-Disposition: form-data; name="file"; filename="upload.wav"\r\n'
+        b"Content-Type: audio/wav\r\n\r\n"
+    )
+    with open(path, "rb") as handle:
+        while True:
+            block = handle.read(64 * 1024)
+            if not block:
+                break
+            yield block
+    yield b"\r\n--bench--\r\n"
+
+
+async def upload(client: httpx.AsyncClient, path: str, size_mb: int, max_upload_mb: int) -> int:
+    try:
+        if size_mb > max_upload_mb:
+            response = await client.post(
+                "/process-audio", content=chunked(path), headers={"content-type": "multipart/form-data; boundary=bench"}
+            )
+        else:
+            with open(path, "rb") as handle:
+                response = await client.post("/process-audio", files={"file": ("upload.wav", handle, "audio/wav")})
+    except httpx.HTTPError:
+        # The server may close the connection while the rest of the body is still being sent
+        return 0
+    return response.status_code
+
+
+async def run_server(sizes_mb, max_upload_mb: int, port: int, directory: str) -> None:
+    env = dict(os.environ)
+    for key in ("ASSEMBLYAI_API_KEY", "GEMINI_API_KEY", "TRELLO_API_KEY", "TRELLO_TOKEN"):
+        env.pop(key, None)
+    env.update({
+        "MAX_UPLOAD_MB": str(max_upload_mb),
+        "UPLOAD_DIR": os.path.join(directory, "uploads"),
+        "ADMISSION_CONTROL": "false",
+        "MEETING_STORE": "none",
+    })
+    backend = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        base_url = f"http://127.0.0.1:{port}"
+        await wait_until_ready(f"{base_url}/", backend)
+        print(f"\nPOST /process-audio through uvicorn, MAX_UPLOAD_MB={max_upload_mb}")
+        print(f"{'size':>8} {'status':>7} {'server peak RSS':>16} {'time':>8}")
+        async with httpx.AsyncClient(base_url=base_url, timeout=600) as client:
+            # Load the agents before measuring
+            await client.post("/process-audio", files={"file": ("warmup.wav", b"\0" * 1024, "audio/wav")})
+            for size_mb in sizes_mb:
+                source = make_source(size_mb, directory)
+                reset_peak_rss(backend.pid)
+                start = time.perf_counter()
+                status = await upload(client, source, size_mb, max_upload_mb)
+                elapsed = time.perf_counter() - start
+                peak = peak_rss_mb(backend.pid)
+                print(
+                    f"{size_mb:>6}MB {status or 'closed':>7} {'n/a' if peak is None else f'{peak:.0f}MB':>16} "
+                    f"{elapsed:>7.2f}s"
+                )
+                os.unlink(source)
+    finally:
+        backend.terminate()
+        try:
+            backend.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            backend.kill()
+
+
+async def run(args) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"{'size':>8} {'read-all peak':>14} {'spooled peak':>13} {'spooled time':>13}")
+        for size_mb in args.sizes_mb:
+            source = make_source(size_mb, directory)
+            read_peak, _ = await measure(read_all, source, directory)
+            spool_peak, spool_time = await measure(spooled, source, directory)
+            print(
+                f"{size_mb:>6}MB {read_peak / 1e6:>12.1f}MB {spool_peak / 1e6:>11.1f}MB {spool_time:>12.2f}s"
+            )
+            os.unlink(source)
+        if not args.no_server:
+            await run_server(args.sizes_mb, args.max_upload_mb, args.port, directory)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes-mb", type=int, nargs="+", default=[16, 64, 256])
+    parser.add_argument("--max-upload-mb", type=int, default=128, help="Server upload limit")
+    parser.add_argument("--port", type=int, default=9110, help="Backend port")
+    parser.add_argument("--no-server", action="store_true", help="Only measure spool_upload in this process")
+    args = parser.parse_args()
+    asyncio.run(run(args))
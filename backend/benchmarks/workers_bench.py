@@ -0,0 +1,151 @@
+"""
+Throughput against the number of server processes. Starts the AssemblyAI,
+Gemini and Trello stand-ins, then the backend under gunicorn (gunicorn.conf.py)
+with each worker count in turn, drives the same closed-loop load at every
+count and reports throughput, latency and the memory of all server processes.
+
+Memory is reported as PSS (proportional set size): pages the forked workers
+still share copy-on-write with the master are split between them, so the
+total shows what the extra workers really cost. Run with --no-preload to see
+it without the shared copy of the app.
+
+A single event loop is limited to one core, so throughput scales with the
+worker count only up to the number of cores available (the stand-ins run on
+the same machine and take their share too); past that the extra workers add
+memory and no throughput.
+
+Usage (from the backend directory):
+    python -m benchmarks.workers_bench --workers 1 2 4 --concurrency 32 --requests 256
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List, Optional
+
+import httpx
+
+from benchmarks import fake_servers
+from benchmarks.load_test import BACKEND_DIR, backend_env, drive, wait_until_ready
+
+
+def process_tree(pid: int) -> List[int]:
+    """
+    pid and all its descendants (Linux only)
+    """
+    parents: Dict[int, int] = {}
+    for name in os.listdir("/proc"):
+        if not name.isdigit():
+            continue
+        try:
+            with open(f"/proc/{name}/stat") as handle:
+                # The command name may contain spaces; the parent pid follows its closing parenthesis
+                parents[int(name)] = int(handle.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+    tree = [pid]
+    for current in tree:
+        tree += [child for child, parent in parents.items() if parent == current]
+    return tree
+
+
+def pss_mb(pids: List[int]) -> Optional[float]:
+    total = 0
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/smaps_rollup") as handle:
+                for line in handle:
+                    if line.startswith("Pss:"):
+                        total += int(line.split()[1])
+                        break
+        except OSError:
+            return None
+    return total / 1024
+
+
+async def run_level(args, workers: int, data_dir: str) -> Dict[str, object]:
+    env = backend_env(args)
+    env.update({
+        "WEB_CONCURRENCY": str(workers),
+        "PORT": str(args.port),
+        "GUNICORN_PRELOAD": "false" if args.no_preload else "true",
+        "GUNICORN_LOG_LEVEL": "warning",
+        "UPLOAD_DIR": os.path.join(data_dir, "uploads"),
+        "JOB_DB_PATH": os.path.join(data_dir, "jobs.db"),
+        "MEETING_DB_PATH": os.path.join(data_dir, "meetings.db"),
+        "SHARED_STATE_PATH": os.path.join(data_dir, "shared_state.db"),
+    })
+    backend = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "main:app", "-c", "gunicorn.conf.py"],
+        cwd=BACKEND_DIR, env=env,
+        stdout=None if args.verbose else subprocess.DEVNULL,
+        stderr=None if args.verbose else subprocess.DEVNULL,
+    )
+    try:
+        base_url = f"http://{args.host}:{args.port}"
+        await wait_until_ready(f"{base_url}/", backend)
+        limits = httpx.Limits(max_connections=args.concurrency * 2)
+        async with httpx.AsyncClient(base_url=base_url, timeout=300, limits=limits) as client:
+            # Every worker loads its agents and opens its connections before the measurement
+            await drive(client, args.endpoint, args.concurrency * 2, args.concurrency, args)
+            result = await drive(client, args.endpoint, args.requests, args.concurrency, args)
+        pids = process_tree(backend.pid)
+        result["workers"] = workers
+        result["processes"] = len(pids)
+        result["pss_mb"] = pss_mb(pids)
+        return result
+    finally:
+        backend.terminate()
+        try:
+            backend.wait(timeout=60)
+        except subprocess.TimeoutExpired:
+            backend.kill()
+
+
+async def run(args) -> None:
+    fakes = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.fake_servers"] + fake_servers.forward_arguments(args), cwd=BACKEND_DIR
+    )
+    cores = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+    print(f"{args.endpoint}: {args.requests} requests at concurrency {args.concurrency}, {cores} cores available, "
+          f"preload {'off' if args.no_preload else 'on'}")
+    try:
+        for port in (args.assemblyai_port, args.gemini_port, args.trello_port):
+            await wait_until_ready(f"http://{args.host}:{port}/", fakes)
+        baseline = None
+        for workers in args.workers:
+            with tempfile.TemporaryDirectory() as data_dir:
+                result = await run_level(args, workers, data_dir)
+            baseline = baseline or result["throughput_rps"]
+            pss = result["pss_mb"]
+            print(
+                f"  workers={workers:>2} errors={result['errors']:>3} rps={result['throughput_rps']:7.2f} "
+                f"(x{result['throughput_rps'] / baseline:4.2f}) p50={result['p50_ms']:8.1f}ms "
+                f"p95={result['p95_ms']:8.1f}ms pss={'n/a' if pss is None else f'{pss:.0f}MB'} "
+                f"({result['processes']} processes)"
+            )
+    finally:
+        fakes.terminate()
+        try:
+            fakes.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            fakes.kill()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="Worker counts to compare")
+    parser.add_argument("--endpoint", default="process-audio", choices=["process-audio", "send-to-trello"])
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=256, help="Requests per worker count")
+    parser.add_argument("--audio-kb", type=int, default=256, help="Size of each synthetic upload")
+    parser.add_argument("--items", type=int, default=5, help="Action items per /send-to-trello request")
+    parser.add_argument("--port", type=int, default=9100, help="Backend port")
+    parser.add_argument("--poll-interval", type=float, default=0.25, help="Initial transcription poll interval")
+    parser.add_argument("--cache", action="store_true", help="Keep the result cache enabled")
+    parser.add_argument("--no-preload", action="store_true", help="Import the app in every worker instead of once")
+    parser.add_argument("--verbose", action="store_true", help="Show the backend's log output")
+    fake_servers.add_arguments(parser)
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,74 @@
+"""
+gunicorn settings for production: several uvicorn worker processes on one port.
+
+    gunicorn main:app -c gunicorn.conf.py
+
+The app is imported once in the master and the workers are forked from it, so
+the code and the loaded modules are shared copy-on-write. Job state, cached
+results and rate limits are shared through SQLite files on the host (see
+services/shared_state.py and the "Multi-Process Serving" section of the README).
+"""
+import gc
+import os
+
+_FALSE = ("false", "0", "no")
+
+
+def cpu_count() -> int:
+    """
+    CPUs this container may actually use: the affinity mask, capped by a cgroup v2 CPU quota
+    """
+    try:
+        count = len(os.sched_getaffinity(0))
+    except AttributeError:
+        count = os.cpu_count() or 1
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as handle:
+            quota, period = handle.read().split()
+        if quota != "max":
+            count = min(count, max(1, int(int(quota) / int(period) + 0.5)))
+    except (OSError, ValueError):
+        pass
+    return max(1, count)
+
+
+# Requests mostly wait on the transcription and summarization APIs, so one
+# event loop per CPU is enough; set WEB_CONCURRENCY to override
+workers = int(os.getenv("WEB_CONCURRENCY", "0")) or cpu_count()
+# The app reads WEB_CONCURRENCY to pick shared (SQLite) state defaults
+os.environ["WEB_CONCURRENCY"] = str(workers)
+
+worker_class = "uvicorn.workers.UvicornWorker"
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+
+# Import the app once in the master before forking
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() not in _FALSE
+if preload_app:
+    # Including the agents' SDKs, which are otherwise imported by each worker
+    os.environ.setdefault("AGENT_PRELOAD_MODULES", "true")
+
+# On SIGTERM or a reload, workers stop accepting connections, finish their
+# requests and drain running jobs (JOB_DRAIN_TIMEOUT) within this many seconds
+graceful_timeout = int(os.getenv("DRAIN_TIMEOUT", "30"))
+# A worker that stops answering the master's heartbeat for this long is restarted
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+
+# Optional periodic worker restarts; the jitter keeps workers from restarting together
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "0"))
+max_requests_jitter = max_requests // 10
+
+# The heartbeat file is touched constantly; keep it off a container's overlay disk
+if os.path.isdir("/dev/shm"):
+    worker_tmp_dir = "/dev/shm"
+
+accesslog = None
+errorlog = "-"
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
+
+
+def when_ready(server):
+    # Move everything the app allocated at import out of the collector's reach:
+    # collections would touch those objects and copy their pages into every worker
+    gc.freeze()
+    server.log.info(f"Serving with {workers} workers")
@@ -1,16 +1,46 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException
+from fastapi import FastAPI, File, Form, UploadFile, HTTPException, Request, Header, Query, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse, PlainTextResponse
+import asyncio
 import os
+import json
+import shutil
+import tempfile
 from dotenv import load_dotenv
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+import time
 import logging
 
+from services.job_store import JobStore, create_job_store, public_view, JobStatus
+from services.job_queue import JobQueue
+from services.executor import run_blocking, shutdown_executor
+from services.upload_spool import spool_upload, UploadLimitMiddleware, UploadTooLarge
+from services.result_cache import create_result_cache
+from services.pipeline import MeetingPipeline
+from services.audio_preprocessor import AudioPreprocessor
+from services.agent_registry import AgentRegistry
+from services.batch import BatchManager, BatchRunner, batch_summary, new_batch
+from services.events import EventBroadcaster
+from services.live_session import LiveMeetingSession
+from services.resilience import deadline, provider_status, remaining
+from services.admission import AdmissionController, AdmissionRejected, PRIORITIES
+from services.meeting_store import SEARCH_SCOPES, MeetingStore, create_meeting_store, parse_date
+from services.shared_state import worker_count
+from services.metrics import (
+    REGISTRY, HTTP_REQUESTS, HTTP_LATENCY, ADMISSION_REJECTED, TraceIdLogFilter, new_trace_id, trace_id_var, track,
+)
+
 # Load environment variables
 load_dotenv()
 
 # Configure logging
-logging.basicConfig(level=logging.INFO)
+LOG_TRACE_IDS = os.getenv("LOG_TRACE_IDS", "false").lower() == "true"
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(levelname)s:%(name)s:[%(trace_id)s] %(message)s" if LOG_TRACE_IDS else logging.BASIC_FORMAT,
+)
+for handler in logging.getLogger().handlers:
+    handler.addFilter(TraceIdLogFilter())
 logger = logging.getLogger(__name__)
 
 app = FastAPI(
@@ -19,53 +49,312 @@ app = FastAPI(
     version="1.0.0"
 )
 
-# Configure CORS for frontend
+# With several worker processes (gunicorn, see gunicorn.conf.py) job state and
+# cached results default to SQLite files every worker on this host shares
+SHARED_DEFAULT = "sqlite" if worker_count() > 1 else "memory"
+
+# Agents are imported and constructed on first use (or by the startup pre-warm),
+# so the server starts answering before the SDKs have loaded
+agents = AgentRegistry()
+agents.register("transcription", "agents.transcription_agent", "TranscriptionAgent")
+agents.register("summarization", "agents.summarization_agent", "SummarizationAgent")
+agents.register("trello", "agents.trello_agent", "TrelloAgent")
+AGENT_PREWARM = os.getenv("AGENT_PREWARM", "true").lower() == "true"
+# Set by gunicorn.conf.py with preload_app: import the SDKs once in the master so the
+# forked workers share them; they still construct their agents on their own
+if os.getenv("AGENT_PRELOAD_MODULES", "false").lower() == "true":
+    agents.import_modules()
+
+# Content-addressed cache for transcripts and summaries
+result_cache = create_result_cache(
+    backend=os.getenv("RESULT_CACHE", SHARED_DEFAULT),
+    db_path=os.getenv("RESULT_CACHE_PATH", "cache.db"),
+    max_entries=int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "1000")),
+    ttl=float(os.getenv("RESULT_CACHE_TTL", "604800")),
+)
+# Optional downmix/transcode of uploads before they are sent for transcription
+audio_preprocessor = None
+if os.getenv("AUDIO_PREPROCESS", "false").lower() == "true":
+    audio_preprocessor = AudioPreprocessor(
+        sample_rate=int(os.getenv("AUDIO_PREPROCESS_SAMPLE_RATE", "16000")),
+        bitrate_kbps=int(os.getenv("AUDIO_PREPROCESS_BITRATE_KBPS", "32")),
+        min_savings=float(os.getenv("AUDIO_PREPROCESS_MIN_SAVINGS", "0.3")),
+        upload_mbps=float(os.getenv("AUDIO_UPLOAD_MBPS", "20")),
+    )
+pipeline = MeetingPipeline(agents, result_cache, audio_preprocessor)
+
+# Background job subsystem
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", os.path.join(tempfile.gettempdir(), "meeting-agent-uploads"))
+os.makedirs(UPLOAD_DIR, exist_ok=True)
+
+# Every processed meeting, searchable by transcript, summary and action item, and the
+# job records. Both databases are opened by the startup handler (open_stores), in the
+# process that serves: importing the app stays cheap, and forked workers open their own
+meeting_store: Optional[MeetingStore] = None
+job_store: Optional[JobStore] = None
+
+event_broadcaster = EventBroadcaster(
+    queue_size=int(os.getenv("EVENT_QUEUE_SIZE", "100")),
+    history_size=int(os.getenv("EVENT_HISTORY_SIZE", "50")),
+)
+job_queue = JobQueue(
+    None,
+    pipeline,
+    events=event_broadcaster,
+    workers=int(os.getenv("JOB_WORKERS", "4")),
+    transcription_concurrency=int(os.getenv("TRANSCRIPTION_CONCURRENCY", "2")),
+    summarization_concurrency=int(os.getenv("SUMMARIZATION_CONCURRENCY", "2")),
+    job_timeout=float(os.getenv("JOB_TIMEOUT", "7200")),
+    lease=float(os.getenv("JOB_LEASE", "60")),
+)
+# Seconds jobs in progress get to finish on shutdown before they are released to other workers
+JOB_DRAIN_TIMEOUT = float(os.getenv("JOB_DRAIN_TIMEOUT", "25"))
+
+# Bulk processing of many recordings, with per-stage concurrency and checkpoints
+batch_runner = BatchRunner(
+    pipeline,
+    agents,
+    transcription_concurrency=int(os.getenv("BATCH_TRANSCRIPTION_CONCURRENCY", "4")),
+    summarization_concurrency=int(os.getenv("BATCH_SUMMARIZATION_CONCURRENCY", "4")),
+    trello_concurrency=int(os.getenv("BATCH_TRELLO_CONCURRENCY", "2")),
+    stage_timeout=float(os.getenv("JOB_TIMEOUT", "7200")),
+)
+batch_manager = BatchManager(batch_runner, os.getenv("BATCH_DIR", os.path.join(UPLOAD_DIR, "batches")))
+
+# Admission control in front of the expensive routes: global and per-client concurrency,
+# per-client rate limits and a bounded priority queue, answering 429/503 instead of piling up
+ADMISSION_CONTROL = os.getenv("ADMISSION_CONTROL", "true").lower() == "true"
+admission = AdmissionController(
+    max_concurrent=int(os.getenv("ADMISSION_MAX_CONCURRENT", "8")),
+    queue_size=int(os.getenv("ADMISSION_QUEUE_SIZE", "32")),
+    max_wait=float(os.getenv("ADMISSION_MAX_WAIT", "30")),
+    client_concurrency=int(os.getenv("ADMISSION_CLIENT_CONCURRENCY", "2")),
+    client_queue=int(os.getenv("ADMISSION_CLIENT_QUEUE", "4")),
+    client_rate=float(os.getenv("ADMISSION_CLIENT_RATE", "30")),
+    client_burst=float(os.getenv("ADMISSION_CLIENT_BURST", "10")),
+)
+# Default priority per admitted route; X-Priority may lower it, and raise it only for trusted keys
+ADMITTED_ROUTES = {"/process-audio": "normal", "/jobs": "normal", "/batch": "low"}
+ADMISSION_PRIORITY_KEYS = {key.strip() for key in os.getenv("ADMISSION_PRIORITY_KEYS", "").split(",") if key.strip()}
+ADMISSION_TRUST_PROXY = os.getenv("ADMISSION_TRUST_PROXY", "false").lower() == "true"
+# Background jobs waiting for a worker before POST /jobs answers 503 (0 = unlimited)
+MAX_QUEUED_JOBS = int(os.getenv("MAX_QUEUED_JOBS", "100"))
+
+prewarm_task: Optional[asyncio.Task] = None
+
+def open_stores():
+    """
+    Open the meeting and job stores and hand them to the job queue and the batch runner
+    """
+    global meeting_store, job_store
+    if job_store is not None:
+        return
+    meeting_store = create_meeting_store(
+        backend=os.getenv("MEETING_STORE", "sqlite"),
+        db_path=os.getenv("MEETING_DB_PATH", "meetings.db"),
+        segment_chars=int(os.getenv("MEETING_SEGMENT_CHARS", "2000")),
+        batch_size=int(os.getenv("MEETING_WRITE_BATCH", "64")),
+        rank_window=int(os.getenv("MEETING_SEARCH_WINDOW", "5000")),
+    )
+    job_store = create_job_store(
+        backend=os.getenv("JOB_STORE", SHARED_DEFAULT),
+        db_path=os.getenv("JOB_DB_PATH", "jobs.db"),
+    )
+    job_queue.store = job_store
+    job_queue.meetings = meeting_store
+    batch_runner.meetings = meeting_store
+
+def _reopen_after_fork():
+    # gunicorn imports this module once and forks the workers from it: each
+    # worker needs its own database connections (the executor resets itself).
+    # The stores are normally opened after the fork, by the startup handler
+    if job_store is not None:
+        job_store.reopen()
+    if result_cache is not None:
+        result_cache.backend.reopen()
+    if meeting_store is not None:
+        meeting_store.reopen()
+
+os.register_at_fork(after_in_child=_reopen_after_fork)
+
+@app.on_event("startup")
+async def start_job_queue():
+    global prewarm_task
+    open_stores()
+    await job_queue.start()
+    await batch_manager.start()
+    if AGENT_PREWARM:
+        # Load the agents in the background; /ready reports when they are done
+        prewarm_task = asyncio.create_task(agents.warm())
+
+@app.on_event("shutdown")
+async def stop_job_queue():
+    await job_queue.drain(JOB_DRAIN_TIMEOUT)
+    await batch_manager.stop()
+    if prewarm_task is not None and not prewarm_task.done():
+        prewarm_task.cancel()
+    transcription_agent = agents.loaded("transcription")
+    if transcription_agent:
+        await transcription_agent.tracker.close()
+    trello_agent = agents.loaded("trello")
+    if trello_agent:
+        await trello_agent.close()
+    if meeting_store is not None:
+        # Writes what is still queued
+        await run_blocking(meeting_store.close)
+    shutdown_executor(wait=False)
+
+def _validate_audio_filename(filename: str):
+    if not filename or not filename.lower().endswith(('.mp3', '.wav', '.m4a', '.flac')):
+        raise HTTPException(status_code=400, detail="Only audio files (.mp3, .wav, .m4a, .flac) are supported")
+
+# Upload limits
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_MB", "500")) * 1024 * 1024
+MAX_BATCH_UPLOAD_BYTES = int(os.getenv("MAX_BATCH_UPLOAD_MB", "4096")) * 1024 * 1024
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_KB", "1024")) * 1024
+
+# Deadline for handling one HTTP request; clients may ask for less with an X-Request-Timeout header
+REQUEST_TIMEOUT = float(os.getenv("REQUEST_TIMEOUT", "900"))
+
+def _request_timeout(request: Request) -> Optional[float]:
+    requested = request.headers.get("x-request-timeout")
+    try:
+        requested = float(requested) if requested else None
+    except ValueError:
+        requested = None
+    if requested is None or requested <= 0:
+        return REQUEST_TIMEOUT or None
+    return min(requested, REQUEST_TIMEOUT) if REQUEST_TIMEOUT > 0 else requested
+
+def _deadline_passed() -> bool:
+    left = remaining()
+    return left is not None and left <= 0
+
+def _client_id(request: Request) -> str:
+    api_key = request.headers.get("x-api-key")
+    if api_key:
+        return f"key:{api_key}"
+    forwarded = request.headers.get("x-forwarded-for") if ADMISSION_TRUST_PROXY else None
+    if forwarded:
+        return f"ip:{forwarded.split(',')[0].strip()}"
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+def _priority(request: Request, default: str) -> str:
+    requested = (request.headers.get("x-priority") or "").lower()
+    if requested not in PRIORITIES:
+        return default
+    if PRIORITIES[requested] < PRIORITIES[default] and request.headers.get("x-api-key") not in ADMISSION_PRIORITY_KEYS:
+        return default
+    return requested
+
+def _rejection(status_code: int, detail: str, headers: Dict[str, str]) -> JSONResponse:
+    return JSONResponse(status_code=status_code, content={"detail": detail}, headers=headers)
+
+@app.middleware("http")
+async def admission_control(request: Request, call_next):
+    """
+    Admit uploads to the processing routes through the admission controller
+    before their bodies are read; answer 429/503 with Retry-After when full
+    """
+    route = ADMITTED_ROUTES.get(request.url.path) if request.method == "POST" else None
+    if route is None or not ADMISSION_CONTROL:
+        return await call_next(request)
+    
+    if request.url.path == "/jobs" and MAX_QUEUED_JOBS and job_queue.depth >= MAX_QUEUED_JOBS:
+        ADMISSION_REJECTED.inc(reason="job_backlog")
+        return _rejection(503, f"{job_queue.depth} jobs are already waiting; try again later",
+                          {"Retry-After": "30", "X-Queue-Depth": str(job_queue.depth)})
+    
+    client = _client_id(request)
+    try:
+        await admission.acquire(client, _priority(request, route))
+    except AdmissionRejected as e:
+        return _rejection(e.status_code, str(e), e.headers())
+    
+    start = time.monotonic()
+    try:
+        response = await call_next(request)
+    finally:
+        admission.release(client, time.monotonic() - start)
+    response.headers["X-Queue-Depth"] = str(admission.queue_depth)
+    return response
+
+# Oversized uploads are refused before their bodies are read: by Content-Length, or once
+# more bytes than the limit have arrived. A batch upload carries many files, so it has
+# its own limit on the whole request
+app.add_middleware(UploadLimitMiddleware, max_bytes=MAX_UPLOAD_BYTES, path_limits={"/batch": MAX_BATCH_UPLOAD_BYTES})
+
+@app.middleware("http")
+async def instrument_requests(request: Request, call_next):
+    """
+    Record request count and latency per route, tag the request with a trace id
+    and give it a deadline that every agent call made for it respects
+    """
+    trace_id = request.headers.get("x-trace-id") or new_trace_id()
+    token = trace_id_var.set(trace_id)
+    start = time.perf_counter()
+    status = 500
+    try:
+        with deadline(_request_timeout(request)):
+            response = await call_next(request)
+        status = response.status_code
+        response.headers["X-Trace-Id"] = trace_id
+        return response
+    finally:
+        # Label by route template rather than raw path to keep cardinality bounded
+        route = request.scope.get("route")
+        route_path = getattr(route, "path", "unmatched")
+        HTTP_LATENCY.observe(time.perf_counter() - start, method=request.method, route=route_path)
+        HTTP_REQUESTS.inc(method=request.method, route=route_path, status=str(status))
+        trace_id_var.reset(token)
+
+# Configure CORS for frontend. Added last, so it is the outermost middleware: the
+# 429/503 and 413 answers of the middlewares above get the CORS headers too
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:5173", "http://localhost:3000"],  # Vite default port
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Retry-After", "X-Queue-Depth", "X-Trace-Id"],
 )
 
-# Initialize agents with error handling
-transcription_agent = None
-summarization_agent = None
-trello_agent = None
-
-try:
-    from agents.transcription_agent import TranscriptionAgent
-    transcription_agent = TranscriptionAgent()
-    logger.info("Transcription agent initialized successfully")
-except Exception as e:
-    logger.warning(f"Failed to initialize transcription agent: {e}")
-
-try:
-    from agents.summarization_agent import SummarizationAgent
-    summarization_agent = SummarizationAgent()
-    logger.info("Summarization agent initialized successfully")
-except Exception as e:
-    logger.warning(f"Failed to initialize summarization agent: {e}")
-
-try:
-    from agents.trello_agent import TrelloAgent
-    trello_agent = TrelloAgent()
-    logger.info("Trello agent initialized successfully")
-except Exception as e:
-    logger.warning(f"Failed to initialize Trello agent: {e}")
+async def _spool(file: UploadFile):
+    try:
+        async with track("api", "upload"):
+            return await spool_upload(file, UPLOAD_DIR, max_bytes=MAX_UPLOAD_BYTES, chunk_size=UPLOAD_CHUNK_SIZE)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
 
 @app.get("/")
 async def root():
-    """Health check endpoint"""
+    """Health check endpoint (liveness). Never waits for the agents to load."""
     return {
         "message": "Meeting Intelligence Agent API is running!",
-        "agents": {
-            "transcription": transcription_agent is not None,
-            "summarization": summarization_agent is not None,
-            "trello": trello_agent is not None
-        }
+        "agents": {name: status["state"] for name, status in agents.status().items()}
     }
 
+@app.get("/ready")
+async def ready():
+    """
+    Readiness check: 200 once the agents have been loaded by the startup pre-warm,
+    503 while loading is still in progress. With AGENT_PREWARM=false agents load
+    on first use, so the service is always reported ready.
+    """
+    status = agents.status()
+    settled = not AGENT_PREWARM or all(agents.is_settled(name) for name in agents.names)
+    return JSONResponse(
+        status_code=200 if settled else 503,
+        content={
+            "ready": settled,
+            "worker_pid": os.getpid(),
+            "prewarm": AGENT_PREWARM,
+            "agents": status,
+            "providers": provider_status(),
+            "admission": admission.status() if ADMISSION_CONTROL else None,
+        },
+    )
+
 @app.post("/process-audio")
 async def process_audio(file: UploadFile = File(...)):
     """
@@ -76,30 +365,42 @@ async def process_audio(file: UploadFile = File(...)):
     """
     try:
         # Validate file type
-        if not file.filename.lower().endswith(('.mp3', '.wav', '.m4a', '.flac')):
-            raise HTTPException(status_code=400, detail="Only audio files (.mp3, .wav, .m4a, .flac) are supported")
+        _validate_audio_filename(file.filename)
         
         logger.info(f"Processing audio file: {file.filename}")
         
         # Check if agents are available
+        transcription_agent = await agents.aget("transcription")
+        summarization_agent = await agents.aget("summarization")
         if not transcription_agent:
             raise HTTPException(status_code=500, detail="Transcription agent not available. Please check API keys.")
         
         if not summarization_agent:
             raise HTTPException(status_code=500, detail="Summarization agent not available. Please check API keys.")
         
-        # Step 1: Transcribe audio
-        logger.info("Starting transcription...")
-        transcript = await transcription_agent.transcribe_audio(file)
+        # Step 1: Stream the upload to disk, then transcribe it
+        spooled = await _spool(file)
+        preprocessing = {}
+        try:
+            logger.info("Starting transcription...")
+            transcript = await pipeline.transcribe(
+                spooled.path, file.filename, spooled.sha256, on_preprocessed=preprocessing.update
+            )
+        finally:
+            await run_blocking(spooled.remove)
         
         if not transcript:
+            if _deadline_passed():
+                raise HTTPException(status_code=504, detail="Transcription did not finish before the request deadline")
             raise HTTPException(status_code=500, detail="Transcription failed")
         
         # Step 2: Generate summary and extract action items
         logger.info("Generating summary and extracting action items...")
-        summary_data = await summarization_agent.process_transcript(transcript)
+        summary_data = await pipeline.summarize(transcript)
         
         if not summary_data:
+            if _deadline_passed():
+                raise HTTPException(status_code=504, detail="Summarization did not finish before the request deadline")
             raise HTTPException(status_code=500, detail="Summarization failed")
         
         # Return structured response
@@ -109,6 +410,19 @@ async def process_audio(file: UploadFile = File(...)):
             "action_items": summary_data.get("action_items", []),
             "status": "success"
         }
+        if meeting_store is not None:
+            response["meeting_id"] = meeting_store.save(
+                transcript,
+                response["summary"],
+                response["action_items"],
+                title=file.filename,
+                source="upload",
+                engine=summary_data.get("engine"),
+                action_item_details=summary_data.get("action_item_details"),
+                audio_sha256=spooled.sha256,
+            )
+        if preprocessing:
+            response["preprocessing"] = preprocessing
         
         logger.info("Audio processing completed successfully")
         return response
@@ -128,23 +442,406 @@ async def send_to_trello(action_items: List[str]):
         if not action_items:
             raise HTTPException(status_code=400, detail="No action items provided")
         
+        trello_agent = await agents.aget("trello")
         if not trello_agent:
             raise HTTPException(status_code=500, detail="Trello agent not available. Please check API keys.")
         
         logger.info(f"Sending {len(action_items)} action items to Trello")
         
-        results = await trello_agent.create_tasks(action_items)
+        results = await trello_agent.create_tasks_detailed(action_items)
+        created_cards = [result["card"] for result in results if result["status"] == "created"]
+        duplicates = sum(1 for result in results if result["status"] in ("duplicate", "updated"))
+        failed = sum(1 for result in results if result["status"] == "failed")
+        
+        message = f"Successfully created {len(created_cards)} tasks in Trello"
+        if duplicates:
+            message += f", {duplicates} already there"
+        if failed:
+            message += f" ({failed} failed)"
         
         return {
-            "message": f"Successfully created {len(results)} tasks in Trello",
-            "created_cards": results,
-            "status": "success"
+            "message": message,
+            "created_cards": created_cards,
+            "results": results,
+            "status": "success" if not failed else "partial"
         }
         
     except Exception as e:
         logger.error(f"Error creating Trello tasks: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to create Trello tasks: {str(e)}")
 
+@app.post("/jobs", status_code=202)
+async def create_job(file: UploadFile = File(...)):
+    """
+    Accept an audio upload and queue it for background processing.
+    Returns immediately with a job id that can be polled via GET /jobs/{job_id}.
+    """
+    _validate_audio_filename(file.filename)
+    
+    if not await agents.aget("transcription") or not await agents.aget("summarization"):
+        raise HTTPException(status_code=500, detail="Processing agents not available. Please check API keys.")
+    
+    spooled = await _spool(file)
+    try:
+        job = await job_queue.submit(file.filename, spooled.path, spooled.sha256, spooled.size)
+        return {"job_id": job["id"], "status": job["status"]}
+        
+    except Exception as e:
+        await run_blocking(spooled.remove)
+        logger.error(f"Error queuing job: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to queue job: {str(e)}")
+
+@app.post("/batch", status_code=202)
+async def create_batch(files: List[UploadFile] = File(...), trello: bool = Form(False)):
+    """
+    Accept many audio uploads and process them as one batch in the background.
+    Progress and, once finished, the throughput report are available via GET /batch/{batch_id}.
+    """
+    for file in files:
+        _validate_audio_filename(file.filename)
+    
+    if not await agents.aget("transcription") or not await agents.aget("summarization"):
+        raise HTTPException(status_code=500, detail="Processing agents not available. Please check API keys.")
+    
+    batch = new_batch([], trello=trello, owns_files=True)
+    upload_dir = batch_manager.upload_dir(batch["id"])
+    spooled_files = []
+    try:
+        for file in files:
+            async with track("api", "upload"):
+                spooled = await spool_upload(file, upload_dir, max_bytes=MAX_UPLOAD_BYTES, chunk_size=UPLOAD_CHUNK_SIZE)
+            spooled_files.append({"path": spooled.path, "filename": file.filename})
+    except UploadTooLarge as e:
+        await run_blocking(shutil.rmtree, upload_dir, True)
+        raise HTTPException(status_code=413, detail=str(e))
+    
+    batch = new_batch(spooled_files, trello=trello, owns_files=True, batch_id=batch["id"])
+    await batch_manager.submit(batch)
+    logger.info(f"Queued batch {batch['id']} with {len(spooled_files)} files")
+    return {"batch_id": batch["id"], "files": len(spooled_files), "status": batch["status"]}
+
+@app.get("/batch/{batch_id}")
+async def get_batch(batch_id: str, items: bool = False):
+    """
+    Report a batch's progress and, once finished, its throughput report (items=true adds per-file results)
+    """
+    batch = await batch_manager.get(batch_id)
+    if batch is None:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    return batch_summary(batch, include_items=items)
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """
+    Report the status, progress and (when finished) results of a processing job
+    """
+    job = await run_blocking(job_store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return public_view(job)
+
+# How often a stream follows a job run by another worker process through the job store
+JOB_EVENTS_POLL_INTERVAL = float(os.getenv("JOB_EVENTS_POLL_INTERVAL", "1.0"))
+
+def _terminal_event(job: Dict[str, Any], event_id: int) -> Dict[str, Any]:
+    data = public_view(job) if job["status"] == JobStatus.COMPLETED else {"error": job["error"]}
+    return {"id": event_id, "event": job["status"], "job_id": job["id"], "data": data}
+
+async def _polled_events(job_id: str, last_event_id: int = 0, heartbeat: Optional[float] = None):
+    """
+    Status events for a job another worker process is running, read from the
+    shared job store: one per status or progress change, then the terminal event
+    """
+    seen = None
+    idle = 0.0
+    while True:
+        job = await run_blocking(job_store.get, job_id)
+        if job is None:
+            return
+        last_event_id += 1
+        if job["status"] in JobStatus.TERMINAL:
+            yield _terminal_event(job, last_event_id)
+            return
+        if (job["status"], job["progress"]) != seen:
+            seen = (job["status"], job["progress"])
+            idle = 0.0
+            yield {"id": last_event_id, "event": "status", "job_id": job_id,
+                   "data": {"status": job["status"], "progress": job["progress"]}}
+        elif heartbeat is not None and idle >= heartbeat:
+            idle = 0.0
+            yield {"id": last_event_id, "event": "heartbeat", "job_id": job_id, "data": {}}
+        await asyncio.sleep(JOB_EVENTS_POLL_INTERVAL)
+        idle += JOB_EVENTS_POLL_INTERVAL
+
+async def _job_events(job_id: str, last_event_id: int = 0, heartbeat: Optional[float] = None):
+    """
+    Event stream for a job. Jobs that already finished (e.g. before a restart)
+    get a single terminal event built from the stored record; jobs run by
+    another worker process are followed through the job store.
+    """
+    job = await run_blocking(job_store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    if job["status"] in JobStatus.TERMINAL and not event_broadcaster.has_events(job_id):
+        async def finished():
+            yield _terminal_event(job, last_event_id + 1)
+        return finished()
+    
+    if not event_broadcaster.has_events(job_id) and job.get("owner") != job_queue.worker_id:
+        return _polled_events(job_id, last_event_id, heartbeat)
+    
+    return event_broadcaster.subscribe(job_id, last_event_id, heartbeat)
+
+@app.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str, last_event_id: Optional[int] = Header(None)):
+    """
+    Server-Sent Events stream of pipeline progress for a job
+    """
+    events = await _job_events(job_id, last_event_id or 0, heartbeat=15.0)
+    
+    async def sse():
+        async for event in events:
+            if event["event"] == "heartbeat":
+                yield ": heartbeat\n\n"
+                continue
+            yield f"id: {event['id']}\nevent: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+    
+    return StreamingResponse(
+        sse(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.websocket("/jobs/{job_id}/ws")
+async def job_events_websocket(websocket: WebSocket, job_id: str):
+    """
+    WebSocket stream of pipeline progress for a job
+    """
+    await websocket.accept()
+    try:
+        events = await _job_events(job_id, heartbeat=15.0)
+    except HTTPException as e:
+        await websocket.send_json({"event": "error", "data": {"detail": e.detail}})
+        await websocket.close(code=4404)
+        return
+    
+    try:
+        async for event in events:
+            await websocket.send_json({"id": event["id"], "event": event["event"], "data": event["data"]})
+        await websocket.close()
+    except WebSocketDisconnect:
+        logger.info(f"WebSocket subscriber for job {job_id} disconnected")
+
+@app.websocket("/live")
+async def live_meeting(websocket: WebSocket):
+    """
+    Real-time summarization of a live meeting.
+    
+    Client messages: {"type": "segment", "text": "...", "speaker": "optional"} and {"type": "end"}.
+    Server messages: "session_started", an "update" with the rolling summary and
+    action items whenever enough new text has arrived, and a "final" state after "end".
+    """
+    await websocket.accept()
+    summarization_agent = await agents.aget("summarization")
+    if not summarization_agent:
+        await websocket.send_json({"type": "error", "detail": "Summarization agent not available. Please check API keys."})
+        await websocket.close(code=1011)
+        return
+    
+    async def send_update(update: Dict[str, Any]):
+        await websocket.send_json({"type": "update", **update})
+    
+    session = LiveMeetingSession(
+        summarization_agent,
+        on_update=send_update,
+        min_update_chars=int(os.getenv("LIVE_MIN_UPDATE_CHARS", "800")),
+        max_update_chars=int(os.getenv("LIVE_MAX_UPDATE_CHARS", "6000")),
+        max_summary_chars=int(os.getenv("LIVE_MAX_SUMMARY_CHARS", "3000")),
+        max_buffer_chars=int(os.getenv("LIVE_MAX_BUFFER_CHARS", "24000")),
+    )
+    await websocket.send_json({"type": "session_started", "session_id": session.id})
+    logger.info(f"Live session {session.id} started")
+    
+    try:
+        while True:
+            try:
+                message = json.loads(await websocket.receive_text())
+            except ValueError:
+                await websocket.send_json({"type": "error", "detail": "Messages must be JSON"})
+                continue
+            if not isinstance(message, dict):
+                await websocket.send_json({"type": "error", "detail": "Messages must be JSON objects"})
+                continue
+            if message.get("type") == "segment":
+                text = message.get("text", "")
+                if not isinstance(text, str):
+                    await websocket.send_json({"type": "error", "detail": "Segment text must be a string"})
+                    continue
+                speaker = message.get("speaker")
+                session.add_segment(text, speaker if isinstance(speaker, str) else None)
+            elif message.get("type") == "end":
+                final = await session.finish()
+                await websocket.send_json({"type": "final", **final})
+                await websocket.close()
+                logger.info(f"Live session {session.id} finished after {final['segments']} segments")
+                return
+            else:
+                await websocket.send_json({"type": "error", "detail": f"Unknown message type: {message.get('type')}"})
+    except WebSocketDisconnect:
+        logger.info(f"Live session {session.id} disconnected")
+    finally:
+        # Whatever ended the session, its background update must not outlive it
+        await session.cancel()
+
+def _meeting_store():
+    if meeting_store is None:
+        raise HTTPException(status_code=404, detail="Meeting store is disabled")
+    return meeting_store
+
+def _date_range(date_from: Optional[str], date_to: Optional[str]):
+    try:
+        return parse_date(date_from), parse_date(date_to, end=True)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Dates must be ISO dates, e.g. 2024-05-31")
+
+@app.get("/meetings")
+async def list_meetings(
+    owner: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+):
+    """
+    List stored meetings, newest first, optionally only those with action items
+    for an owner or within a date range. Pass next_cursor to get the next page.
+    """
+    store = _meeting_store()
+    start, end = _date_range(date_from, date_to)
+    try:
+        return await run_blocking(store.list, owner, start, end, limit, cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+@app.get("/meetings/search")
+async def search_meetings(
+    q: str = Query(..., min_length=1, max_length=500),
+    scope: List[str] = Query(list(SEARCH_SCOPES)),
+    owner: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=1000),
+):
+    """
+    Ranked full-text search over transcripts, summaries and action items.
+    All words must match; "quoted phrases" and prefix* searches are supported.
+    """
+    store = _meeting_store()
+    unknown = [name for name in scope if name not in SEARCH_SCOPES]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown scope {unknown[0]}; use {', '.join(SEARCH_SCOPES)}")
+    start, end = _date_range(date_from, date_to)
+    return await run_blocking(store.search, q, scope, owner, start, end, limit, offset)
+
+@app.get("/meetings/{meeting_id}")
+async def get_meeting(meeting_id: str):
+    """
+    Return a stored meeting's summary and action items (the transcript is paged separately)
+    """
+    meeting = await run_blocking(_meeting_store().get, meeting_id)
+    if meeting is None:
+        raise HTTPException(status_code=404, detail="Meeting not found")
+    return meeting
+
+@app.get("/meetings/{meeting_id}/transcript")
+async def get_meeting_transcript(
+    meeting_id: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(10, ge=1, le=100),
+):
+    """
+    Return a page of a stored meeting's transcript segments; pass next_offset to continue
+    """
+    page = await run_blocking(_meeting_store().transcript_page, meeting_id, offset, limit)
+    if page is None:
+        raise HTTPException(status_code=404, detail="Meeting not found")
+    return page
+
+@app.delete("/meetings/{meeting_id}")
+async def delete_meeting(meeting_id: str, x_admin_token: Optional[str] = Header(None)):
+    """
+    Remove a stored meeting and its search entries
+    """
+    _require_admin(x_admin_token)
+    if not await run_blocking(_meeting_store().delete, meeting_id):
+        raise HTTPException(status_code=404, detail="Meeting not found")
+    return {"status": "success"}
+
+@app.post("/webhooks/transcription")
+async def transcription_webhook(request: Request):
+    """
+    Completion callback from AssemblyAI (webhook mode). Resumes the job waiting on the transcript.
+    """
+    transcription_agent = await agents.aget("transcription")
+    if not transcription_agent:
+        raise HTTPException(status_code=500, detail="Transcription agent not available. Please check API keys.")
+    
+    secret = transcription_agent.webhook_secret
+    if secret and request.headers.get("X-Webhook-Secret") != secret:
+        raise HTTPException(status_code=401, detail="Invalid webhook secret")
+    
+    payload = await request.json()
+    transcript_id = payload.get("transcript_id")
+    status = payload.get("status")
+    if not transcript_id or not status:
+        raise HTTPException(status_code=400, detail="Missing transcript_id or status")
+    
+    resumed = await transcription_agent.tracker.notify(transcript_id, status)
+    logger.info(f"Transcription webhook for {transcript_id}: {status} (resumed={resumed})")
+    return {"status": "received"}
+
+def _require_admin(token: Optional[str]):
+    admin_token = os.getenv("ADMIN_TOKEN")
+    if not admin_token:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled. Set ADMIN_TOKEN to enable them.")
+    if token != admin_token:
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """
+    Expose pipeline metrics in the Prometheus text format
+    """
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/admin/cache")
+async def cache_stats(x_admin_token: Optional[str] = Header(None)):
+    """
+    Report result cache hit/miss counts and size
+    """
+    _require_admin(x_admin_token)
+    if result_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **result_cache.stats()}
+
+@app.delete("/admin/cache")
+async def invalidate_cache(
+    key: Optional[str] = None,
+    prefix: Optional[str] = None,
+    x_admin_token: Optional[str] = Header(None),
+):
+    """
+    Invalidate one cache key, every key with a prefix (e.g. "transcript:" or "summary:"),
+    or the whole cache when neither is given
+    """
+    _require_admin(x_admin_token)
+    if result_cache is None:
+        raise HTTPException(status_code=404, detail="Result cache is disabled")
+    removed = await run_blocking(result_cache.invalidate, key, prefix)
+    return {"removed": removed, "status": "success"}
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
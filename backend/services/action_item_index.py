@@ -0,0 +1,485 @@
+import difflib
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+import zlib
+import logging
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# MinHash / LSH parameters. Signatures are stored, so changing any of these
+# (or normalize()) needs a new INDEX_VERSION; the index is rebuilt on open.
+INDEX_VERSION = 1
+SHINGLE_SIZE = 4
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+# Items sharing no band are never compared; with 16 bands of 4 rows an item
+# with Jaccard similarity 0.7 shares at least one with 99% probability. The
+# MAX_CANDIDATES items sharing the most bands are then compared by signature,
+# and those estimated within ESTIMATE_MARGIN of the threshold checked exactly.
+MAX_CANDIDATES = 16
+ESTIMATE_MARGIN = 0.1
+# Buckets of a phrase many items share grow with the index; only their newest
+# BUCKET_LIMIT entries are read. A near duplicate shares several bands, so it
+# is still found through the other, smaller buckets.
+BUCKET_LIMIT = 24
+# Near duplicates may differ in these words and in spelling, nothing else
+FILLER_WORDS = frozenset(
+    "a an the to will shall should must can could would please need needs be is are "
+    "by on at of for and also then up out".split()
+)
+SPELLING_SIMILARITY = 0.8
+
+_PRIME = (1 << 31) - 1
+_random = np.random.RandomState(20240601)
+_PERM_A = _random.randint(1, _PRIME, NUM_PERM).astype(np.uint64)
+_PERM_B = _random.randint(0, _PRIME, NUM_PERM).astype(np.uint64)
+_BAND_MULTIPLIERS = _random.randint(1, 1 << 62, ROWS, dtype=np.int64).astype(np.uint64) | np.uint64(1)
+_BAND_SALTS = _random.randint(1, 1 << 62, BANDS, dtype=np.int64).astype(np.uint64)
+
+_LIST_MARKER = re.compile(r"^\s*(?:[-*•]|\d+[.)]|\[[ xX]?\])\s*")
+_NON_WORD = re.compile(r"[^\w\s]")
+_SPACE = re.compile(r"\s+")
+_NUMBER = re.compile(r"\d+")
+
+_BUCKETS_QUERY = " UNION ALL ".join(
+    f"SELECT item_id FROM (SELECT item_id FROM action_item_bands WHERE band_key = ? "
+    f"ORDER BY item_id DESC LIMIT {BUCKET_LIMIT})"
+    for _ in range(BANDS)
+)
+
+
+def normalize(text: str) -> str:
+    """
+    Canonical form of an action item: case-folded, without list markers,
+    punctuation or repeated whitespace
+    """
+    text = unicodedata.normalize("NFKC", text).casefold()
+    text = _LIST_MARKER.sub("", text)
+    text = _NON_WORD.sub(" ", text)
+    return _SPACE.sub(" ", text).strip()
+
+
+def fingerprint(normalized: str) -> str:
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def content_words(normalized: str) -> List[str]:
+    words = normalized.split()
+    return [word for word in words if word not in FILLER_WORDS] or words
+
+
+def shingles(normalized: str) -> set:
+    """
+    Character shingles of the item's content words; filler words shared by
+    most items would put everything in the same LSH buckets
+    """
+    padded = f" {' '.join(content_words(normalized))} "
+    return {padded[i:i + SHINGLE_SIZE] for i in range(max(1, len(padded) - SHINGLE_SIZE + 1))}
+
+
+def jaccard(a: set, b: set) -> float:
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+def same_content(a: str, b: str) -> bool:
+    """
+    Whether two normalized items have the same numbers and content words,
+    allowing for filler words and spelling variants ("finalise"/"finalize"),
+    so a different assignee, object or deadline is never a near duplicate
+    """
+    if set(_NUMBER.findall(a)) != set(_NUMBER.findall(b)):
+        return False
+    a_words = set(content_words(a))
+    b_words = set(content_words(b))
+    only_a, only_b = a_words - b_words, b_words - a_words
+    return all(
+        any(_similar_spelling(word, other) for other in others)
+        for words, others in ((only_a, only_b), (only_b, only_a))
+        for word in words
+    )
+
+
+def _similar_spelling(a: str, b: str) -> bool:
+    # Spelling variants and typos keep the first letter and roughly the length;
+    # that rules out most pairs before the (slower) exact ratio
+    if a[0] != b[0] or 2 * min(len(a), len(b)) < SPELLING_SIMILARITY * (len(a) + len(b)):
+        return False
+    matcher = difflib.SequenceMatcher(None, a, b)
+    return matcher.quick_ratio() >= SPELLING_SIMILARITY and matcher.ratio() >= SPELLING_SIMILARITY
+
+
+def signature(normalized: str) -> np.ndarray:
+    """
+    MinHash signature (NUM_PERM uint32 values) of the item's character shingles
+    """
+    item_shingles = shingles(normalized)
+    hashes = np.fromiter(
+        (zlib.crc32(s.encode("utf-8")) for s in item_shingles), dtype=np.uint64, count=len(item_shingles)
+    )
+    hashes %= _PRIME
+    permuted = (np.outer(_PERM_A, hashes) + _PERM_B[:, None]) % _PRIME
+    return permuted.min(axis=1).astype(np.uint32)
+
+
+def band_keys(list_id: str, sig: np.ndarray) -> List[int]:
+    """
+    LSH bucket keys, one per band of the signature, salted with the list id
+    """
+    list_salt = np.uint64(int.from_bytes(hashlib.blake2b(list_id.encode("utf-8"), digest_size=8).digest(), "little"))
+    bands = sig.reshape(BANDS, ROWS).astype(np.uint64)
+    keys = (bands * _BAND_MULTIPLIERS).sum(axis=1) ^ _BAND_SALTS ^ list_salt
+    return keys.view(np.int64).tolist()
+
+
+class ActionItemIndex:
+    """
+    Persistent index of the action items already sent to Trello, per list.
+
+    Items are matched exactly by the SHA-256 of their normalized text, and
+    approximately by MinHash signatures over character shingles, bucketed with
+    locality-sensitive hashing so a lookup only compares the few items sharing
+    the most buckets. A near match needs a shingle Jaccard similarity of at
+    least threshold and the same content words up to spelling ("Q2" never
+    matches "Q3", nor "Tom will ..." "John will ..."). New items are reserved
+    while their card is created, so concurrent submissions of the same item
+    (from any worker process) create one card.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        threshold: float = 0.7,
+        pending_ttl: float = 600.0,
+        cache_mb: int = 64,
+        mmap_mb: int = 256,
+    ):
+        self.db_path = db_path
+        self.threshold = threshold
+        self.pending_ttl = pending_ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        # Lookups read a few rows at random; serve them from memory rather than through read() calls
+        self._conn.execute(f"PRAGMA mmap_size = {mmap_mb * 1024 * 1024}")
+        self._conn.execute(f"PRAGMA cache_size = -{cache_mb * 1024}")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS action_items (
+                id INTEGER PRIMARY KEY,
+                list_id TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                name TEXT NOT NULL,
+                normalized TEXT NOT NULL,
+                signature BLOB NOT NULL,
+                alias_of INTEGER,
+                card_id TEXT,
+                card_name TEXT,
+                card_url TEXT,
+                created_at REAL NOT NULL,
+                UNIQUE (list_id, fingerprint)
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_action_items_card ON action_items (list_id, card_id)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_action_items_alias ON action_items (alias_of)")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS action_item_bands (
+                band_key INTEGER NOT NULL,
+                item_id INTEGER NOT NULL,
+                PRIMARY KEY (band_key, item_id)
+            ) WITHOUT ROWID
+            """
+        )
+        if self._conn.execute("PRAGMA user_version").fetchone()[0] != INDEX_VERSION:
+            self._rebuild()
+        logger.info(f"Action item index opened at {db_path} ({self.size()} items)")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def lookup(self, list_id: str, names: Sequence[str], reserve: bool = True) -> List[Optional[Dict[str, Any]]]:
+        """
+        Find the existing card for each action item
+
+        Args:
+            list_id: Trello list the cards belong to
+            names: Action item texts
+            reserve: Record unmatched items as pending, so later lookups (and
+                later names in this call) match them while their cards are
+                created; also index near matches' wording as an alias
+
+        Returns:
+            One entry per name: None when the item is new, otherwise a dict
+            with match ("exact" or "near"), similarity, the indexed name and
+            card (None while the matched card is still being created)
+        """
+        now = time.time()
+        results: List[Optional[Dict[str, Any]]] = []
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE" if reserve else "BEGIN")
+            try:
+                for name in names:
+                    results.append(self._lookup_one(list_id, name, reserve, now))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return results
+
+    def record(self, list_id: str, entries: Sequence[Tuple[str, Dict[str, Any]]]) -> None:
+        """
+        Store the cards created for action items (and for their pending aliases)
+
+        Args:
+            list_id: Trello list the cards belong to
+            entries: (action item text, card dict with id, name and url) pairs
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for name, card in entries:
+                    normalized = normalize(name)
+                    if not normalized:
+                        continue
+                    item_id = self._insert(list_id, name, normalized, None, card, now)
+                    if item_id is None:
+                        item_id = self._conn.execute(
+                            "SELECT id FROM action_items WHERE list_id = ? AND fingerprint = ?",
+                            (list_id, fingerprint(normalized)),
+                        ).fetchone()[0]
+                    card_fields = (card["id"], card.get("name"), card.get("url"))
+                    self._conn.execute(
+                        "UPDATE action_items SET card_id = ?, card_name = ?, card_url = ? WHERE id = ?",
+                        card_fields + (item_id,),
+                    )
+                    self._conn.execute(
+                        "UPDATE action_items SET card_id = ?, card_name = ?, card_url = ? "
+                        "WHERE alias_of = ? AND card_id IS NULL",
+                        card_fields + (item_id,),
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def release(self, list_id: str, names: Sequence[str]) -> int:
+        """
+        Drop the reservations of items whose cards could not be created
+
+        Returns:
+            The number of removed entries (including aliases)
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                ids = []
+                for name in names:
+                    row = self._conn.execute(
+                        "SELECT id FROM action_items WHERE list_id = ? AND fingerprint = ? AND card_id IS NULL",
+                        (list_id, fingerprint(normalize(name))),
+                    ).fetchone()
+                    if row:
+                        ids.append(row[0])
+                removed = self._delete_where(
+                    f"card_id IS NULL AND (id IN ({_placeholders(ids)}) OR alias_of IN ({_placeholders(ids)}))",
+                    ids + ids,
+                ) if ids else 0
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return removed
+
+    def forget(self, list_id: str, card_id: str) -> int:
+        """
+        Remove every entry of a card (e.g. one deleted in Trello)
+
+        Returns:
+            The number of removed entries
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                removed = self._delete_where("list_id = ? AND card_id = ?", [list_id, card_id])
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        logger.info(f"Removed {removed} index entries for Trello card {card_id}")
+        return removed
+
+    def size(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM action_items").fetchone()[0]
+
+    def _lookup_one(self, list_id: str, name: str, reserve: bool, now: float) -> Optional[Dict[str, Any]]:
+        normalized = normalize(name)
+        if not normalized:
+            return None
+        row = self._conn.execute(
+            "SELECT id, name, normalized, signature, alias_of, card_id, card_name, card_url, created_at "
+            "FROM action_items WHERE list_id = ? AND fingerprint = ?",
+            (list_id, fingerprint(normalized)),
+        ).fetchone()
+        if row is not None and self._abandoned(row, now):
+            # A reservation whose creator never finished (crashed, or lost its result)
+            if not reserve:
+                return None
+            self._delete_where("id = ?", [row[0]])
+            row = None
+        if row is not None:
+            return self._match(row, "exact", 1.0)
+
+        sig = signature(normalized)
+        near, similarity = self._nearest(list_id, normalized, sig, now)
+        if reserve:
+            # An alias lets the next submission of this wording match exactly
+            alias_of = (near[4] or near[0]) if near is not None else None
+            card = {"id": near[5], "name": near[6], "url": near[7]} if near is not None and near[5] else None
+            self._insert(list_id, name, normalized, sig, card, now, alias_of=alias_of)
+        return self._match(near, "near", similarity) if near is not None else None
+
+    def _nearest(self, list_id: str, normalized: str, sig: np.ndarray, now: float) -> Tuple[Optional[tuple], float]:
+        keys = band_keys(list_id, sig)
+        # Counted here: a GROUP BY in SQLite is several times slower than reading the buckets
+        shared = Counter(item_id for (item_id,) in self._conn.execute(_BUCKETS_QUERY, keys))
+        if not shared:
+            return None, 0.0
+        candidates = [item_id for item_id, _ in shared.most_common(MAX_CANDIDATES)]
+        # "+list_id" keeps SQLite on primary key lookups instead of scanning the list's entries
+        rows = self._conn.execute(
+            f"""
+            SELECT id, name, normalized, signature, alias_of, card_id, card_name, card_url, created_at
+            FROM action_items WHERE id IN ({_placeholders(candidates)}) AND +list_id = ?
+            """,
+            candidates + [list_id],
+        ).fetchall()
+        if not rows:
+            return None, 0.0
+        # The signatures' agreement estimates the similarity; only likely matches are checked exactly
+        signatures = np.frombuffer(b"".join(row[3] for row in rows), dtype=np.uint32).reshape(len(rows), NUM_PERM)
+        estimates = (signatures == sig).mean(axis=1)
+        item_shingles = shingles(normalized)
+        for index in np.argsort(-estimates):
+            if estimates[index] < self.threshold - ESTIMATE_MARGIN:
+                break
+            row = rows[index]
+            if self._abandoned(row, now) or not same_content(normalized, row[2]):
+                continue
+            similarity = jaccard(item_shingles, shingles(row[2]))
+            if similarity >= self.threshold:
+                return row, similarity
+        return None, 0.0
+
+    def _insert(
+        self,
+        list_id: str,
+        name: str,
+        normalized: str,
+        sig: Optional[np.ndarray],
+        card: Optional[Dict[str, Any]],
+        now: float,
+        alias_of: Optional[int] = None,
+    ) -> Optional[int]:
+        """
+        Insert an entry and its LSH buckets; returns None when it already exists
+        """
+        if sig is None:
+            sig = signature(normalized)
+        cursor = self._conn.execute(
+            """
+            INSERT OR IGNORE INTO action_items
+                (list_id, fingerprint, name, normalized, signature, alias_of, card_id, card_name, card_url, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (list_id, fingerprint(normalized), name, normalized, sig.tobytes(), alias_of,
+             card["id"] if card else None, card.get("name") if card else None, card.get("url") if card else None, now),
+        )
+        if cursor.rowcount != 1:
+            return None
+        item_id = cursor.lastrowid
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO action_item_bands (band_key, item_id) VALUES (?, ?)",
+            [(key, item_id) for key in band_keys(list_id, sig)],
+        )
+        return item_id
+
+    def _delete_where(self, condition: str, params: List[Any]) -> int:
+        rows = self._conn.execute(
+            f"SELECT id, list_id, signature FROM action_items WHERE {condition}", params
+        ).fetchall()
+        for item_id, list_id, blob in rows:
+            self._conn.executemany(
+                "DELETE FROM action_item_bands WHERE band_key = ? AND item_id = ?",
+                [(key, item_id) for key in band_keys(list_id, np.frombuffer(blob, dtype=np.uint32))],
+            )
+            self._conn.execute("DELETE FROM action_items WHERE id = ?", (item_id,))
+        return len(rows)
+
+    def _abandoned(self, row: tuple, now: float) -> bool:
+        return row[5] is None and row[8] < now - self.pending_ttl
+
+    @staticmethod
+    def _match(row: tuple, kind: str, similarity: float) -> Dict[str, Any]:
+        card = {"id": row[5], "name": row[6], "url": row[7]} if row[5] else None
+        return {"match": kind, "similarity": round(similarity, 3), "name": row[1], "card": card}
+
+    def _rebuild(self) -> None:
+        """
+        Recompute fingerprints, signatures and buckets after the matching
+        parameters changed
+        """
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            if self._conn.execute("PRAGMA user_version").fetchone()[0] == INDEX_VERSION:
+                # Another process rebuilt it first
+                self._conn.execute("COMMIT")
+                return
+            rows = self._conn.execute(
+                "SELECT id, list_id, name, alias_of, card_id, card_name, card_url, created_at FROM action_items"
+            ).fetchall()
+            self._conn.execute("DELETE FROM action_item_bands")
+            self._conn.execute("DELETE FROM action_items")
+            for item_id, list_id, name, alias_of, card_id, card_name, card_url, created_at in rows:
+                normalized = normalize(name)
+                if not normalized:
+                    continue
+                sig = signature(normalized)
+                cursor = self._conn.execute(
+                    """
+                    INSERT OR IGNORE INTO action_items (id, list_id, fingerprint, name, normalized, signature,
+                        alias_of, card_id, card_name, card_url, created_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (item_id, list_id, fingerprint(normalized), name, normalized, sig.tobytes(),
+                     alias_of, card_id, card_name, card_url, created_at),
+                )
+                if cursor.rowcount == 1:
+                    self._conn.executemany(
+                        "INSERT OR IGNORE INTO action_item_bands (band_key, item_id) VALUES (?, ?)",
+                        [(key, item_id) for key in band_keys(list_id, sig)],
+                    )
+            self._conn.execute(f"PRAGMA user_version = {INDEX_VERSION}")
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+        if rows:
+            logger.info(f"Rebuilt the action item index for version {INDEX_VERSION} ({len(rows)} items)")
+
+
+def _placeholders(values: Sequence[Any]) -> str:
+    return ", ".join("?" for _ in values)
@@ -0,0 +1,264 @@
+import asyncio
+import math
+import time
+import logging
+from typing import Dict, List, Optional, Union
+
+from services.metrics import (
+    ADMISSION_IN_FLIGHT, ADMISSION_QUEUE_DEPTH, ADMISSION_REJECTED, ADMISSION_WAIT,
+)
+from services.rate_limit import TokenBucket
+from services.shared_state import SharedTokenBucket, token_bucket
+from services.resilience import remaining
+
+logger = logging.getLogger(__name__)
+
+# Lower value = served first
+PRIORITIES = {"high": 0, "normal": 1, "low": 2}
+# Idle clients are forgotten once this many are tracked
+MAX_TRACKED_CLIENTS = 10000
+
+
+class AdmissionRejected(Exception):
+    """
+    Raised when a request is not admitted: 429 when the client is over its own
+    limits, 503 when the server as a whole is full
+    """
+
+    def __init__(self, status_code: int, reason: str, message: str, retry_after: float, queue_depth: int):
+        super().__init__(message)
+        self.status_code = status_code
+        self.reason = reason
+        self.retry_after = retry_after
+        self.queue_depth = queue_depth
+
+    def headers(self) -> Dict[str, str]:
+        return {
+            "Retry-After": str(max(1, math.ceil(self.retry_after))),
+            "X-Queue-Depth": str(self.queue_depth),
+        }
+
+
+class _Client:
+    __slots__ = ("running", "waiting", "bucket")
+
+    def __init__(self, bucket: Optional[Union[TokenBucket, SharedTokenBucket]]):
+        self.running = 0
+        self.waiting = 0
+        self.bucket = bucket
+
+
+class _Waiter:
+    __slots__ = ("client", "priority", "seq", "future")
+
+    def __init__(self, client: str, priority: int, seq: int, future: asyncio.Future):
+        self.client = client
+        self.priority = priority
+        self.seq = seq
+        self.future = future
+
+
+class AdmissionController:
+    """
+    Admission control for expensive requests.
+
+    At most `max_concurrent` requests run at once, and at most
+    `client_concurrency` of them for one client (API key or IP address). Others
+    wait in a bounded queue and are admitted by priority, then arrival order,
+    skipping clients that are already at their limit so one busy client cannot
+    hold up the rest. Each client also has a token-bucket rate limit
+    (`client_rate` requests per minute, bursts of `client_burst`).
+
+    Requests that cannot be admitted fail at once instead of timing out: 429
+    when the client is over its rate, concurrency or queue share, 503 when the
+    queue is full or the wait would exceed `max_wait` (or the request deadline).
+    Both carry a Retry-After estimate from the recent service time.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 8,
+        queue_size: int = 32,
+        max_wait: float = 30.0,
+        client_concurrency: int = 2,
+        client_queue: int = 4,
+        client_rate: float = 30.0,
+        client_burst: float = 10.0,
+    ):
+        self.max_concurrent = max(1, max_concurrent)
+        self.queue_size = max(0, queue_size)
+        self.max_wait = max_wait
+        self.client_concurrency = max(1, client_concurrency)
+        self.client_queue = max(0, client_queue)
+        self.client_rate = client_rate
+        self.client_burst = client_burst
+
+        self.running = 0
+        self._waiters: List[_Waiter] = []
+        self._clients: Dict[str, _Client] = {}
+        self._seq = 0
+        # Moving average of how long admitted requests hold their slot
+        self._service_time = 1.0
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    def _client(self, client: str) -> _Client:
+        state = self._clients.get(client)
+        if state is None:
+            if len(self._clients) >= MAX_TRACKED_CLIENTS:
+                self._forget_idle_clients()
+            bucket = None
+            if self.client_rate > 0:
+                # Shared by all worker processes when shared state is configured
+                bucket = token_bucket(f"admission:{client}", rate=self.client_rate / 60, capacity=self.client_burst)
+            state = self._clients[client] = _Client(bucket)
+        return state
+
+    def _forget_idle_clients(self) -> None:
+        for name, state in list(self._clients.items()):
+            # A shared bucket's tokens stay in the shared state when its client is forgotten
+            refilled = (state.bucket is None or isinstance(state.bucket, SharedTokenBucket)
+                        or state.bucket.available() >= state.bucket.capacity)
+            if not state.running and not state.waiting and refilled:
+                del self._clients[name]
+
+    def estimated_wait(self, position: Optional[int] = None) -> float:
+        """
+        Seconds until a request queued at `position` (default: the back of the
+        queue) would probably be admitted
+        """
+        ahead = self.queue_depth if position is None else position
+        return self._service_time * (ahead // self.max_concurrent + 1)
+
+    def _reject(self, status_code: int, reason: str, message: str, retry_after: float) -> AdmissionRejected:
+        ADMISSION_REJECTED.inc(reason=reason)
+        logger.warning(f"Request rejected ({reason}): {message}")
+        return AdmissionRejected(status_code, reason, message, retry_after, self.queue_depth)
+
+    async def acquire(self, client: str, priority: str = "normal") -> float:
+        """
+        Wait for a slot for one request
+
+        Args:
+            client: Identity the per-client limits apply to
+            priority: "high", "normal" or "low"
+
+        Returns:
+            The time spent waiting, in seconds (hold the slot until release())
+
+        Raises:
+            AdmissionRejected: if the request is rate limited, the queue is
+                full or the slot would not come in time
+        """
+        state = self._client(client)
+        if state.bucket is not None:
+            wait = await state.bucket.atry_acquire()
+            if wait > 0:
+                raise self._reject(429, "rate_limited", f"Rate limit of {self.client_rate:g} requests per minute exceeded", wait)
+            # A shared bucket's transaction ran on the executor: the client may have been forgotten meanwhile
+            state = self._client(client)
+
+        start = time.monotonic()
+        if self.running < self.max_concurrent and not self._waiters and state.running < self.client_concurrency:
+            self._admit(state)
+            ADMISSION_WAIT.observe(0.0, priority=priority)
+            return 0.0
+
+        try:
+            if state.waiting >= self.client_queue:
+                raise self._reject(429, "client_busy",
+                                   f"Too many concurrent requests ({self.client_concurrency} running and "
+                                   f"{self.client_queue} waiting allowed per client)", self._service_time)
+            if self.queue_depth >= self.queue_size:
+                raise self._reject(503, "queue_full", "Server is at capacity", self.estimated_wait())
+
+            max_wait = self.max_wait
+            left = remaining()
+            if left is not None:
+                max_wait = min(max_wait, left)
+            estimate = self.estimated_wait()
+            if estimate > max_wait * 2:
+                # Clearly hopeless: answer now rather than after max_wait
+                raise self._reject(503, "wait_too_long", "Server is at capacity", estimate)
+        except AdmissionRejected:
+            # Turned away without waiting: the request does not count against the client's rate
+            if state.bucket is not None:
+                await state.bucket.arefund()
+            raise
+
+        self._seq += 1
+        waiter = _Waiter(client, PRIORITIES.get(priority, PRIORITIES["normal"]), self._seq,
+                         asyncio.get_running_loop().create_future())
+        self._waiters.append(waiter)
+        state.waiting += 1
+        ADMISSION_QUEUE_DEPTH.set(self.queue_depth)
+        # Free slots may be held back only for clients at their own limit
+        self._dispatch()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), max_wait)
+        except asyncio.TimeoutError:
+            if not waiter.future.done():
+                raise self._reject(503, "wait_timeout", f"No capacity within {max_wait:.0f}s", self.estimated_wait())
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Admitted just as the caller went away: pass the slot on
+                self.release(client, 0.0)
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+                state.waiting -= 1
+                ADMISSION_QUEUE_DEPTH.set(self.queue_depth)
+            waiter.future.cancel()
+        waited = time.monotonic() - start
+        ADMISSION_WAIT.observe(waited, priority=priority)
+        return waited
+
+    def _admit(self, state: _Client) -> None:
+        self.running += 1
+        state.running += 1
+        ADMISSION_IN_FLIGHT.set(self.running)
+
+    def release(self, client: str, held: float) -> None:
+        """
+        Give back the slot of a finished request and admit the next waiter
+
+        Args:
+            client: The client passed to acquire()
+            held: How long the slot was held, for the Retry-After estimates
+        """
+        state = self._clients.get(client)
+        self.running -= 1
+        if state is not None:
+            state.running -= 1
+        if held > 0:
+            self._service_time += 0.2 * (held - self._service_time)
+        ADMISSION_IN_FLIGHT.set(self.running)
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        while self.running < self.max_concurrent:
+            eligible = [
+                waiter for waiter in self._waiters
+                if not waiter.future.done() and self._clients[waiter.client].running < self.client_concurrency
+            ]
+            if not eligible:
+                return
+            waiter = min(eligible, key=lambda waiter: (waiter.priority, waiter.seq))
+            state = self._clients[waiter.client]
+            self._waiters.remove(waiter)
+            state.waiting -= 1
+            ADMISSION_QUEUE_DEPTH.set(self.queue_depth)
+            self._admit(state)
+            waiter.future.set_result(None)
+
+    def status(self) -> Dict[str, float]:
+        return {
+            "running": self.running,
+            "max_concurrent": self.max_concurrent,
+            "queue_depth": self.queue_depth,
+            "queue_size": self.queue_size,
+            "service_time": round(self._service_time, 3),
+        }
@@ -0,0 +1,121 @@
+import asyncio
+import importlib
+import threading
+import time
+import logging
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from services.executor import run_blocking
+
+logger = logging.getLogger(__name__)
+
+
+class AgentRegistry:
+    """
+    Imports and constructs agents on first use instead of at application import.
+
+    The SDKs behind the agents (google.generativeai, assemblyai) take most of
+    the process start-up time, so deferring them lets the server answer its
+    liveness check right away. Construction happens exactly once per agent: a
+    lock guards it across threads, and async callers do the import on the
+    blocking executor so the event loop keeps serving while an agent loads.
+    A failed construction is remembered and the agent reported as unavailable,
+    as before.
+    """
+
+    def __init__(self):
+        self._factories: Dict[str, Tuple[str, str]] = {}
+        self._instances: Dict[str, Any] = {}
+        self._errors: Dict[str, str] = {}
+        self._load_seconds: Dict[str, float] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+
+    def register(self, name: str, module: str, class_name: str) -> None:
+        self._factories[name] = (module, class_name)
+        self._locks[name] = threading.Lock()
+
+    @property
+    def names(self) -> Tuple[str, ...]:
+        return tuple(self._factories)
+
+    def get(self, name: str) -> Optional[Any]:
+        """
+        Return the agent, constructing it on first use. Blocks while it loads.
+
+        Returns:
+            The agent instance, or None if it could not be constructed
+        """
+        if name in self._instances or name in self._errors:
+            return self._instances.get(name)
+
+        with self._locks[name]:
+            # Another thread may have finished loading while we waited for the lock
+            if name in self._instances or name in self._errors:
+                return self._instances.get(name)
+
+            module, class_name = self._factories[name]
+            start = time.perf_counter()
+            try:
+                agent_class = getattr(importlib.import_module(module), class_name)
+                self._instances[name] = agent_class()
+                logger.info(f"{class_name} initialized successfully")
+            except Exception as e:
+                self._errors[name] = str(e)
+                logger.warning(f"Failed to initialize {class_name}: {e}")
+            self._load_seconds[name] = time.perf_counter() - start
+            return self._instances.get(name)
+
+    def import_modules(self) -> None:
+        """
+        Import every agent's module without constructing the agent. A server that
+        forks its workers calls this first, so they share the SDKs' memory
+        copy-on-write instead of each importing them again.
+        """
+        for module, class_name in self._factories.values():
+            try:
+                importlib.import_module(module)
+            except Exception as e:
+                # get() reports it when the agent is constructed
+                logger.warning(f"Failed to import {module}: {e}")
+
+    async def aget(self, name: str) -> Optional[Any]:
+        """
+        Async version of get(); loading runs on the blocking executor
+        """
+        if name in self._instances or name in self._errors:
+            return self._instances.get(name)
+        return await run_blocking(self.get, name)
+
+    def loaded(self, name: str) -> Optional[Any]:
+        """
+        Return the agent only if it has already been constructed; never triggers loading
+        """
+        return self._instances.get(name)
+
+    def is_settled(self, name: str) -> bool:
+        return name in self._instances or name in self._errors
+
+    async def warm(self, names: Optional[Iterable[str]] = None) -> None:
+        """
+        Construct the given agents (all by default) concurrently
+        """
+        start = time.perf_counter()
+        await asyncio.gather(*(self.aget(name) for name in (names or self.names)))
+        logger.info(f"Agents pre-warmed in {time.perf_counter() - start:.2f}s")
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        report = {}
+        for name in self._factories:
+            if name in self._instances:
+                state = "ready"
+            elif name in self._errors:
+                state = "failed"
+            else:
+                state = "not_loaded"
+            entry: Dict[str, Any] = {"state": state}
+            if name in self._load_seconds:
+                entry["load_seconds"] = round(self._load_seconds[name], 3)
+            if name in self._errors:
+                entry["error"] = self._errors[name]
+            report[name] = entry
+        return report
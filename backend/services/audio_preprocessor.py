@@ -0,0 +1,202 @@
+import os
+import subprocess
+import time
+import wave
+import logging
+from typing import Any, Dict, Optional
+
+from services.executor import run_blocking, run_in_process
+from services.metrics import track
+
+logger = logging.getLogger(__name__)
+
+# Input frames converted per step when resampling WAV without ffmpeg
+RESAMPLE_BLOCK_FRAMES = 1 << 20
+
+
+class PreprocessResult:
+    """
+    Outcome of normalizing one audio file before upload
+    """
+
+    def __init__(
+        self,
+        path: str,
+        original_bytes: int,
+        output_bytes: int,
+        transcode_seconds: float = 0.0,
+        estimated_upload_seconds_saved: float = 0.0,
+        skipped: Optional[str] = None,
+    ):
+        self.path = path
+        self.original_bytes = original_bytes
+        self.output_bytes = output_bytes
+        self.transcode_seconds = transcode_seconds
+        self.estimated_upload_seconds_saved = estimated_upload_seconds_saved
+        self.skipped = skipped
+
+    @property
+    def converted(self) -> bool:
+        return self.skipped is None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "converted": self.converted,
+            "skipped": self.skipped,
+            "original_bytes": self.original_bytes,
+            "output_bytes": self.output_bytes,
+            "saved_bytes": self.original_bytes - self.output_bytes,
+            "transcode_seconds": round(self.transcode_seconds, 3),
+            "estimated_upload_seconds_saved": round(self.estimated_upload_seconds_saved, 3),
+            # Positive means preprocessing made the request slower overall
+            "estimated_net_latency_seconds": round(self.transcode_seconds - self.estimated_upload_seconds_saved, 3),
+        }
+
+
+def transcode_ffmpeg(path: str, out_path: str, sample_rate: int, bitrate_kbps: int) -> str:
+    """
+    Downmix to mono, resample and encode as Opus. Runs in a worker process.
+    """
+    subprocess.run(
+        ["ffmpeg", "-v", "error", "-y", "-i", path, "-vn", "-ac", "1", "-ar", str(sample_rate),
+         "-c:a", "libopus", "-b:a", f"{bitrate_kbps}k", "-application", "voip", out_path],
+        check=True,
+    )
+    return out_path
+
+
+def resample_wav(path: str, out_path: str, sample_rate: int) -> str:
+    """
+    Downmix a WAV to mono 16-bit PCM at sample_rate using numpy, streaming in
+    blocks so memory stays bounded. Used when ffmpeg is not installed.
+    Runs in a worker process.
+    """
+    import numpy as np
+
+    from services.audio_segmenter import pcm_to_mono
+
+    with wave.open(path, "rb") as source, wave.open(out_path, "wb") as target:
+        in_rate = source.getframerate()
+        target.setnchannels(1)
+        target.setsampwidth(2)
+        target.setframerate(sample_rate)
+
+        step = in_rate / sample_rate
+        # Integer ratios (48k -> 16k) average each group of input samples, which also low-passes
+        factor = int(step) if in_rate % sample_rate == 0 else 0
+        block = RESAMPLE_BLOCK_FRAMES - RESAMPLE_BLOCK_FRAMES % factor if factor else RESAMPLE_BLOCK_FRAMES
+        consumed = 0
+        next_output = 0
+        previous = np.zeros(0, dtype=np.float32)
+        while True:
+            raw = source.readframes(block)
+            if not raw:
+                break
+            samples = pcm_to_mono(raw, source.getsampwidth(), source.getnchannels())
+            if factor:
+                usable = len(samples) - len(samples) % factor
+                output = samples[:usable].reshape(-1, factor).mean(axis=1)
+            else:
+                # Linear interpolation, carrying the last sample over so blocks join smoothly
+                window = np.concatenate([previous, samples])
+                window_start = consumed - len(previous)
+                positions = np.arange(next_output, (consumed + len(samples) - 1) / step) * step
+                output = np.interp(positions - window_start, np.arange(len(window)), window)
+                next_output += len(positions)
+                previous = samples[-1:]
+            consumed += len(samples)
+            target.writeframes((np.clip(output, -1.0, 1.0) * 32767).astype("<i2").tobytes())
+    return out_path
+
+
+class AudioPreprocessor:
+    """
+    Normalizes uploads to mono, low-sample-rate, compressed audio before they are
+    sent for transcription, which cuts upload time and egress for large WAV/FLAC
+    files. Files that are already compact are passed through untouched.
+
+    With ffmpeg installed any input is encoded as 16 kHz mono Opus; without it,
+    WAV input is downmixed and resampled to 16 kHz mono PCM and other formats are
+    left as they are. Transcoding runs on the shared process pool.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        bitrate_kbps: int = 32,
+        min_savings: float = 0.3,
+        upload_mbps: float = 20.0,
+    ):
+        self.sample_rate = sample_rate
+        self.bitrate_kbps = bitrate_kbps
+        self.min_savings = min_savings
+        self.upload_mbps = upload_mbps
+
+    def _estimated_output_bytes(self, duration: float, use_ffmpeg: bool) -> int:
+        if use_ffmpeg:
+            return int(duration * self.bitrate_kbps * 1000 / 8)
+        return int(duration * self.sample_rate * 2) + 44
+
+    def _upload_seconds(self, size: int) -> float:
+        return size * 8 / (self.upload_mbps * 1_000_000)
+
+    async def process(self, path: str) -> PreprocessResult:
+        """
+        Normalize one file. The converted file is written next to the input;
+        the caller removes it once it is no longer needed.
+
+        Args:
+            path: Path of the audio file
+
+        Returns:
+            PreprocessResult whose path is the file to upload (the input itself when skipped)
+        """
+        # Imported here rather than at the top: the segmenter needs numpy, and most servers never preprocess
+        from services.audio_segmenter import ffmpeg_available, probe_duration
+
+        original_bytes = os.path.getsize(path)
+        use_ffmpeg = ffmpeg_available()
+        is_wav = path.lower().endswith(".wav")
+
+        if not use_ffmpeg and not is_wav:
+            return PreprocessResult(path, original_bytes, original_bytes, skipped="ffmpeg not available")
+
+        duration = await run_blocking(probe_duration, path)
+        if duration is None:
+            return PreprocessResult(path, original_bytes, original_bytes, skipped="unknown duration")
+
+        estimated = self._estimated_output_bytes(duration, use_ffmpeg)
+        if estimated > original_bytes * (1 - self.min_savings):
+            return PreprocessResult(path, original_bytes, original_bytes, skipped="already compact")
+
+        base = os.path.splitext(path)[0]
+        start = time.perf_counter()
+        async with track("audio", "preprocess"):
+            if use_ffmpeg:
+                out_path = await run_in_process(
+                    transcode_ffmpeg, path, f"{base}.normalized.ogg", self.sample_rate, self.bitrate_kbps
+                )
+            else:
+                out_path = await run_in_process(resample_wav, path, f"{base}.normalized.wav", self.sample_rate)
+        transcode_seconds = time.perf_counter() - start
+
+        output_bytes = os.path.getsize(out_path)
+        result = PreprocessResult(
+            out_path,
+            original_bytes,
+            output_bytes,
+            transcode_seconds=transcode_seconds,
+            estimated_upload_seconds_saved=self._upload_seconds(original_bytes - output_bytes),
+        )
+        stats = result.as_dict()
+        logger.info(
+            f"Preprocessed {os.path.basename(path)}: {original_bytes / 1e6:.1f}MB -> {output_bytes / 1e6:.1f}MB "
+            f"in {transcode_seconds:.2f}s (est. upload saved {stats['estimated_upload_seconds_saved']:.2f}s, "
+            f"net {stats['estimated_net_latency_seconds']:+.2f}s)"
+        )
+        return result
+
+
+def remove_preprocessed(result: Optional[PreprocessResult]) -> None:
+    if result is not None and result.converted and os.path.exists(result.path):
+        os.unlink(result.path)
@@ -0,0 +1,272 @@
+import asyncio
+import os
+import shutil
+import subprocess
+import wave
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from services.executor import run_blocking, run_in_process
+
+logger = logging.getLogger(__name__)
+
+# Sample rate used when decoding compressed formats with ffmpeg
+DECODE_SAMPLE_RATE = 16000
+
+
+class AudioChunk:
+    """
+    One segment of a longer recording, written to its own file
+    """
+
+    def __init__(self, index: int, path: str, start: float, duration: float):
+        self.index = index
+        self.path = path
+        self.start = start
+        self.duration = duration
+
+    @property
+    def end(self) -> float:
+        return self.start + self.duration
+
+
+def ffmpeg_available() -> bool:
+    return shutil.which("ffmpeg") is not None
+
+
+def _is_wav(path: str) -> bool:
+    return path.lower().endswith(".wav")
+
+
+def probe_duration(path: str) -> Optional[float]:
+    """
+    Duration of an audio file in seconds, or None when it cannot be determined
+    (non-WAV input without ffprobe, or an unreadable file)
+    """
+    try:
+        if _is_wav(path):
+            with wave.open(path, "rb") as wav:
+                return wav.getnframes() / wav.getframerate()
+        if shutil.which("ffprobe") is None:
+            return None
+        output = subprocess.run(
+            ["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "csv=p=0", path],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+        return float(output)
+    except (wave.Error, EOFError, ValueError, OSError, subprocess.CalledProcessError) as e:
+        logger.warning(f"Could not determine duration of {path}: {str(e)}")
+        return None
+
+
+def pcm_to_mono(raw: bytes, sample_width: int, channels: int) -> np.ndarray:
+    if sample_width == 1:
+        samples = np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128.0
+        scale = 128.0
+    elif sample_width == 2:
+        samples = np.frombuffer(raw, dtype="<i2").astype(np.float32)
+        scale = 32768.0
+    elif sample_width == 3:
+        bytes_ = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3)
+        samples = (bytes_[:, 0].astype(np.int32) | (bytes_[:, 1].astype(np.int32) << 8)
+                   | (bytes_[:, 2].astype(np.int32) << 16))
+        samples = np.where(samples >= 1 << 23, samples - (1 << 24), samples).astype(np.float32)
+        scale = float(1 << 23)
+    else:
+        samples = np.frombuffer(raw, dtype="<i4").astype(np.float32)
+        scale = float(1 << 31)
+    if channels > 1:
+        samples = samples[: len(samples) // channels * channels].reshape(-1, channels).mean(axis=1)
+    return samples / scale
+
+
+def read_block(path: str, start: float, duration: float) -> Tuple[np.ndarray, int]:
+    """
+    Decode [start, start + duration) seconds of a file to mono float samples
+    """
+    if _is_wav(path):
+        with wave.open(path, "rb") as wav:
+            rate = wav.getframerate()
+            wav.setpos(min(int(round(start * rate)), wav.getnframes()))
+            raw = wav.readframes(int(round(duration * rate)))
+            return pcm_to_mono(raw, wav.getsampwidth(), wav.getnchannels()), rate
+
+    raw = subprocess.run(
+        ["ffmpeg", "-v", "error", "-ss", str(start), "-t", str(duration), "-i", path,
+         "-f", "s16le", "-ac", "1", "-ar", str(DECODE_SAMPLE_RATE), "-"],
+        capture_output=True, check=True,
+    ).stdout
+    return pcm_to_mono(raw, 2, 1), DECODE_SAMPLE_RATE
+
+
+def block_energies(path: str, start: float, duration: float, frame_seconds: float) -> np.ndarray:
+    """
+    Per-frame RMS energy in dBFS for one block of a file. Runs in a worker process.
+    """
+    samples, rate = read_block(path, start, duration)
+    frame = max(1, int(round(rate * frame_seconds)))
+    frames = len(samples) // frame
+    if frames == 0:
+        return np.zeros(0, dtype=np.float32)
+    rms = np.sqrt(np.mean(np.square(samples[: frames * frame].reshape(frames, frame)), axis=1))
+    return (20 * np.log10(rms + 1e-10)).astype(np.float32)
+
+
+def choose_cut_points(
+    energies_db: np.ndarray,
+    frame_seconds: float,
+    duration: float,
+    max_chunk_seconds: float,
+    min_chunk_seconds: float,
+    smoothing_seconds: float = 0.5,
+    quiet_margin_db: float = 3.0,
+) -> List[float]:
+    """
+    Pick cut times so every chunk is at most max_chunk_seconds long. Each cut is
+    placed in the quietest stretch (smoothed energy) between min_chunk_seconds and
+    max_chunk_seconds after the previous cut, which lands in a pause between words.
+    Of the pauses within quiet_margin_db of the quietest, the latest one is used so
+    chunks stay close to the maximum length.
+    """
+    window = max(1, int(round(smoothing_seconds / frame_seconds)))
+    smoothed = np.convolve(energies_db, np.ones(window) / window, mode="same")
+
+    cuts: List[float] = []
+    start = 0.0
+    while duration - start > max_chunk_seconds:
+        lo = int((start + min_chunk_seconds) / frame_seconds)
+        hi = min(int((start + max_chunk_seconds) / frame_seconds), len(smoothed))
+        if hi <= lo:
+            cut = start + max_chunk_seconds
+        else:
+            window_energy = smoothed[lo:hi]
+            quiet = np.flatnonzero(window_energy <= window_energy.min() + quiet_margin_db)
+            cut = (lo + int(quiet[-1]) + 0.5) * frame_seconds
+        cuts.append(cut)
+        start = cut
+    return cuts
+
+
+def write_chunk(path: str, out_path: str, start: float, duration: float) -> str:
+    """
+    Write [start, start + duration) seconds of a file to out_path. WAV input is
+    copied frame-for-frame; other formats are decoded to 16 kHz mono WAV.
+    Runs in a worker process.
+    """
+    if _is_wav(path):
+        with wave.open(path, "rb") as source:
+            rate = source.getframerate()
+            source.setpos(min(int(round(start * rate)), source.getnframes()))
+            raw = source.readframes(int(round(duration * rate)))
+            with wave.open(out_path, "wb") as target:
+                target.setnchannels(source.getnchannels())
+                target.setsampwidth(source.getsampwidth())
+                target.setframerate(rate)
+                target.writeframes(raw)
+        return out_path
+
+    subprocess.run(
+        ["ffmpeg", "-v", "error", "-y", "-ss", str(start), "-t", str(duration), "-i", path,
+         "-ac", "1", "-ar", str(DECODE_SAMPLE_RATE), out_path],
+        check=True,
+    )
+    return out_path
+
+
+class AudioSegmenter:
+    """
+    Splits long recordings at silence into chunks of bounded length so they can
+    be transcribed in parallel.
+
+    Decoding and energy analysis run block by block on the shared process pool,
+    and chunk files are written there too. WAV is handled with the standard
+    library; MP3, M4A and FLAC need ffmpeg and are left unsplit without it.
+    """
+
+    def __init__(
+        self,
+        max_chunk_seconds: float = 600.0,
+        min_chunk_seconds: Optional[float] = None,
+        analysis_block_seconds: float = 300.0,
+        frame_seconds: float = 0.02,
+    ):
+        self.max_chunk_seconds = max_chunk_seconds
+        self.min_chunk_seconds = min_chunk_seconds if min_chunk_seconds is not None else max_chunk_seconds / 2
+        self.frame_seconds = frame_seconds
+        # Keep blocks a whole number of frames so per-block energies line up when concatenated
+        self.analysis_block_seconds = round(analysis_block_seconds / frame_seconds) * frame_seconds
+
+    def can_split(self, path: str) -> bool:
+        return _is_wav(path) or ffmpeg_available()
+
+    async def split(self, path: str, out_dir: str) -> Optional[List[AudioChunk]]:
+        """
+        Split a file into chunks written to out_dir
+
+        Args:
+            path: Path of the audio file
+            out_dir: Existing directory for the chunk files
+
+        Returns:
+            The chunks in order, or None when the file is short enough (or cannot
+            be decoded) and should be transcribed whole
+        """
+        if not self.can_split(path):
+            logger.info(f"ffmpeg not found; transcribing {os.path.basename(path)} without splitting")
+            return None
+
+        duration = await run_blocking(probe_duration, path)
+        if duration is None or duration <= self.max_chunk_seconds:
+            return None
+
+        block_starts = np.arange(0.0, duration, self.analysis_block_seconds)
+        energies = await asyncio.gather(*(
+            run_in_process(block_energies, path, float(start), self.analysis_block_seconds, self.frame_seconds)
+            for start in block_starts
+        ))
+        cuts = choose_cut_points(
+            np.concatenate(energies), self.frame_seconds, duration, self.max_chunk_seconds, self.min_chunk_seconds
+        )
+
+        bounds = [0.0] + cuts + [duration]
+        chunks = [
+            AudioChunk(i, os.path.join(out_dir, f"chunk_{i:04d}.wav"), start, end - start)
+            for i, (start, end) in enumerate(zip(bounds, bounds[1:]))
+        ]
+        await asyncio.gather(*(
+            run_in_process(write_chunk, path, chunk.path, chunk.start, chunk.duration) for chunk in chunks
+        ))
+        logger.info(
+            f"Split {os.path.basename(path)} ({duration:.0f}s) into {len(chunks)} chunks "
+            f"at {', '.join(f'{cut:.1f}s' for cut in cuts)}"
+        )
+        return chunks
+
+
+def stitch_transcripts(chunks: List[AudioChunk], transcripts: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Join per-chunk transcripts in chunk order, shifting word timestamps
+    (milliseconds, as returned by AssemblyAI) by each chunk's start offset
+
+    Returns:
+        Dict with the joined "text", offset "words" and the "chunks" boundaries
+    """
+    texts = []
+    words = []
+    for chunk, transcript in sorted(zip(chunks, transcripts), key=lambda pair: pair[0].index):
+        text = (transcript.get("text") or "").strip()
+        if text:
+            texts.append(text)
+        offset_ms = int(round(chunk.start * 1000))
+        for word in transcript.get("words") or []:
+            shifted = dict(word)
+            shifted["start"] = word["start"] + offset_ms
+            shifted["end"] = word["end"] + offset_ms
+            words.append(shifted)
+    return {
+        "text": " ".join(texts),
+        "words": words,
+        "chunks": [{"index": chunk.index, "start": chunk.start, "end": chunk.end} for chunk in chunks],
+    }
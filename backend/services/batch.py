@@ -0,0 +1,552 @@
+import asyncio
+import json
+import os
+import shutil
+import time
+import uuid
+import logging
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from services.executor import run_blocking
+from services.meeting_store import MeetingStore
+from services.pipeline import MeetingPipeline
+from services.resilience import deadline, deadline_var
+
+try:
+    import fcntl
+except ImportError:  # Not on Windows: every process there resumes every batch
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+AUDIO_EXTENSIONS = (".mp3", ".wav", ".m4a", ".flac")
+
+STAGES = ("transcription", "summarization", "trello")
+
+
+class BatchStatus:
+    """
+    Lifecycle states of a batch
+    """
+    RUNNING = "running"
+    COMPLETED = "completed"
+
+
+class ItemStatus:
+    """
+    Progress of one file in a batch; each state records the last finished stage
+    """
+    PENDING = "pending"
+    TRANSCRIBED = "transcribed"
+    SUMMARIZED = "summarized"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+    TERMINAL = (COMPLETED, FAILED)
+
+
+def collect_audio_files(paths: Iterable[str]) -> List[str]:
+    """
+    Expand files and directories (searched recursively) into a sorted list of audio files
+    """
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                found.extend(os.path.join(root, name) for name in names if name.lower().endswith(AUDIO_EXTENSIONS))
+        elif path.lower().endswith(AUDIO_EXTENSIONS):
+            found.append(path)
+        else:
+            logger.warning(f"Skipping {path}: not a supported audio file")
+    return sorted(set(os.path.abspath(path) for path in found))
+
+
+def new_batch(
+    files: List[Dict[str, str]],
+    trello: bool = False,
+    owns_files: bool = False,
+    batch_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Build a fresh batch record
+
+    Args:
+        files: Dicts with the "path" of each audio file and its original "filename"
+        trello: Also create Trello cards for the action items
+        owns_files: The audio files belong to the batch (uploads) and are removed
+            once transcribed; files given on the command line are never removed
+        batch_id: Id to use instead of a random one
+    """
+    now = time.time()
+    return {
+        "id": batch_id or uuid.uuid4().hex,
+        "status": BatchStatus.RUNNING,
+        "trello": trello,
+        "owns_files": owns_files,
+        "created_at": now,
+        "updated_at": now,
+        "items": [
+            {
+                "index": index,
+                "filename": file["filename"],
+                "path": file["path"],
+                "status": ItemStatus.PENDING,
+                "audio_seconds": None,
+                "transcript": None,
+                "summary": None,
+                "action_items": None,
+                "meeting_id": None,
+                "trello": None,
+                "error": None,
+                "stage_seconds": {},
+            }
+            for index, file in enumerate(files)
+        ],
+        "report": None,
+    }
+
+
+def batch_summary(batch: Dict[str, Any], include_items: bool = True) -> Dict[str, Any]:
+    """
+    Client view of a batch: status counts, the report once finished and the
+    items without server-side paths
+    """
+    counts: Dict[str, int] = {}
+    for item in batch["items"]:
+        counts[item["status"]] = counts.get(item["status"], 0) + 1
+    view = {key: value for key, value in batch.items() if key not in ("items", "owns_files")}
+    view["counts"] = counts
+    if include_items:
+        view["items"] = [{key: value for key, value in item.items() if key != "path"} for item in batch["items"]]
+    return view
+
+
+class BatchCheckpoint:
+    """
+    Batch state saved as a JSON file, so an interrupted batch resumes from the
+    last finished stage of every file. Writes go to a temporary file that
+    replaces the checkpoint, so a crash never leaves a torn checkpoint, and are
+    rate limited to one per min_interval seconds except when forced.
+
+    Each file's results (transcript, summary, action items) are written once,
+    to their own file in results_dir, when the stage producing them finishes;
+    the checkpoint itself only holds statuses and timings, so rewriting it stays
+    cheap however long the transcripts are. load() merges the results back in.
+    """
+
+    RESULT_FIELDS = ("transcript", "summary", "action_items")
+
+    def __init__(self, path: str, min_interval: float = 1.0):
+        self.path = path
+        self.results_dir = f"{os.path.splitext(path)[0]}.results"
+        self.min_interval = min_interval
+        self._last_save = 0.0
+        self._lock = asyncio.Lock()
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """
+        Read the checkpoint and its items' results. Blocks on the file system,
+        so async callers use aload.
+        """
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path) as handle:
+            batch = json.load(handle)
+        for item in batch["items"]:
+            path = self._results_path(item["index"])
+            # Checkpoints written before results had their own files keep them inline
+            if os.path.exists(path):
+                with open(path) as handle:
+                    item.update(json.load(handle))
+        return batch
+
+    async def aload(self) -> Optional[Dict[str, Any]]:
+        return await run_blocking(self.load)
+
+    def _results_path(self, index: int) -> str:
+        return os.path.join(self.results_dir, f"{index}.json")
+
+    @staticmethod
+    def _write(path: str, value: Any) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w") as handle:
+            json.dump(value, handle)
+        os.replace(temp_path, path)
+
+    async def save_results(self, item: Dict[str, Any]) -> None:
+        """
+        Write an item's results. Called before the item's status records the
+        stage that produced them, so a resumed batch never misses them.
+        """
+        results = {field: item[field] for field in self.RESULT_FIELDS}
+        await run_blocking(self._write, self._results_path(item["index"]), results)
+
+    async def save(self, batch: Dict[str, Any], force: bool = False) -> None:
+        if not force and time.monotonic() - self._last_save < self.min_interval:
+            return
+        async with self._lock:
+            self._last_save = time.monotonic()
+            batch["updated_at"] = time.time()
+            # Snapshot on the event loop, where the batch is mutated; serialize and write on the executor
+            snapshot = dict(batch, items=[
+                dict(
+                    {key: value for key, value in item.items() if key not in self.RESULT_FIELDS},
+                    stage_seconds=dict(item["stage_seconds"]),
+                )
+                for item in batch["items"]
+            ])
+            await run_blocking(self._write, self.path, snapshot)
+
+
+def _percentile(values: List[float], pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+class BatchRunner:
+    """
+    Runs a batch through transcription, summarization and (optionally) Trello.
+
+    Each stage has its own worker pool and queue, so the stages work on
+    different files at the same time: while one file is being summarized the
+    next ones are already transcribing. Stage concurrency is set per stage to
+    match each provider's limits. Files resume at the stage after the last one
+    recorded in the checkpoint.
+    """
+
+    def __init__(
+        self,
+        pipeline: MeetingPipeline,
+        agents,
+        transcription_concurrency: int = 4,
+        summarization_concurrency: int = 4,
+        trello_concurrency: int = 2,
+        stage_timeout: Optional[float] = None,
+        meetings: Optional[MeetingStore] = None,
+    ):
+        self.pipeline = pipeline
+        self.agents = agents
+        # Summarized files are kept here for search
+        self.meetings = meetings
+        # Deadline for one file's stage; every provider call inside it is bounded by it
+        self.stage_timeout = stage_timeout
+        self.concurrency = {
+            "transcription": max(1, transcription_concurrency),
+            "summarization": max(1, summarization_concurrency),
+            "trello": max(1, trello_concurrency),
+        }
+
+    async def run(
+        self,
+        batch: Dict[str, Any],
+        checkpoint: Optional[BatchCheckpoint] = None,
+        on_progress: Optional[Callable[[Dict[str, Any], str], None]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Process every unfinished file of a batch
+
+        Args:
+            batch: Batch record (see new_batch); updated in place
+            checkpoint: Where progress is saved after each finished stage
+            on_progress: Optional callback receiving the item and the stage it just finished
+
+        Returns:
+            The throughput report, also stored in batch["report"]
+        """
+        stages = [stage for stage in STAGES if stage != "trello" or batch["trello"]]
+        queues = {stage: asyncio.Queue() for stage in stages}
+        stats = {stage: {"completed": 0, "failed": 0, "busy_seconds": 0.0, "seconds": []} for stage in stages}
+        pending = [item for item in batch["items"] if item["status"] not in ItemStatus.TERMINAL]
+        already_done = len(batch["items"]) - len(pending)
+        remaining = len(pending)
+        all_done = asyncio.Event()
+        if remaining == 0:
+            all_done.set()
+
+        def route(item: Dict[str, Any]) -> None:
+            nonlocal remaining
+            if item["status"] == ItemStatus.PENDING:
+                queues["transcription"].put_nowait(item)
+            elif item["status"] == ItemStatus.TRANSCRIBED:
+                queues["summarization"].put_nowait(item)
+            elif item["status"] == ItemStatus.SUMMARIZED and "trello" in queues:
+                queues["trello"].put_nowait(item)
+            else:
+                if item["status"] == ItemStatus.SUMMARIZED:
+                    item["status"] = ItemStatus.COMPLETED
+                remaining -= 1
+                if remaining == 0:
+                    all_done.set()
+
+        async def worker(stage: str) -> None:
+            while True:
+                item = await queues[stage].get()
+                start = time.perf_counter()
+                try:
+                    async with deadline(self.stage_timeout):
+                        await self._run_stage(stage, batch, item, checkpoint)
+                except Exception as e:
+                    item["status"] = ItemStatus.FAILED
+                    item["error"] = f"{stage}: {str(e)}"
+                elapsed = time.perf_counter() - start
+                item["stage_seconds"][stage] = round(elapsed, 3)
+                stats[stage]["busy_seconds"] += elapsed
+                stats[stage]["seconds"].append(elapsed)
+                if item["status"] == ItemStatus.FAILED:
+                    stats[stage]["failed"] += 1
+                    logger.warning(f"Batch {batch['id']}: {item['filename']} failed ({item['error']})")
+                else:
+                    stats[stage]["completed"] += 1
+                route(item)
+                if on_progress is not None:
+                    on_progress(item, stage)
+                if checkpoint is not None:
+                    await checkpoint.save(batch)
+
+        logger.info(
+            f"Batch {batch['id']}: {len(pending)} files to process ({already_done} already done), "
+            f"concurrency {', '.join(f'{stage}={self.concurrency[stage]}' for stage in stages)}"
+        )
+        start = time.perf_counter()
+        workers = [
+            asyncio.create_task(worker(stage)) for stage in stages for _ in range(self.concurrency[stage])
+        ]
+        try:
+            for item in pending:
+                route(item)
+            await all_done.wait()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            if checkpoint is not None:
+                await asyncio.shield(checkpoint.save(batch, force=True))
+        wall = time.perf_counter() - start
+
+        report = self._report(batch, stages, stats, wall, len(pending), already_done)
+        batch["report"] = report
+        batch["status"] = BatchStatus.COMPLETED
+        if checkpoint is not None:
+            await checkpoint.save(batch, force=True)
+        logger.info(
+            f"Batch {batch['id']} finished: {report['completed']} completed, {report['failed']} failed "
+            f"in {wall:.1f}s ({report['files_per_minute']} files/min)"
+        )
+        return report
+
+    async def _run_stage(
+        self,
+        stage: str,
+        batch: Dict[str, Any],
+        item: Dict[str, Any],
+        checkpoint: Optional[BatchCheckpoint] = None,
+    ) -> None:
+        if stage == "transcription":
+            if not os.path.exists(item["path"]):
+                raise FileNotFoundError(f"{item['path']} not found")
+            # Not imported with the module, so the API server only loads numpy once a batch runs
+            from services.audio_segmenter import probe_duration
+
+            item["audio_seconds"] = await run_blocking(probe_duration, item["path"])
+            transcript = await self.pipeline.transcribe(item["path"], item["filename"])
+            if batch["owns_files"]:
+                await run_blocking(os.unlink, item["path"])
+            if not transcript:
+                raise RuntimeError("Transcription failed")
+            item["transcript"] = transcript
+            if checkpoint is not None:
+                await checkpoint.save_results(item)
+            item["status"] = ItemStatus.TRANSCRIBED
+
+        elif stage == "summarization":
+            summary_data = await self.pipeline.summarize(item["transcript"])
+            if not summary_data:
+                raise RuntimeError("Summarization failed")
+            item["summary"] = summary_data.get("summary", "")
+            item["action_items"] = summary_data.get("action_items", [])
+            if self.meetings is not None:
+                # Derived from the batch and file, so a resumed batch stores each file once
+                item["meeting_id"] = self.meetings.save(
+                    item["transcript"],
+                    item["summary"],
+                    item["action_items"],
+                    title=item["filename"],
+                    meeting_id=uuid.uuid5(uuid.NAMESPACE_URL, f"batch:{batch['id']}:{item['index']}").hex,
+                    source="batch",
+                    engine=summary_data.get("engine"),
+                    action_item_details=summary_data.get("action_item_details"),
+                )
+            if checkpoint is not None:
+                await checkpoint.save_results(item)
+            item["status"] = ItemStatus.SUMMARIZED
+
+        elif stage == "trello":
+            if item["action_items"]:
+                trello_agent = await self.agents.aget("trello")
+                if trello_agent is None:
+                    raise RuntimeError("Trello agent not available")
+                results = await trello_agent.create_tasks_detailed(item["action_items"])
+                item["trello"] = {
+                    "created": sum(1 for result in results if result["status"] == "created"),
+                    "duplicates": sum(1 for result in results if result["status"] in ("duplicate", "updated")),
+                    "failed": sum(1 for result in results if result["status"] == "failed"),
+                }
+            item["status"] = ItemStatus.COMPLETED
+
+    def _report(
+        self,
+        batch: Dict[str, Any],
+        stages: List[str],
+        stats: Dict[str, Dict[str, Any]],
+        wall: float,
+        processed: int,
+        already_done: int,
+    ) -> Dict[str, Any]:
+        items = batch["items"]
+        completed = sum(1 for item in items if item["status"] == ItemStatus.COMPLETED)
+        failed = sum(1 for item in items if item["status"] == ItemStatus.FAILED)
+        audio_seconds = sum(item["audio_seconds"] or 0 for item in items if item["status"] == ItemStatus.COMPLETED)
+        report = {
+            "files": len(items),
+            "processed_this_run": processed,
+            "already_done": already_done,
+            "completed": completed,
+            "failed": failed,
+            "wall_seconds": round(wall, 3),
+            "files_per_minute": round(processed / wall * 60, 2) if wall > 0 else None,
+            "audio_hours": round(audio_seconds / 3600, 3),
+            "trello_cards": sum((item["trello"] or {}).get("created", 0) for item in items),
+            "stages": {},
+        }
+        if wall > 0 and audio_seconds:
+            report["audio_hours_per_hour"] = round(audio_seconds / wall, 2)
+        for stage in stages:
+            seconds = stats[stage]["seconds"]
+            workers = self.concurrency[stage]
+            report["stages"][stage] = {
+                "concurrency": workers,
+                "completed": stats[stage]["completed"],
+                "failed": stats[stage]["failed"],
+                "p50_seconds": round(_percentile(seconds, 50), 3) if seconds else None,
+                "p95_seconds": round(_percentile(seconds, 95), 3) if seconds else None,
+                # Share of the stage's worker time spent busy; the bottleneck stage is near 1
+                "utilization": round(stats[stage]["busy_seconds"] / (wall * workers), 3) if wall > 0 else None,
+            }
+        return report
+
+
+class BatchManager:
+    """
+    Runs batches submitted through the API in the background and keeps their
+    checkpoints in batch_dir, resuming unfinished batches on start.
+
+    Several worker processes may share batch_dir: each batch is run by the
+    process holding its lock file, and the others report it from its checkpoint.
+    """
+
+    def __init__(self, runner: BatchRunner, batch_dir: str):
+        self.runner = runner
+        self.batch_dir = batch_dir
+        self._batches: Dict[str, Dict[str, Any]] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._locks: Dict[str, int] = {}
+        os.makedirs(batch_dir, exist_ok=True)
+
+    def checkpoint_path(self, batch_id: str) -> str:
+        return os.path.join(self.batch_dir, f"{batch_id}.json")
+
+    def _lock(self, batch_id: str) -> bool:
+        """
+        Take the batch's lock file, unless another process holds it. The lock
+        goes away with the process, so a crashed worker's batches are resumed.
+        """
+        if fcntl is None:
+            return True
+        fd = os.open(os.path.join(self.batch_dir, f"{batch_id}.lock"), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self._locks[batch_id] = fd
+        return True
+
+    def _unlock(self, batch_id: str, finished: bool) -> None:
+        fd = self._locks.pop(batch_id, None)
+        if fd is None:
+            return
+        if finished:
+            os.unlink(os.path.join(self.batch_dir, f"{batch_id}.lock"))
+        os.close(fd)
+
+    def upload_dir(self, batch_id: str) -> str:
+        path = os.path.join(self.batch_dir, batch_id)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    async def start(self) -> None:
+        """
+        Resume batches left unfinished by a previous run
+        """
+        for name in sorted(os.listdir(self.batch_dir)):
+            if not name.endswith(".json"):
+                continue
+            try:
+                batch = await BatchCheckpoint(os.path.join(self.batch_dir, name)).aload()
+            except (OSError, ValueError) as e:
+                logger.warning(f"Unreadable batch checkpoint {name}: {str(e)}")
+                continue
+            self._batches[batch["id"]] = batch
+            if batch["status"] == BatchStatus.RUNNING and self._lock(batch["id"]):
+                logger.info(f"Resuming batch {batch['id']} after restart")
+                self._launch(batch)
+
+    async def stop(self) -> None:
+        for task in self._tasks.values():
+            task.cancel()
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+        self._tasks = {}
+        for batch_id in list(self._locks):
+            self._unlock(batch_id, finished=False)
+
+    async def submit(self, batch: Dict[str, Any]) -> Dict[str, Any]:
+        self._batches[batch["id"]] = batch
+        self._lock(batch["id"])
+        await BatchCheckpoint(self.checkpoint_path(batch["id"])).save(batch, force=True)
+        self._launch(batch)
+        return batch
+
+    async def get(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        batch = self._batches.get(batch_id)
+        if batch is not None and (batch_id in self._tasks or batch["status"] != BatchStatus.RUNNING):
+            return batch
+        if os.path.basename(batch_id) != batch_id:
+            return None
+        # Run by another worker process (or submitted to one): its checkpoint is the latest state
+        try:
+            return await BatchCheckpoint(self.checkpoint_path(batch_id)).aload() or batch
+        except (OSError, ValueError):
+            return batch
+
+    def _launch(self, batch: Dict[str, Any]) -> None:
+        checkpoint = BatchCheckpoint(self.checkpoint_path(batch["id"]))
+        task = asyncio.create_task(self._run(batch, checkpoint))
+        self._tasks[batch["id"]] = task
+
+    async def _run(self, batch: Dict[str, Any], checkpoint: BatchCheckpoint) -> None:
+        # A batch outlives the request that submitted it: only the per-stage deadline applies
+        deadline_var.set(None)
+        try:
+            await self.runner.run(batch, checkpoint)
+            if batch["owns_files"]:
+                await run_blocking(shutil.rmtree, os.path.join(self.batch_dir, batch["id"]), True)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Batch {batch['id']} stopped: {str(e)}")
+        finally:
+            self._tasks.pop(batch["id"], None)
+            self._unlock(batch["id"], finished=batch["status"] != BatchStatus.RUNNING)
@@ -0,0 +1,111 @@
+import asyncio
+import time
+import logging
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Event types that end a job's stream
+TERMINAL_EVENTS = ("completed", "failed")
+
+
+class _Channel:
+    def __init__(self, history_size: int):
+        self.history: Deque[Dict[str, Any]] = deque(maxlen=history_size)
+        self.subscribers: Set[asyncio.Queue] = set()
+        self.closed_at: Optional[float] = None
+        self.sequence = 0
+
+
+class EventBroadcaster:
+    """
+    Fan-out of pipeline events to any number of subscribers per job.
+
+    Every subscriber gets its own bounded queue. When a slow subscriber's queue
+    is full the oldest undelivered event is dropped (progress events supersede
+    each other), so a stalled client can never grow server memory. A short
+    history is kept per job so late subscribers still see earlier events and
+    the final result.
+    """
+
+    def __init__(self, queue_size: int = 100, history_size: int = 50, retention: float = 300.0):
+        self.queue_size = queue_size
+        self.history_size = history_size
+        self.retention = retention
+        self._channels: Dict[str, _Channel] = {}
+        self.dropped_events = 0
+
+    def publish(self, job_id: str, event_type: str, data: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Publish an event to every subscriber of a job. Never blocks.
+        """
+        self._expire_channels()
+        channel = self._channels.setdefault(job_id, _Channel(self.history_size))
+        if channel.closed_at is not None:
+            return
+
+        channel.sequence += 1
+        event = {"id": channel.sequence, "event": event_type, "job_id": job_id, "data": data or {}, "time": time.time()}
+        channel.history.append(event)
+
+        for queue in channel.subscribers:
+            if queue.full():
+                queue.get_nowait()
+                self.dropped_events += 1
+            queue.put_nowait(event)
+
+        if event_type in TERMINAL_EVENTS:
+            channel.closed_at = time.monotonic()
+
+    async def subscribe(
+        self,
+        job_id: str,
+        last_event_id: int = 0,
+        heartbeat: Optional[float] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield a job's events, starting with the retained history after last_event_id,
+        until a terminal event is delivered. When heartbeat is set, a "heartbeat"
+        event is yielded after that many idle seconds so connections stay open.
+        """
+        channel = self._channels.setdefault(job_id, _Channel(self.history_size))
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+
+        # Register before replaying history so nothing published meanwhile is missed
+        channel.subscribers.add(queue)
+        try:
+            for event in list(channel.history):
+                if event["id"] > last_event_id:
+                    yield event
+                    last_event_id = event["id"]
+                    if event["event"] in TERMINAL_EVENTS:
+                        return
+
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield {"id": last_event_id, "event": "heartbeat", "job_id": job_id, "data": {}, "time": time.time()}
+                    continue
+                if event["id"] <= last_event_id:
+                    continue
+                yield event
+                if event["event"] in TERMINAL_EVENTS:
+                    return
+        finally:
+            channel.subscribers.discard(queue)
+
+    def has_events(self, job_id: str) -> bool:
+        channel = self._channels.get(job_id)
+        return bool(channel and channel.history)
+
+    def subscriber_count(self, job_id: str) -> int:
+        channel = self._channels.get(job_id)
+        return len(channel.subscribers) if channel else 0
+
+    def _expire_channels(self) -> None:
+        cutoff = time.monotonic() - self.retention
+        for job_id, channel in list(self._channels.items()):
+            if channel.closed_at is not None and channel.closed_at < cutoff and not channel.subscribers:
+                del self._channels[job_id]
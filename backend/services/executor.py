@@ -0,0 +1,137 @@
+import asyncio
+import contextvars
+import functools
+import multiprocessing
+import os
+import threading
+import logging
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_process_pool: Optional[ProcessPoolExecutor] = None
+_provider_executors: Dict[str, ThreadPoolExecutor] = {}
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """
+    Return the shared thread pool used for blocking SDK and file I/O calls.
+    The pool is created on first use and sized by BLOCKING_EXECUTOR_WORKERS.
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                workers = int(os.getenv("BLOCKING_EXECUTOR_WORKERS", "16"))
+                _executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="blocking")
+                logger.info(f"Blocking executor started with {workers} threads")
+    return _executor
+
+
+async def run_blocking(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Run a blocking function on the shared executor without blocking the event loop.
+    Context variables (such as the current trace id) are carried into the thread.
+
+    Args:
+        func: Synchronous callable to run
+        *args, **kwargs: Arguments passed to the callable
+
+    Returns:
+        The callable's return value
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(get_executor(), functools.partial(context.run, func, *args, **kwargs))
+
+
+def get_provider_executor(provider: str) -> ThreadPoolExecutor:
+    """
+    Return the thread pool for one external API's blocking SDK calls, sized by
+    PROVIDER_EXECUTOR_WORKERS. A call whose caller gave up (timeout, deadline)
+    keeps its thread until the SDK returns; in this pool it can only hold up
+    more calls to the same API, never the shared executor's other work.
+    """
+    executor = _provider_executors.get(provider)
+    if executor is None:
+        with _executor_lock:
+            executor = _provider_executors.get(provider)
+            if executor is None:
+                workers = max(1, int(os.getenv("PROVIDER_EXECUTOR_WORKERS", "8")))
+                executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=provider)
+                _provider_executors[provider] = executor
+                logger.info(f"{provider} executor started with {workers} threads")
+    return executor
+
+
+async def run_provider_call(provider: str, func: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Run a blocking SDK call to an external API on that API's own executor.
+    Context variables are carried into the thread, as with run_blocking.
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(
+        get_provider_executor(provider), functools.partial(context.run, func, *args, **kwargs)
+    )
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """
+    Return the shared process pool used for CPU-bound work such as audio decoding.
+    The pool is created on first use and sized by PROCESS_POOL_WORKERS (default: CPU count).
+    Workers are spawned rather than forked, since the server process runs threads.
+    """
+    global _process_pool
+    if _process_pool is None:
+        with _executor_lock:
+            if _process_pool is None:
+                workers = int(os.getenv("PROCESS_POOL_WORKERS", "0")) or os.cpu_count() or 1
+                _process_pool = ProcessPoolExecutor(
+                    max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+                )
+                logger.info(f"Process pool started with {workers} workers")
+    return _process_pool
+
+
+async def run_in_process(func: Callable[..., Any], *args) -> Any:
+    """
+    Run a CPU-bound function on the shared process pool. The function and its
+    arguments must be picklable (i.e. a module-level function).
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_process_pool(), func, *args)
+
+
+def shutdown_executor(wait: bool = True) -> None:
+    """
+    Shut down the shared executor, the API executors and the process pool.
+    New ones are created on next use.
+    """
+    global _executor, _process_pool
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=wait)
+            _executor = None
+        for executor in _provider_executors.values():
+            executor.shutdown(wait=wait)
+        _provider_executors.clear()
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=wait)
+            _process_pool = None
+
+
+def _reset_after_fork() -> None:
+    # The pools' threads and processes stay with the parent; a forked server
+    # worker creates its own on first use
+    global _executor, _process_pool, _executor_lock
+    _executor = None
+    _process_pool = None
+    _provider_executors.clear()
+    _executor_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
@@ -0,0 +1,489 @@
+import math
+import re
+from difflib import SequenceMatcher
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from services.transcript_chunker import normalize_action_item
+
+logger = logging.getLogger(__name__)
+
+# TextRank: damping factor and power iteration limits
+DAMPING = 0.85
+MAX_ITERATIONS = 100
+TOLERANCE = 1e-6
+# Sentences with fewer content words are not picked for a summary ("Okay, sounds good.")
+MIN_CONTENT_WORDS = 4
+# A sentence this similar (cosine) to one already picked adds nothing new
+REDUNDANCY = 0.5
+# Short transcripts are summarized in at most this share of their sentences
+MAX_SENTENCE_SHARE = 0.3
+# Action items whose tasks (without the deadline) are this similar are one item
+TASK_SIMILARITY = 0.85
+
+STOPWORDS = frozenset(
+    "a about above after again against all also am an and any are as at be because been before being below "
+    "between both but by can could did do does doing down during each few for from further had has have having "
+    "he her here hers him his how i if in into is it its itself just let lets me more most my no nor not now of "
+    "off on once only or other our ours out over own same she should so some such than that the their them then "
+    "there these they this those through to too under until up very was we were what when where which while who "
+    "whom why will with would you your yours yeah yes okay ok oh um uh hmm like know think mean really right well "
+    "gonna wanna kind sort thing things stuff actually basically maybe probably going get got go said say says "
+    "one two lot bit good great sure thanks thank guys everyone".split()
+)
+
+# Verbs after "will", "needs to", ... that do not describe a task ("we will be fine", "I should think")
+NON_TASK_VERBS = frozenset(
+    "be been have had see know think feel like love want need hope guess mean say said wonder remember believe "
+    "probably definitely maybe not never always still also just really actually happen seem become get keep "
+    "continue start stop go come".split()
+)
+# Capitalised words that start a "<owner> will ..." match without naming anyone
+NON_OWNERS = frozenset(
+    "it this that there these those they he she what which who everything nothing something someone anyone "
+    "everyone nobody somebody anybody".split()
+)
+NUMBER_WORDS = r"(?:a|an|one|two|three|four|five|six|\d+)"
+
+_SPEAKER = re.compile(r"^\s*(?P<speaker>Speaker\s+\w+|[A-Z][\w.'-]*(?:\s+[A-Z][\w.'-]*){0,2})\s*:\s+")
+_LIST_MARKER = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s+")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_NUMBER = re.compile(r"\d+")
+_WORD = re.compile(r"[a-z][a-z0-9'’]*|\d+")
+
+_WEEKDAY = r"(?:monday|tuesday|wednesday|thursday|friday|saturday|sunday)"
+_MONTH = (r"(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?|"
+          r"sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)")
+_DATE = rf"(?:{_MONTH}\.?\s+\d{{1,2}}(?:st|nd|rd|th)?|\d{{1,2}}(?:st|nd|rd|th)?\s+(?:of\s+)?{_MONTH}|\d{{1,2}}/\d{{1,2}}(?:/\d{{2,4}})?)"
+_PERIOD = r"(?:day|week|month|quarter|year|sprint)"
+_WHEN = (rf"(?:(?:next|this)\s+(?:{_WEEKDAY}|{_PERIOD})|{_WEEKDAY}|{_DATE}|tomorrow|tonight|today|eod|eow|"
+         rf"(?:the\s+)?end\s+of\s+(?:the\s+)?(?:{_PERIOD}|{_MONTH})|q[1-4])")
+DEADLINE = re.compile(
+    rf"\b(?:(?:by|before|until|due|no\s+later\s+than|on)\s+{_WHEN}"
+    rf"|(?:by|before|for)\s+the\s+(?:\w+\s+){{0,2}}(?:meeting|review|launch|release|deadline|call|standup|offsite|demo)"
+    rf"|(?:next|this)\s+(?:{_WEEKDAY}|{_PERIOD})|tomorrow|tonight|(?:the\s+)?end\s+of\s+(?:the\s+)?{_PERIOD}"
+    rf"|(?:with)?in\s+{NUMBER_WORDS}\s+(?:days?|weeks?|months?))\b",
+    re.IGNORECASE,
+)
+
+_OWNER = r"(?P<owner>I|[Ww]e|(?:[Tt]he\s+)?(?:[A-Za-z]+\s+)?team|[A-Z][\w'-]*(?:\s+[A-Z][\w'-]*)?)"
+_MODAL = (r"(?:\s*['’](?:ll|(?:s|m|re)\s+(?:going\s+to|gonna))|"
+          r"\s+(?:will|shall|must|should|needs?\s+to|has\s+to|have\s+to|(?:is|are|am)\s+(?:going\s+to|gonna)))")
+_ADVERBS = r"(?:(?:also|then|just|quickly|first|still|please|definitely|personally)\s+)*"
+# "<owner> will|needs to|is going to <verb> ..."
+COMMITMENT = re.compile(rf"\b{_OWNER}{_MODAL}\s+{_ADVERBS}(?P<verb>[a-z]+)\b(?P<rest>[^.!?;]*)")
+# "<name>, can you <verb> ..."
+REQUEST = re.compile(
+    rf"(?:\b(?P<owner>[A-Z][\w'-]*),\s*)?\b(?:[Cc]an|[Cc]ould|[Ww]ould)\s+you\s+{_ADVERBS}(?P<verb>[a-z]+)\b(?P<rest>[^.!?;]*)"
+)
+# "Action item: ...", "Next step - ..."
+EXPLICIT = re.compile(r"\b(?:action\s+items?|to-?do|next\s+steps?)\s*[:\-–]\s*(?P<rest>[^.!?;]{8,})", re.IGNORECASE)
+
+
+class Sentence:
+    """
+    One sentence of a transcript with the speaker who said it, if labelled
+    """
+
+    __slots__ = ("index", "turn", "speaker", "text")
+
+    def __init__(self, index: int, turn: int, speaker: Optional[str], text: str):
+        self.index = index
+        self.turn = turn
+        self.speaker = speaker
+        self.text = text
+
+
+def split_sentences(transcript: str) -> List[Sentence]:
+    """
+    Split a transcript into sentences, keeping track of speaker turns. Lines of
+    the form "Speaker A: ..." or "Sarah: ..." start a new turn; any other line
+    continues the previous speaker's turn.
+    """
+    sentences: List[Sentence] = []
+    speaker = None
+    turn = -1
+    for line in transcript.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        labelled = _SPEAKER.match(line)
+        if labelled:
+            speaker = labelled.group("speaker")
+            line = line[labelled.end():]
+            turn += 1
+        elif turn < 0:
+            turn = 0
+        line = _LIST_MARKER.sub("", line)
+        for text in _SENTENCE_END.split(line):
+            text = text.strip()
+            if text:
+                sentences.append(Sentence(len(sentences), turn, speaker, text))
+    return sentences
+
+
+def _tokens(text: str) -> List[str]:
+    return [word for word in _WORD.findall(text.lower()) if word not in STOPWORDS and len(word) > 1]
+
+
+class TermMatrix:
+    """
+    Sparse TF-IDF sentence-term matrix in coordinate form, with rows (sentences)
+    L2-normalised so that row dot products are cosine similarities
+    """
+
+    def __init__(self, token_lists: List[List[str]]):
+        vocabulary: Dict[str, int] = {}
+        row_ids: List[int] = []
+        term_ids: List[int] = []
+        for row, tokens in enumerate(token_lists):
+            for token in tokens:
+                term_ids.append(vocabulary.setdefault(token, len(vocabulary)))
+            row_ids.extend([row] * len(tokens))
+
+        self.shape = (len(token_lists), max(1, len(vocabulary)))
+        sentences, terms = self.shape
+        # Count repeated terms within a sentence; keys come out sorted by row
+        keys, counts = np.unique(np.asarray(row_ids, dtype=np.int64) * terms + np.asarray(term_ids, dtype=np.int64),
+                                 return_counts=True)
+        self.rows = keys // terms
+        self.cols = keys % terms
+        document_frequency = np.bincount(self.cols, minlength=terms)
+        idf = np.log((1 + sentences) / (1 + document_frequency)) + 1
+        values = (1 + np.log(counts)) * idf[self.cols]
+        norms = np.sqrt(np.bincount(self.rows, weights=values * values, minlength=sentences))
+        self.values = values / norms[self.rows]
+        self.row_starts = np.searchsorted(self.rows, np.arange(sentences + 1))
+        # Cosine similarity of each non-empty sentence with itself
+        self.diagonal = (norms > 0).astype(np.float64)
+
+    def similarity_dot(self, vector: np.ndarray) -> np.ndarray:
+        """
+        (S - diag(S)) @ vector for the sentence similarity matrix S = X X^T,
+        computed from the sparse factors without building S
+        """
+        sentences, terms = self.shape
+        projected = np.bincount(self.cols, weights=self.values * vector[self.rows], minlength=terms)
+        return np.bincount(self.rows, weights=self.values * projected[self.cols], minlength=sentences) - self.diagonal * vector
+
+    def row(self, index: int) -> Dict[int, float]:
+        start, end = self.row_starts[index], self.row_starts[index + 1]
+        return dict(zip(self.cols[start:end].tolist(), self.values[start:end].tolist()))
+
+
+def textrank(matrix: TermMatrix) -> np.ndarray:
+    """
+    TextRank scores: PageRank over the graph of sentences weighted by their
+    TF-IDF cosine similarity. Each power iteration is two sparse products, so a
+    multi-hour transcript takes milliseconds rather than a dense n x n matrix.
+    """
+    sentences = matrix.shape[0]
+    if sentences == 0:
+        return np.zeros(0)
+    degree = matrix.similarity_dot(np.ones(sentences))
+    connected = degree > 1e-12
+    inverse_degree = np.where(connected, 1 / np.where(connected, degree, 1), 0)
+    scores = np.full(sentences, 1 / sentences)
+    for _ in range(MAX_ITERATIONS):
+        # Sentences sharing no terms with any other spread their score evenly
+        dangling = scores[~connected].sum()
+        updated = (1 - DAMPING) / sentences + DAMPING * (matrix.similarity_dot(scores * inverse_degree) + dangling / sentences)
+        if np.abs(updated - scores).sum() < TOLERANCE:
+            return updated
+        scores = updated
+    return scores
+
+
+def _same_task(a: Tuple[str, str], b: Tuple[str, str]) -> bool:
+    """
+    Whether two (verb, normalized task) pairs are the same task. Tasks are short,
+    so a different verb ("review" / "prepare the report") is a different task.
+    """
+    if a[0] != b[0]:
+        return False
+    if a[1] == b[1]:
+        return True
+    # Tasks that mention different numbers (amounts, ticket ids) are distinct
+    if _NUMBER.findall(a[1]) != _NUMBER.findall(b[1]):
+        return False
+    return SequenceMatcher(None, a[1], b[1]).ratio() >= TASK_SIMILARITY
+
+
+def _cosine(a: Dict[int, float], b: Dict[int, float]) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(value * b.get(term, 0.0) for term, value in a.items())
+
+
+class ExtractiveAnalysis:
+    """
+    Sentences, TF-IDF matrix and TextRank scores of one transcript, computed once
+    and shared by the summary, the action items and the condensed transcript
+    """
+
+    def __init__(self, transcript: str):
+        self.sentences = split_sentences(transcript)
+        tokens = [_tokens(sentence.text) for sentence in self.sentences]
+        self.content_words = np.fromiter((len(words) for words in tokens), dtype=np.int64, count=len(tokens))
+        self.matrix = TermMatrix(tokens)
+        self.scores = textrank(self.matrix)
+
+    def ranked(self) -> List[int]:
+        """
+        Sentence indexes from the most to the least central
+        """
+        return np.argsort(-self.scores, kind="stable").tolist()
+
+    def summary_sentences(self, max_words: int) -> List[Sentence]:
+        """
+        The most central sentences, skipping near repeats, up to max_words, in transcript order
+        """
+        limit = max(1, math.ceil(len(self.sentences) * MAX_SENTENCE_SHARE))
+        picked: List[int] = []
+        picked_vectors: List[Dict[int, float]] = []
+        words = 0
+        for index in self.ranked():
+            if len(picked) >= limit or words >= max_words:
+                break
+            # Questions rarely summarize anything on their own
+            if self.content_words[index] < MIN_CONTENT_WORDS or self.sentences[index].text.endswith("?"):
+                continue
+            vector = self.matrix.row(index)
+            if any(_cosine(vector, other) > REDUNDANCY for other in picked_vectors):
+                continue
+            length = len(self.sentences[index].text.split())
+            if picked and words + length > max_words:
+                continue
+            picked.append(index)
+            picked_vectors.append(vector)
+            words += length
+        return [self.sentences[index] for index in sorted(picked)]
+
+    def summary(self, max_words: int = 150, paragraphs: int = 3) -> str:
+        """
+        Extractive summary: the picked sentences in order, split into up to
+        `paragraphs` paragraphs at the largest gaps in the transcript
+        """
+        picked = self.summary_sentences(max_words)
+        if not picked:
+            return ""
+        gaps = sorted(range(1, len(picked)), key=lambda i: picked[i].index - picked[i - 1].index, reverse=True)
+        breaks = set(gaps[:paragraphs - 1])
+        parts: List[List[str]] = [[]]
+        for i, sentence in enumerate(picked):
+            if i in breaks:
+                parts.append([])
+            text = sentence.text
+            parts[-1].append(text if text[-1] in ".!?" else f"{text}.")
+        return "\n\n".join(" ".join(part) for part in parts)
+
+    def action_items(self) -> List[Dict[str, Any]]:
+        """
+        Rule-based action items, see extract_action_items
+        """
+        items = []
+        for sentence in self.sentences:
+            item = detect_action_item(sentence)
+            if item:
+                items.append(item)
+        # The same task is often mentioned twice, once loosely ("we need to send
+        # the deck") and once firmly ("Sarah will send the deck by Friday"); the
+        # mention with a named owner and a deadline wins. Tasks of different
+        # named owners are never merged.
+        preferred = sorted(items, key=lambda item: (item["owner"] in (None, "The team"), item["deadline"] is None))
+        kept_tasks: Dict[Optional[str], List[Tuple[str, str]]] = {}
+        deduped = []
+        for item in preferred:
+            task = (item["verb"], normalize_action_item(DEADLINE.sub("", item["task"])))
+            named = item["owner"] not in (None, "The team")
+            candidates = kept_tasks.get(item["owner"], []) if named else [
+                other for tasks in kept_tasks.values() for other in tasks]
+            if any(_same_task(task, other) for other in candidates):
+                continue
+            kept_tasks.setdefault(item["owner"], []).append(task)
+            deduped.append(item)
+        return sorted(deduped, key=lambda item: item["sentence"])
+
+    def condensed(self, max_chars: int) -> str:
+        """
+        The transcript shortened to about max_chars: sentences that look like
+        action items first, then the most central ones, kept in their original
+        order under their speaker labels, with "[...]" where text was left out
+        """
+        action_sentences = {sentence.index for sentence in self.sentences if detect_action_item(sentence)}
+        order = sorted(action_sentences, key=lambda index: -self.scores[index])
+        order += [index for index in self.ranked() if index not in action_sentences]
+        kept, used, seen = [], 0, set()
+        for index in order:
+            sentence = self.sentences[index]
+            # Boilerplate repeated word for word ("Can everyone hear me?") is kept once
+            start, end = self.matrix.row_starts[index], self.matrix.row_starts[index + 1]
+            terms = self.matrix.cols[start:end].tobytes()
+            if index not in action_sentences and terms in seen:
+                continue
+            # Count the speaker label and a "[...]" marker as if each sentence needed them
+            length = len(sentence.text) + len(sentence.speaker or "") + 8
+            if used + length > max_chars:
+                continue
+            seen.add(terms)
+            kept.append(index)
+            used += length
+
+        lines: List[str] = []
+        previous: Optional[Sentence] = None
+        for index in sorted(kept):
+            sentence = self.sentences[index]
+            contiguous = previous is not None and sentence.index == previous.index + 1
+            if contiguous and sentence.turn == previous.turn:
+                lines[-1] += " " + sentence.text
+            else:
+                if not contiguous and sentence.index > 0:
+                    lines.append("[...]")
+                lines.append(f"{sentence.speaker}: {sentence.text}" if sentence.speaker else sentence.text)
+            previous = sentence
+        if previous is not None and previous.index < len(self.sentences) - 1:
+            lines.append("[...]")
+        return "\n".join(lines)
+
+
+def _owner(owner: Optional[str], speaker: Optional[str]) -> Optional[str]:
+    """
+    Resolve who an action item belongs to: "I" is the speaker, "we" the team
+    """
+    if owner is None:
+        return None
+    words = owner.split()
+    # "Then Sarah will ..." / "So the team will ..." - drop a leading filler word
+    while len(words) > 1 and words[0].lower() in STOPWORDS and words[0].lower() not in ("the",):
+        words = words[1:]
+    owner = " ".join(words)
+    lowered = owner.lower()
+    if lowered == "i":
+        return speaker or "Speaker"
+    if lowered == "we":
+        return "The team"
+    if lowered in NON_OWNERS or lowered in STOPWORDS:
+        return ""
+    return owner[0].upper() + owner[1:]
+
+
+def detect_action_item(sentence: Sentence) -> Optional[Dict[str, Any]]:
+    """
+    Match one sentence against the action item rules
+
+    Returns:
+        Dict with the item "text" ("<owner> will <task>"), "owner" (None if
+        nobody was named), "verb", "task", "deadline" (None if none was
+        mentioned), "speaker" and "sentence" (index in the transcript),
+        or None if the sentence is not an action item
+    """
+    text = sentence.text
+    owner = verb = None
+    match = None
+    if not text.endswith("?"):
+        for candidate in COMMITMENT.finditer(text):
+            if candidate.group("verb") in NON_TASK_VERBS:
+                continue
+            owner = _owner(candidate.group("owner"), sentence.speaker)
+            if owner == "":
+                continue
+            match, verb = candidate, candidate.group("verb")
+            break
+    if match is None:
+        candidate = REQUEST.search(text)
+        if candidate and candidate.group("verb") not in NON_TASK_VERBS:
+            match, verb = candidate, candidate.group("verb")
+            owner = _owner(candidate.group("owner"), sentence.speaker)
+    if match is None:
+        candidate = EXPLICIT.search(text)
+        if not candidate:
+            return None
+        rest = candidate.group("rest").strip()
+        nested = detect_action_item(Sentence(sentence.index, sentence.turn, sentence.speaker, rest))
+        if nested:
+            return nested
+        deadline = DEADLINE.search(rest)
+        return {
+            "text": rest[0].upper() + rest[1:],
+            "owner": None,
+            "verb": rest.split()[0].lower(),
+            "task": rest,
+            "deadline": deadline.group(0) if deadline else None,
+            "speaker": sentence.speaker,
+            "sentence": sentence.index,
+        }
+
+    task = f"{verb}{match.group('rest')}".strip().rstrip(",:- ")
+    if len(task.split()) < 2:
+        return None
+    deadline = DEADLINE.search(task)
+    if owner:
+        item_text = f"{owner} will {task}"
+    else:
+        item_text = task[0].upper() + task[1:]
+    return {
+        "text": item_text,
+        "owner": owner or None,
+        "verb": verb,
+        "task": task,
+        "deadline": deadline.group(0) if deadline else None,
+        "speaker": sentence.speaker,
+        "sentence": sentence.index,
+    }
+
+
+def summarize(transcript: str, max_words: int = 150) -> Dict[str, Any]:
+    """
+    Summarize a transcript and extract its action items without calling a model
+
+    Args:
+        transcript: Raw transcript text
+        max_words: Upper bound on the length of the summary
+
+    Returns:
+        Dict with "summary", "action_items" (strings, as from Gemini) and
+        "action_item_details" (owner, verb, deadline of each item)
+    """
+    analysis = ExtractiveAnalysis(transcript)
+    details = analysis.action_items()
+    return {
+        "summary": analysis.summary(max_words),
+        "action_items": [item["text"] for item in details],
+        "action_item_details": details,
+    }
+
+
+def extract_action_items(transcript: str) -> List[Dict[str, Any]]:
+    """
+    Rule-based action item extraction: commitments ("Sarah will send ...",
+    "I'll ...", "we need to ..."), requests ("John, can you ...") and explicit
+    "Action item: ..." notes, each with its owner, verb and deadline
+
+    Args:
+        transcript: Raw transcript text
+
+    Returns:
+        List of action item dicts (see detect_action_item), near duplicates removed
+    """
+    return ExtractiveAnalysis(transcript).action_items()
+
+
+def condense(transcript: str, max_chars: int) -> str:
+    """
+    Shorten a transcript to about max_chars by keeping the sentences that look
+    like action items and the most central ones, so that a long meeting fits
+    in a single model prompt
+
+    Args:
+        transcript: Raw transcript text
+        max_chars: Target length of the condensed transcript
+
+    Returns:
+        The transcript itself if it is already short enough, otherwise the
+        condensed transcript
+    """
+    if len(transcript) <= max_chars:
+        return transcript
+    return ExtractiveAnalysis(transcript).condensed(max_chars)
@@ -0,0 +1,349 @@
+import asyncio
+import os
+import socket
+import time
+import uuid
+import logging
+from typing import Dict, List, Optional, Any
+
+from services.job_store import JobStore, JobStatus, new_job, public_view
+from services.meeting_store import MeetingStore
+from services.pipeline import MeetingPipeline
+from services.events import EventBroadcaster
+from services.executor import run_blocking
+from services.metrics import JOBS_QUEUED, current_trace_id, new_trace_id, trace_id_var, track
+from services.resilience import deadline, remaining
+
+logger = logging.getLogger(__name__)
+
+
+def _process_gone(owner: str) -> bool:
+    """
+    Whether the worker process that owns a job is known to have exited: only
+    decidable for owners on this host, others wait for their lease to run out
+    """
+    host, _, rest = owner.partition(":")
+    pid = rest.partition(":")[0]
+    if host != socket.gethostname() or not pid.isdigit():
+        return False
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return True
+    except OSError:
+        return False
+    return False
+
+
+class JobQueue:
+    """
+    Bounded worker pool that runs the transcription and summarization pipeline
+    for queued jobs in the background
+    """
+
+    def __init__(
+        self,
+        store: Optional[JobStore],
+        pipeline: MeetingPipeline,
+        workers: int = 4,
+        transcription_concurrency: int = 2,
+        summarization_concurrency: int = 2,
+        events: Optional[EventBroadcaster] = None,
+        job_timeout: Optional[float] = None,
+        meetings: Optional[MeetingStore] = None,
+        lease: float = 60.0,
+    ):
+        # May be given later, before start(), when the store is opened after fork()
+        self.store = store
+        self.pipeline = pipeline
+        self.events = events
+        self.workers = max(1, workers)
+        self.transcription_concurrency = max(1, transcription_concurrency)
+        self.summarization_concurrency = max(1, summarization_concurrency)
+        # Deadline for running one job, counted from when a worker picks it up
+        self.job_timeout = job_timeout
+        # Completed meetings are kept here for search, under the job id
+        self.meetings = meetings
+        # Seconds a worker process's claim on a job holds without renewal; with
+        # several processes sharing a persistent store, the jobs of one that died
+        # are taken over by another once its lease runs out
+        self.lease = max(1.0, lease)
+
+        self.worker_id: Optional[str] = None
+        self._owned: set = set()
+        self._running: Dict[int, Optional[str]] = {}
+        self._draining = False
+        self._maintenance: Optional[asyncio.Task] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._transcription_slots: Optional[asyncio.Semaphore] = None
+        self._summarization_slots: Optional[asyncio.Semaphore] = None
+
+    @property
+    def depth(self) -> int:
+        """
+        Jobs waiting for a worker
+        """
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def start(self) -> None:
+        """
+        Start the worker tasks and take over jobs left unfinished by a previous
+        run or by a worker process that is gone
+        """
+        self._queue = asyncio.Queue()
+        self._transcription_slots = asyncio.Semaphore(self.transcription_concurrency)
+        self._summarization_slots = asyncio.Semaphore(self.summarization_concurrency)
+        # Started after fork(), so every worker process gets its own id
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._draining = False
+
+        await self._claim_orphans()
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        self._maintenance = asyncio.create_task(self._maintain())
+        logger.info(
+            f"Job queue started with {self.workers} workers "
+            f"(transcription={self.transcription_concurrency}, summarization={self.summarization_concurrency})"
+        )
+
+    async def stop(self) -> None:
+        """
+        Cancel all worker tasks. Jobs in progress stay unfinished in the store and
+        are resumed on the next start when the store is persistent.
+        """
+        tasks = self._tasks + ([self._maintenance] if self._maintenance else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks = []
+        self._maintenance = None
+
+    async def drain(self, timeout: float) -> None:
+        """
+        Stop taking new jobs, give the jobs in progress up to timeout seconds to
+        finish, then stop. Jobs still queued or cut off are released, so another
+        worker process (or the next start) takes them over without waiting for
+        this process's lease to run out.
+        """
+        if self._queue is None:
+            return
+        self._draining = True
+        # Idle workers would only pick up more jobs
+        for index, task in enumerate(self._tasks):
+            if self._running.get(index) is None:
+                task.cancel()
+        busy = [task for index, task in enumerate(self._tasks) if self._running.get(index) is not None]
+        if busy:
+            logger.info(f"Draining {len(busy)} jobs in progress (up to {timeout:.0f}s)")
+            _, pending = await asyncio.wait(busy, timeout=timeout)
+            if pending:
+                logger.warning(f"{len(pending)} jobs did not finish within {timeout:.0f}s and are released")
+        await self.stop()
+
+        released = 0
+        while not self._queue.empty():
+            self._owned.add(self._queue.get_nowait())
+        for job_id in self._owned:
+            job = await run_blocking(self.store.get, job_id)
+            if job is not None and job["status"] not in JobStatus.TERMINAL and job.get("owner") == self.worker_id:
+                await self._update(job_id, status=JobStatus.QUEUED, progress=0, owner=None, lease_until=0.0)
+                released += 1
+        self._owned.clear()
+        JOBS_QUEUED.set(0)
+        if released:
+            logger.info(f"Released {released} unfinished jobs")
+
+    async def submit(
+        self,
+        filename: str,
+        audio_path: str,
+        audio_sha256: Optional[str] = None,
+        audio_size: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Register a new job for an audio file already saved to disk and queue it
+
+        Args:
+            filename: Original name of the uploaded file
+            audio_path: Path of the saved audio file
+            audio_sha256: SHA-256 of the audio bytes, if known
+            audio_size: Size of the audio file in bytes, if known
+
+        Returns:
+            The created job record
+        """
+        if self._queue is None:
+            raise RuntimeError("Job queue has not been started")
+
+        if self._draining:
+            raise RuntimeError("Job queue is shutting down")
+
+        job = new_job(filename, audio_path, audio_sha256, audio_size, trace_id=current_trace_id() or new_trace_id())
+        job.update(owner=self.worker_id, lease_until=time.time() + self.lease)
+        await run_blocking(self.store.create, job)
+        self._owned.add(job["id"])
+        self._publish(job["id"], "upload_received", {"filename": filename, "size": audio_size})
+        self._queue.put_nowait(job["id"])
+        JOBS_QUEUED.set(self._queue.qsize())
+        self._publish(job["id"], "transcription_queued", {"queue_depth": self._queue.qsize()})
+        logger.info(f"Queued job {job['id']} for {filename}")
+        return job
+
+    async def _claim_orphans(self) -> None:
+        """
+        Claim unfinished jobs nobody holds a lease on and queue them here
+        """
+        for job in await run_blocking(self.store.list_unfinished):
+            if job["id"] in self._owned:
+                continue
+            job = await run_blocking(self.store.claim, job["id"], self.worker_id, self.lease, expired=_process_gone)
+            if job is None:
+                continue
+            if job.get("audio_path") and os.path.exists(job["audio_path"]):
+                logger.info(f"Resuming job {job['id']}")
+                await self._update(job["id"], status=JobStatus.QUEUED, progress=0)
+                self._owned.add(job["id"])
+                self._queue.put_nowait(job["id"])
+                JOBS_QUEUED.set(self._queue.qsize())
+            else:
+                await self._fail(job["id"], "Audio file lost during server restart")
+
+    async def _maintain(self) -> None:
+        """
+        Renew the lease on this process's jobs and take over orphaned ones,
+        several times per lease period
+        """
+        while True:
+            await asyncio.sleep(self.lease / 3)
+            try:
+                await run_blocking(self.store.renew, self.worker_id, list(self._owned), self.lease)
+                await self._claim_orphans()
+            except Exception as e:
+                logger.error(f"Job lease maintenance failed: {str(e)}")
+
+    async def _worker(self, index: int) -> None:
+        while not self._draining:
+            job_id = await self._queue.get()
+            JOBS_QUEUED.set(self._queue.qsize())
+            self._running[index] = job_id
+            try:
+                await self._run_job(job_id)
+            except Exception as e:
+                logger.error(f"Worker {index} failed job {job_id}: {str(e)}")
+                await self._fail(job_id, str(e))
+            finally:
+                self._running[index] = None
+                self._queue.task_done()
+
+    async def _run_job(self, job_id: str) -> None:
+        job = await run_blocking(self.store.get, job_id)
+        if job is None:
+            logger.warning(f"Job {job_id} disappeared from the store")
+            return
+
+        # Continue the trace of the request that submitted the job
+        trace_token = trace_id_var.set(job.get("trace_id") or new_trace_id())
+        try:
+            with track("pipeline", "job"), deadline(self.job_timeout):
+                await self._run_pipeline(job)
+        except asyncio.CancelledError:
+            # Keep the upload on disk so the job can be resumed after a restart
+            raise
+        except Exception as e:
+            logger.error(f"Error processing job {job_id}: {str(e)}")
+            await self._fail(job_id, str(e))
+        finally:
+            job = await run_blocking(self.store.get, job_id) or job
+            if job["status"] in JobStatus.TERMINAL:
+                self._owned.discard(job_id)
+                if os.path.exists(job["audio_path"]):
+                    os.unlink(job["audio_path"])
+            trace_id_var.reset(trace_token)
+
+    async def _run_pipeline(self, job: Dict[str, Any]) -> None:
+        job_id = job["id"]
+
+        async with self._transcription_slots:
+            await self._update(job_id, status=JobStatus.TRANSCRIBING, progress=10)
+            self._publish(job_id, "transcription_started")
+
+            # The callback cannot wait for the store: the report is stored once transcription returns
+            preprocessing: Dict[str, Any] = {}
+
+            def on_preprocessed(report: Dict[str, Any]) -> None:
+                preprocessing.update(report)
+                self._publish(job_id, "audio_preprocessed", report)
+
+            transcript = await self.pipeline.transcribe(
+                job["audio_path"], job["filename"], job.get("audio_sha256"), on_preprocessed
+            )
+            if preprocessing:
+                await self._update(job_id, preprocessing=preprocessing)
+
+        if not transcript:
+            await self._fail(job_id, self._with_deadline("Transcription failed"))
+            return
+        self._publish(job_id, "transcription_done", {"transcript": transcript})
+
+        def on_partial(partial: Dict[str, Any]) -> None:
+            # Streamed action items and the local preview get their own events so clients can show them right away;
+            # summary_partial is kept for chunk results, which carry chunk and chunks
+            if "preview" in partial:
+                self._publish(job_id, "summary_preview", partial["preview"])
+            elif "action_item" in partial:
+                self._publish(job_id, "action_item", partial)
+            elif "chunk" in partial:
+                self._publish(job_id, "summary_partial", partial)
+            else:
+                self._publish(job_id, "summary_text", partial)
+
+        async with self._summarization_slots:
+            await self._update(job_id, status=JobStatus.SUMMARIZING, progress=60, transcript=transcript)
+            summary_data = await self.pipeline.summarize(transcript, on_partial)
+
+        if not summary_data:
+            await self._fail(job_id, self._with_deadline("Summarization failed"))
+            return
+
+        action_items = summary_data.get("action_items", [])
+        self._publish(job_id, "action_items", {"action_items": action_items})
+        meeting_id = None
+        if self.meetings is not None:
+            meeting_id = self.meetings.save(
+                transcript,
+                summary_data.get("summary", ""),
+                action_items,
+                title=job["filename"],
+                meeting_id=job_id,
+                source="job",
+                engine=summary_data.get("engine"),
+                action_item_details=summary_data.get("action_item_details"),
+                audio_sha256=job.get("audio_sha256"),
+            )
+        job = await self._update(
+            job_id,
+            status=JobStatus.COMPLETED,
+            progress=100,
+            summary=summary_data.get("summary", ""),
+            action_items=action_items,
+            meeting_id=meeting_id,
+        )
+        self._publish(job_id, "completed", public_view(job))
+        logger.info(f"Job {job_id} completed")
+
+    def _with_deadline(self, error: str) -> str:
+        left = remaining()
+        return f"{error}: job exceeded JOB_TIMEOUT ({self.job_timeout:.0f}s)" if left is not None and left <= 0 else error
+
+    async def _update(self, job_id: str, **fields) -> Optional[Dict[str, Any]]:
+        # Store calls may wait on another worker's write lock: keep them off the event loop
+        return await run_blocking(self.store.update, job_id, **fields)
+
+    async def _fail(self, job_id: str, error: str) -> None:
+        self._owned.discard(job_id)
+        await self._update(job_id, status=JobStatus.FAILED, error=error)
+        self._publish(job_id, "failed", {"error": error})
+
+    def _publish(self, job_id: str, event_type: str, data: Optional[Dict[str, Any]] = None) -> None:
+        if self.events is not None:
+            self.events.publish(job_id, event_type, data)
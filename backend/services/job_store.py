@@ -0,0 +1,294 @@
+import json
+import sqlite3
+import threading
+import time
+import uuid
+import logging
+from typing import Dict, List, Optional, Any
+
+logger = logging.getLogger(__name__)
+
+
+class JobStatus:
+    """
+    Lifecycle states of an audio processing job
+    """
+    QUEUED = "queued"
+    TRANSCRIBING = "transcribing"
+    SUMMARIZING = "summarizing"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+    TERMINAL = (COMPLETED, FAILED)
+
+
+# Fields that only the server needs and that are never returned to clients
+PRIVATE_FIELDS = ("audio_path", "owner", "lease_until")
+
+
+def new_job(
+    filename: str,
+    audio_path: str,
+    audio_sha256: Optional[str] = None,
+    audio_size: Optional[int] = None,
+    trace_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Build a fresh job record in the queued state
+    """
+    now = time.time()
+    return {
+        "id": uuid.uuid4().hex,
+        "filename": filename,
+        "audio_path": audio_path,
+        "audio_sha256": audio_sha256,
+        "audio_size": audio_size,
+        "trace_id": trace_id,
+        "status": JobStatus.QUEUED,
+        "progress": 0,
+        "created_at": now,
+        "updated_at": now,
+        "transcript": None,
+        "summary": None,
+        "action_items": None,
+        "preprocessing": None,
+        "meeting_id": None,
+        "error": None,
+        # Worker process running the job, and until when its claim holds without renewal
+        "owner": None,
+        "lease_until": 0.0,
+    }
+
+
+def public_view(job: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Strip server-side fields from a job record before returning it to a client
+    """
+    return {key: value for key, value in job.items() if key not in PRIVATE_FIELDS}
+
+
+class JobStore:
+    """
+    Base class for job state backends
+    """
+
+    def create(self, job: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def update(self, job_id: str, **fields) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def list_unfinished(self) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def claim(self, job_id: str, owner: str, lease: float, expired=None) -> Optional[Dict[str, Any]]:
+        """
+        Take an unfinished job over for owner, unless another owner's lease
+        still holds. Atomic, so of several workers claiming the same orphaned
+        job exactly one succeeds.
+
+        Args:
+            job_id: Job to claim
+            owner: Id of the claiming worker
+            lease: Seconds the claim holds without renewal
+            expired: Optional callable(owner) telling whether an owner is known
+                to be gone, so its jobs need not wait for their lease to run out
+
+        Returns:
+            The claimed job record, or None
+        """
+        raise NotImplementedError
+
+    def renew(self, owner: str, job_ids: List[str], lease: float) -> None:
+        """
+        Extend owner's lease on the given jobs
+        """
+        for job_id in job_ids:
+            self.update(job_id, lease_until=time.time() + lease)
+
+    def reopen(self) -> None:
+        """
+        Reconnect in a process forked after the store was created
+        """
+
+
+def _claimable(job: Dict[str, Any], owner: str, expired, now: float) -> bool:
+    if job["status"] in JobStatus.TERMINAL:
+        return False
+    current = job.get("owner")
+    if current is None or current == owner or job.get("lease_until", 0.0) < now:
+        return True
+    return expired is not None and expired(current)
+
+
+class InMemoryJobStore(JobStore):
+    """
+    Job store kept in process memory. Jobs are lost when the server restarts.
+    """
+
+    def __init__(self):
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def create(self, job: Dict[str, Any]) -> None:
+        with self._lock:
+            self._jobs[job["id"]] = dict(job)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def update(self, job_id: str, **fields) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            job.update(fields)
+            job["updated_at"] = time.time()
+            return dict(job)
+
+    def list_unfinished(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [dict(job) for job in self._jobs.values() if job["status"] not in JobStatus.TERMINAL]
+
+    def claim(self, job_id: str, owner: str, lease: float, expired=None) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or not _claimable(job, owner, expired, now):
+                return None
+            job.update(owner=owner, lease_until=now + lease, updated_at=now)
+            return dict(job)
+
+
+class SQLiteJobStore(JobStore):
+    """
+    Job store backed by a SQLite database so that jobs survive restarts
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = self._connect()
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                data TEXT NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status)")
+        self._conn.commit()
+        logger.info(f"SQLite job store opened at {db_path}")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def create(self, job: Dict[str, Any]) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, status, updated_at, data) VALUES (?, ?, ?, ?)",
+                (job["id"], job["status"], job["updated_at"], json.dumps(job)),
+            )
+            self._conn.commit()
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def update(self, job_id: str, **fields) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            # Read and write in one transaction, so a claim or lease renewal by
+            # another worker in between is not overwritten with the stale record
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute("SELECT data FROM jobs WHERE id = ?", (job_id,)).fetchone()
+                if row is None:
+                    self._conn.rollback()
+                    return None
+                job = json.loads(row[0])
+                job.update(fields)
+                job["updated_at"] = time.time()
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, updated_at = ?, data = ? WHERE id = ?",
+                    (job["status"], job["updated_at"], json.dumps(job), job_id),
+                )
+                self._conn.commit()
+                return job
+            except Exception:
+                self._conn.rollback()
+                raise
+
+    def list_unfinished(self) -> List[Dict[str, Any]]:
+        placeholders = ",".join("?" for _ in JobStatus.TERMINAL)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT data FROM jobs WHERE status NOT IN ({placeholders})",
+                JobStatus.TERMINAL,
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def claim(self, job_id: str, owner: str, lease: float, expired=None) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            # The write lock is taken before reading, so two workers cannot both see the job unclaimed
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute("SELECT data FROM jobs WHERE id = ?", (job_id,)).fetchone()
+                job = json.loads(row[0]) if row else None
+                if job is None or not _claimable(job, owner, expired, now):
+                    self._conn.rollback()
+                    return None
+                job.update(owner=owner, lease_until=now + lease, updated_at=now)
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, updated_at = ?, data = ? WHERE id = ?",
+                    (job["status"], job["updated_at"], json.dumps(job), job_id),
+                )
+                self._conn.commit()
+                return job
+            except Exception:
+                self._conn.rollback()
+                raise
+
+    def renew(self, owner: str, job_ids: List[str], lease: float) -> None:
+        if not job_ids:
+            return
+        lease_until = time.time() + lease
+        with self._lock:
+            self._conn.execute(
+                f"""
+                UPDATE jobs SET data = json_set(data, '$.lease_until', ?)
+                WHERE id IN ({",".join("?" for _ in job_ids)}) AND json_extract(data, '$.owner') = ?
+                """,
+                (lease_until, *job_ids, owner),
+            )
+            self._conn.commit()
+
+    def reopen(self) -> None:
+        # Only this thread survived fork(), and the lock may have been copied while held
+        self._lock = threading.Lock()
+        # Keep the parent's connection open but unused: closing it in this process
+        # could release the locks SQLite holds through the new one
+        self._inherited = self._conn
+        self._conn = self._connect()
+
+
+def create_job_store(backend: str = "memory", db_path: str = "jobs.db") -> JobStore:
+    """
+    Create a job store for the given backend name ("memory" or "sqlite")
+    """
+    if backend == "sqlite":
+        return SQLiteJobStore(db_path)
+    if backend != "memory":
+        logger.warning(f"Unknown job store backend '{backend}', falling back to memory")
+    return InMemoryJobStore()
@@ -0,0 +1,243 @@
+import json
+import re
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Runs of characters that need no attention inside a string, per quote character
+_STRING_RUN = {'"': re.compile(r'[^"\\]+'), "'": re.compile(r"[^'\\]+")}
+# Bare words: true/false/null, numbers, and unquoted keys or values in malformed output
+_BARE_WORD = re.compile(r"[^\s,:\[\]{}\"']+")
+_SKIP = re.compile(r"[\s,:]+")
+_SURROGATE = re.compile("[\ud800-\udfff]")
+_ESCAPES = {'"': '"', "'": "'", "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+# Compact the buffer once this many characters have been consumed
+_COMPACT_AT = 1 << 16
+
+
+def _bare_value(word: str) -> Any:
+    if word == "true":
+        return True
+    if word == "false":
+        return False
+    if word == "null":
+        return None
+    try:
+        return json.loads(word)
+    except ValueError:
+        return word
+
+
+def _fix_surrogates(text: str) -> str:
+    # \uXXXX escapes outside the BMP arrive as two surrogate halves; join them into one character
+    try:
+        return text.encode("utf-16", "surrogatepass").decode("utf-16")
+    except UnicodeError:
+        return text
+
+
+class SummaryStreamParser:
+    """
+    Incremental, tolerant parser for the summarization model's JSON answer.
+
+    Text is fed in as it streams from the model. Every character is scanned once:
+    the parser keeps its place (including inside an unfinished string) between
+    feeds, so nothing is re-parsed. Events are returned as soon as the top-level
+    "summary" string or an entry of the "action_items" array is complete.
+
+    Besides valid JSON it accepts what models tend to produce: markdown fences
+    and prose around the object, missing or trailing commas, single-quoted or
+    unquoted strings, raw newlines inside strings and mismatched closing brackets.
+    Output cut off mid-way is recovered by close(), which finishes any open
+    string, array and object.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0
+        self._started = False
+        self._done = False
+        # Each frame is [container, pending key]; the key is unused for arrays
+        self._stack: List[list] = []
+        self._root: Optional[Dict[str, Any]] = None
+        # Unfinished string: quote character and the parts decoded so far
+        self._quote: Optional[str] = None
+        self._parts: List[str] = []
+        self._events: List[Tuple[str, Any]] = []
+
+    @property
+    def done(self) -> bool:
+        """
+        True once the top-level object has been closed
+        """
+        return self._done
+
+    def feed(self, text: str) -> List[Tuple[str, Any]]:
+        """
+        Consume the next piece of the response
+
+        Returns:
+            New events: ("summary", text) and ("action_item", item), in the order
+            they completed
+        """
+        if self._done or not text:
+            return []
+        self._buffer += text
+        self._scan(final=False)
+        return self._take_events()
+
+    def close(self) -> Optional[Dict[str, Any]]:
+        """
+        Finish parsing at the end of the stream, completing anything left open
+
+        Returns:
+            The parsed object, or None if the response contained no object at all
+        """
+        if not self._done:
+            self._scan(final=True)
+            if self._quote is not None:
+                self._emit_value(self._finish_string())
+            while self._stack:
+                self._close_container()
+        self._done = True
+        return self._root
+
+    def events(self) -> List[Tuple[str, Any]]:
+        """
+        Events produced by close() that have not been returned yet
+        """
+        return self._take_events()
+
+    def _take_events(self) -> List[Tuple[str, Any]]:
+        events, self._events = self._events, []
+        return events
+
+    def _scan(self, final: bool) -> None:
+        buffer = self._buffer
+        pos = self._pos
+        end = len(buffer)
+
+        if not self._started:
+            start = buffer.find("{", pos)
+            if start < 0:
+                # Keep nothing of the leading prose or fences
+                self._buffer, self._pos = "", 0
+                return
+            self._started = True
+            self._stack.append([{}, None])
+            self._root = self._stack[0][0]
+            pos = start + 1
+
+        while pos < end and not self._done:
+            if self._quote is not None:
+                pos = self._scan_string(buffer, pos, final)
+                if self._quote is not None:
+                    break
+                continue
+
+            skip = _SKIP.match(buffer, pos)
+            if skip:
+                pos = skip.end()
+                if pos >= end:
+                    break
+
+            char = buffer[pos]
+            if char in "\"'":
+                self._quote = char
+                self._parts = []
+                pos += 1
+            elif char == "{" or char == "[":
+                self._stack.append([{} if char == "{" else [], None])
+                pos += 1
+            elif char == "}" or char == "]":
+                self._close_bracket(char)
+                pos += 1
+            else:
+                word = _BARE_WORD.match(buffer, pos)
+                if word.end() == end and not final:
+                    # The word may continue in the next piece
+                    break
+                self._emit_value(_bare_value(word.group()))
+                pos = word.end()
+
+        if pos >= _COMPACT_AT or pos == end:
+            self._buffer, self._pos = buffer[pos:], 0
+        else:
+            self._pos = pos
+
+    def _scan_string(self, buffer: str, pos: int, final: bool) -> int:
+        run = _STRING_RUN[self._quote]
+        end = len(buffer)
+        while pos < end:
+            match = run.match(buffer, pos)
+            if match:
+                self._parts.append(match.group())
+                pos = match.end()
+                continue
+            char = buffer[pos]
+            if char == self._quote:
+                self._emit_value(self._finish_string())
+                return pos + 1
+            # Backslash escape
+            if pos + 1 >= end:
+                return end if final else pos
+            code = buffer[pos + 1]
+            if code == "u":
+                if pos + 6 > end and not final:
+                    return pos
+                try:
+                    self._parts.append(chr(int(buffer[pos + 2:pos + 6], 16)))
+                    pos += 6
+                except ValueError:
+                    self._parts.append(buffer[pos + 1:pos + 6])
+                    pos += 6
+            else:
+                self._parts.append(_ESCAPES.get(code, code))
+                pos += 2
+        return pos
+
+    def _finish_string(self) -> str:
+        text = "".join(self._parts)
+        self._quote = None
+        self._parts = []
+        return _fix_surrogates(text) if _SURROGATE.search(text) else text
+
+    def _close_bracket(self, char: str) -> None:
+        wanted = dict if char == "}" else list
+        # A stray closer closes everything up to the nearest matching container
+        if not any(isinstance(frame[0], wanted) for frame in self._stack):
+            return
+        while self._stack:
+            container = self._stack[-1][0]
+            self._close_container()
+            if isinstance(container, wanted):
+                break
+
+    def _close_container(self) -> None:
+        container, _ = self._stack.pop()
+        if not self._stack:
+            self._done = True
+            return
+        self._emit_value(container)
+
+    def _emit_value(self, value: Any) -> None:
+        frame = self._stack[-1]
+        container = frame[0]
+        if isinstance(container, list):
+            container.append(value)
+            if len(self._stack) == 2 and self._stack[0][1] == "action_items":
+                self._events.append(("action_item", value))
+            return
+        if frame[1] is None:
+            # Key position; a container here has no key to live under and is dropped
+            if isinstance(value, (dict, list)):
+                return
+            frame[1] = value if isinstance(value, str) else str(value)
+            return
+        key = frame[1]
+        container[key] = value
+        if len(self._stack) == 1 and key == "summary" and isinstance(value, str):
+            self._events.append(("summary", value))
+        frame[1] = None
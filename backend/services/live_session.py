@@ -0,0 +1,160 @@
+import asyncio
+import time
+import uuid
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from services.transcript_chunker import dedupe_action_items
+
+logger = logging.getLogger(__name__)
+
+
+class LiveMeetingSession:
+    """
+    Rolling summary and action-item list for a meeting that is still in progress.
+
+    Transcript segments are buffered and folded into the state by calling
+    SummarizationAgent.update_rolling_summary with only the previous state and
+    the new text. Segments that arrive while an update is running are coalesced
+    into the next update, and the summary is capped, so per-update latency stays
+    flat as the meeting gets longer. When text arrives faster than updates
+    finish, the buffer is bounded by dropping its oldest text.
+    """
+
+    def __init__(
+        self,
+        summarization_agent,
+        on_update: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None,
+        min_update_chars: int = 800,
+        max_update_chars: int = 6000,
+        max_summary_chars: int = 3000,
+        max_buffer_chars: int = 24000,
+    ):
+        self.id = uuid.uuid4().hex
+        self.summarization_agent = summarization_agent
+        self.on_update = on_update
+        self.min_update_chars = min_update_chars
+        self.max_update_chars = max_update_chars
+        self.max_summary_chars = max_summary_chars
+        self.max_buffer_chars = max(max_update_chars, max_buffer_chars)
+
+        self.summary = ""
+        self.action_items: List[str] = []
+        self.segments = 0
+        self.transcript_chars = 0
+        self.updates = 0
+        # Transcript text dropped unsummarized because updates could not keep up
+        self.skipped_chars = 0
+
+        self._buffer: List[str] = []
+        self._buffer_chars = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def add_segment(self, text: str, speaker: Optional[str] = None) -> None:
+        """
+        Add a partial transcript segment. Never waits for the model; an update is
+        scheduled in the background once enough new text has accumulated.
+        """
+        text = text.strip()
+        if not text:
+            return
+        if speaker:
+            text = f"{speaker}: {text}"
+        self._buffer.append(text)
+        self._buffer_chars += len(text) + 1
+        self.segments += 1
+        self.transcript_chars += len(text) + 1
+        self._bound_buffer()
+
+        if self._buffer_chars >= self.min_update_chars and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._run_updates())
+
+    async def finish(self) -> Dict[str, Any]:
+        """
+        Wait for the running update, fold in any remaining text and return the final state
+        """
+        if self._task is not None:
+            await self._task
+        while self._buffer:
+            await self._update_once()
+        return self.snapshot()
+
+    async def cancel(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "session_id": self.id,
+            "summary": self.summary,
+            "action_items": list(self.action_items),
+            "segments": self.segments,
+            "transcript_chars": self.transcript_chars,
+            "updates": self.updates,
+            "skipped_chars": self.skipped_chars,
+        }
+
+    async def _run_updates(self) -> None:
+        while self._buffer_chars >= self.min_update_chars:
+            await self._update_once()
+
+    def _bound_buffer(self) -> None:
+        # The newest text matters most to a live view: drop from the front
+        skipped = 0
+        while self._buffer_chars > self.max_buffer_chars and len(self._buffer) > 1:
+            segment = self._buffer.pop(0)
+            self._buffer_chars -= len(segment) + 1
+            skipped += len(segment) + 1
+        if skipped:
+            self.skipped_chars += skipped
+            logger.warning(f"Live session {self.id}: updates are behind, skipped {skipped} chars of transcript")
+
+    def _take_buffer(self) -> str:
+        taken: List[str] = []
+        taken_chars = 0
+        while self._buffer and (not taken or taken_chars + len(self._buffer[0]) <= self.max_update_chars):
+            segment = self._buffer.pop(0)
+            if len(segment) > self.max_update_chars:
+                # Oversized segment: process the head now, keep the rest for the next update
+                self._buffer.insert(0, segment[self.max_update_chars:])
+                segment = segment[: self.max_update_chars]
+            taken.append(segment)
+            taken_chars += len(segment) + 1
+        self._buffer_chars = sum(len(segment) + 1 for segment in self._buffer)
+        return "\n".join(taken)
+
+    async def _update_once(self) -> None:
+        new_text = self._take_buffer()
+        if not new_text:
+            return
+
+        start = time.perf_counter()
+        result = await self.summarization_agent.update_rolling_summary(self.summary, self.action_items, new_text)
+        latency = time.perf_counter() - start
+        if not result:
+            logger.warning(f"Live session {self.id}: update failed, keeping previous state")
+            return
+
+        before = len(self.action_items)
+        self.action_items = dedupe_action_items(self.action_items + list(result.get("action_items", [])))
+        self.summary = self._cap_summary(result.get("summary") or self.summary)
+        self.updates += 1
+
+        if self.on_update is not None:
+            await self.on_update({
+                **self.snapshot(),
+                "new_action_items": self.action_items[before:],
+                "latency_ms": round(latency * 1000, 1),
+            })
+
+    def _cap_summary(self, summary: str) -> str:
+        summary = summary.strip()
+        if len(summary) <= self.max_summary_chars:
+            return summary
+        # Keep the end: a summary extended update by update (the local engine) has its
+        # newest text there, and cutting it would freeze the summary once it is full
+        cut = summary[-self.max_summary_chars:]
+        # Prefer starting on a sentence boundary
+        start = cut.find(". ")
+        return cut[start + 2:] if 0 <= start < self.max_summary_chars // 2 else cut
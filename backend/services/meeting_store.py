@@ -0,0 +1,681 @@
+import queue
+import re
+import sqlite3
+import threading
+import time
+import uuid
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from services.metrics import MEETINGS_STORED, track
+
+logger = logging.getLogger(__name__)
+
+# Stored in PRAGMA user_version; the schema is created when the database has another version
+SCHEMA_VERSION = 1
+SEARCH_SCOPES = ("transcripts", "summaries", "action_items")
+SNIPPET_TOKENS = 16
+HIGHLIGHT = ("<mark>", "</mark>")
+
+_QUERY_TERM = re.compile(r'"([^"]*)"|(\S+)')
+_TOKEN_CHARS = re.compile(r"[\w']+\*?")
+_SEGMENT_BREAKS = ("\n", ". ", "? ", "! ", " ")
+
+
+def fts_query(text: str) -> str:
+    """
+    Turn free text into an FTS5 query: every word (or "quoted phrase") must
+    appear; a trailing * matches prefixes. Operators and punctuation in the
+    input are treated as text, so user input can never be a syntax error.
+    """
+    terms = []
+    for phrase, word in _QUERY_TERM.findall(text):
+        if phrase:
+            tokens = _TOKEN_CHARS.findall(phrase)
+            if tokens:
+                terms.append('"' + " ".join(token.rstrip("*") for token in tokens) + '"')
+            continue
+        for token in _TOKEN_CHARS.findall(word):
+            prefix = token.endswith("*")
+            token = token.rstrip("*").replace("'", " ").strip()
+            if token:
+                terms.append(f'"{token}"' + ("*" if prefix else ""))
+    return " ".join(terms)
+
+
+def split_segments(transcript: str, max_chars: int) -> List[str]:
+    """
+    Cut a transcript into consecutive pieces of at most max_chars, at line
+    breaks where possible, else after a sentence or a word. The pieces join
+    back into the exact transcript.
+    """
+    segments = []
+    start = 0
+    while len(transcript) - start > max_chars:
+        window = transcript[start:start + max_chars]
+        cut = 0
+        for separator in _SEGMENT_BREAKS:
+            position = window.rfind(separator)
+            if position > max_chars // 4:
+                cut = position + len(separator)
+                break
+        cut = cut or max_chars
+        segments.append(transcript[start:start + cut])
+        start += cut
+    if start < len(transcript) or not segments:
+        segments.append(transcript[start:])
+    return segments
+
+
+def item_details(text: str) -> Dict[str, Optional[str]]:
+    """
+    Owner and deadline of an action item written as a sentence
+    ("Sarah will send the notes by Friday"), from the local engine's rules
+    """
+    # The local engine's rules come with numpy; import them on first use, not at server start
+    from services.extractive_summary import Sentence, detect_action_item
+
+    detected = detect_action_item(Sentence(0, 0, None, text.strip()))
+    if not detected:
+        return {"owner": None, "deadline": None}
+    return {"owner": detected["owner"], "deadline": detected["deadline"]}
+
+
+def parse_date(value: Optional[str], end: bool = False) -> Optional[float]:
+    """
+    Timestamp of an ISO date or datetime; a bare end date includes that whole day
+
+    Raises:
+        ValueError: if the value is not an ISO date
+    """
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value)
+    timestamp = parsed.timestamp()
+    if end and len(value) == 10:
+        timestamp += 86400
+    return timestamp
+
+
+class MeetingStore:
+    """
+    Persistent store of processed meetings: transcript, summary and action
+    items, with full-text search (SQLite FTS5, porter stemming) over all three.
+
+    Transcripts are stored in segments of about segment_chars, so search
+    snippets and paginated transcript reads only touch the segments they need,
+    never a whole transcript. Writes are queued and written by one background
+    thread, which commits everything queued since its last commit (up to
+    batch_size meetings) in a single transaction (group commit): under load many meetings share one fsync, and
+    callers never wait for the disk.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        segment_chars: int = 2000,
+        batch_size: int = 64,
+        cache_mb: int = 64,
+        mmap_mb: int = 256,
+        rank_window: int = 5000,
+    ):
+        self.db_path = db_path
+        self.segment_chars = max(200, segment_chars)
+        self.batch_size = max(1, batch_size)
+        self.rank_window = max(1, rank_window)
+        self._cache_mb = cache_mb
+        self._mmap_mb = mmap_mb
+        self._lock = threading.Lock()
+        self._conn = self._connect()
+        self._create_schema()
+        self._queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._writer_lock = threading.Lock()
+        # Ids saved but not yet committed, so reading one back waits for its write
+        self._pending = set()
+        logger.info(f"Meeting store opened at {db_path}")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        conn.execute(f"PRAGMA mmap_size = {self._mmap_mb * 1024 * 1024}")
+        conn.execute(f"PRAGMA cache_size = -{self._cache_mb * 1024}")
+        return conn
+
+    def _create_schema(self) -> None:
+        with self._lock:
+            if self._conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION:
+                return
+            # One script, one transaction: a crash never leaves half a schema behind
+            self._conn.executescript(
+                f"""
+                BEGIN IMMEDIATE;
+                CREATE TABLE IF NOT EXISTS meetings (
+                    id INTEGER PRIMARY KEY,
+                    meeting_id TEXT NOT NULL UNIQUE,
+                    title TEXT,
+                    source TEXT,
+                    engine TEXT,
+                    audio_sha256 TEXT,
+                    created_at REAL NOT NULL,
+                    summary TEXT NOT NULL,
+                    transcript_chars INTEGER NOT NULL,
+                    segments INTEGER NOT NULL,
+                    action_item_count INTEGER NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_meetings_created ON meetings (created_at);
+                CREATE TABLE IF NOT EXISTS transcript_segments (
+                    id INTEGER PRIMARY KEY,
+                    meeting_id INTEGER NOT NULL REFERENCES meetings (id) ON DELETE CASCADE,
+                    seq INTEGER NOT NULL,
+                    text TEXT NOT NULL,
+                    UNIQUE (meeting_id, seq)
+                );
+                CREATE TABLE IF NOT EXISTS action_items (
+                    id INTEGER PRIMARY KEY,
+                    meeting_id INTEGER NOT NULL REFERENCES meetings (id) ON DELETE CASCADE,
+                    position INTEGER NOT NULL,
+                    text TEXT NOT NULL,
+                    owner TEXT,
+                    owner_key TEXT,
+                    deadline TEXT
+                );
+                CREATE INDEX IF NOT EXISTS idx_action_items_meeting ON action_items (meeting_id);
+                CREATE INDEX IF NOT EXISTS idx_action_items_owner ON action_items (owner_key, meeting_id);
+                CREATE VIRTUAL TABLE IF NOT EXISTS meetings_fts USING fts5 (
+                    title, summary, content='meetings', content_rowid='id', tokenize='porter unicode61'
+                );
+                CREATE VIRTUAL TABLE IF NOT EXISTS segments_fts USING fts5 (
+                    text, content='transcript_segments', content_rowid='id', tokenize='porter unicode61'
+                );
+                CREATE VIRTUAL TABLE IF NOT EXISTS action_items_fts USING fts5 (
+                    text, content='action_items', content_rowid='id', tokenize='porter unicode61'
+                );
+                PRAGMA user_version = {SCHEMA_VERSION};
+                COMMIT;
+                """
+            )
+
+    def save(
+        self,
+        transcript: str,
+        summary: str,
+        action_items: Sequence[str],
+        title: Optional[str] = None,
+        meeting_id: Optional[str] = None,
+        source: Optional[str] = None,
+        engine: Optional[str] = None,
+        action_item_details: Optional[Sequence[Dict[str, Any]]] = None,
+        audio_sha256: Optional[str] = None,
+        created_at: Optional[float] = None,
+    ) -> str:
+        """
+        Queue a meeting for storage without waiting for it to be written
+
+        Args:
+            transcript: Full transcript text
+            summary: Meeting summary
+            action_items: Action item texts
+            title: Display name, e.g. the uploaded file name
+            meeting_id: Id to store it under (default: a new one); saving the
+                same id again is ignored, so retried work is stored once
+            source: Where it came from ("upload", "job", "batch")
+            engine: Summarization engine ("local" for the extractive engine)
+            action_item_details: Owner and deadline of each item when known
+                (the local engine's details); otherwise taken from the item text
+            audio_sha256: Hash of the recording
+            created_at: Meeting time (default: now)
+
+        Returns:
+            The meeting id
+        """
+        meeting_id = meeting_id or uuid.uuid4().hex
+        self._pending.add(meeting_id)
+        self._queue.put({
+            "meeting_id": meeting_id,
+            "transcript": transcript,
+            "summary": summary or "",
+            "action_items": list(action_items or []),
+            "details": list(action_item_details) if action_item_details else None,
+            "title": title,
+            "source": source,
+            "engine": engine,
+            "audio_sha256": audio_sha256,
+            "created_at": created_at or time.time(),
+        })
+        self._ensure_writer()
+        return meeting_id
+
+    def _wait_for(self, meeting_id: str) -> None:
+        if meeting_id in self._pending:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Block until every meeting queued so far has been written
+        """
+        self._queue.join()
+
+    def close(self) -> None:
+        """
+        Write what is still queued and close the database
+        """
+        with self._writer_lock:
+            writer, self._writer = self._writer, None
+        if writer is not None:
+            self._queue.put(None)
+            writer.join()
+        with self._lock:
+            self._conn.close()
+
+    def reopen(self) -> None:
+        """
+        Start over in a process forked after the store was created: the writer
+        thread and whatever it had queued stay with the parent
+        """
+        self._lock = threading.Lock()
+        self._writer_lock = threading.Lock()
+        # Keep the parent's connection open but unused: closing it in this process
+        # could release the locks SQLite holds through the new one
+        self._inherited = self._conn
+        self._conn = self._connect()
+        self._queue = queue.Queue()
+        self._writer = None
+        self._pending = set()
+
+    def _ensure_writer(self) -> None:
+        if self._writer is None:
+            with self._writer_lock:
+                if self._writer is None:
+                    self._writer = threading.Thread(target=self._write_loop, name="meeting-store-writer", daemon=True)
+                    self._writer.start()
+
+    def _write_loop(self) -> None:
+        conn = self._connect()
+        try:
+            while True:
+                record = self._queue.get()
+                batch = [record]
+                # Everything that queued up during the previous commit goes into this one
+                while record is not None and len(batch) < self.batch_size:
+                    try:
+                        record = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    batch.append(record)
+                records = [record for record in batch if record is not None]
+                try:
+                    if records:
+                        self._write(conn, records)
+                except Exception as e:
+                    logger.error(f"Failed to store {len(records)} meetings: {str(e)}")
+                finally:
+                    for record in records:
+                        self._pending.discard(record["meeting_id"])
+                    for _ in batch:
+                        self._queue.task_done()
+                if len(records) < len(batch):
+                    return
+        finally:
+            conn.close()
+
+    def _write(self, conn: sqlite3.Connection, records: List[Dict[str, Any]]) -> None:
+        # Segmenting and owner detection happen here, off the event loop and outside the transaction
+        prepared = [self._prepare(record) for record in records]
+        with track("meetings", "write_batch"):
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                stored = 0
+                for record, segments, items in prepared:
+                    stored += self._insert(conn, record, segments, items)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        MEETINGS_STORED.inc(stored)
+
+    def _prepare(self, record: Dict[str, Any]) -> Tuple[Dict[str, Any], List[str], List[Tuple[str, Optional[str], Optional[str]]]]:
+        segments = split_segments(record["transcript"] or "", self.segment_chars)
+        details = record["details"]
+        items = []
+        for position, text in enumerate(record["action_items"]):
+            detail = details[position] if details and position < len(details) else item_details(text)
+            items.append((text, detail.get("owner"), detail.get("deadline")))
+        return record, segments, items
+
+    @staticmethod
+    def _insert(
+        conn: sqlite3.Connection,
+        record: Dict[str, Any],
+        segments: List[str],
+        items: List[Tuple[str, Optional[str], Optional[str]]],
+    ) -> int:
+        cursor = conn.execute(
+            """
+            INSERT OR IGNORE INTO meetings (meeting_id, title, source, engine, audio_sha256, created_at, summary,
+                transcript_chars, segments, action_item_count)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (record["meeting_id"], record["title"], record["source"], record["engine"], record["audio_sha256"],
+             record["created_at"], record["summary"], len(record["transcript"] or ""), len(segments), len(items)),
+        )
+        if cursor.rowcount != 1:
+            return 0
+        row_id = cursor.lastrowid
+        conn.execute(
+            "INSERT INTO meetings_fts (rowid, title, summary) VALUES (?, ?, ?)",
+            (row_id, record["title"] or "", record["summary"]),
+        )
+        for seq, text in enumerate(segments):
+            segment_id = conn.execute(
+                "INSERT INTO transcript_segments (meeting_id, seq, text) VALUES (?, ?, ?)", (row_id, seq, text)
+            ).lastrowid
+            conn.execute("INSERT INTO segments_fts (rowid, text) VALUES (?, ?)", (segment_id, text))
+        for position, (text, owner, deadline) in enumerate(items):
+            item_id = conn.execute(
+                "INSERT INTO action_items (meeting_id, position, text, owner, owner_key, deadline) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (row_id, position, text, owner, owner.casefold() if owner else None, deadline),
+            ).lastrowid
+            conn.execute("INSERT INTO action_items_fts (rowid, text) VALUES (?, ?)", (item_id, text))
+        return 1
+
+    def get(self, meeting_id: str) -> Optional[Dict[str, Any]]:
+        """
+        A meeting's summary, action items and transcript size (not the transcript)
+        """
+        self._wait_for(meeting_id)
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {_MEETING_COLUMNS}, m.summary FROM meetings m WHERE m.meeting_id = ?", (meeting_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            items = self._conn.execute(
+                "SELECT text, owner, deadline FROM action_items WHERE meeting_id = ? ORDER BY position",
+                (row[0],),
+            ).fetchall()
+        meeting = _meeting(row)
+        meeting["summary"] = row[-1]
+        meeting["action_items"] = [{"text": text, "owner": owner, "deadline": deadline} for text, owner, deadline in items]
+        return meeting
+
+    def transcript_page(self, meeting_id: str, offset: int = 0, limit: int = 10) -> Optional[Dict[str, Any]]:
+        """
+        Read limit transcript segments starting at segment offset
+
+        Returns:
+            Dict with the "segments" (seq and text; their texts join into the
+            transcript), the total segment count and "next_offset" (None after
+            the last page), or None if the meeting does not exist
+        """
+        self._wait_for(meeting_id)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, segments FROM meetings WHERE meeting_id = ?", (meeting_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            segments = self._conn.execute(
+                "SELECT seq, text FROM transcript_segments WHERE meeting_id = ? AND seq >= ? ORDER BY seq LIMIT ?",
+                (row[0], offset, limit),
+            ).fetchall()
+        next_offset = offset + limit if offset + limit < row[1] else None
+        return {
+            "meeting_id": meeting_id,
+            "total_segments": row[1],
+            "offset": offset,
+            "segments": [{"seq": seq, "text": text} for seq, text in segments],
+            "next_offset": next_offset,
+        }
+
+    def list(
+        self,
+        owner: Optional[str] = None,
+        date_from: Optional[float] = None,
+        date_to: Optional[float] = None,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        List meetings, newest first, optionally only those in a date range or
+        with an action item for owner
+
+        Args:
+            cursor: "next_cursor" of the previous page
+
+        Returns:
+            Dict with the "meetings" and "next_cursor" (None on the last page)
+        """
+        conditions, params = self._filters(owner, date_from, date_to)
+        if cursor:
+            created_at, row_id = cursor.split(":", 1)
+            # Keyset pagination: every page is an index range scan, however deep
+            conditions.append("(m.created_at, m.id) < (?, ?)")
+            params += [float(created_at), int(row_id)]
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        with track("meetings", "list"), self._lock:
+            rows = self._conn.execute(
+                f"SELECT {_MEETING_COLUMNS} FROM meetings m {where} ORDER BY m.created_at DESC, m.id DESC LIMIT ?",
+                params + [limit + 1],
+            ).fetchall()
+        more = len(rows) > limit
+        rows = rows[:limit]
+        return {
+            "meetings": [_meeting(row) for row in rows],
+            "next_cursor": f"{rows[-1][6]!r}:{rows[-1][0]}" if more else None,
+        }
+
+    def search(
+        self,
+        text: str,
+        scopes: Sequence[str] = SEARCH_SCOPES,
+        owner: Optional[str] = None,
+        date_from: Optional[float] = None,
+        date_to: Optional[float] = None,
+        limit: int = 20,
+        offset: int = 0,
+    ) -> Dict[str, Any]:
+        """
+        Ranked full-text search (BM25) over transcripts, summaries and action items
+
+        Args:
+            text: Words that must all appear ("quoted phrases", prefix*)
+            scopes: Which of "transcripts", "summaries" and "action_items" to search
+            owner: Only meetings with an action item for this owner; action item
+                hits must belong to the owner themselves
+            date_from, date_to: Meeting time range (timestamps)
+
+        Returns:
+            Dict with the "hits" (kind, meeting, snippet, score; transcript hits
+            also carry the segment to fetch) and "next_offset"
+        """
+        query = fts_query(text)
+        if not query:
+            return {"query": text, "hits": [], "next_offset": None}
+        wanted = offset + limit + 1
+        hits = []
+        with track("meetings", "search"), self._lock:
+            for scope in scopes:
+                hits += self._search_scope(scope, query, owner, date_from, date_to, wanted)
+        # rank (BM25) is lower for better matches
+        hits.sort(key=lambda hit: hit["score"])
+        page = hits[offset:offset + limit]
+        for hit in page:
+            hit["score"] = round(-hit["score"], 4)
+        return {
+            "query": text,
+            "hits": page,
+            "next_offset": offset + limit if len(hits) > offset + limit else None,
+        }
+
+    def _search_scope(
+        self, scope: str, query: str, owner: Optional[str], date_from: Optional[float], date_to: Optional[float], limit: int
+    ) -> List[Dict[str, Any]]:
+        if scope not in _SCOPES:
+            raise ValueError(f"Unknown search scope '{scope}'")
+        kind, fts, content, column, position = _SCOPES[scope]
+        # Constraints FTS5 evaluates itself: the query and a rowid range
+        matching, match_params = [f"{fts} MATCH ?"], [query]
+        if date_from is not None or date_to is not None:
+            bounds = self._rowid_bounds(content, date_from, date_to)
+            if bounds is None:
+                return []
+            # Rows are written with their meeting, so a date range is mostly a rowid
+            # range, which FTS5 skips to instead of checking every match's date
+            matching.append(f"{fts}.rowid BETWEEN ? AND ?")
+            match_params += bounds
+        # BM25 costs time for every match; a word found in most meetings is
+        # ranked (and filtered) among its newest rank_window matches
+        cutoff = self._conn.execute(
+            f"SELECT rowid FROM {fts} WHERE {' AND '.join(matching)} ORDER BY rowid DESC LIMIT 1 OFFSET ?",
+            [*match_params, self.rank_window - 1],
+        ).fetchone()
+        if cutoff is not None:
+            matching.append(f"{fts}.rowid >= ?")
+            match_params.append(cutoff[0])
+
+        conditions, params = self._filters(None if scope == "action_items" else owner, date_from, date_to)
+        if scope == "action_items" and owner:
+            conditions.append("c.owner_key = ?")
+            params.append(owner.casefold())
+        meeting = "c.id" if content == "meetings" else "c.meeting_id"
+        source = fts
+        if conditions:
+            source += f" JOIN {content} c ON c.id = {fts}.rowid JOIN meetings m ON m.id = {meeting}"
+        ranked = self._conn.execute(
+            f"SELECT {fts}.rowid, {fts}.rank FROM {source} WHERE {' AND '.join(matching + conditions)} "
+            f"ORDER BY {fts}.rank LIMIT ?",
+            [*match_params, *params, limit],
+        ).fetchall()
+        if not ranked:
+            return []
+        scores = dict(ranked)
+        # Snippets only for the rows returned
+        rows = self._conn.execute(
+            f"SELECT {fts}.rowid, {position}, {meeting}, snippet({fts}, {column}, ?, ?, '…', ?) "
+            f"FROM {fts} JOIN {content} c ON c.id = {fts}.rowid "
+            f"WHERE {fts} MATCH ? AND {fts}.rowid IN ({', '.join('?' for _ in ranked)})",
+            [*HIGHLIGHT, SNIPPET_TOKENS, query, *scores],
+        ).fetchall()
+        meetings = {
+            row[0]: _meeting(row)
+            for row in self._conn.execute(
+                f"SELECT {_MEETING_COLUMNS} FROM meetings m WHERE m.id IN ({', '.join('?' for _ in rows)})",
+                [row[2] for row in rows],
+            )
+        }
+        hits = []
+        for row_id, seq, meeting_row, snippet in rows:
+            hit = {"kind": kind, "meeting": meetings[meeting_row], "snippet": snippet, "score": scores[row_id]}
+            if kind == "transcript":
+                hit["segment"] = seq
+            elif kind == "action_item":
+                hit["position"] = seq
+            hits.append(hit)
+        return hits
+
+    def _rowid_bounds(self, content: str, date_from: Optional[float], date_to: Optional[float]) -> Optional[List[int]]:
+        conditions, params = self._filters(None, date_from, date_to)
+        meetings = f"SELECT m.id FROM meetings m WHERE {' AND '.join(conditions)}"
+        if content == "meetings":
+            sql = f"SELECT MIN(id), MAX(id) FROM meetings WHERE id IN ({meetings})"
+        else:
+            sql = f"SELECT MIN(id), MAX(id) FROM {content} WHERE meeting_id IN ({meetings})"
+        low, high = self._conn.execute(sql, params).fetchone()
+        return None if low is None else [low, high]
+
+    @staticmethod
+    def _filters(owner: Optional[str], date_from: Optional[float], date_to: Optional[float]) -> Tuple[List[str], List[Any]]:
+        conditions, params = [], []
+        if date_from is not None:
+            conditions.append("m.created_at >= ?")
+            params.append(date_from)
+        if date_to is not None:
+            conditions.append("m.created_at < ?")
+            params.append(date_to)
+        if owner:
+            conditions.append("EXISTS (SELECT 1 FROM action_items o WHERE o.owner_key = ? AND o.meeting_id = m.id)")
+            params.append(owner.casefold())
+        return conditions, params
+
+    def delete(self, meeting_id: str) -> bool:
+        """
+        Remove a meeting and its search entries
+
+        Returns:
+            False if the meeting did not exist
+        """
+        self._wait_for(meeting_id)
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT id, title, summary FROM meetings WHERE meeting_id = ?", (meeting_id,)
+                ).fetchone()
+                if row is not None:
+                    row_id = row[0]
+                    # External-content FTS tables are told which text to remove
+                    self._conn.execute(
+                        "INSERT INTO meetings_fts (meetings_fts, rowid, title, summary) VALUES ('delete', ?, ?, ?)",
+                        (row_id, row[1] or "", row[2]),
+                    )
+                    self._conn.execute(
+                        "INSERT INTO segments_fts (segments_fts, rowid, text) "
+                        "SELECT 'delete', id, text FROM transcript_segments WHERE meeting_id = ?", (row_id,)
+                    )
+                    self._conn.execute(
+                        "INSERT INTO action_items_fts (action_items_fts, rowid, text) "
+                        "SELECT 'delete', id, text FROM action_items WHERE meeting_id = ?", (row_id,)
+                    )
+                    self._conn.execute("DELETE FROM meetings WHERE id = ?", (row_id,))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return row is not None
+
+    def size(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM meetings").fetchone()[0]
+
+
+# Search scope: hit kind, FTS table, content table, indexed column shown in snippets, position column
+_SCOPES = {
+    "transcripts": ("transcript", "segments_fts", "transcript_segments", 0, "c.seq"),
+    "summaries": ("summary", "meetings_fts", "meetings", 1, "NULL"),
+    "action_items": ("action_item", "action_items_fts", "action_items", 0, "c.position"),
+}
+
+_MEETING_COLUMNS = (
+    "m.id, m.meeting_id, m.title, m.source, m.engine, m.audio_sha256, m.created_at, "
+    "m.transcript_chars, m.segments, m.action_item_count"
+)
+
+
+def _meeting(row: tuple) -> Dict[str, Any]:
+    return {
+        "meeting_id": row[1],
+        "title": row[2],
+        "source": row[3],
+        "engine": row[4],
+        "audio_sha256": row[5],
+        "created_at": row[6],
+        "transcript_chars": row[7],
+        "transcript_segments": row[8],
+        "action_item_count": row[9],
+    }
+
+
+def create_meeting_store(backend: str = "sqlite", db_path: str = "meetings.db", **options) -> Optional[MeetingStore]:
+    """
+    Create the meeting store for the given backend name ("sqlite" or "none")
+    """
+    if backend == "sqlite":
+        return MeetingStore(db_path, **options)
+    if backend != "none":
+        logger.warning(f"Unknown meeting store backend '{backend}', meetings will not be stored")
+    return None
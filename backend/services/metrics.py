@@ -0,0 +1,243 @@
+import contextvars
+import threading
+import time
+import uuid
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+
+# Trace id of the request or job currently being processed
+trace_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("trace_id", default=None)
+
+
+def new_trace_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+def current_trace_id() -> Optional[str]:
+    return trace_id_var.get()
+
+
+class TraceIdLogFilter(logging.Filter):
+    """
+    Adds the current trace id to log records as %(trace_id)s
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.trace_id = trace_id_var.get() or "-"
+        return True
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return self.header() + [f"{self.name}{_format_labels(self.labelnames, key)} {value}" for key, value in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [bucket counts..., sum, count]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [0.0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    def count(self, **labels) -> float:
+        series = self._values.get(self._key(labels))
+        return series[-1] if series else 0.0
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = [(key, list(series)) for key, series in self._values.items()]
+        lines = self.header()
+        for key, series in items:
+            cumulative = 0.0
+            labels = _format_labels(self.labelnames, key)
+            for bound, bucket_count in zip(self.buckets, series):
+                cumulative += bucket_count
+                bucket_labels = _format_labels(self.labelnames, key, 'le="%s"' % bound)
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            inf_labels = _format_labels(self.labelnames, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{inf_labels} {series[-1]}")
+            lines.append(f"{self.name}_sum{labels} {series[-2]}")
+            lines.append(f"{self.name}_count{labels} {series[-1]}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """
+        Render every metric in the Prometheus text exposition format
+        """
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+HTTP_REQUESTS = REGISTRY.register(Counter(
+    "meeting_agent_http_requests_total", "HTTP requests by route and status", ("method", "route", "status")))
+HTTP_LATENCY = REGISTRY.register(Histogram(
+    "meeting_agent_http_request_seconds", "HTTP request latency by route", ("method", "route")))
+STAGE_LATENCY = REGISTRY.register(Histogram(
+    "meeting_agent_stage_seconds", "Pipeline stage latency", ("agent", "stage")))
+STAGE_IN_FLIGHT = REGISTRY.register(Gauge(
+    "meeting_agent_stage_in_flight", "Pipeline stage executions currently running", ("agent", "stage")))
+EXTERNAL_REQUESTS = REGISTRY.register(Counter(
+    "meeting_agent_external_requests_total", "Calls to external APIs by outcome", ("agent", "outcome")))
+CACHE_REQUESTS = REGISTRY.register(Counter(
+    "meeting_agent_cache_requests_total", "Result cache lookups", ("namespace", "result")))
+RETRIES = REGISTRY.register(Counter(
+    "meeting_agent_retries_total", "Retried external API calls", ("agent",)))
+JOBS_QUEUED = REGISTRY.register(Gauge(
+    "meeting_agent_jobs_queued", "Jobs waiting for a worker"))
+COALESCED_REQUESTS = REGISTRY.register(Counter(
+    "meeting_agent_coalesced_requests_total", "Calls that joined identical work already in flight", ("operation",)))
+DUPLICATE_ACTION_ITEMS = REGISTRY.register(Counter(
+    "meeting_agent_duplicate_action_items_total", "Action items matched to an existing Trello card",
+    ("match", "action")))
+CIRCUIT_STATE = REGISTRY.register(Gauge(
+    "meeting_agent_circuit_state", "Circuit breaker state per provider (0 closed, 1 half-open, 2 open)",
+    ("provider",)))
+CIRCUIT_REJECTIONS = REGISTRY.register(Counter(
+    "meeting_agent_circuit_rejections_total", "Calls failed fast by an open circuit breaker", ("provider",)))
+RETRY_BUDGET_EXHAUSTED = REGISTRY.register(Counter(
+    "meeting_agent_retry_budget_exhausted_total", "Retries skipped because the retry budget was spent",
+    ("provider",)))
+HEDGED_REQUESTS = REGISTRY.register(Counter(
+    "meeting_agent_hedged_requests_total", "Hedged requests sent, and those that answered first",
+    ("provider", "outcome")))
+DEADLINES_EXCEEDED = REGISTRY.register(Counter(
+    "meeting_agent_deadlines_exceeded_total", "Provider calls not made or cut short by the request deadline",
+    ("provider",)))
+ADMISSION_IN_FLIGHT = REGISTRY.register(Gauge(
+    "meeting_agent_admission_in_flight", "Admitted requests currently running"))
+ADMISSION_QUEUE_DEPTH = REGISTRY.register(Gauge(
+    "meeting_agent_admission_queue_depth", "Requests waiting for admission"))
+ADMISSION_REJECTED = REGISTRY.register(Counter(
+    "meeting_agent_admission_rejected_total", "Requests shed by admission control", ("reason",)))
+ADMISSION_WAIT = REGISTRY.register(Histogram(
+    "meeting_agent_admission_wait_seconds", "Time admitted requests waited for a slot", ("priority",)))
+LOCAL_SUMMARIES = REGISTRY.register(Counter(
+    "meeting_agent_local_summaries_total", "Transcripts summarized by the local extractive engine", ("use",)))
+MEETINGS_STORED = REGISTRY.register(Counter(
+    "meeting_agent_meetings_stored_total", "Meetings written to the meeting store"))
+
+
+class track:
+    """
+    Time a pipeline stage and count it as in flight while it runs.
+    Usable as a sync or async context manager:
+
+        with track("summarization", "generate"):
+            ...
+    """
+
+    __slots__ = ("agent", "stage", "_start")
+
+    def __init__(self, agent: str, stage: str):
+        self.agent = agent
+        self.stage = stage
+
+    def __enter__(self):
+        STAGE_IN_FLIGHT.inc(agent=self.agent, stage=self.stage)
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        STAGE_LATENCY.observe(time.perf_counter() - self._start, agent=self.agent, stage=self.stage)
+        STAGE_IN_FLIGHT.dec(agent=self.agent, stage=self.stage)
+        return False
+
+    async def __aenter__(self):
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return self.__exit__(exc_type, exc, tb)
+
+
+def record_external(agent: str, success: bool) -> None:
+    """
+    Count one external API call for the per-agent error rate
+    """
+    EXTERNAL_REQUESTS.inc(agent=agent, outcome="success" if success else "error")
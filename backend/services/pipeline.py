@@ -0,0 +1,189 @@
+import hashlib
+import os
+import logging
+from typing import Any, Callable, Dict, Optional
+
+from services.audio_preprocessor import AudioPreprocessor, remove_preprocessed
+from services.executor import run_blocking
+from services.result_cache import ResultCache
+from services.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+
+def hash_file(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """
+    Compute the SHA-256 of a file without loading it into memory
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hold_file(path: str) -> str:
+    """
+    Hard-link a file under a private name so it outlives the caller's copy.
+    Falls back to the original path where hard links are not supported.
+    """
+    root, ext = os.path.splitext(path)
+    held = f"{root}.flight{ext}"
+    try:
+        os.link(path, held)
+        return held
+    except OSError:
+        return path
+
+
+def release_file(held: str, path: str) -> None:
+    if held != path and os.path.exists(held):
+        os.unlink(held)
+
+
+class MeetingPipeline:
+    """
+    The transcription and summarization steps shared by /process-audio and the
+    background job queue, with result caching in front of both external APIs.
+    Demo-mode results are never cached. When a preprocessor is given, audio is
+    normalized before upload on cache misses. Agents are fetched from the
+    registry, so they are only loaded once a pipeline step actually runs.
+
+    Identical work running concurrently is coalesced: uploads with the same
+    audio hash share one transcription, and identical transcripts share one
+    summarization, so double-submitted recordings call AssemblyAI and Gemini once.
+    Cache lookups and writes may hit SQLite, so they run on the blocking executor.
+    """
+
+    def __init__(
+        self,
+        agents,
+        cache: Optional[ResultCache] = None,
+        preprocessor: Optional[AudioPreprocessor] = None,
+    ):
+        self.agents = agents
+        self.cache = cache
+        self.preprocessor = preprocessor
+        self.transcriptions = SingleFlight("transcription")
+        self.summaries = SingleFlight("summarization")
+
+    async def transcribe(
+        self,
+        audio_path: str,
+        filename: Optional[str] = None,
+        audio_sha256: Optional[str] = None,
+        on_preprocessed: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> Optional[str]:
+        """
+        Transcribe an audio file on disk, reusing a cached transcript of identical audio.
+        The caller may delete audio_path as soon as this returns or is cancelled:
+        a transcription shared with other callers keeps its own link to the file.
+
+        Args:
+            audio_path: Path of the audio file
+            filename: Original name of the upload
+            audio_sha256: SHA-256 of the audio bytes; computed from the file when missing
+            on_preprocessed: Optional callback receiving the preprocessing report
+                (bytes saved, transcode time) when the audio was normalized
+
+        Returns:
+            str: Transcribed text or None if failed
+        """
+        transcription_agent = await self.agents.aget("transcription")
+        if transcription_agent is None:
+            return None
+        use_cache = self.cache is not None and not transcription_agent.demo_mode
+        if audio_sha256 is None:
+            audio_sha256 = await run_blocking(hash_file, audio_path)
+        if use_cache:
+            cached = await run_blocking(self.cache.get_transcript, audio_sha256)
+            if cached is not None:
+                logger.info(f"Transcript cache hit for {filename or audio_path}")
+                return cached
+
+        # Only the caller that starts the transcription links the file; there is
+        # no await between this check and joining, so the check cannot go stale
+        if audio_sha256 in self.transcriptions:
+            return await self.transcriptions.do(audio_sha256, None, on_preprocessed)
+
+        held = hold_file(audio_path)
+
+        async def work(publish):
+            return await self._transcribe(transcription_agent, held, filename, audio_sha256, use_cache, publish)
+
+        return await self.transcriptions.do(
+            audio_sha256, work, on_preprocessed, cleanup=lambda: release_file(held, audio_path)
+        )
+
+    async def _transcribe(
+        self,
+        transcription_agent,
+        audio_path: str,
+        filename: Optional[str],
+        audio_sha256: str,
+        use_cache: bool,
+        on_preprocessed: Callable[[Dict[str, Any]], None],
+    ) -> Optional[str]:
+        if use_cache:
+            # A flight that finished just before this one started may have filled the cache
+            cached = await run_blocking(self.cache.get_transcript, audio_sha256)
+            if cached is not None:
+                return cached
+
+        preprocessed = None
+        if self.preprocessor is not None and not transcription_agent.demo_mode:
+            try:
+                preprocessed = await self.preprocessor.process(audio_path)
+                on_preprocessed(preprocessed.as_dict())
+            except Exception as e:
+                logger.warning(f"Audio preprocessing failed, uploading the original file: {str(e)}")
+        try:
+            upload_path = preprocessed.path if preprocessed is not None else audio_path
+            transcript = await transcription_agent.transcribe_file(upload_path, filename)
+        finally:
+            await run_blocking(remove_preprocessed, preprocessed)
+
+        if transcript and use_cache:
+            await run_blocking(self.cache.set_transcript, audio_sha256, transcript)
+        return transcript
+
+    async def summarize(
+        self,
+        transcript: str,
+        on_partial: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Generate the summary and action items for a transcript, reusing a cached result
+        produced with the same prompt version
+
+        Args:
+            transcript: Transcript text
+            on_partial: Optional callback receiving partial results as they complete
+
+        Returns:
+            Dict containing summary and action_items or None if failed
+        """
+        summarization_agent = await self.agents.aget("summarization")
+        if summarization_agent is None:
+            return None
+        prompt_version = summarization_agent.PROMPT_VERSION
+        use_cache = self.cache is not None and not summarization_agent.demo_mode
+        if use_cache:
+            cached = await run_blocking(self.cache.get_summary, transcript, prompt_version)
+            if cached is not None:
+                logger.info("Summary cache hit")
+                return cached
+
+        async def work(publish):
+            if use_cache:
+                cached = await run_blocking(self.cache.get_summary, transcript, prompt_version)
+                if cached is not None:
+                    return cached
+            summary_data = await summarization_agent.process_transcript(transcript, publish)
+            # Local results (Gemini failed) are not cached, so the next request tries Gemini again
+            if summary_data and use_cache and summary_data.get("engine") != "local":
+                await run_blocking(self.cache.set_summary, transcript, summary_data, prompt_version)
+            return summary_data
+
+        key = ResultCache.summary_key(transcript, prompt_version)
+        return await self.summaries.do(key, work, on_partial)
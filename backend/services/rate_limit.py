@@ -0,0 +1,85 @@
+import asyncio
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """
+    Async token-bucket rate limiter.
+
+    Tokens refill continuously at `rate` per second up to `capacity`. Callers
+    await acquire() before each request. pause() blocks every caller until a
+    given time, which is how server-sent Retry-After hints are honoured.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens: float = 1.0) -> float:
+        """
+        Take tokens if available without waiting
+
+        Returns:
+            0.0 when the tokens were taken, otherwise the number of seconds to wait
+        """
+        now = time.monotonic()
+        if now < self._paused_until:
+            return self._paused_until - now
+        self._refill(now)
+        if self._tokens >= tokens:
+            self._tokens -= tokens
+            return 0.0
+        return (tokens - self._tokens) / self.rate
+
+    async def atry_acquire(self, tokens: float = 1.0) -> float:
+        """
+        Async version of try_acquire(), for callers that may hold a SharedTokenBucket
+        """
+        return self.try_acquire(tokens)
+
+    async def arefund(self, tokens: float = 1.0) -> None:
+        """
+        Give back tokens taken for a request that was then turned away
+        """
+        self._refill(time.monotonic())
+        self._tokens = min(self.capacity, self._tokens + tokens)
+
+    def available(self) -> float:
+        """
+        Tokens that could be taken right now
+        """
+        now = time.monotonic()
+        if now < self._paused_until:
+            return 0.0
+        return min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        """
+        Wait until tokens are available and take them
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        # Waiters queue on the lock so tokens are handed out in arrival order
+        async with self._lock:
+            while True:
+                wait = self.try_acquire(tokens)
+                if wait <= 0:
+                    return
+                await asyncio.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """
+        Stop handing out tokens for the given number of seconds
+        """
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._tokens = 0.0
+        self._updated = time.monotonic()
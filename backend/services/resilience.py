@@ -0,0 +1,477 @@
+import asyncio
+import contextvars
+import os
+import time
+import logging
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+from services.metrics import (
+    CIRCUIT_REJECTIONS, CIRCUIT_STATE, DEADLINES_EXCEEDED, HEDGED_REQUESTS, RETRY_BUDGET_EXHAUSTED,
+)
+
+logger = logging.getLogger(__name__)
+
+# time.monotonic() by which the current request or job must be finished (None = no deadline)
+deadline_var: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("deadline", default=None)
+
+# Per-call timeouts in seconds when <NAME>_TIMEOUT is not set
+DEFAULT_TIMEOUTS = {"assemblyai": 30.0, "gemini": 120.0, "trello": 10.0}
+# Hedge delay before enough latencies have been observed to estimate it
+MIN_LATENCY_SAMPLES = 20
+
+
+class DeadlineExceeded(TimeoutError):
+    """
+    Raised when the current request or job has run out of time
+    """
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of calling a provider whose circuit breaker is open
+    """
+
+    def __init__(self, provider: str, retry_in: float):
+        super().__init__(f"{provider} is unavailable (circuit open, next probe in {retry_in:.1f}s)")
+        self.provider = provider
+        self.retry_in = retry_in
+
+
+class deadline:
+    """
+    Give the current request or job `seconds` to finish. The deadline is a
+    context variable, so it follows the work into every agent call (and into
+    run_blocking threads); a nested deadline can shorten it but never extend it.
+    Usable as a sync or async context manager:
+
+        async with deadline(30):
+            ...
+    """
+
+    __slots__ = ("seconds", "_token")
+
+    def __init__(self, seconds: Optional[float]):
+        self.seconds = seconds
+
+    def __enter__(self):
+        current = deadline_var.get()
+        if self.seconds is not None and self.seconds > 0:
+            ends = time.monotonic() + self.seconds
+            current = ends if current is None else min(current, ends)
+        self._token = deadline_var.set(current)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        deadline_var.reset(self._token)
+        return False
+
+    async def __aenter__(self):
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return self.__exit__(exc_type, exc, tb)
+
+
+def remaining() -> Optional[float]:
+    """
+    Seconds left before the current deadline, or None without a deadline
+    """
+    ends = deadline_var.get()
+    return None if ends is None else ends - time.monotonic()
+
+
+def time_left(cap: Optional[float] = None) -> Optional[float]:
+    """
+    The time an operation may take: cap, shortened to what is left of the
+    current deadline
+
+    Raises:
+        DeadlineExceeded: if the deadline has already passed
+    """
+    left = remaining()
+    if left is None:
+        return cap
+    if left <= 0:
+        raise DeadlineExceeded("Deadline exceeded")
+    return left if cap is None else min(cap, left)
+
+
+async def sleep_within_deadline(seconds: float) -> None:
+    """
+    Sleep before a retry or the next poll, failing at once if the deadline
+    would pass first (waiting would only delay the inevitable error)
+    """
+    left = remaining()
+    if left is not None and left <= seconds:
+        raise DeadlineExceeded("Deadline exceeded")
+    await asyncio.sleep(seconds)
+
+
+class CircuitBreaker:
+    """
+    Per-provider circuit breaker.
+
+    Closed: calls go through and their outcomes are kept for `window` seconds.
+    When at least `min_calls` recent calls have a failure rate of
+    `failure_rate` or more, the breaker opens and calls fail immediately for
+    `open_seconds`. It then turns half-open and lets `half_open_calls` probe
+    calls through: a success closes it, a failure opens it again.
+    """
+
+    CLOSED = "closed"
+    HALF_OPEN = "half_open"
+    OPEN = "open"
+    STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate: float = 0.5,
+        min_calls: int = 10,
+        window: float = 30.0,
+        open_seconds: float = 15.0,
+        half_open_calls: int = 1,
+    ):
+        self.name = name
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.window = window
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+
+        self.state = self.CLOSED
+        self._outcomes: Deque[Tuple[float, bool]] = deque()
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        CIRCUIT_STATE.set(0, provider=name)
+
+    def _set_state(self, state: str) -> None:
+        if state != self.state:
+            logger.warning(f"Circuit breaker for {self.name}: {self.state} -> {state}")
+            self.state = state
+            CIRCUIT_STATE.set(self.STATE_VALUES[state], provider=self.name)
+
+    def _prune(self, now: float) -> None:
+        while self._outcomes and self._outcomes[0][0] <= now - self.window:
+            _, success = self._outcomes.popleft()
+            self._failures -= not success
+
+    def allow(self) -> bool:
+        """
+        Admit one call
+
+        Returns:
+            True if the call is a half-open probe, False for a normal call
+
+        Raises:
+            CircuitOpenError: if the breaker is open, or half-open with all
+                probes already in flight
+        """
+        if self.state == self.OPEN:
+            retry_in = self._opened_at + self.open_seconds - time.monotonic()
+            if retry_in > 0:
+                CIRCUIT_REJECTIONS.inc(provider=self.name)
+                raise CircuitOpenError(self.name, retry_in)
+            self._set_state(self.HALF_OPEN)
+            self._probes = 0
+        if self.state == self.HALF_OPEN:
+            if self._probes >= self.half_open_calls:
+                CIRCUIT_REJECTIONS.inc(provider=self.name)
+                raise CircuitOpenError(self.name, 0.0)
+            self._probes += 1
+            return True
+        return False
+
+    def record(self, success: bool, probe: bool = False) -> None:
+        """
+        Record the outcome of a call admitted by allow()
+        """
+        now = time.monotonic()
+        if self.state == self.HALF_OPEN:
+            if probe:
+                self._probes -= 1
+                if success:
+                    self._outcomes.clear()
+                    self._failures = 0
+                    self._set_state(self.CLOSED)
+                else:
+                    self._open(now)
+            return
+        if self.state == self.OPEN:
+            # Calls admitted before the breaker opened do not change its state
+            return
+
+        self._outcomes.append((now, success))
+        self._failures += not success
+        self._prune(now)
+        if len(self._outcomes) >= self.min_calls and self._failures >= self.failure_rate * len(self._outcomes):
+            self._open(now)
+
+    def release(self, probe: bool) -> None:
+        """
+        Give back a probe slot for a call that ended without an outcome (cancelled)
+        """
+        if probe and self.state == self.HALF_OPEN:
+            self._probes -= 1
+
+    def _open(self, now: float) -> None:
+        self._opened_at = now
+        self._outcomes.clear()
+        self._failures = 0
+        self._set_state(self.OPEN)
+
+
+class RetryBudget:
+    """
+    Limits retries (and hedged requests) to `ratio` of the requests made in the
+    last `window` seconds, plus `min_per_second` so a quiet service can still
+    retry. Per-call retry counts multiply the load on a provider that is already
+    failing; a budget caps the extra load at a fixed fraction.
+    """
+
+    def __init__(self, ratio: float = 0.2, window: float = 10.0, min_per_second: float = 1.0):
+        self.ratio = ratio
+        self.window = window
+        self.min_per_second = min_per_second
+        self._requests: Deque[float] = deque()
+        self._retries: Deque[float] = deque()
+
+    def _prune(self, now: float) -> None:
+        for events in (self._requests, self._retries):
+            while events and events[0] <= now - self.window:
+                events.popleft()
+
+    def record_request(self) -> None:
+        self._requests.append(time.monotonic())
+
+    def try_spend(self) -> bool:
+        """
+        Take one retry from the budget
+
+        Returns:
+            False if the budget is exhausted and the retry should not be made
+        """
+        now = time.monotonic()
+        self._prune(now)
+        allowed = self.ratio * len(self._requests) + self.min_per_second * self.window
+        if len(self._retries) >= allowed:
+            return False
+        self._retries.append(now)
+        return True
+
+
+class Provider:
+    """
+    Failure policy shared by every call to one external API: a per-call
+    timeout bounded by the current deadline, a circuit breaker, a retry budget
+    and, for idempotent calls when enabled, hedging: if the first attempt has
+    not answered within the provider's recent p95 latency (HEDGE_QUANTILE), a
+    second identical request is sent and whichever answers first is used.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        timeout: Optional[float],
+        breaker: CircuitBreaker,
+        budget: RetryBudget,
+        hedging: bool = False,
+        hedge_delay: float = 1.0,
+        hedge_quantile: float = 0.95,
+    ):
+        self.name = name
+        self.timeout = timeout
+        self.breaker = breaker
+        self.budget = budget
+        self.hedging = hedging
+        self.initial_hedge_delay = hedge_delay
+        self.hedge_quantile = hedge_quantile
+        self._latencies: Deque[float] = deque(maxlen=200)
+
+    def hedge_delay(self) -> float:
+        """
+        How long to wait for the first attempt before hedging: the configured
+        quantile of recent successful latencies
+        """
+        if len(self._latencies) < MIN_LATENCY_SAMPLES:
+            return self.initial_hedge_delay
+        ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(self.hedge_quantile * len(ordered)))]
+
+    def retry_allowed(self) -> bool:
+        """
+        Whether a failed call may be retried now (takes one retry from the budget)
+        """
+        if self.budget.try_spend():
+            return True
+        RETRY_BUDGET_EXHAUSTED.inc(provider=self.name)
+        logger.warning(f"Retry budget for {self.name} exhausted; not retrying")
+        return False
+
+    async def call(
+        self,
+        operation: Callable[[Optional[float]], Awaitable[Any]],
+        timeout: Optional[float] = None,
+        idempotent: bool = False,
+        failed: Optional[Callable[[Any], bool]] = None,
+        client_error: Optional[Callable[[BaseException], bool]] = None,
+    ) -> Any:
+        """
+        Make one call to the provider
+
+        Args:
+            operation: Coroutine function performing the call; receives the
+                time it may take (None = unlimited) to pass on as a client timeout
+            timeout: Per-call timeout instead of the provider's default
+            idempotent: Safe to send twice, so the call may be hedged
+            failed: Classifies a returned value (e.g. a 5xx response) as a
+                provider failure for the circuit breaker
+            client_error: Classifies a raised exception as the caller's fault
+                (e.g. a rejected request): re-raised without counting against
+                the provider
+
+        Returns:
+            The operation's result
+
+        Raises:
+            DeadlineExceeded: if the current deadline passed before or during the call
+            CircuitOpenError: if the provider's circuit breaker is open
+            TimeoutError: if the call took longer than its timeout
+        """
+        cap = self.timeout if timeout is None else timeout
+        try:
+            attempt_timeout = time_left(cap)
+        except DeadlineExceeded:
+            DEADLINES_EXCEEDED.inc(provider=self.name)
+            raise
+        probe = self.breaker.allow()
+        self.budget.record_request()
+        start = time.monotonic()
+        try:
+            if idempotent and self.hedging:
+                result = await self._hedged(operation, attempt_timeout, failed)
+            else:
+                result = await asyncio.wait_for(operation(attempt_timeout), attempt_timeout)
+        except asyncio.CancelledError:
+            self.breaker.release(probe)
+            raise
+        except asyncio.TimeoutError:
+            left = remaining()
+            if left is not None and left <= 0:
+                # Cut short by the caller's deadline, which says nothing about the provider
+                self.breaker.release(probe)
+                DEADLINES_EXCEEDED.inc(provider=self.name)
+                raise DeadlineExceeded(f"Deadline exceeded while calling {self.name}")
+            self.breaker.record(False, probe)
+            raise TimeoutError(f"{self.name} did not answer within {attempt_timeout:.1f}s")
+        except Exception as e:
+            self.breaker.record(bool(client_error and client_error(e)), probe)
+            raise
+
+        success = not (failed and failed(result))
+        self.breaker.record(success, probe)
+        if success:
+            self._latencies.append(time.monotonic() - start)
+        return result
+
+    async def _hedged(
+        self,
+        operation: Callable[[Optional[float]], Awaitable[Any]],
+        timeout: Optional[float],
+        failed: Optional[Callable[[Any], bool]],
+    ) -> Any:
+        """
+        Run the operation, starting a second copy if the first is slow; return
+        the first good result, or the last outcome when every copy failed
+        """
+        ends = None if timeout is None else time.monotonic() + timeout
+        first = asyncio.ensure_future(operation(timeout))
+        pending = {first}
+        hedge_at = time.monotonic() + self.hedge_delay()
+        hedged = False
+        last: Optional[asyncio.Future] = None
+        try:
+            while pending:
+                wake = ends if hedged else (hedge_at if ends is None else min(ends, hedge_at))
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=None if wake is None else max(0.0, wake - time.monotonic()),
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                for task in done:
+                    last = task
+                    if task.exception() is None and not (failed and failed(task.result())):
+                        if task is not first:
+                            HEDGED_REQUESTS.inc(provider=self.name, outcome="won")
+                        return task.result()
+                if ends is not None and time.monotonic() >= ends:
+                    raise asyncio.TimeoutError()
+                if not hedged and not done:
+                    # The first copy is slow; a fast failure is left to the caller's retry policy
+                    hedged = True
+                    if self.budget.try_spend():
+                        HEDGED_REQUESTS.inc(provider=self.name, outcome="sent")
+                        pending.add(asyncio.ensure_future(operation(None if ends is None else ends - time.monotonic())))
+            # Every copy failed: surface the last failure
+            return last.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "state": self.breaker.state,
+            "hedging": self.hedging,
+            "hedge_delay": round(self.hedge_delay(), 3),
+        }
+
+
+_providers: Dict[str, Provider] = {}
+
+
+def get_provider(name: str) -> Provider:
+    """
+    Return the shared policy for an external API, created on first use from
+    the CIRCUIT_*, RETRY_BUDGET_*, HEDGE_* and <NAME>_TIMEOUT settings. All
+    agents (and all instances of an agent) calling the same API share it.
+    """
+    provider = _providers.get(name)
+    if provider is None:
+        hedged = {entry.strip() for entry in os.getenv("HEDGE_PROVIDERS", "").lower().split(",") if entry.strip()}
+        timeout = float(os.getenv(f"{name.upper()}_TIMEOUT", str(DEFAULT_TIMEOUTS.get(name, 30))))
+        provider = Provider(
+            name,
+            timeout=timeout if timeout > 0 else None,
+            breaker=CircuitBreaker(
+                name,
+                failure_rate=float(os.getenv("CIRCUIT_FAILURE_RATE", "0.5")),
+                min_calls=int(os.getenv("CIRCUIT_MIN_CALLS", "10")),
+                window=float(os.getenv("CIRCUIT_WINDOW", "30")),
+                open_seconds=float(os.getenv("CIRCUIT_OPEN_SECONDS", "15")),
+                half_open_calls=int(os.getenv("CIRCUIT_HALF_OPEN_CALLS", "1")),
+            ),
+            budget=RetryBudget(
+                ratio=float(os.getenv("RETRY_BUDGET_RATIO", "0.2")),
+                window=float(os.getenv("RETRY_BUDGET_WINDOW", "10")),
+                min_per_second=float(os.getenv("RETRY_BUDGET_MIN_PER_SECOND", "1")),
+            ),
+            hedging=name in hedged,
+            hedge_delay=float(os.getenv("HEDGE_DELAY", "1.0")),
+            hedge_quantile=float(os.getenv("HEDGE_QUANTILE", "0.95")),
+        )
+        _providers[name] = provider
+    return provider
+
+
+def reset_providers() -> None:
+    """
+    Forget every provider's state; new ones are created from the settings on next use
+    """
+    _providers.clear()
+
+
+def provider_status() -> Dict[str, Dict[str, Any]]:
+    return {name: provider.status() for name, provider in _providers.items()}
+
@@ -0,0 +1,261 @@
+import copy
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from services.metrics import CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+TRANSCRIPT_NAMESPACE = "transcript"
+SUMMARY_NAMESPACE = "summary"
+
+
+class CacheBackend:
+    """
+    Base class for result cache storage backends
+    """
+
+    def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        raise NotImplementedError
+
+    def invalidate(self, key: Optional[str] = None, prefix: Optional[str] = None) -> int:
+        """
+        Remove one key, every key starting with prefix, or everything when both are None.
+        Returns the number of removed entries.
+        """
+        raise NotImplementedError
+
+    def size(self) -> int:
+        raise NotImplementedError
+
+    def reopen(self) -> None:
+        """
+        Reconnect in a process forked after the backend was created
+        """
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    In-process LRU cache with per-entry TTL and a maximum number of entries
+    """
+
+    def __init__(self, max_entries: int = 1000, default_ttl: Optional[float] = None):
+        self.max_entries = max(1, max_entries)
+        self.default_ttl = default_ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return copy.deepcopy(value)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = ttl if ttl is not None else self.default_ttl
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            self._entries[key] = (copy.deepcopy(value), expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: Optional[str] = None, prefix: Optional[str] = None) -> int:
+        with self._lock:
+            if key is not None:
+                return 1 if self._entries.pop(key, None) is not None else 0
+            if prefix is None:
+                removed = len(self._entries)
+                self._entries.clear()
+                return removed
+            doomed = [k for k in self._entries if k.startswith(prefix)]
+            for k in doomed:
+                del self._entries[k]
+            return len(doomed)
+
+    def size(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """
+    On-disk cache in a SQLite database that several worker processes can share
+    """
+
+    def __init__(self, db_path: str, max_entries: int = 10000, default_ttl: Optional[float] = None):
+        self.db_path = db_path
+        self.max_entries = max(1, max_entries)
+        self.default_ttl = default_ttl
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._conn = self._connect()
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                expires_at REAL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_accessed ON cache (accessed_at)")
+        self._conn.commit()
+        logger.info(f"SQLite result cache opened at {db_path}")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def reopen(self) -> None:
+        # Only this thread survived fork(), and the lock may have been copied while held
+        self._lock = threading.Lock()
+        # Keep the parent's connection open but unused, as in SQLiteJobStore.reopen
+        self._inherited = self._conn
+        self._conn = self._connect()
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, expires_at FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if row[1] is not None and row[1] < now:
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = ttl if ttl is not None else self.default_ttl
+        now = time.time()
+        expires_at = now + ttl if ttl else None
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), expires_at, now),
+            )
+            self._writes += 1
+            if self._writes % 100 == 0:
+                self._prune(now)
+            self._conn.commit()
+
+    def _prune(self, now: float) -> None:
+        self._conn.execute("DELETE FROM cache WHERE expires_at IS NOT NULL AND expires_at < ?", (now,))
+        self._conn.execute(
+            """
+            DELETE FROM cache WHERE key IN (
+                SELECT key FROM cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+            )
+            """,
+            (self.max_entries,),
+        )
+
+    def invalidate(self, key: Optional[str] = None, prefix: Optional[str] = None) -> int:
+        with self._lock:
+            if key is not None:
+                cursor = self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+            elif prefix is not None:
+                cursor = self._conn.execute("DELETE FROM cache WHERE substr(key, 1, ?) = ?", (len(prefix), prefix))
+            else:
+                cursor = self._conn.execute("DELETE FROM cache")
+            self._conn.commit()
+            return cursor.rowcount
+
+    def size(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+
+class ResultCache:
+    """
+    Content-addressed cache for transcripts and summaries.
+
+    Transcripts are keyed by the SHA-256 of the audio bytes; summaries by the
+    SHA-256 of the transcript text plus the summarization prompt version, so a
+    prompt change never serves stale summaries.
+    """
+
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+        self._stats: Dict[str, Dict[str, int]] = {
+            TRANSCRIPT_NAMESPACE: {"hits": 0, "misses": 0},
+            SUMMARY_NAMESPACE: {"hits": 0, "misses": 0},
+        }
+
+    @staticmethod
+    def transcript_key(audio_sha256: str) -> str:
+        return f"{TRANSCRIPT_NAMESPACE}:{audio_sha256}"
+
+    @staticmethod
+    def summary_key(transcript: str, prompt_version: str) -> str:
+        digest = hashlib.sha256(transcript.encode("utf-8")).hexdigest()
+        return f"{SUMMARY_NAMESPACE}:v{prompt_version}:{digest}"
+
+    def _lookup(self, namespace: str, key: str) -> Optional[Any]:
+        value = self.backend.get(key)
+        result = "hits" if value is not None else "misses"
+        self._stats[namespace][result] += 1
+        CACHE_REQUESTS.inc(namespace=namespace, result=result)
+        return value
+
+    def get_transcript(self, audio_sha256: str) -> Optional[str]:
+        return self._lookup(TRANSCRIPT_NAMESPACE, self.transcript_key(audio_sha256))
+
+    def set_transcript(self, audio_sha256: str, transcript: str) -> None:
+        self.backend.set(self.transcript_key(audio_sha256), transcript)
+
+    def get_summary(self, transcript: str, prompt_version: str) -> Optional[Dict[str, Any]]:
+        return self._lookup(SUMMARY_NAMESPACE, self.summary_key(transcript, prompt_version))
+
+    def set_summary(self, transcript: str, summary_data: Dict[str, Any], prompt_version: str) -> None:
+        self.backend.set(self.summary_key(transcript, prompt_version), summary_data)
+
+    def invalidate(self, key: Optional[str] = None, prefix: Optional[str] = None) -> int:
+        removed = self.backend.invalidate(key=key, prefix=prefix)
+        logger.info(f"Invalidated {removed} cache entries (key={key}, prefix={prefix})")
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": type(self.backend).__name__,
+            "entries": self.backend.size(),
+            **{namespace: dict(counts) for namespace, counts in self._stats.items()},
+        }
+
+
+def create_result_cache(
+    backend: str = "memory",
+    db_path: str = "cache.db",
+    max_entries: int = 1000,
+    ttl: Optional[float] = None,
+) -> Optional[ResultCache]:
+    """
+    Create a result cache for the given backend name ("memory", "sqlite" or "none")
+    """
+    if backend == "none":
+        return None
+    if backend == "sqlite":
+        return ResultCache(SQLiteCacheBackend(db_path, max_entries, ttl))
+    if backend != "memory":
+        logger.warning(f"Unknown result cache backend '{backend}', falling back to memory")
+    return ResultCache(MemoryCacheBackend(max_entries, ttl))
@@ -0,0 +1,302 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+import json
+import logging
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+from services.executor import run_blocking
+from services.rate_limit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+# Buckets untouched for this long are full again and are dropped from the table
+IDLE_BUCKET_SECONDS = 3600
+PRUNE_EVERY = 1000
+# Callbacks nobody collected within this many seconds are dropped
+CALLBACK_SECONDS = 3600
+
+
+def worker_count() -> int:
+    """
+    Number of server processes sharing this host's state (WEB_CONCURRENCY, set by gunicorn.conf.py)
+    """
+    try:
+        return max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+    except ValueError:
+        return 1
+
+
+class SharedState:
+    """
+    State shared by the worker processes of one host, kept in a SQLite file.
+
+    Holds token buckets, so a rate limit (Trello's per-token limit, per-client
+    admission limits) applies to all workers together instead of to each one,
+    and transcription webhooks, so a callback answered by one worker reaches
+    the job waiting for it in another.
+    Every operation is one short IMMEDIATE transaction. Nothing here needs to
+    survive a crash, so the file is written without fsync. The methods block
+    while another worker holds the write lock, so async callers run them on
+    the blocking executor (see SharedTokenBucket).
+
+    Connections are opened per process: one inherited across fork() is never
+    used, so the state can be created before gunicorn forks its workers.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._inherited: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self._writes = 0
+        self._connection()
+        logger.info(f"Shared state opened at {db_path}")
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._pid != os.getpid():
+            # Opened by the parent before fork(): keep it open but unused (closing it here
+            # could release the locks SQLite holds through our own) and open our own
+            self._inherited = self._conn
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=10, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=OFF")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS buckets (
+                    name TEXT PRIMARY KEY,
+                    tokens REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    paused_until REAL NOT NULL DEFAULT 0
+                )
+                """
+            )
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS callbacks (
+                    key TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    received_at REAL NOT NULL
+                )
+                """
+            )
+            self._pid = os.getpid()
+        return self._conn
+
+    def _bucket(self, conn: sqlite3.Connection, name: str, capacity: float) -> Tuple[float, float, float]:
+        row = conn.execute("SELECT tokens, updated_at, paused_until FROM buckets WHERE name = ?", (name,)).fetchone()
+        return row if row is not None else (capacity, time.time(), 0.0)
+
+    def take(self, name: str, rate: float, capacity: float, tokens: float = 1.0) -> float:
+        """
+        Take tokens from a bucket if available without waiting
+
+        Returns:
+            0.0 when the tokens were taken, otherwise the number of seconds to wait
+        """
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                available, updated_at, paused_until = self._bucket(conn, name, capacity)
+                now = time.time()
+                if now < paused_until:
+                    conn.execute("COMMIT")
+                    return paused_until - now
+                available = min(capacity, available + max(0.0, now - updated_at) * rate)
+                wait = 0.0
+                if available >= tokens:
+                    available -= tokens
+                else:
+                    wait = (tokens - available) / rate
+                conn.execute(
+                    "INSERT OR REPLACE INTO buckets (name, tokens, updated_at, paused_until) VALUES (?, ?, ?, ?)",
+                    (name, available, now, paused_until),
+                )
+                self._writes += 1
+                if self._writes % PRUNE_EVERY == 0:
+                    conn.execute(
+                        "DELETE FROM buckets WHERE updated_at < ? AND paused_until < ?",
+                        (now - IDLE_BUCKET_SECONDS, now),
+                    )
+                conn.execute("COMMIT")
+                return wait
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def refund(self, name: str, rate: float, capacity: float, tokens: float = 1.0) -> None:
+        """
+        Give back tokens taken from a bucket, up to its capacity
+        """
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                available, updated_at, paused_until = self._bucket(conn, name, capacity)
+                now = time.time()
+                available = min(capacity, available + max(0.0, now - updated_at) * rate + tokens)
+                conn.execute(
+                    "INSERT OR REPLACE INTO buckets (name, tokens, updated_at, paused_until) VALUES (?, ?, ?, ?)",
+                    (name, available, now, paused_until),
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def available(self, name: str, rate: float, capacity: float) -> float:
+        """
+        Tokens that could be taken from a bucket right now
+        """
+        with self._lock:
+            available, updated_at, paused_until = self._bucket(self._connection(), name, capacity)
+        now = time.time()
+        if now < paused_until:
+            return 0.0
+        return min(capacity, available + max(0.0, now - updated_at) * rate)
+
+    def pause(self, name: str, seconds: float) -> None:
+        """
+        Stop handing out tokens from a bucket for the given number of seconds, in every worker
+        """
+        with self._lock:
+            conn = self._connection()
+            now = time.time()
+            conn.execute(
+                """
+                INSERT INTO buckets (name, tokens, updated_at, paused_until) VALUES (?, 0, ?, ?)
+                ON CONFLICT (name) DO UPDATE SET tokens = 0, updated_at = excluded.updated_at,
+                    paused_until = MAX(paused_until, excluded.paused_until)
+                """,
+                (name, now, now + seconds),
+            )
+
+    def post_callback(self, key: str, status: str) -> None:
+        """
+        Record a callback for whichever worker is waiting on key (see take_callbacks)
+        """
+        with self._lock:
+            conn = self._connection()
+            now = time.time()
+            conn.execute(
+                "INSERT OR REPLACE INTO callbacks (key, status, received_at) VALUES (?, ?, ?)", (key, status, now)
+            )
+            self._writes += 1
+            if self._writes % PRUNE_EVERY == 0:
+                conn.execute("DELETE FROM callbacks WHERE received_at < ?", (now - CALLBACK_SECONDS,))
+
+    def take_callbacks(self, keys: Iterable[str]) -> Dict[str, str]:
+        """
+        Remove and return the callbacks recorded for any of the given keys
+
+        Returns:
+            Dict mapping each key that has a callback to its status
+        """
+        with self._lock:
+            conn = self._connection()
+            # One JSON parameter instead of one per key, which SQLite limits
+            rows = conn.execute(
+                "DELETE FROM callbacks WHERE key IN (SELECT value FROM json_each(?)) RETURNING key, status",
+                (json.dumps(list(keys)),),
+            ).fetchall()
+        return dict(rows)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+            self._pid = None
+
+
+class SharedTokenBucket:
+    """
+    TokenBucket whose tokens live in SharedState, so every worker process
+    draws from the same bucket. Same interface as TokenBucket; the async
+    methods (atry_acquire, acquire, arefund) and pause() keep the SQLite transaction
+    off the event loop, try_acquire() and available() run it in the caller.
+    """
+
+    def __init__(self, state: SharedState, name: str, rate: float, capacity: Optional[float] = None):
+        self.state = state
+        self.name = name
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._lock: Optional[asyncio.Lock] = None
+        self._pausing: Optional[asyncio.Future] = None
+
+    def try_acquire(self, tokens: float = 1.0) -> float:
+        return self.state.take(self.name, self.rate, self.capacity, tokens)
+
+    async def atry_acquire(self, tokens: float = 1.0) -> float:
+        return await run_blocking(self.state.take, self.name, self.rate, self.capacity, tokens)
+
+    async def arefund(self, tokens: float = 1.0) -> None:
+        await run_blocking(self.state.refund, self.name, self.rate, self.capacity, tokens)
+
+    def available(self) -> float:
+        return self.state.available(self.name, self.rate, self.capacity)
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        # This worker's callers queue on the lock; workers compete for the shared tokens
+        async with self._lock:
+            while True:
+                wait = await self.atry_acquire(tokens)
+                if wait <= 0:
+                    return
+                await asyncio.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            self.state.pause(self.name, seconds)
+            return
+        # Takes effect a moment later, without waiting for the write lock on the event loop
+        self._pausing = asyncio.ensure_future(run_blocking(self.state.pause, self.name, seconds))
+
+
+_state: Optional[SharedState] = None
+_state_lock = threading.Lock()
+_configured = False
+
+
+def get_shared_state() -> Optional[SharedState]:
+    """
+    Return the host's shared state, created on first use from SHARED_STATE
+    ("sqlite" or "memory"; sqlite by default when WEB_CONCURRENCY > 1) and
+    SHARED_STATE_PATH, or None when state is kept in each process
+    """
+    global _state, _configured
+    if not _configured:
+        with _state_lock:
+            if not _configured:
+                backend = os.getenv("SHARED_STATE", "sqlite" if worker_count() > 1 else "memory")
+                if backend == "sqlite":
+                    _state = SharedState(os.getenv("SHARED_STATE_PATH", "shared_state.db"))
+                elif backend != "memory":
+                    logger.warning(f"Unknown shared state backend '{backend}', keeping state in each process")
+                _configured = True
+    return _state
+
+
+def token_bucket(name: str, rate: float, capacity: Optional[float] = None) -> Union[TokenBucket, SharedTokenBucket]:
+    """
+    A rate limiter shared by all worker processes when shared state is
+    configured, otherwise one for this process alone
+
+    Args:
+        name: Identity of the limit; buckets with the same name are one bucket
+        rate: Tokens added per second
+        capacity: Maximum burst (default: max(1, rate))
+    """
+    state = get_shared_state()
+    if state is None:
+        return TokenBucket(rate=rate, capacity=capacity)
+    return SharedTokenBucket(state, name, rate, capacity)
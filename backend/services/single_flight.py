@@ -0,0 +1,114 @@
+import asyncio
+import copy
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from services.metrics import COALESCED_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+Publish = Callable[[Any], None]
+
+
+class _Flight:
+    def __init__(self):
+        self.task: Optional[asyncio.Task] = None
+        self.waiters = 0
+        self.listeners: List[Publish] = []
+        self.published: List[Any] = []
+
+    def publish(self, value: Any) -> None:
+        self.published.append(value)
+        for listener in list(self.listeners):
+            try:
+                listener(value)
+            except Exception as e:
+                logger.warning(f"Progress listener failed: {str(e)}")
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key into one execution.
+
+    The first caller for a key starts the work as its own task; callers that
+    arrive while it runs wait for that task instead of starting another, and
+    every caller receives a copy of the same result or the same exception.
+    Progress the work publishes is passed to every caller's listener, and
+    replayed to callers that join late.
+
+    A caller that is cancelled only stops waiting; the work keeps running for
+    the others and is cancelled once no caller is left.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._flights: Dict[str, _Flight] = {}
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._flights
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+    async def do(
+        self,
+        key: str,
+        work: Optional[Callable[[Publish], Awaitable[Any]]],
+        on_progress: Optional[Publish] = None,
+        cleanup: Optional[Callable[[], None]] = None,
+    ) -> Any:
+        """
+        Run work(publish) for key, or join the run already in flight
+
+        Args:
+            key: Identity of the work (e.g. a content hash)
+            work: Coroutine function doing the work; it receives a publish
+                callback for progress updates. May be None when the caller
+                has checked that the key is already in flight.
+            on_progress: Optional listener for this caller's progress updates
+            cleanup: Optional function run when work started by this call ends,
+                however it ends (even when cancelled before it began)
+
+        Returns:
+            The work's result (a private copy for each caller)
+        """
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight()
+            self._flights[key] = flight
+            flight.task = asyncio.ensure_future(work(flight.publish))
+            flight.task.add_done_callback(lambda task: self._finished(key, flight, cleanup))
+        else:
+            COALESCED_REQUESTS.inc(operation=self.name)
+            logger.info(f"Joined in-flight {self.name} for {key[:12]} ({flight.waiters} already waiting)")
+            if on_progress is not None:
+                for value in flight.published:
+                    on_progress(value)
+
+        if on_progress is not None:
+            flight.listeners.append(on_progress)
+        flight.waiters += 1
+        try:
+            result = await asyncio.shield(flight.task)
+            return copy.deepcopy(result)
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.task.done():
+                logger.info(f"Last caller left; cancelling {self.name} for {key[:12]}")
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+            if on_progress is not None:
+                flight.listeners.remove(on_progress)
+
+    def _finished(self, key: str, flight: _Flight, cleanup: Optional[Callable[[], None]]) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        if cleanup is not None:
+            try:
+                cleanup()
+            except Exception as e:
+                logger.warning(f"Cleanup after {self.name} failed: {str(e)}")
+        # Mark the exception as retrieved when every caller had already left
+        if not flight.task.cancelled():
+            flight.task.exception()
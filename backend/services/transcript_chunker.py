@@ -0,0 +1,101 @@
+import re
+from difflib import SequenceMatcher
+from typing import List
+
+# A new speaker turn: "Speaker A:", "John:", "Sarah Lee:" at the start of a line
+SPEAKER_TURN = re.compile(r"\n(?=\s*(?:Speaker\s+\w+|[A-Z][\w.'-]*(?:\s+[A-Z][\w.'-]*){0,2})\s*:)")
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def _split_units(text: str, max_chars: int) -> List[str]:
+    """
+    Break text into speaker turns, then sentences, then hard slices, so that
+    no unit is longer than max_chars
+    """
+    units = []
+    for turn in SPEAKER_TURN.split(text):
+        turn = turn.strip()
+        if not turn:
+            continue
+        if len(turn) <= max_chars:
+            units.append(turn)
+            continue
+        for sentence in SENTENCE_END.split(turn):
+            while len(sentence) > max_chars:
+                units.append(sentence[:max_chars])
+                sentence = sentence[max_chars:]
+            if sentence:
+                units.append(sentence)
+    return units
+
+
+def split_transcript(text: str, max_chars: int = 12000, overlap_chars: int = 600) -> List[str]:
+    """
+    Split a transcript into overlapping chunks on speaker or sentence boundaries
+
+    Args:
+        text: Full transcript
+        max_chars: Upper bound on the length of a chunk (excluding the overlap)
+        overlap_chars: Trailing context from the previous chunk repeated at the
+            start of the next one, so statements spanning a boundary are not lost
+
+    Returns:
+        List of chunk strings in transcript order
+    """
+    text = text.strip()
+    if len(text) <= max_chars:
+        return [text] if text else []
+
+    chunks = []
+    current: List[str] = []
+    current_len = 0
+    for unit in _split_units(text, max_chars):
+        if current and current_len + len(unit) + 1 > max_chars:
+            chunks.append(current)
+            # Carry the last units of this chunk over as overlap
+            carried: List[str] = []
+            carried_len = 0
+            for previous in reversed(current):
+                if carried_len + len(previous) > overlap_chars:
+                    break
+                carried.insert(0, previous)
+                carried_len += len(previous) + 1
+            current, current_len = carried, carried_len
+        current.append(unit)
+        current_len += len(unit) + 1
+    if current:
+        chunks.append(current)
+
+    return [" ".join(chunk) for chunk in chunks]
+
+
+def normalize_action_item(item: str) -> str:
+    item = re.sub(r"^\s*(?:[-*•]|\d+[.)])\s*", "", item.lower())
+    return re.sub(r"[^a-z0-9 ]+", "", re.sub(r"\s+", " ", item)).strip()
+
+
+def _is_near_duplicate(a: str, b: str, threshold: float) -> bool:
+    if a == b:
+        return True
+    # Items that mention different numbers (dates, amounts, ticket ids) are distinct tasks
+    if re.findall(r"\d+", a) != re.findall(r"\d+", b):
+        return False
+    return SequenceMatcher(None, a, b).ratio() >= threshold
+
+
+def dedupe_action_items(items: List[str], threshold: float = 0.9) -> List[str]:
+    """
+    Remove exact and near-duplicate action items, keeping the first occurrence.
+    Chunk overlaps routinely produce the same item twice with small wording changes.
+    """
+    kept: List[str] = []
+    kept_normalized: List[str] = []
+    for item in items:
+        if not isinstance(item, str) or not item.strip():
+            continue
+        normalized = normalize_action_item(item)
+        if any(_is_near_duplicate(normalized, other, threshold) for other in kept_normalized):
+            continue
+        kept.append(item.strip())
+        kept_normalized.append(normalized)
+    return kept
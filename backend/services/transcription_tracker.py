@@ -0,0 +1,244 @@
+import asyncio
+import random
+import time
+import logging
+from typing import Dict, Any, Optional
+
+import httpx
+
+from services.executor import run_blocking
+from services.metrics import record_external
+from services.resilience import CircuitOpenError, DeadlineExceeded, get_provider, remaining
+from services.shared_state import SharedState
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = ("completed", "error")
+
+
+class TranscriptionTimeout(Exception):
+    """
+    Raised when a transcript does not reach a terminal status before the deadline
+    """
+
+
+class TranscriptionTracker:
+    """
+    Tracks in-flight AssemblyAI transcripts until they complete.
+
+    Two modes are supported:
+    - polling: async polling with exponential backoff, jitter and an overall timeout
+      (or the request deadline, if sooner)
+    - webhook: AssemblyAI calls back our webhook endpoint, which resolves the waiting
+      coroutine; a slow safety poll covers lost callbacks
+
+    With several worker processes the webhook may reach a worker other than the
+    one waiting. Given a SharedState, callbacks nobody waits for in this process
+    are recorded there, and one task per process collects the ones for its
+    waiters every callback_interval seconds.
+
+    Neither mode holds a thread per transcript, so thousands of transcripts can be
+    tracked concurrently by one event loop.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = "https://api.assemblyai.com",
+        webhook_url: Optional[str] = None,
+        initial_interval: float = 1.0,
+        max_interval: float = 30.0,
+        backoff_factor: float = 2.0,
+        timeout: float = 3600.0,
+        http_client: Optional[httpx.AsyncClient] = None,
+        shared_state: Optional[SharedState] = None,
+        callback_interval: float = 1.0,
+    ):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.webhook_url = webhook_url
+        self.initial_interval = initial_interval
+        self.max_interval = max_interval
+        self.backoff_factor = backoff_factor
+        self.timeout = timeout
+
+        self._client = http_client
+        # Status requests share the AssemblyAI timeouts, circuit breaker and retry budget;
+        # they are idempotent, so slow ones may be hedged
+        self.provider = get_provider("assemblyai")
+        self._waiters: Dict[str, asyncio.Future] = {}
+        # Callbacks that arrived before anyone started waiting for the transcript
+        self._early_callbacks: Dict[str, float] = {}
+        self.shared_state = shared_state
+        self.callback_interval = callback_interval
+        self._collector: Optional[asyncio.Task] = None
+
+    @property
+    def mode(self) -> str:
+        return "webhook" if self.webhook_url else "polling"
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers={"authorization": self.api_key},
+                timeout=self.provider.timeout,
+            )
+        return self._client
+
+    async def close(self) -> None:
+        if self._collector is not None:
+            self._collector.cancel()
+            self._collector = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def fetch(self, transcript_id: str) -> Dict[str, Any]:
+        """
+        Fetch the current state of a transcript from the API
+        """
+        try:
+            response = await self.provider.call(
+                lambda timeout: self._get_client().get(f"/v2/transcript/{transcript_id}", timeout=timeout),
+                idempotent=True,
+                failed=lambda response: response.status_code >= 500,
+            )
+            response.raise_for_status()
+        except (CircuitOpenError, DeadlineExceeded):
+            raise
+        except (httpx.HTTPError, TimeoutError):
+            record_external("transcription", False)
+            raise
+        record_external("transcription", True)
+        return response.json()
+
+    async def wait(self, transcript_id: str) -> Dict[str, Any]:
+        """
+        Wait until a transcript reaches a terminal status
+
+        Args:
+            transcript_id: AssemblyAI transcript id
+
+        Returns:
+            The transcript JSON with status "completed" or "error"
+
+        Raises:
+            TranscriptionTimeout: if the transcript is still running after the
+                timeout or the request deadline
+        """
+        if self.webhook_url:
+            return await self._wait_for_webhook(transcript_id)
+        return await self._poll(transcript_id, self._deadline())
+
+    def _deadline(self) -> float:
+        deadline = time.monotonic() + self.timeout
+        left = remaining()
+        return deadline if left is None else min(deadline, time.monotonic() + left)
+
+    async def _poll(self, transcript_id: str, deadline: float) -> Dict[str, Any]:
+        interval = self.initial_interval
+        while True:
+            try:
+                transcript = await self.fetch(transcript_id)
+            except DeadlineExceeded:
+                raise
+            except (httpx.HTTPError, TimeoutError) as e:
+                if not self.provider.retry_allowed():
+                    raise
+                # A failed status request is simply repeated at the next poll
+                logger.warning(f"Polling transcript {transcript_id} failed, will retry: {str(e) or type(e).__name__}")
+                transcript = {}
+            if transcript.get("status") in TERMINAL_STATUSES:
+                return transcript
+
+            left = deadline - time.monotonic()
+            if left <= 0:
+                raise TranscriptionTimeout(f"Transcript {transcript_id} did not complete before its deadline")
+
+            # Full jitter keeps many concurrent pollers from synchronizing
+            delay = min(random.uniform(interval / 2, interval), left)
+            await asyncio.sleep(delay)
+            interval = min(interval * self.backoff_factor, self.max_interval)
+
+    async def _wait_for_webhook(self, transcript_id: str) -> Dict[str, Any]:
+        deadline = self._deadline()
+        if self._early_callbacks.pop(transcript_id, None) is None:
+            future = asyncio.get_running_loop().create_future()
+            self._waiters[transcript_id] = future
+            if self.shared_state is not None and self._collector is None:
+                self._collector = asyncio.create_task(self._collect_shared_callbacks())
+            try:
+                while not future.done():
+                    left = deadline - time.monotonic()
+                    if left <= 0:
+                        raise TranscriptionTimeout(
+                            f"No webhook received for transcript {transcript_id} before its deadline"
+                        )
+                    try:
+                        await asyncio.wait_for(asyncio.shield(future), timeout=min(self.max_interval * 10, left))
+                    except asyncio.TimeoutError:
+                        # Safety poll in case the callback was lost
+                        transcript = await self.fetch(transcript_id)
+                        if transcript.get("status") in TERMINAL_STATUSES:
+                            return transcript
+            finally:
+                self._waiters.pop(transcript_id, None)
+
+        # The callback only carries the status, so fetch the full transcript once
+        return await self.fetch(transcript_id)
+
+    async def _collect_shared_callbacks(self) -> None:
+        """
+        Resume this process's waiters whose callbacks were received by another worker
+        """
+        try:
+            # Collect once right away: the callback may have arrived before the wait began
+            while self._waiters:
+                try:
+                    callbacks = await run_blocking(self.shared_state.take_callbacks, list(self._waiters))
+                except Exception as e:
+                    # The safety poll still covers the waiters
+                    logger.warning(f"Collecting shared transcription callbacks failed: {e}")
+                    callbacks = {}
+                for transcript_id, status in callbacks.items():
+                    self._resume(transcript_id, status)
+                await asyncio.sleep(self.callback_interval)
+        finally:
+            if self._collector is asyncio.current_task():
+                self._collector = None
+
+    def _resume(self, transcript_id: str, status: str) -> bool:
+        future = self._waiters.get(transcript_id)
+        if future is None:
+            return False
+        if not future.done():
+            future.set_result(status)
+        return True
+
+    async def notify(self, transcript_id: str, status: str) -> bool:
+        """
+        Resume the coroutine waiting on a transcript. Called by the webhook endpoint.
+
+        Returns:
+            bool: True if a waiter in this process was resumed, False if the callback
+                was buffered (in the shared state, for any worker, when configured)
+        """
+        if status not in TERMINAL_STATUSES:
+            return False
+
+        if self._resume(transcript_id, status):
+            return True
+
+        if self.shared_state is not None:
+            await run_blocking(self.shared_state.post_callback, transcript_id, status)
+        else:
+            self._early_callbacks[transcript_id] = time.monotonic()
+            self._expire_early_callbacks()
+        return False
+
+    def _expire_early_callbacks(self) -> None:
+        cutoff = time.monotonic() - self.timeout
+        for transcript_id, received_at in list(self._early_callbacks.items()):
+            if received_at < cutoff:
+                del self._early_callbacks[transcript_id]
@@ -0,0 +1,165 @@
+import hashlib
+import json
+import os
+import uuid
+import logging
+from typing import Dict, Optional
+
+from services.executor import run_blocking
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+
+class UploadTooLarge(Exception):
+    """
+    Raised when an upload exceeds the configured maximum size
+    """
+
+    def __init__(self, max_bytes: int):
+        super().__init__(f"File exceeds the maximum upload size of {max_bytes // (1024 * 1024)} MB")
+        self.max_bytes = max_bytes
+
+
+class UploadLimitMiddleware:
+    """
+    ASGI middleware that caps the size of POST request bodies.
+
+    A declared Content-Length over the limit is answered with 413 before the
+    body is read. The body bytes are also counted as they arrive, so a chunked
+    upload or a wrong Content-Length is cut off at the limit too: the app then
+    sees the client disconnect, and the client gets 413 instead of the app's
+    response. This happens before Starlette spools the multipart body to disk.
+    """
+
+    def __init__(self, app, max_bytes: int, path_limits: Optional[Dict[str, int]] = None):
+        """
+        Args:
+            app: The ASGI app to wrap
+            max_bytes: Limit on the body of any POST request
+            path_limits: Other limits for particular paths (e.g. a batch upload of many files)
+        """
+        self.app = app
+        self.max_bytes = max_bytes
+        self.path_limits = path_limits or {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST":
+            await self.app(scope, receive, send)
+            return
+
+        limit = self.path_limits.get(scope["path"], self.max_bytes)
+        content_length = dict(scope["headers"]).get(b"content-length", b"")
+        if content_length.isdigit() and int(content_length) > limit:
+            await self._reject(send, limit)
+            return
+
+        received = 0
+        exceeded = False
+        started = False
+
+        async def limited_receive():
+            nonlocal received, exceeded
+            if exceeded:
+                return {"type": "http.disconnect"}
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    exceeded = True
+                    logger.warning(f"Upload to {scope['path']} cut off after {received} bytes (limit {limit})")
+                    return {"type": "http.disconnect"}
+            return message
+
+        async def guarded_send(message):
+            nonlocal started
+            if exceeded and not started:
+                # The app's answer to the disconnect; the client gets 413 instead
+                return
+            if message["type"] == "http.response.start":
+                started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except Exception:
+            if not exceeded:
+                raise
+        if exceeded and not started:
+            await self._reject(send, limit)
+
+    @staticmethod
+    async def _reject(send, limit: int) -> None:
+        body = json.dumps({"detail": str(UploadTooLarge(limit))}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode()),
+                        (b"connection", b"close")],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+class SpooledUpload:
+    """
+    An upload copied to local disk, with its size and SHA-256 content hash
+    """
+
+    def __init__(self, path: str, filename: str, size: int, sha256: str):
+        self.path = path
+        self.filename = filename
+        self.size = size
+        self.sha256 = sha256
+
+    def remove(self) -> None:
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+async def spool_upload(
+    upload,
+    dest_dir: str,
+    max_bytes: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> SpooledUpload:
+    """
+    Copy an upload to disk in fixed-size chunks, hashing it along the way.
+    Peak memory stays at roughly one chunk regardless of the file size.
+
+    Args:
+        upload: FastAPI UploadFile (anything with an async read(size) and a filename)
+        dest_dir: Directory the file is written to
+        max_bytes: Reject the upload once more than this many bytes were read
+        chunk_size: Number of bytes read and written per step
+
+    Returns:
+        SpooledUpload describing the file on disk
+
+    Raises:
+        UploadTooLarge: if the upload is larger than max_bytes (the partial file is removed)
+    """
+    filename = os.path.basename(upload.filename or "upload")
+    path = os.path.join(dest_dir, f"{uuid.uuid4().hex}_{filename}")
+    digest = hashlib.sha256()
+    size = 0
+
+    out = await run_blocking(open, path, "wb")
+    try:
+        while True:
+            chunk = await upload.read(chunk_size)
+            if not chunk:
+                break
+            size += len(chunk)
+            if max_bytes is not None and size > max_bytes:
+                raise UploadTooLarge(max_bytes)
+            digest.update(chunk)
+            await run_blocking(out.write, chunk)
+    except BaseException:
+        out.close()
+        os.unlink(path)
+        raise
+    out.close()
+
+    logger.info(f"Spooled upload {filename} ({size} bytes) to {path}")
+    return SpooledUpload(path, filename, size, digest.hexdigest())
@@ -0,0 +1,22 @@
+"""
+The app reads its settings when main is imported: run it in demo mode (no API
+keys), with its databases and uploads in a scratch directory
+"""
+import os
+import tempfile
+
+_DATA_DIR = tempfile.mkdtemp(prefix="meeting-agent-tests-")
+
+os.environ.update({
+    "ASSEMBLYAI_API_KEY": "",
+    "GEMINI_API_KEY": "",
+    "TRELLO_API_KEY": "",
+    "TRELLO_TOKEN": "",
+    "WEB_CONCURRENCY": "1",
+    "UPLOAD_DIR": os.path.join(_DATA_DIR, "uploads"),
+    "JOB_DB_PATH": os.path.join(_DATA_DIR, "jobs.db"),
+    "MEETING_DB_PATH": os.path.join(_DATA_DIR, "meetings.db"),
+    "RESULT_CACHE_PATH": os.path.join(_DATA_DIR, "cache.db"),
+    "SHARED_STATE_PATH": os.path.join(_DATA_DIR, "shared_state.db"),
+    "TRELLO_INDEX_PATH": os.path.join(_DATA_DIR, "trello_index.db"),
+})
@@ -0,0 +1,79 @@
+import asyncio
+import json
+import os
+import tempfile
+
+from services.batch import BatchCheckpoint, BatchManager, BatchRunner, ItemStatus, new_batch
+
+
+class StubPipeline:
+    """
+    Transcribes every file to a long text and summarizes it instantly
+    """
+
+    async def transcribe(self, audio_path, filename=None, *args):
+        return f"Transcript of {filename}. " * 2000
+
+    async def summarize(self, transcript, on_partial=None):
+        return {"summary": f"Summary of {transcript[:30]}", "action_items": ["Send the notes"]}
+
+
+def make_batch(directory: str, files: int) -> dict:
+    paths = []
+    for index in range(files):
+        path = os.path.join(directory, f"meeting-{index}.wav")
+        with open(path, "wb") as handle:
+            handle.write(b"RIFF....")
+        paths.append({"path": path, "filename": os.path.basename(path)})
+    return new_batch(paths)
+
+
+def run_batch(directory: str, files: int = 3):
+    batch = make_batch(directory, files)
+    checkpoint = BatchCheckpoint(os.path.join(directory, "batch.json"))
+    asyncio.run(BatchRunner(StubPipeline(), agents=None).run(batch, checkpoint))
+    return batch, checkpoint
+
+
+def test_results_are_kept_out_of_the_checkpoint(monkeypatch):
+    # probe_duration reads the audio; the stand-in files are not real recordings
+    monkeypatch.setattr("services.audio_segmenter.probe_duration", lambda path: 60.0)
+    directory = tempfile.mkdtemp()
+    batch, checkpoint = run_batch(directory)
+
+    with open(checkpoint.path) as handle:
+        saved = json.load(handle)
+    assert all(item["status"] == ItemStatus.COMPLETED for item in saved["items"])
+    assert all("transcript" not in item for item in saved["items"])
+    assert os.path.getsize(checkpoint.path) < len(batch["items"][0]["transcript"])
+
+    loaded = asyncio.run(checkpoint.aload())
+    assert loaded["items"] == batch["items"]
+
+
+def test_checkpoint_without_results_files_still_loads():
+    directory = tempfile.mkdtemp()
+    batch = make_batch(directory, 2)
+    batch["items"][0].update(status=ItemStatus.TRANSCRIBED, transcript="Inline transcript")
+    path = os.path.join(directory, "batch.json")
+    with open(path, "w") as handle:
+        json.dump(batch, handle)
+
+    loaded = BatchCheckpoint(path).load()
+
+    assert loaded["items"][0]["transcript"] == "Inline transcript"
+
+
+def test_manager_reports_a_batch_from_its_checkpoint(monkeypatch):
+    monkeypatch.setattr("services.audio_segmenter.probe_duration", lambda path: 60.0)
+    directory = tempfile.mkdtemp()
+    batch, checkpoint = run_batch(directory)
+    # Another worker process: the batch is only known through the checkpoint in batch_dir
+    manager = BatchManager(runner=None, batch_dir=directory)
+    os.replace(checkpoint.path, manager.checkpoint_path(batch["id"]))
+    os.replace(checkpoint.results_dir, BatchCheckpoint(manager.checkpoint_path(batch["id"])).results_dir)
+
+    reported = asyncio.run(manager.get(batch["id"]))
+
+    assert reported["items"] == batch["items"]
+    assert asyncio.run(manager.get("missing")) is None
@@ -0,0 +1,50 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi.testclient import TestClient
+
+import main
+from benchmarks.concurrency_bench import BlockingModel, stand_in_transcribe
+
+LATENCY = 0.5
+REQUESTS = 4
+
+
+def post_audio(client: TestClient, index: int) -> float:
+    start = time.perf_counter()
+    # Different bytes and names per request, so none joins another's transcription or summary
+    audio = b"RIFF" + index.to_bytes(4, "little") + b"WAVE"
+    response = client.post("/process-audio", files={"file": (f"meeting-{index}.wav", audio, "audio/wav")})
+    assert response.status_code == 200
+    return time.perf_counter() - start
+
+
+def test_blocking_model_calls_do_not_serialize_requests(monkeypatch):
+    # Every request comes from the same client, which admission control would hold to its share
+    monkeypatch.setattr(main, "ADMISSION_CONTROL", False)
+    monkeypatch.setattr(main.pipeline, "cache", None)
+    transcription_agent = main.agents.get("transcription")
+    monkeypatch.setattr(transcription_agent, "transcribe_file", stand_in_transcribe)
+    summarization_agent = main.agents.get("summarization")
+    model = BlockingModel(LATENCY)
+    monkeypatch.setattr(summarization_agent, "demo_mode", False)
+    monkeypatch.setattr(summarization_agent, "model", model, raising=False)
+
+    with TestClient(main.app) as client, ThreadPoolExecutor(REQUESTS) as pool:
+        single = post_audio(client, 0)
+
+        start = time.perf_counter()
+        batch = [pool.submit(post_audio, client, index) for index in range(1, REQUESTS + 1)]
+        time.sleep(LATENCY / 4)
+        health_start = time.perf_counter()
+        assert client.get("/").status_code == 200
+        health_latency = time.perf_counter() - health_start
+        for future in batch:
+            future.result()
+        total = time.perf_counter() - start
+
+    assert model.calls == REQUESTS + 1
+    # Run one after another the batch would take REQUESTS times as long
+    assert total < single * REQUESTS / 2
+    # The health check does not wait for the blocking model calls
+    assert health_latency < LATENCY / 2
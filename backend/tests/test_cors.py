@@ -0,0 +1,33 @@
+from fastapi.testclient import TestClient
+
+import main
+from services.admission import AdmissionController
+
+ORIGIN = "http://localhost:5173"
+
+
+def test_admission_rejection_is_readable_cross_origin(monkeypatch):
+    # One request per client, then 429
+    monkeypatch.setattr(main, "ADMISSION_CONTROL", True)
+    monkeypatch.setattr(main, "admission", AdmissionController(client_rate=0.001, client_burst=1))
+    files = {"file": ("meeting.wav", b"RIFF" + b"\0" * 1024, "audio/wav")}
+    with TestClient(main.app) as client:
+        first = client.post("/process-audio", files=files, headers={"Origin": ORIGIN})
+        rejected = client.post("/process-audio", files=files, headers={"Origin": ORIGIN})
+
+    assert first.status_code == 200
+    assert rejected.status_code == 429
+    assert rejected.headers["access-control-allow-origin"] == ORIGIN
+    assert "Retry-After" in rejected.headers["access-control-expose-headers"]
+    assert int(rejected.headers["retry-after"]) >= 1
+
+
+def test_oversized_upload_rejection_is_readable_cross_origin():
+    with TestClient(main.app) as client:
+        response = client.post(
+            "/process-audio",
+            content=b"x" * 16,
+            headers={"Origin": ORIGIN, "Content-Length": str(main.MAX_UPLOAD_BYTES + 1)},
+        )
+    assert response.status_code == 413
+    assert response.headers["access-control-allow-origin"] == ORIGIN
@@ -0,0 +1,57 @@
+import socket
+import threading
+import time
+
+import pytest
+import requests
+import uvicorn
+
+from agents.summarization_agent import SummarizationAgent
+from benchmarks import fake_gemini
+
+
+@pytest.fixture
+def gemini_endpoint():
+    """
+    The Gemini stand-in on a local port, answering after a second
+    """
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(
+        fake_gemini.create_app(base_latency=1.0, seconds_per_kchar=0.0), host="127.0.0.1", port=port, log_level="warning"
+    ))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    yield f"http://127.0.0.1:{port}"
+    server.should_exit = True
+    thread.join()
+
+
+@pytest.fixture
+def agent(gemini_endpoint, monkeypatch):
+    monkeypatch.setenv("GEMINI_API_KEY", "test")
+    monkeypatch.setenv("GEMINI_API_ENDPOINT", gemini_endpoint)
+    return SummarizationAgent()
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_generate_through_the_sdk(agent, stream):
+    response = agent._generate_blocking("Summarize the meeting.", timeout=10.0, stream=stream)
+
+    text = "".join(chunk.text for chunk in response) if stream else response.text
+    assert text
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_timeout_reaches_the_sdk_client(agent, stream):
+    start = time.perf_counter()
+    # GEMINI_API_ENDPOINT selects the REST transport, which sends requests through the requests library
+    with pytest.raises(requests.exceptions.Timeout):
+        response = agent._generate_blocking("Summarize the meeting.", timeout=0.2, stream=stream)
+        if stream:
+            list(response)
+    # The stand-in takes a second to answer; the request must have given up before that
+    assert time.perf_counter() - start < 0.9
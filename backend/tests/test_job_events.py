@@ -0,0 +1,57 @@
+import json
+import time
+
+from fastapi.testclient import TestClient
+
+import main
+
+
+def wait_for_job(client: TestClient, job_id: str) -> dict:
+    for _ in range(100):
+        job = client.get(f"/jobs/{job_id}").json()
+        if job["status"] in ("completed", "failed"):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"Job {job_id} did not finish")
+
+
+def parse_sse(body: str) -> list:
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if not line.startswith(":"))
+        if "event" in fields:
+            events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+def test_sse_stream_of_a_demo_job():
+    with TestClient(main.app) as client:
+        job_id = client.post("/jobs", files={"file": ("a.wav", b"RIFF....", "audio/wav")}).json()["job_id"]
+        assert wait_for_job(client, job_id)["status"] == "completed"
+
+        events = parse_sse(client.get(f"/jobs/{job_id}/events").text)
+
+    names = [name for name, _ in events]
+    assert names[-1] == "completed"
+    # The summary is published on its own event; summary_partial is only used for chunks
+    summary = dict(events)["summary_text"]
+    assert summary["summary"]
+    assert all("chunk" in data for name, data in events if name == "summary_partial")
+
+
+def test_sse_replays_from_last_event_id():
+    with TestClient(main.app) as client:
+        job_id = client.post("/jobs", files={"file": ("a.wav", b"RIFF....", "audio/wav")}).json()["job_id"]
+        wait_for_job(client, job_id)
+
+        events = parse_sse(client.get(f"/jobs/{job_id}/events").text)
+        tail = parse_sse(client.get(f"/jobs/{job_id}/events", headers={"Last-Event-ID": "2"}).text)
+
+    assert tail == events[2:]
+
+
+def test_unknown_job():
+    with TestClient(main.app) as client:
+        assert client.get("/jobs/missing/events").status_code == 404
+        with client.websocket_connect("/jobs/missing/ws") as websocket:
+            assert websocket.receive_json() == {"event": "error", "data": {"detail": "Job not found"}}
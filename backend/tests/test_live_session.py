@@ -0,0 +1,134 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+
+import main
+from agents.local_summarization_agent import LocalSummarizationAgent
+from services.live_session import LiveMeetingSession
+
+
+class RecordingAgent:
+    """
+    Appends a marker per update; can be held mid-update to simulate a slow model
+    """
+
+    def __init__(self):
+        self.calls = []
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def update_rolling_summary(self, previous_summary, action_items, new_text):
+        self.calls.append(new_text)
+        await self.release.wait()
+        return {"summary": f"{previous_summary} Update {len(self.calls)}.".strip(), "action_items": [f"item {len(self.calls)}"]}
+
+
+def segment(index: int) -> str:
+    return f"Segment {index} of the meeting covers the roadmap in some detail. " * 3
+
+
+def test_session_lifecycle():
+    async def run():
+        updates = []
+
+        async def on_update(update):
+            updates.append(update)
+
+        agent = RecordingAgent()
+        session = LiveMeetingSession(agent, on_update=on_update, min_update_chars=300)
+        session.add_segment(segment(1), speaker="Sam")
+        session.add_segment(segment(2))
+        # Enough text for a background update
+        for _ in range(5):
+            await asyncio.sleep(0)
+        assert len(agent.calls) == 1
+        assert agent.calls[0].startswith("Sam: Segment 1")
+        assert updates[0]["summary"] == "Update 1."
+
+        session.add_segment("A short tail.")
+        final = await session.finish()
+        assert final["segments"] == 3
+        assert final["updates"] == 2
+        assert final["action_items"] == ["item 1", "item 2"]
+        assert "A short tail." in agent.calls[1]
+
+    asyncio.run(run())
+
+
+def test_cancel_stops_a_running_update():
+    async def run():
+        agent = RecordingAgent()
+        agent.release.clear()
+        session = LiveMeetingSession(agent, min_update_chars=10)
+        session.add_segment(segment(1))
+        await asyncio.sleep(0)
+        assert session._task is not None and not session._task.done()
+        await session.cancel()
+        assert session._task.done()
+        assert session.updates == 0
+
+    asyncio.run(run())
+
+
+def test_buffer_is_bounded_while_an_update_is_running():
+    async def run():
+        agent = RecordingAgent()
+        agent.release.clear()
+        session = LiveMeetingSession(agent, min_update_chars=100, max_update_chars=1000, max_buffer_chars=2000)
+        for index in range(200):
+            session.add_segment(segment(index))
+            await asyncio.sleep(0)
+        assert len(agent.calls) == 1
+        assert session._buffer_chars <= 2000
+        assert session.skipped_chars > 0
+        # The newest text is kept
+        assert session._buffer[-1].startswith("Segment 199")
+
+        agent.release.set()
+        final = await session.finish()
+        assert final["skipped_chars"] == session.skipped_chars
+        assert any("Segment 199" in text for text in agent.calls)
+
+    asyncio.run(run())
+
+
+def test_summary_keeps_changing_after_the_cap_is_reached():
+    async def run():
+        session = LiveMeetingSession(LocalSummarizationAgent(), min_update_chars=50, max_summary_chars=600)
+        summaries = []
+        for topic in range(1, 41):
+            session.add_segment(
+                f"Topic {topic} was the launch plan for region {topic}. "
+                f"The team agreed that region {topic} needs its own launch plan and budget. "
+                f"Priya will send the region {topic} launch plan by Friday."
+            )
+            await session.finish()
+            summaries.append(session.summary)
+
+        assert all(len(summary) <= 600 for summary in summaries)
+        capped = [index for index, summary in enumerate(summaries) if len(summary) > 450]
+        assert capped and capped[0] < 30
+        after_cap = summaries[capped[0]:]
+        assert len(set(after_cap)) == len(after_cap)
+        assert "region 40" in summaries[-1]
+
+    asyncio.run(run())
+
+
+def test_live_endpoint_answers_malformed_frames_and_keeps_the_session():
+    with TestClient(main.app) as client:
+        with client.websocket_connect("/live") as websocket:
+            assert websocket.receive_json()["type"] == "session_started"
+
+            for frame in ("not json", "[1, 2]", '"text"', '{"type": "segment", "text": 5}', '{"type": "dance"}'):
+                websocket.send_text(frame)
+                reply = websocket.receive_json()
+                assert reply["type"] == "error", frame
+
+            websocket.send_json({"type": "segment", "text": "Sarah will send the report by Friday.", "speaker": "Sarah"})
+            websocket.send_json({"type": "end"})
+            final = websocket.receive_json()
+            while final["type"] == "update":
+                final = websocket.receive_json()
+            assert final["type"] == "final"
+            assert final["segments"] == 1
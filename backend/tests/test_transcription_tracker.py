@@ -0,0 +1,93 @@
+import asyncio
+import os
+import tempfile
+import time
+
+import httpx
+from fastapi import FastAPI, Request
+
+from benchmarks import fake_assemblyai
+from services.shared_state import SharedState
+from services.transcription_tracker import TranscriptionTracker
+
+PROCESSING_TIME = 0.5
+MAX_INTERVAL = 2.0
+# The webhook waiter falls back to a status request after max_interval * 10 seconds
+SAFETY_POLL = MAX_INTERVAL * 10
+
+
+async def track(transcripts: int, webhook: bool, shared_state: SharedState = None):
+    """
+    Create transcripts on the AssemblyAI stand-in and wait for all of them
+
+    With a shared_state the webhook is answered by a second tracker, as if
+    another worker process had received the callback.
+
+    Returns:
+        (results, wall time in seconds, status requests sent)
+    """
+    webhook_app = FastAPI()
+    webhook_client = httpx.AsyncClient(transport=httpx.ASGITransport(app=webhook_app), base_url="http://webhook")
+    fake = fake_assemblyai.create_app(processing_time=PROCESSING_TIME, webhook_client=webhook_client)
+    api_client = httpx.AsyncClient(transport=httpx.ASGITransport(app=fake), base_url="http://fake-assemblyai")
+    settings = dict(
+        api_key="test",
+        webhook_url="http://webhook/webhooks/transcription" if webhook else None,
+        initial_interval=0.25,
+        max_interval=MAX_INTERVAL,
+        timeout=SAFETY_POLL * 3,
+        http_client=api_client,
+        shared_state=shared_state,
+        callback_interval=0.05,
+    )
+    tracker = TranscriptionTracker(**settings)
+    receiver = TranscriptionTracker(**settings) if shared_state is not None else tracker
+
+    @webhook_app.post("/webhooks/transcription")
+    async def on_webhook(request: Request):
+        payload = await request.json()
+        await receiver.notify(payload["transcript_id"], payload["status"])
+        return {"status": "received"}
+
+    body = {"audio_url": "https://example.invalid/audio.wav"}
+    if webhook:
+        body["webhook_url"] = tracker.webhook_url
+    ids = [(await api_client.post("/v2/transcript", json=body)).json()["id"] for _ in range(transcripts)]
+
+    start = time.perf_counter()
+    results = await asyncio.wait_for(
+        asyncio.gather(*(tracker.wait(transcript_id) for transcript_id in ids)), timeout=SAFETY_POLL * 2
+    )
+    elapsed = time.perf_counter() - start
+    await api_client.aclose()
+    await webhook_client.aclose()
+    return results, elapsed, fake.state.stats["polls"]
+
+
+def test_webhook_resolves_without_polling():
+    results, elapsed, polls = asyncio.run(track(50, webhook=True))
+
+    assert all(result["status"] == "completed" for result in results)
+    # Resumed by the callback, not by the safety poll
+    assert elapsed < SAFETY_POLL / 4
+    # Only the one fetch of the finished transcript per transcript
+    assert polls == 50
+
+
+def test_polling_mode_completes():
+    results, elapsed, polls = asyncio.run(track(20, webhook=False))
+
+    assert all(result["status"] == "completed" for result in results)
+    assert polls > 20
+
+
+def test_webhook_received_by_another_worker():
+    shared_state = SharedState(os.path.join(tempfile.mkdtemp(), "shared_state.db"))
+    try:
+        results, elapsed, polls = asyncio.run(track(20, webhook=True, shared_state=shared_state))
+    finally:
+        shared_state.close()
+
+    assert all(result["status"] == "completed" for result in results)
+    assert elapsed < SAFETY_POLL / 4
+    assert polls == 20
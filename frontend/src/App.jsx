@@ -15,29 +15,82 @@ function App() {
   const [data, setData] = useState(null);
   const [error, setError] = useState(null);
   const [trelloSuccess, setTrelloSuccess] = useState(null);
+  const [progressMessage, setProgressMessage] = useState('Processing your audio file...');
+
+  const waitForJob = (jobId) =>
+    new Promise((resolve, reject) => {
+      const source = new EventSource(`${API_URL}/jobs/${jobId}/events`);
+      const on = (type, handler) =>
+        source.addEventListener(type, (event) => handler(JSON.parse(event.data)));
+
+      on('transcription_queued', () => setProgressMessage('Waiting for a transcription slot...'));
+      on('transcription_started', () => setProgressMessage('Transcribing audio...'));
+      on('transcription_done', () => setProgressMessage('Transcript ready. Generating summary...'));
+      on('summary_partial', ({ chunk, chunks }) =>
+        setProgressMessage(`Summarizing part ${chunk} of ${chunks}...`)
+      );
+      on('summary_text', () => setProgressMessage('Summary ready. Extracting action items...'));
+      on('action_items', () => setProgressMessage('Extracting action items...'));
+      on('completed', (job) => {
+        source.close();
+        resolve(job);
+      });
+      on('failed', ({ error }) => {
+        source.close();
+        reject(new Error(error || 'Failed to process audio'));
+      });
+      source.onerror = () => {
+        // EventSource reconnects on its own unless the connection was closed for good
+        if (source.readyState === EventSource.CLOSED) {
+          reject(new Error('Lost connection to the server'));
+        }
+      };
+    });
 
   const handleFileUpload = async (file) => {
     setIsProcessing(true);
     setError(null);
     setData(null);
     setTrelloSuccess(null);
+    setProgressMessage('Uploading audio...');
 
     try {
       const formData = new FormData();
       formData.append('file', file);
 
-      const response = await fetch(`${API_URL}/process-audio`, {
+      // Queue a background job and follow its progress events
+      const response = await fetch(`${API_URL}/jobs`, {
         method: 'POST',
         body: formData,
       });
 
+      if (response.status === 404) {
+        // Backend without the job API: fall back to the blocking endpoint
+        const fallback = await fetch(`${API_URL}/process-audio`, {
+          method: 'POST',
+          body: formData,
+        });
+        if (!fallback.ok) {
+          const errorData = await fallback.json();
+          throw new Error(errorData.detail || 'Failed to process audio');
+        }
+        setData(await fallback.json());
+        return;
+      }
+
       if (!response.ok) {
         const errorData = await response.json();
         throw new Error(errorData.detail || 'Failed to process audio');
       }
 
-      const result = await response.json();
-      setData(result);
+      const { job_id: jobId } = await response.json();
+      const job = await waitForJob(jobId);
+      setData({
+        transcript: job.transcript,
+        summary: job.summary,
+        action_items: job.action_items,
+        status: 'success',
+      });
     } catch (err) {
       setError(err.message);
     } finally {
@@ -95,7 +148,7 @@ function App() {
         {/* Loading State */}
         {isProcessing && (
           <div className="max-w-2xl mx-auto mb-8">
-            <LoadingSpinner message="Processing your audio file..." />
+            <LoadingSpinner message={progressMessage} />
           </div>
         )}
 